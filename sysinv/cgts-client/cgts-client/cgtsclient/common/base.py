@@ -20,6 +20,10 @@ Base utilities to build API operation managers and objects on top of.
 
 import copy
 
+from six.moves.urllib.parse import parse_qsl
+from six.moves.urllib.parse import urlencode
+from six.moves.urllib.parse import urlparse
+
 # Python 2.4 compat
 try:
     all
@@ -68,22 +72,59 @@ class Manager(object):
         return body
 
     def _list(self, url, response_key=None, obj_class=None, body=None):
-        _, body = self.api.json_request('GET', url)
+        return list(self._list_iter(url, response_key, obj_class))
 
+    def _list_iter(self, url, response_key=None, obj_class=None):
+        """Yield the objects of a collection, requesting the subsets of a
+        paginated collection one at a time.
+        """
         if obj_class is None:
             obj_class = self.resource_class
 
-        if response_key:
-            try:
-                data = body[response_key]
-            except KeyError:
-                return []
-        else:
-            data = body
-        if not isinstance(data, list):
-            data = [data]
-
-        return [obj_class(self, res, loaded=True) for res in data if res]
+        marker = None
+        while url:
+            _, body = self.api.json_request('GET', url)
+
+            if response_key:
+                try:
+                    data = body[response_key]
+                except KeyError:
+                    return
+            else:
+                data = body
+            if not isinstance(data, list):
+                data = [data]
+
+            for res in data:
+                if res:
+                    yield obj_class(self, res, loaded=True)
+
+            url, marker = self._get_next_url(url, response_key and body,
+                                             marker)
+
+    @staticmethod
+    def _get_next_url(url, body, marker):
+        """Return the url and marker of the next subset of a collection.
+
+        The marker and limit of the next link are added to the url of the
+        collection, the next link does not include the parent resource of
+        the nested collections.
+        """
+        next_link = body.get('next') if isinstance(body, dict) else None
+        if not next_link:
+            return None, None
+        next_args = dict(parse_qsl(urlparse(next_link).query))
+        next_marker = next_args.get('marker')
+        if not next_marker or next_marker == marker:
+            return None, None
+
+        parts = urlparse(url)
+        args = [(key, value) for key, value in parse_qsl(parts.query)
+                if key not in ('marker', 'limit')]
+        if 'limit' in next_args:
+            args.append(('limit', next_args['limit']))
+        args.append(('marker', next_marker))
+        return '%s?%s' % (parts.path, urlencode(args)), next_marker
 
     def _update(self, url, body, http_method='PATCH', response_key=None):
         _, body = self.api.json_request(http_method, url, body=body)
@@ -0,0 +1,81 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+import copy
+import testtools
+
+from cgtsclient.tests import utils
+import cgtsclient.v1.isensor
+
+HOST_UUID = '4ed16c34-3bb9-4a59-9d9e-02cd7d1b62d8'
+
+SENSOR1 = {'uuid': '0b0a5d13-8f13-4dc9-9c5f-4c20d5a3d3e1',
+           'sensorname': 'Fan 1'}
+SENSOR2 = {'uuid': '2b8c5f3c-0f4f-4d8e-8d2c-06d3e0e0f1a2',
+           'sensorname': 'Fan 2'}
+SENSOR3 = {'uuid': '8a7b9c0d-2e3f-4a5b-9c6d-7e8f9a0b1c2d',
+           'sensorname': 'Temp 1'}
+
+SENSORS_URL = '/v1/ihosts/%s/isensors' % HOST_UUID
+
+fixtures = {
+    SENSORS_URL:
+    {
+        'GET': (
+            {},
+            {"isensors": [SENSOR1, SENSOR2],
+             "next": "http://127.0.0.1:6385/v1/isensors?sort_key=id&"
+                     "sort_dir=asc&limit=2&marker=eyJpZCI6IDJ9"},
+        ),
+    },
+    SENSORS_URL + '?limit=2&marker=eyJpZCI6IDJ9':
+    {
+        'GET': (
+            {},
+            {"isensors": [SENSOR3]},
+        ),
+    },
+}
+
+
+class SensorManagerTest(testtools.TestCase):
+
+    def setUp(self):
+        super(SensorManagerTest, self).setUp()
+        self.api = utils.FakeAPI(fixtures)
+        self.mgr = cgtsclient.v1.isensor.isensorManager(self.api)
+
+    def test_sensor_list_pages(self):
+        sensors = self.mgr.list(HOST_UUID)
+        # the next subset is requested from the nested collection
+        expect = [
+            ('GET', SENSORS_URL, {}, None),
+            ('GET', SENSORS_URL + '?limit=2&marker=eyJpZCI6IDJ9', {}, None),
+        ]
+        self.assertEqual(self.api.calls, expect)
+        self.assertEqual([s.uuid for s in sensors],
+                         [SENSOR1['uuid'], SENSOR2['uuid'], SENSOR3['uuid']])
+
+    def test_sensor_list_iter(self):
+        sensors = self.mgr.list_iter(HOST_UUID)
+        self.assertEqual(self.api.calls, [])
+        # the next subset is only requested once the first one is consumed
+        self.assertEqual(next(sensors).uuid, SENSOR1['uuid'])
+        self.assertEqual(next(sensors).uuid, SENSOR2['uuid'])
+        self.assertEqual(len(self.api.calls), 1)
+        self.assertEqual(next(sensors).uuid, SENSOR3['uuid'])
+        self.assertEqual(len(self.api.calls), 2)
+        self.assertRaises(StopIteration, next, sensors)
+
+    def test_sensor_list_same_marker(self):
+        # a next link repeating the previous marker ends the listing
+        page = copy.deepcopy(fixtures[SENSORS_URL + '?limit=2&marker=eyJpZCI6IDJ9'])
+        page['GET'][1]['next'] = fixtures[SENSORS_URL]['GET'][1]['next']
+        self.api.fixtures = dict(fixtures)
+        self.api.fixtures[SENSORS_URL + '?limit=2&marker=eyJpZCI6IDJ9'] = page
+        sensors = self.mgr.list(HOST_UUID)
+        self.assertEqual(len(self.api.calls), 2)
+        self.assertEqual(len(sensors), 3)
@@ -28,12 +28,18 @@ class AddressManager(base.Manager):
         return self._list(path, "addresses")
 
     def list_by_interface(self, interface_id):
+        return list(self.list_by_interface_iter(interface_id))
+
+    def list_by_interface_iter(self, interface_id):
         path = '/v1/iinterfaces/%s/addresses' % interface_id
-        return self._list(path, "addresses")
+        return self._list_iter(path, "addresses")
 
     def list_by_host(self, host_id):
+        return list(self.list_by_host_iter(host_id))
+
+    def list_by_host_iter(self, host_id):
         path = '/v1/ihosts/%s/addresses' % host_id
-        return self._list(path, "addresses")
+        return self._list_iter(path, "addresses")
 
     def get(self, address_id):
         path = '/v1/addresses/%s' % address_id
@@ -31,12 +31,18 @@ class isensorManager(base.Manager):
     resource_class = isensor
 
     def list(self, ihost_id):
+        return list(self.list_iter(ihost_id))
+
+    def list_iter(self, ihost_id):
         path = '/v1/ihosts/%s/isensors' % ihost_id
-        return self._list(path, "isensors")
+        return self._list_iter(path, "isensors")
 
     def list_by_sensorgroup(self, isensorgroup_id):
+        return list(self.list_by_sensorgroup_iter(isensorgroup_id))
+
+    def list_by_sensorgroup_iter(self, isensorgroup_id):
         path = '/v1/isensorgroups/%s/isensors' % isensorgroup_id
-        return self._list(path, "isensors")
+        return self._list_iter(path, "isensors")
 
     def get(self, isensor_id):
         path = '/v1/isensors/%s' % isensor_id
@@ -55,7 +55,7 @@ def _print_isensor_show(isensor):
 
 
 def _find_sensor(cc, ihost, sensor_uuid):
-    sensors = cc.isensor.list(ihost.uuid)
+    sensors = cc.isensor.list_iter(ihost.uuid)
     for p in sensors:
         if p.uuid == sensor_uuid:
             break
@@ -84,7 +84,7 @@ def get_sensorgroup_display_name(s):
 
 
 def _get_sensors(cc, ihost, sensorgroup):
-    sensors = cc.isensor.list_by_sensorgroup(sensorgroup.uuid)
+    sensors = cc.isensor.list_by_sensorgroup_iter(sensorgroup.uuid)
     sensor_list = [isensor_utils.get_sensor_display_name(p) for p in sensors]
 
     sensorgroup.sensors = sensor_list
@@ -19,8 +19,11 @@ class PortManager(base.Manager):
     resource_class = Port
 
     def list(self, ihost_id):
+        return list(self.list_iter(ihost_id))
+
+    def list_iter(self, ihost_id):
         path = '/v1/ihosts/%s/ports' % ihost_id
-        return self._list(path, "ports")
+        return self._list_iter(path, "ports")
 
     def get(self, port_id):
         path = '/v1/ports/%s' % port_id
@@ -40,7 +40,7 @@ def _print_port_show(port):
 
 
 def _find_port(cc, ihost, portnameoruuid):
-    ports = cc.port.list(ihost.uuid)
+    ports = cc.port.list_iter(ihost.uuid)
     for p in ports:
         if p.name == portnameoruuid or p.uuid == portnameoruuid:
             break
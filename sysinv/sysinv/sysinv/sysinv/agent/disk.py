@@ -17,8 +17,11 @@ import pyudev
 import re
 import sys
 
+from oslo_config import cfg
 from oslo_log import log as logging
 
+from sysinv.agent import lvm_snapshot
+from sysinv.agent import probe_cache
 from sysinv.common import disk_utils
 from sysinv.common import constants
 from sysinv.common import utils
@@ -27,6 +30,8 @@ from sysinv.openstack.common import context
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+
 
 class DiskOperator(object):
     '''Class to encapsulate Disk operations for System Inventory'''
@@ -43,6 +48,11 @@ class DiskOperator(object):
         self.free_memory_nodes_MiB = []
         self.topology = {}
 
+        self._probe_cache = None
+        if CONF.agent.disk_probe_cache:
+            self._probe_cache = probe_cache.ProbeCache(
+                CONF.agent.disk_probe_cache)
+
         # self._get_cpu_topology()
         # self._get_default_hugepage_size_kB()
         # self._get_total_memory_MiB()
@@ -105,12 +115,7 @@ class DiskOperator(object):
             LOG.debug("Format of disk node %s is not GPT." % device_node)
             return 0
 
-        pvs_command = '{} {}'.format('pvs | grep -w ', device_node)
-        pvs_process = subprocess.Popen(pvs_command, stdout=subprocess.PIPE,
-                                       shell=True, universal_newlines=True)
-        pvs_output = pvs_process.stdout.read()
-
-        if pvs_output:
+        if lvm_snapshot.get_report().has_pv(device_node):
             LOG.debug("Disk %s is completely used by a PV => 0 available mib."
                       % device_node)
             return 0
@@ -148,6 +153,51 @@ class DiskOperator(object):
 
         return avail_space_mib
 
+    def get_disk_model(self, device):
+        """Obtain the model of a disk.
+
+        :param device: the udev device of the disk
+        :returns the model of the disk
+        """
+        model_num = ''
+        # ID_MODEL received from udev is not correct for disks that
+        # are used entirely for LVM. LVM replaced the model ID with
+        # its own identifier that starts with "LVM PV".For this
+        # reason we will attempt to retrieve the correct model ID
+        # by using 2 different commands: hdparm and lsblk and
+        # hdparm. If one of them fails, the other one can attempt
+        # to retrieve the information. Else we use udev.
+
+        # try hdparm command first
+        hdparm_command = 'hdparm -I %s |grep Model' % (
+            device.get('DEVNAME'))
+        hdparm_process = subprocess.Popen(
+            hdparm_command,
+            stdout=subprocess.PIPE,
+            shell=True, universal_newlines=True)
+        hdparm_output = hdparm_process.communicate()[0]
+        if hdparm_process.returncode == 0:
+            second_half = hdparm_output.split(':')[1]
+            model_num = second_half.strip()
+        else:
+            # try lsblk command
+            lsblk_command = 'lsblk -dn --output MODEL %s' % (
+                                 device.get('DEVNAME'))
+            lsblk_process = subprocess.Popen(
+                                lsblk_command,
+                                stdout=subprocess.PIPE,
+                                shell=True,
+                                universal_newlines=True)
+            lsblk_output = lsblk_process.communicate()[0]
+            if lsblk_process.returncode == 0:
+                model_num = lsblk_output.strip()
+            else:
+                # both hdparm and lsblk commands failed, try udev
+                model_num = device.get('ID_MODEL')
+        if not model_num:
+            model_num = constants.DEVICE_MODEL_UNKNOWN
+        return model_num
+
     def disk_prepare(self, host_uuid, idisk_dict,
                      skip_format, is_cinder_device):
         disk_node = idisk_dict.get('device_path')
@@ -155,6 +205,7 @@ class DiskOperator(object):
         disk_utils.disk_wipe(disk_node)
         if not skip_format:
             utils.execute('parted', disk_node, 'mklabel', 'gpt')
+        lvm_snapshot.invalidate()
 
         if is_cinder_device:
             LOG.debug("Removing .node_cinder_lvm_config_complete_file")
@@ -237,6 +288,62 @@ class DiskOperator(object):
 
         return device_id, device_wwn
 
+    def get_probe_key(self, device):
+        """Return the persistent identifier of a disk, by which the results
+           of its probes are cached.
+        """
+        device_wwn = self.get_device_id_wwn(device)[1]
+        return device_wwn or device.get('ID_PATH')
+
+    def get_probe_stamp(self, device):
+        """Return the udev state of a disk on which its model and capacity
+           depend. The initialization time of a disk changes when the disk
+           is added again.
+        """
+        if not device.get('USEC_INITIALIZED'):
+            return None
+        return [device.device_node, device.get('USEC_INITIALIZED'),
+                device.get('ID_SERIAL')]
+
+    def get_layout_stamp(self, device):
+        """Return the state of a disk on which its free space depends: its
+           partition table, its filesystem type for the disks used entirely
+           by LVM, and the partitions known by the kernel.
+        """
+        stamp = self.get_probe_stamp(device)
+        if stamp is None:
+            return None
+        stamp = stamp + [device.get('ID_PART_TABLE_TYPE'),
+                         device.get('ID_PART_TABLE_UUID'),
+                         device.get('ID_FS_TYPE')]
+        try:
+            for name in sorted(os.listdir(device.sys_path)):
+                if not name.startswith(device.sys_name):
+                    continue
+                partition = [name]
+                for attribute in ['start', 'size']:
+                    with open(os.path.join(device.sys_path, name,
+                                           attribute), 'r') as f:
+                        partition.append(f.read().strip())
+                stamp.append(partition)
+        except (IOError, OSError):
+            return None
+        return stamp
+
+    def _cached_probe(self, device, probe, stamp, function, *args, **kwargs):
+        """Return the cached result of a probe of a disk, running the probe
+           if not cached for the stamp.
+        """
+        key = self.get_probe_key(device)
+        if self._probe_cache is None or key is None or stamp is None:
+            return function(*args, **kwargs)
+
+        result = self._probe_cache.get(key, probe, stamp)
+        if result is None:
+            result = function(*args, **kwargs)
+            self._probe_cache.set(key, probe, stamp, result)
+        return result
+
     def idisk_get(self):
         """Enumerate disk topology based on:
 
@@ -246,140 +353,131 @@ class DiskOperator(object):
         idisk = []
         context = pyudev.Context()
 
+        probe_keys = []
         for device in context.list_devices(DEVTYPE='disk'):
-            if not utils.is_system_usable_block_device(device):
-                continue
-
-            if device['MAJOR'] in constants.VALID_MAJOR_LIST:
-                if 'ID_PATH' in device:
-                    device_path = "/dev/disk/by-path/" + device['ID_PATH']
-                    LOG.debug("[DiskEnum] device_path: %s ", device_path)
-                else:
-                    # We should always have a udev supplied /dev/disk/by-path
-                    # value as a matter of normal operation. We do not expect
-                    # this to occur, thus the error.
-                    #
-                    # The kickstart files for the host install require the
-                    # by-path value also to be present or the host install will
-                    # fail. Since the installer and the runtime share the same
-                    # kernel/udev we should not see this message on an installed
-                    # system.
-                    device_path = None
-                    LOG.error("Device %s does not have an ID_PATH value provided "
-                              "by udev" % device.device_node)
-
-                size_mib = 0
-                available_mib = 0
-                model_num = ''
-                serial_id = ''
-
-                # Can merge all try/except in one block but this allows at
-                # least attributes with no exception to be filled
-                try:
-                    size_mib = utils.get_disk_capacity_mib(device.device_node)
-                except Exception as e:
-                    self.handle_exception("Could not retrieve disk size - %s "
-                                          % e)
-
-                try:
-                    available_mib = self.get_disk_available_mib(
-                        device_node=device.device_node)
-                except Exception as e:
-                    self.handle_exception("Could not retrieve disk %s free space" % e)
-
-                try:
-                    # ID_MODEL received from udev is not correct for disks that
-                    # are used entirely for LVM. LVM replaced the model ID with
-                    # its own identifier that starts with "LVM PV".For this
-                    # reason we will attempt to retrieve the correct model ID
-                    # by using 2 different commands: hdparm and lsblk and
-                    # hdparm. If one of them fails, the other one can attempt
-                    # to retrieve the information. Else we use udev.
-
-                    # try hdparm command first
-                    hdparm_command = 'hdparm -I %s |grep Model' % (
-                        device.get('DEVNAME'))
-                    hdparm_process = subprocess.Popen(
-                        hdparm_command,
-                        stdout=subprocess.PIPE,
-                        shell=True, universal_newlines=True)
-                    hdparm_output = hdparm_process.communicate()[0]
-                    if hdparm_process.returncode == 0:
-                        second_half = hdparm_output.split(':')[1]
-                        model_num = second_half.strip()
-                    else:
-                        # try lsblk command
-                        lsblk_command = 'lsblk -dn --output MODEL %s' % (
-                                             device.get('DEVNAME'))
-                        lsblk_process = subprocess.Popen(
-                                            lsblk_command,
-                                            stdout=subprocess.PIPE,
-                                            shell=True,
-                                            universal_newlines=True)
-                        lsblk_output = lsblk_process.communicate()[0]
-                        if lsblk_process.returncode == 0:
-                            model_num = lsblk_output.strip()
-                        else:
-                            # both hdparm and lsblk commands failed, try udev
-                            model_num = device.get('ID_MODEL')
-                    if not model_num:
-                        model_num = constants.DEVICE_MODEL_UNKNOWN
-                except Exception as e:
-                    self.handle_exception("Could not retrieve disk model "
-                                          "for disk %s. Exception: %s" %
-                                          (device.get('DEVNAME'), e))
-                try:
-                    if 'ID_SCSI_SERIAL' in device:
-                        serial_id = device['ID_SCSI_SERIAL']
-                    else:
-                        serial_id = device['ID_SERIAL_SHORT']
-                except Exception as e:
-                    self.handle_exception("Could not retrieve disk "
-                                          "serial ID - %s " % e)
-
-                capabilities = dict()
-                if model_num:
-                    capabilities.update({'model_num': model_num})
-
-                if self.get_rootfs_node() == device.device_node:
-                    capabilities.update({'stor_function': 'rootfs'})
-
-                rotational = self.is_rotational(device)
-                device_type = device.device_type
-
-                rotation_rate = constants.DEVICE_TYPE_UNDETERMINED
-                if rotational == '1':
-                    device_type = constants.DEVICE_TYPE_HDD
-                    if 'ID_ATA_ROTATION_RATE_RPM' in device:
-                        rotation_rate = device['ID_ATA_ROTATION_RATE_RPM']
-                elif rotational == '0':
-                    if constants.DEVICE_NAME_NVME in device.device_node:
-                        device_type = constants.DEVICE_TYPE_NVME
-                    else:
-                        device_type = constants.DEVICE_TYPE_SSD
-                    rotation_rate = constants.DEVICE_TYPE_NA
-
-                # TODO else: what is the other possible stor_function value?
-                #      or do we just use pair { 'is_rootfs': True } instead?
-                # Obtain device ID and WWN.
-                device_id, device_wwn = self.get_device_id_wwn(device)
-
-                attr = {
-                        'device_node': device.device_node,
-                        'device_num': device.device_number,
-                        'device_type': device_type,
-                        'device_path': device_path,
-                        'device_id': device_id,
-                        'device_wwn': device_wwn,
-                        'size_mib': size_mib,
-                        'available_mib': available_mib,
-                        'serial_id': serial_id,
-                        'capabilities': capabilities,
-                        'rpm': rotation_rate,
-                       }
-
+            attr = self.idisk_get_device(device)
+            if attr is not None:
                 idisk.append(attr)
+                probe_keys.append(self.get_probe_key(device))
+
+        if self._probe_cache is not None:
+            self._probe_cache.prune(probe_keys)
 
         LOG.debug("idisk= %s" % idisk)
 
         return idisk
+
+    def idisk_get_device(self, device):
+        """Obtain the attributes of a disk.
+
+        :param device: the udev device of the disk
+        :returns disk attributes, or None if the disk is not inventoried
+        """
+        if not utils.is_system_usable_block_device(device):
+            return None
+
+        if device['MAJOR'] not in constants.VALID_MAJOR_LIST:
+            return None
+
+        if 'ID_PATH' in device:
+            device_path = "/dev/disk/by-path/" + device['ID_PATH']
+            LOG.debug("[DiskEnum] device_path: %s ", device_path)
+        else:
+            # We should always have a udev supplied /dev/disk/by-path
+            # value as a matter of normal operation. We do not expect
+            # this to occur, thus the error.
+            #
+            # The kickstart files for the host install require the
+            # by-path value also to be present or the host install will
+            # fail. Since the installer and the runtime share the same
+            # kernel/udev we should not see this message on an installed
+            # system.
+            device_path = None
+            LOG.error("Device %s does not have an ID_PATH value provided "
+                      "by udev" % device.device_node)
+
+        size_mib = 0
+        available_mib = 0
+        model_num = ''
+        serial_id = ''
+
+        # Can merge all try/except in one block but this allows at
+        # least attributes with no exception to be filled
+        # The model and the capacity of a disk are cached until the disk is
+        # added again, its free space until its partitions change.
+        stamp = self.get_probe_stamp(device)
+        layout_stamp = self.get_layout_stamp(device)
+
+        try:
+            size_mib = self._cached_probe(device, 'size_mib', stamp,
+                                          utils.get_disk_capacity_mib,
+                                          device.device_node)
+        except Exception as e:
+            self.handle_exception("Could not retrieve disk size - %s "
+                                  % e)
+
+        try:
+            available_mib = self._cached_probe(
+                device, 'available_mib', layout_stamp,
+                self.get_disk_available_mib, device_node=device.device_node)
+        except Exception as e:
+            self.handle_exception("Could not retrieve disk %s free space" % e)
+
+        try:
+            model_num = self._cached_probe(device, 'model_num', stamp,
+                                           self.get_disk_model, device)
+        except Exception as e:
+            self.handle_exception("Could not retrieve disk model "
+                                  "for disk %s. Exception: %s" %
+                                  (device.get('DEVNAME'), e))
+        try:
+            if 'ID_SCSI_SERIAL' in device:
+                serial_id = device['ID_SCSI_SERIAL']
+            else:
+                serial_id = device['ID_SERIAL_SHORT']
+        except Exception as e:
+            self.handle_exception("Could not retrieve disk "
+                                  "serial ID - %s " % e)
+
+        capabilities = dict()
+        if model_num:
+            capabilities.update({'model_num': model_num})
+
+        if self.get_rootfs_node() == device.device_node:
+            capabilities.update({'stor_function': 'rootfs'})
+
+        rotational = self.is_rotational(device)
+        device_type = device.device_type
+
+        rotation_rate = constants.DEVICE_TYPE_UNDETERMINED
+        if rotational == '1':
+            device_type = constants.DEVICE_TYPE_HDD
+            if 'ID_ATA_ROTATION_RATE_RPM' in device:
+                rotation_rate = device['ID_ATA_ROTATION_RATE_RPM']
+        elif rotational == '0':
+            if constants.DEVICE_NAME_NVME in device.device_node:
+                device_type = constants.DEVICE_TYPE_NVME
+            else:
+                device_type = constants.DEVICE_TYPE_SSD
+            rotation_rate = constants.DEVICE_TYPE_NA
+
+        # TODO else: what is the other possible stor_function value?
+        #      or do we just use pair { 'is_rootfs': True } instead?
+        # Obtain device ID and WWN.
+        device_id, device_wwn = self.get_device_id_wwn(device)
+
+        attr = {
+                'device_node': device.device_node,
+                'device_num': device.device_number,
+                'device_type': device_type,
+                'device_path': device_path,
+                'device_id': device_id,
+                'device_wwn': device_wwn,
+                'size_mib': size_mib,
+                'available_mib': available_mib,
+                'serial_id': serial_id,
+                'capabilities': capabilities,
+                'rpm': rotation_rate,
+               }
+
+        return attr
@@ -0,0 +1,258 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# All Rights Reserved.
+#
+
+""" Event driven inventory of the disks and their partitions.
+
+The disks are probed by a full scan, then again only when udev reports that
+a disk, or one of its partitions, was added, changed or removed; the events
+received in a burst are applied together, probing each disk once. The partitions
+of a disk are probed when first requested after a scan or an event of the
+disk. The inventory is served from memory in between, and the disks are
+scanned again on request or after a long safety interval.
+"""
+
+import collections
+import copy
+import time
+
+import eventlet
+from eventlet import hubs
+from eventlet import semaphore
+import pyudev
+
+from oslo_config import cfg
+from oslo_log import log as logging
+
+LOG = logging.getLogger(__name__)
+
+disk_monitor_opts = [
+       cfg.BoolOpt('disk_monitor',
+                   default=False,
+                   help='Update the inventory of the disks and partitions on '
+                        'udev events instead of probing every disk on every '
+                        'audit'),
+       cfg.IntOpt('disk_rescan_interval',
+                  default=3600,
+                  help='Seconds between the full scans of the disks and '
+                       'partitions inventoried on udev events'),
+                    ]
+
+CONF = cfg.CONF
+CONF.register_opts(disk_monitor_opts, 'agent')
+
+# seconds without a udev event after which the events received are applied
+EVENT_SETTLE_TIME = 0.5
+
+# seconds after which the events received are applied during a long burst
+EVENT_MAX_DELAY = 5
+
+
+class DiskMonitor(object):
+    """Class to keep the inventory of the disks and partitions current
+    from the udev events of the block devices.
+    """
+
+    def __init__(self, disk_operator, partition_operator):
+        self._disk_operator = disk_operator
+        self._partition_operator = partition_operator
+        self._context = None
+        self._monitor = None
+        self._watcher = None
+        self._poll_supported = True
+        # the scans and the events are applied one at a time
+        self._lock = semaphore.Semaphore()
+        # udev devices and attributes of the inventoried disks, and their
+        # partitions once probed, by sys path in enumeration order
+        self._devices = collections.OrderedDict()
+        self._disks = collections.OrderedDict()
+        self._partitions = {}
+        self._scanned_at = 0
+
+    @property
+    def started(self):
+        return self._watcher is not None
+
+    def start(self):
+        """Start receiving the udev events of the block devices.
+
+        The disks are scanned when first requested.
+        """
+        if self._watcher is not None:
+            return
+
+        self._context = pyudev.Context()
+        self._monitor = pyudev.Monitor.from_netlink(self._context)
+        self._monitor.filter_by('block')
+        self._monitor.start()
+        self._watcher = eventlet.spawn(self._watch)
+        LOG.info("Disk inventory monitoring udev events, full scan every "
+                 "%ss" % CONF.agent.disk_rescan_interval)
+
+    def stop(self):
+        if self._watcher is not None:
+            self._watcher.kill()
+            self._watcher = None
+        self._monitor = None
+
+    def _receive(self, timeout=None):
+        """Return the device of the next udev event, or None if there is
+        none within timeout seconds.
+        """
+        # The hub waits for the netlink socket, and the pending device is
+        # then received without waiting. Recent pyudev versions poll with
+        # select.poll, which the eventlet monkey patching removes; the
+        # device is then received with the deprecated receive_device.
+        try:
+            hubs.trampoline(self._monitor.fileno(), read=True,
+                            timeout=timeout)
+        except eventlet.Timeout:
+            return None
+        if self._poll_supported:
+            try:
+                return self._monitor.poll(timeout=0)
+            except AttributeError:
+                self._poll_supported = False
+        return self._monitor.receive_device()[1]
+
+    def _receive_events(self):
+        """Wait for a udev event, and return its device followed by those
+        of the events received until they settle.
+        """
+        devices = [self._receive()]
+        deadline = time.time() + EVENT_MAX_DELAY
+        while True:
+            timeout = min(EVENT_SETTLE_TIME, deadline - time.time())
+            if timeout <= 0:
+                break
+            device = self._receive(timeout)
+            if device is None:
+                break
+            devices.append(device)
+        return devices
+
+    def _watch(self):
+        while True:
+            try:
+                devices = self._receive_events()
+            except Exception:
+                LOG.exception("Failed to receive the udev events of the "
+                              "disks, scanning them on the next request")
+                self._scanned_at = 0
+                eventlet.sleep(1)
+                continue
+
+            with self._lock:
+                self.handle_events(devices)
+
+    def handle_event(self, device):
+        """Probe again the disk of a udev block device event.
+
+        :param device: the udev device of the event
+        """
+        self.handle_events([device])
+
+    def handle_events(self, devices):
+        """Probe again the disks of udev block device events, once per
+        disk according to its last event.
+
+        :param devices: the udev devices of the events, in order
+        """
+        disks = collections.OrderedDict()
+        for device in devices:
+            if device is None:
+                continue
+            if device.device_type == 'partition':
+                disk = device.find_parent('block', 'disk')
+                if disk is None:
+                    continue
+                action = 'change'
+            elif device.device_type == 'disk':
+                disk = device
+                action = device.action
+            else:
+                continue
+
+            LOG.debug("[DiskMonitor] %s %s: probing %s" %
+                      (device.action, device.sys_path, disk.sys_path))
+            disks[disk.sys_path] = (disk, action)
+
+        for disk, action in disks.values():
+            if action == 'remove':
+                self._forget(disk.sys_path)
+                continue
+            try:
+                self._probe(disk)
+            except Exception:
+                LOG.exception("Failed to probe disk %s, scanning the disks "
+                              "on the next request" % disk.sys_path)
+                self._scanned_at = 0
+
+    def _forget(self, sys_path):
+        self._devices.pop(sys_path, None)
+        self._disks.pop(sys_path, None)
+        self._partitions.pop(sys_path, None)
+
+    def _probe(self, device):
+        self._partitions.pop(device.sys_path, None)
+        attr = self._disk_operator.idisk_get_device(device)
+        if attr is None:
+            self._forget(device.sys_path)
+            return
+        self._devices[device.sys_path] = device
+        self._disks[device.sys_path] = attr
+
+    def _scan(self):
+        self._devices.clear()
+        self._disks.clear()
+        self._partitions.clear()
+        for device in self._context.list_devices(DEVTYPE='disk'):
+            self._probe(device)
+        self._scanned_at = time.time()
+
+    def _check_scan(self):
+        if time.time() - self._scanned_at >= CONF.agent.disk_rescan_interval:
+            self._scan()
+
+    def rescan(self):
+        """Scan all the disks on the next request"""
+        self._scanned_at = 0
+
+    def idisk_get(self):
+        """Enumerate the disks, from memory if monitoring.
+
+        :returns list of disk and attributes
+        """
+        if not self.started:
+            return self._disk_operator.idisk_get()
+
+        with self._lock:
+            self._check_scan()
+            return copy.deepcopy(list(self._disks.values()))
+
+    def ipartition_get(self, skip_gpt_check=False):
+        """Enumerate the partitions, from memory if monitoring.
+
+        :returns list of partitions and attributes
+        """
+        if not self.started or skip_gpt_check:
+            return self._partition_operator.ipartition_get(
+                skip_gpt_check=skip_gpt_check)
+
+        with self._lock:
+            self._check_scan()
+            ipartitions = []
+            for sys_path, device in self._devices.items():
+                if sys_path not in self._partitions:
+                    self._partitions[sys_path] = \
+                        self._partition_operator.ipartition_get_device(
+                            device) or []
+                ipartitions.extend(self._partitions[sys_path])
+            return copy.deepcopy(ipartitions)
@@ -11,10 +11,10 @@
 
 """ inventory ipy Utilities and helper functions."""
 
-from eventlet.green import subprocess
 import sys
 
 from oslo_log import log as logging
+from sysinv.agent import lvm_snapshot
 from sysinv.common import constants
 
 LOG = logging.getLogger(__name__)
@@ -33,29 +33,22 @@ class LVGOperator(object):
 
     def thinpools_in_vg(self, vg, cinder_device=None):
         """Return number of thinpools in the specified vg. """
-        try:
-            command = ['vgs', '--noheadings', '-o', 'lv_name', vg]
-            if cinder_device:
-                if vg == constants.LVG_CINDER_VOLUMES:
-                    global_filer = 'devices/global_filter=["a|' + \
-                                   cinder_device + '|","r|.*|"]'
-                    command = command + ['--config', global_filer]
-            output = subprocess.check_output(command, universal_newlines=True)  # pylint: disable=not-callable
-        except Exception as e:
-            self.handle_exception("Could not retrieve vgdisplay "
-                                  "information: %s" % e)
-            output = ""
+        global_filter = None
+        if cinder_device:
+            if vg == constants.LVG_CINDER_VOLUMES:
+                global_filter = lvm_snapshot.get_device_filter(cinder_device)
+        report = lvm_snapshot.get_report(global_filter)
+
         thinpools = 0
-        for line in output.splitlines():
+        for lv_name in report.lv_names(vg):
             # This makes some assumptions, the suffix is defined in nova.
-            if constants.LVM_POOL_SUFFIX in line:
+            if constants.LVM_POOL_SUFFIX in lv_name:
                 thinpools += 1
 
         return thinpools
 
-    def ilvg_rook_get(self):
-        # rook-ceph are hidden by global_filter, list them separately.
-        # keys: matching the field order of pvdisplay command
+    def _get_vg_attr(self, vg):
+        # keys: matching the LVM report fields
         string_keys = ['lvm_vg_name', 'lvm_vg_uuid', 'lvm_vg_access',
                        'lvm_max_lv', 'lvm_cur_lv', 'lvm_max_pv',
                        'lvm_cur_pv', 'lvm_vg_size', 'lvm_vg_total_pe',
@@ -66,42 +59,25 @@ class LVGOperator(object):
                     'lvm_cur_pv', 'lvm_vg_size', 'lvm_vg_total_pe',
                     'lvm_vg_free_pe']
 
-        # pvdisplay command to retrieve the pv data of all pvs present
-        vgdisplay_command = 'vgdisplay -C --aligned -o vg_name,vg_uuid,vg_attr'\
-                            ',max_lv,lv_count,max_pv,pv_count,vg_size,'\
-                            'vg_extent_count,vg_free_count'\
-                            ' --units B --nosuffix --noheadings'
-
-        disable_filter = ' --config \'devices/global_filter=["a|.*|"]\''
-        vgdisplay_command = vgdisplay_command + disable_filter
-
-        try:
-            vgdisplay_process = subprocess.Popen(vgdisplay_command,
-                                                 stdout=subprocess.PIPE,
-                                                 shell=True)
-            vgdisplay_output = vgdisplay_process.stdout.read().decode("utf-8")
-        except Exception as e:
-            self.handle_exception("Could not retrieve vgdisplay "
-                                  "information: %s" % e)
-            vgdisplay_output = ""
-
-        # parse the output 1 vg/row
-        rook_vgs = []
-        for row in vgdisplay_output.split('\n'):
-            if row.strip().startswith("ceph"):
+        # create the dict of attributes
+        attr = dict((key, vg[field]) for key, field in
+                    zip(string_keys, lvm_snapshot.VG_FIELDS) if field in vg)
 
-                # get the values of fields as strings
-                values = row.split()
+        # convert required values from strings to ints
+        for k in int_keys:
+            if k in attr.keys():
+                attr[k] = int(attr[k])
 
-                # create the dict of attributes
-                attr = dict(zip(string_keys, values))
+        return attr
 
-                # convert required values from strings to ints
-                for k in int_keys:
-                    if k in attr.keys():
-                        attr[k] = int(attr[k])
+    def ilvg_rook_get(self):
+        # rook-ceph are hidden by global_filter, list them separately.
+        report = lvm_snapshot.get_report(lvm_snapshot.ACCEPT_ALL_FILTER)
 
-                rook_vgs.append(attr)
+        rook_vgs = []
+        for vg in report.vgs:
+            if vg['vg_name'].startswith("ceph"):
+                rook_vgs.append(self._get_vg_attr(vg))
 
         return rook_vgs
 
@@ -114,63 +90,15 @@ class LVGOperator(object):
         '''
         ilvg = []
 
-        # keys: matching the field order of pvdisplay command
-        string_keys = ['lvm_vg_name', 'lvm_vg_uuid', 'lvm_vg_access',
-                       'lvm_max_lv', 'lvm_cur_lv', 'lvm_max_pv',
-                       'lvm_cur_pv', 'lvm_vg_size', 'lvm_vg_total_pe',
-                       'lvm_vg_free_pe']
-
-        # keys that need to be translated into ints
-        int_keys = ['lvm_max_lv', 'lvm_cur_lv', 'lvm_max_pv',
-                    'lvm_cur_pv', 'lvm_vg_size', 'lvm_vg_total_pe',
-                    'lvm_vg_free_pe']
-
-        # pvdisplay command to retrieve the pv data of all pvs present
-        vgdisplay_command = 'vgdisplay -C --aligned -o vg_name,vg_uuid,vg_attr'\
-                            ',max_lv,lv_count,max_pv,pv_count,vg_size,'\
-                            'vg_extent_count,vg_free_count'\
-                            ' --units B --nosuffix --noheadings'
-
-        # Execute the command
-        try:
-            vgdisplay_process = subprocess.Popen(vgdisplay_command,
-                                                 stdout=subprocess.PIPE,
-                                                 shell=True,
-                                                 universal_newlines=True)
-            vgdisplay_output = vgdisplay_process.stdout.read()
-        except Exception as e:
-            self.handle_exception("Could not retrieve vgdisplay "
-                                  "information: %s" % e)
-            vgdisplay_output = ""
+        vgs = list(lvm_snapshot.get_report().vgs)
 
         # Cinder devices are hidden by global_filter, list them separately.
         if cinder_device:
-            new_global_filer = ' --config \'devices/global_filter=["a|' + \
-                               cinder_device + '|","r|.*|"]\''
-            vgdisplay_command = vgdisplay_command + new_global_filer
-
-            try:
-                vgdisplay_process = subprocess.Popen(vgdisplay_command,
-                                                     stdout=subprocess.PIPE,
-                                                     shell=True,
-                                                     universal_newlines=True)
-                vgdisplay_output = vgdisplay_output + vgdisplay_process.stdout.read()
-            except Exception as e:
-                self.handle_exception("Could not retrieve vgdisplay "
-                                      "information: %s" % e)
-
-        # parse the output 1 vg/row
-        for row in vgdisplay_output.split('\n'):
-            # get the values of fields as strings
-            values = row.split()
-
-            # create the dict of attributes
-            attr = dict(zip(string_keys, values))
-
-            # convert required values from strings to ints
-            for k in int_keys:
-                if k in attr.keys():
-                    attr[k] = int(attr[k])
+            vgs += lvm_snapshot.get_report(
+                lvm_snapshot.get_device_filter(cinder_device)).vgs
+
+        for vg in vgs:
+            attr = self._get_vg_attr(vg)
 
             # subtract any thinpools from the lv count
             if 'lvm_cur_lv' in attr:
@@ -0,0 +1,127 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# All Rights Reserved.
+#
+
+""" Snapshot of the LVM volume groups, physical and logical volumes.
+
+Every LVM command takes the global LVM lock and scans the devices. The
+volume groups, physical and logical volumes are read by a single
+'lvm fullreport' per device filter, and the report is shared by the
+operators of the agent until invalidated, at the start of each audit or
+after LVM is modified, or until it is a few seconds old.
+"""
+
+from eventlet.green import subprocess
+import json
+import sys
+import time
+
+from oslo_log import log as logging
+
+LOG = logging.getLogger(__name__)
+
+# seconds a report is used before being read again
+MAX_AGE = 10
+
+# devices/global_filter accepting all the devices, to report the devices of
+# rook-ceph which are hidden by the global filter
+ACCEPT_ALL_FILTER = 'devices/global_filter=["a|.*|"]'
+
+VG_FIELDS = ['vg_name', 'vg_uuid', 'vg_attr', 'max_lv', 'lv_count', 'max_pv',
+             'pv_count', 'vg_size', 'vg_extent_count', 'vg_free_count']
+PV_FIELDS = ['pv_name', 'vg_name', 'pv_uuid', 'pv_size', 'pv_pe_count',
+             'pv_pe_alloc_count']
+LV_FIELDS = ['lv_name', 'vg_name']
+
+# reports by device filter, with the time they were read
+_reports = {}
+
+
+def get_device_filter(device):
+    """Return the devices/global_filter accepting only a device"""
+    return 'devices/global_filter=["a|%s|","r|.*|"]' % device
+
+
+class LVMReport(object):
+    """Volume groups, physical and logical volumes reported by LVM, as
+    lists of dicts of their fields.
+    """
+
+    def __init__(self, vgs=None, pvs=None, lvs=None):
+        self.vgs = vgs or []
+        self.pvs = pvs or []
+        self.lvs = lvs or []
+
+    def lv_names(self, vg_name):
+        """Return the names of the logical volumes of a volume group"""
+        return [lv['lv_name'] for lv in self.lvs
+                if lv.get('vg_name') == vg_name]
+
+    def has_pv(self, pv_name):
+        """Return whether a device is a physical volume"""
+        return any(pv['pv_name'] == pv_name for pv in self.pvs)
+
+
+def _handle_exception(e):
+    traceback = sys.exc_info()[-1]
+    LOG.error("%s @ %s:%s" % (e, traceback.tb_frame.f_code.co_filename,
+                              traceback.tb_lineno))
+
+
+def _read(global_filter):
+    command = ['lvm', 'fullreport', '--reportformat', 'json',
+               '--units', 'B', '--nosuffix',
+               '--configreport', 'vg', '-o', ','.join(VG_FIELDS),
+               '--configreport', 'pv', '-o', ','.join(PV_FIELDS),
+               '--configreport', 'lv', '-o', ','.join(LV_FIELDS),
+               '--configreport', 'pvseg', '-o', 'pv_name',
+               '--configreport', 'seg', '-o', 'lv_name']
+    if global_filter:
+        command += ['--config', global_filter]
+
+    process = subprocess.Popen(command, stdout=subprocess.PIPE,
+                               universal_newlines=True)
+    output = process.communicate()[0]
+    if process.returncode != 0 and not output:
+        raise RuntimeError("lvm fullreport returned %s" % process.returncode)
+
+    report = LVMReport()
+    # one report per volume group, and one for the orphan volumes
+    for entry in json.loads(output).get('report', []):
+        report.vgs.extend(entry.get('vg', []))
+        report.pvs.extend(entry.get('pv', []))
+        report.lvs.extend(entry.get('lv', []))
+    return report
+
+
+def get_report(global_filter=None):
+    """Return the LVM report of the devices accepted by a global filter.
+
+    :param global_filter: devices/global_filter of the report, None for the
+                          filter configured on the host
+    :returns: an LVMReport, empty if LVM could not be read
+    """
+    cached = _reports.get(global_filter)
+    if cached is not None and time.time() - cached[1] < MAX_AGE:
+        return cached[0]
+
+    try:
+        report = _read(global_filter)
+    except Exception as e:
+        _handle_exception("Could not retrieve the LVM report: %s" % e)
+        return LVMReport()
+
+    _reports[global_filter] = (report, time.time())
+    return report
+
+
+def invalidate():
+    """Read the reports again on their next use"""
+    _reports.clear()
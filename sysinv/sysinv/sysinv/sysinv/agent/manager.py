@@ -51,14 +51,17 @@ from six import StringIO
 from oslo_config import cfg
 from oslo_log import log
 from sysinv.agent import disk
+from sysinv.agent import disk_monitor
 from sysinv.agent import partition
 from sysinv.agent import pv
 from sysinv.agent import lvg
+from sysinv.agent import lvm_snapshot
 from sysinv.agent import pci
 from sysinv.agent import node
 from sysinv.agent.lldp import plugin as lldp_plugin
 from sysinv.common import constants
 from sysinv.common import exception
+from sysinv.common import inventory_report
 from sysinv.common import service
 from sysinv.common import utils
 from sysinv.fpga_agent import constants as fpga_constants
@@ -85,6 +88,15 @@ agent_opts = [
        cfg.IntOpt('audit_interval',
                   default=60,
                   help='Maximum time since the last check-in of a agent'),
+       cfg.BoolOpt('inventory_delta_reports',
+                   default=True,
+                   help='Report the memory, disks, local volume groups and '
+                        'physical volumes to the conductor by delta, with '
+                        'the full reports as fallback for older conductors'),
+       cfg.IntOpt('inventory_full_report_interval',
+                  default=3600,
+                  help='Seconds between the full reports of the inventory '
+                       'reported by delta'),
               ]
 
 CONF = cfg.CONF
@@ -160,6 +172,8 @@ class AgentManager(service.PeriodicService):
         self._idisk_operator = disk.DiskOperator()
         self._ipv_operator = pv.PVOperator()
         self._ipartition_operator = partition.PartitionOperator()
+        self._disk_monitor = disk_monitor.DiskMonitor(
+            self._idisk_operator, self._ipartition_operator)
         self._ilvg_operator = lvg.LVGOperator()
         self._lldp_operator = lldp_plugin.SysinvLldpPlugin()
         self._iconfig_read_config_reported = None
@@ -182,6 +196,8 @@ class AgentManager(service.PeriodicService):
         self._first_grub_update = False
         self._inventoried_initial = False
         self._inventory_reported = set()
+        self._inventory_delta_supported = CONF.agent.inventory_delta_reports
+        self._inventory_delta_reports = {}
 
     def start(self):
         super(AgentManager, self).start()
@@ -197,6 +213,13 @@ class AgentManager(service.PeriodicService):
         if tsc.system_mode == constants.SYSTEM_MODE_SIMPLEX:
             utils.touch(SYSINV_READY_FLAG)
 
+        if CONF.agent.disk_monitor:
+            try:
+                self._disk_monitor.start()
+            except Exception:
+                LOG.exception("Failed to monitor the disks, probing them "
+                              "on every audit.")
+
     def _report_to_conductor(self):
         """ Initial inventory report to conductor required
 
@@ -893,7 +916,7 @@ class AgentManager(service.PeriodicService):
                               "conductor.")
                 pass
 
-        idisk = self._idisk_operator.idisk_get()
+        idisk = self._disk_monitor.idisk_get()
         try:
             rpcapi.idisk_update_by_ihost(icontext,
                                          ihost['uuid'],
@@ -1234,7 +1257,7 @@ class AgentManager(service.PeriodicService):
     @utils.synchronized(constants.PARTITION_MANAGE_LOCK)
     def _update_disk_partitions(self, rpcapi, icontext,
                                 host_uuid, force_update=False):
-        ipartition = self._ipartition_operator.ipartition_get()
+        ipartition = self._disk_monitor.ipartition_get()
         if not force_update:
             if self._prev_partition == ipartition:
                 return
@@ -1252,6 +1275,48 @@ class AgentManager(service.PeriodicService):
             if not force_update:
                 self._prev_partition = None
 
+    def _report_inventory_delta(self, icontext, rpcapi, resource, records,
+                                force=False):
+        """Report the records of a resource type to the conductor by delta:
+        only their version while unchanged, else the records changed since
+        the version acknowledged by the conductor.
+
+        :param resource: resource type of the records, as in
+                         INVENTORY_REPORTS_REQUIRED
+        :param records: list of the records
+        :param force: report all the records
+        :returns: False if the conductor does not support delta reports and
+                  the records must be reported by the full report RPC
+        """
+        if not self._inventory_delta_supported:
+            return False
+
+        report = self._inventory_delta_reports.get(resource)
+        if report is None:
+            report = inventory_report.InventoryReport(
+                resource, CONF.agent.inventory_full_report_interval)
+            self._inventory_delta_reports[resource] = report
+        if force:
+            report.reset()
+
+        try:
+            report.report(rpcapi, icontext, self._ihost_uuid, records)
+            self._inventory_reported.add(resource)
+        except RemoteError as e:
+            report.reset()
+            if e.exc_type == 'UnsupportedRpcVersion':
+                LOG.info("Conductor does not support the delta inventory "
+                         "reports, reporting the full inventory.")
+                self._inventory_delta_supported = False
+                return False
+            LOG.exception("Sysinv Agent exception reporting %s inventory "
+                          "to conductor." % resource)
+        except Exception:
+            report.reset()
+            LOG.exception("Sysinv Agent exception reporting %s inventory "
+                          "to conductor." % resource)
+        return True
+
     @periodic_task.periodic_task(spacing=CONF.agent.audit_interval,
                                  run_immediately=True)
     def _agent_audit(self, context):
@@ -1270,6 +1335,10 @@ class AgentManager(service.PeriodicService):
         rpcapi = conductor_rpcapi.ConductorAPI(
                                topic=conductor_rpcapi.MANAGER_TOPIC)
 
+        # read LVM once for the volume groups, physical volumes and disks
+        # reported by this audit
+        lvm_snapshot.invalidate()
+
         if self._ihost_uuid:
             if os.path.isfile(tsc.INITIAL_CONFIG_COMPLETE_FLAG):
                 self._report_config_applied(icontext)
@@ -1298,7 +1367,7 @@ class AgentManager(service.PeriodicService):
                     imsg_dict.update({'iscsi_initiator_name': iscsi_initiator_name})
 
                 if self._ihost_personality == constants.CONTROLLER:
-                    idisk = self._idisk_operator.idisk_get()
+                    idisk = self._disk_monitor.idisk_get()
                     try:
                         rpcapi.idisk_update_by_ihost(icontext,
                                                      self._ihost_uuid,
@@ -1350,10 +1419,12 @@ class AgentManager(service.PeriodicService):
 
             self._update_ttys_dcd_status(icontext, self._ihost_uuid)
             imemory = self._inode_operator.inodes_get_imemory()
-            rpcapi.imemory_update_by_ihost(icontext,
-                                           self._ihost_uuid,
-                                           imemory)
-            self._inventory_reported.add(self.MEMORY)
+            if not self._report_inventory_delta(icontext, rpcapi,
+                                                self.MEMORY, imemory):
+                rpcapi.imemory_update_by_ihost(icontext,
+                                               self._ihost_uuid,
+                                               imemory)
+                self._inventory_reported.add(self.MEMORY)
             if self._agent_throttle > 5:
                 # throttle updates
                 self._agent_throttle = 0
@@ -1375,18 +1446,23 @@ class AgentManager(service.PeriodicService):
             if force_updates:
                 if constants.DISK_AUDIT_REQUEST in force_updates:
                     self._prev_disk = None
+                    self._disk_monitor.rescan()
                 if constants.LVG_AUDIT_REQUEST in force_updates:
                     self._prev_lvg = None
                 if constants.PV_AUDIT_REQUEST in force_updates:
                     self._prev_pv = None
                 if constants.PARTITION_AUDIT_REQUEST in force_updates:
                     self._prev_partition = None
+                    self._disk_monitor.rescan()
                 if constants.FILESYSTEM_AUDIT_REQUEST in force_updates:
                     self._prev_fs = None
 
             # Update disks
-            idisk = self._idisk_operator.idisk_get()
-            if ((self._prev_disk is None) or
+            idisk = self._disk_monitor.idisk_get()
+            if self._report_inventory_delta(icontext, rpcapi, self.DISK, idisk,
+                                            force=self._prev_disk is None):
+                self._prev_disk = idisk
+            elif ((self._prev_disk is None) or
                     (self._prev_disk != idisk)):
                 self._prev_disk = idisk
                 try:
@@ -1414,7 +1490,10 @@ class AgentManager(service.PeriodicService):
 
             # Update local volume groups
             ilvg = self._ilvg_operator.ilvg_get(cinder_device=cinder_device)
-            if ((self._prev_lvg is None) or
+            if self._report_inventory_delta(icontext, rpcapi, self.LVG, ilvg,
+                                            force=self._prev_lvg is None):
+                self._prev_lvg = ilvg
+            elif ((self._prev_lvg is None) or
                     (self._prev_lvg != ilvg)):
                 self._prev_lvg = ilvg
                 try:
@@ -1430,7 +1509,10 @@ class AgentManager(service.PeriodicService):
 
             # Update physical volumes
             ipv = self._ipv_operator.ipv_get(cinder_device=cinder_device)
-            if ((self._prev_pv is None) or
+            if self._report_inventory_delta(icontext, rpcapi, self.PV, ipv,
+                                            force=self._prev_pv is None):
+                self._prev_pv = ipv
+            elif ((self._prev_pv is None) or
                     (self._prev_pv != ipv)):
                 self._prev_pv = ipv
                 try:
@@ -2118,6 +2200,7 @@ class AgentManager(service.PeriodicService):
         if self._ihost_uuid and self._ihost_uuid == host_uuid:
             rpcapi = conductor_rpcapi.ConductorAPI(
                 topic=conductor_rpcapi.MANAGER_TOPIC)
+            lvm_snapshot.invalidate()
 
             ipartition = self._ipartition_operator.ipartition_get(skip_gpt_check=True)
             try:
@@ -128,22 +128,32 @@ class PartitionOperator(object):
         # Get all disk devices.
         context = pyudev.Context()
         for device in context.list_devices(DEVTYPE='disk'):
-            if not utils.is_system_usable_block_device(device):
-                continue
+            new_partitions = self.ipartition_get_device(
+                device, skip_gpt_check=skip_gpt_check)
+            if new_partitions:
+                ipartitions.extend(new_partitions)
 
-            if device['MAJOR'] in constants.VALID_MAJOR_LIST:
-                device_path = "/dev/disk/by-path/" + device['ID_PATH']
-                device_node = device.device_node
+        return ipartitions
 
-                try:
-                    new_partitions = self.get_partition_info(device_path=device_path,
-                                                             device_node=device_node,
-                                                             skip_gpt_check=skip_gpt_check)
-                except IOError as e:
-                    LOG.error("Error getting new partitions for: %s. Reason: %s" %
-                              (device_node, str(e)))
+    def ipartition_get_device(self, device, skip_gpt_check=False):
+        """Obtain the partitions of a disk.
+        :param:   device: the udev device of the disk
+        :returns: list of partitions, or None if the disk is not inventoried
+        """
+        if not utils.is_system_usable_block_device(device):
+            return None
 
-                if new_partitions:
-                    ipartitions.extend(new_partitions)
+        if device['MAJOR'] not in constants.VALID_MAJOR_LIST:
+            return None
 
-        return ipartitions
+        device_path = "/dev/disk/by-path/" + device['ID_PATH']
+        device_node = device.device_node
+
+        try:
+            return self.get_partition_info(device_path=device_path,
+                                           device_node=device_node,
+                                           skip_gpt_check=skip_gpt_check)
+        except IOError as e:
+            LOG.error("Error getting new partitions for: %s. Reason: %s" %
+                      (device_node, str(e)))
+        return None
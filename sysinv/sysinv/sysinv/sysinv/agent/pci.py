@@ -16,14 +16,32 @@ import glob
 import os
 import shlex
 
+from oslo_config import cfg
 from oslo_log import log as logging
 from sysinv._i18n import _
+from sysinv.agent import pci_ids
 from sysinv.common import constants
 from sysinv.common import device as dconstants
 from sysinv.common import utils
 
 LOG = logging.getLogger(__name__)
 
+pci_opts = [
+       cfg.BoolOpt('pci_sysfs_scan',
+                   default=False,
+                   help='Inventory the PCI devices, and the drivers and '
+                        'modules of the SR-IOV VFs, from sysfs and pci.ids '
+                        'rather than with lspci. The names of the devices '
+                        'are not looked up in the udev hardware database, '
+                        'and may differ from those reported by lspci, '
+                        'which renames the inventoried devices and ports.'),
+           ]
+
+CONF = cfg.CONF
+CONF.register_opts(pci_opts, 'agent')
+
+PCI_SYSFS_PATH = '/sys/bus/pci/devices/'
+
 # Look for PCI class 0x0200 and 0x0280 so that we get generic ethernet
 # controllers and those that may report as "other" network controllers.
 ETHERNET_PCI_CLASSES = ['ethernet controller', 'network controller']
@@ -179,6 +197,11 @@ class PCIDevice(object):
 class PCIOperator(object):
     '''Class to encapsulate PCI operations for System Inventory'''
 
+    def __init__(self):
+        # DPDK support by (vendor, device), which query_pci_id reports from
+        # the installed DPDK
+        self._dpdk_support = {}
+
     def format_lspci_output(self, device):
         # hack for now
         # NOTE: this does not properly handle the case where we have both
@@ -284,6 +307,14 @@ class PCIOperator(object):
     def get_pci_sriov_vf_driver_name(self, pciaddr, sriov_vfs_pci_address):
         vf_driver = None
         for addr in sriov_vfs_pci_address:
+            if (CONF.agent.pci_sysfs_scan and
+                    os.path.isdir(PCI_SYSFS_PATH + addr)):
+                ddriver = PCI_SYSFS_PATH + addr + '/driver'
+                if os.path.islink(ddriver):
+                    vf_driver = os.path.basename(os.readlink(ddriver))
+                    break
+                continue
+
             try:
                 output = self.get_lspci_output_by_addr(addr)
             except Exception as e:
@@ -305,7 +336,21 @@ class PCIOperator(object):
 
     def get_pci_sriov_vf_module_name(self, pciaddr, sriov_vfs_pci_address):
         vf_module = None
+        module_aliases = None
+        if CONF.agent.pci_sysfs_scan:
+            module_aliases = pci_ids.get_module_aliases()
         for addr in sriov_vfs_pci_address:
+            fmodalias = PCI_SYSFS_PATH + addr + '/modalias'
+            if module_aliases is not None and os.path.isfile(fmodalias):
+                try:
+                    with open(fmodalias, 'r') as f:
+                        vf_module = module_aliases.module_name(
+                            f.readline().strip())
+                except Exception:
+                    LOG.debug("ATTR modalias unknown for: %s " % addr)
+                if vf_module:
+                    break
+                continue
 
             try:
                 output = self.get_lspci_output_by_addr(addr)
@@ -341,26 +386,87 @@ class PCIOperator(object):
         LOG.debug("driver: %s" % driver)
         return driver
 
-    def pci_devices_get(self, vendor=None, device=None):
-        cmd = ["lspci", "-Dm"]
+    def _read_pci_id(self, pciaddr, attr):
+        with open(PCI_SYSFS_PATH + pciaddr + '/' + attr, 'r') as f:
+            return int(f.readline().strip(), 16)
+
+    def _scan_pci_devices(self, ids, numeric, vendor, device):
+        pci_devices = []
+        for a in sorted(os.listdir(PCI_SYSFS_PATH)):
+            try:
+                pvendor_id = self._read_pci_id(a, 'vendor')
+                pdevice_id = self._read_pci_id(a, 'device')
+                pclass_id = self._read_pci_id(a, 'class')
+                psvendor_id = self._read_pci_id(a, 'subsystem_vendor')
+                psdevice_id = self._read_pci_id(a, 'subsystem_device')
+            except Exception:
+                LOG.debug("ATTR ids unknown for: %s " % a)
+                continue
+            try:
+                prevision_id = self._read_pci_id(a, 'revision')
+            except Exception:
+                prevision_id = 0
+
+            if vendor and device:
+                if (pvendor_id, pdevice_id) != (int(vendor, 16),
+                                                int(device, 16)):
+                    continue
+
+            # the fields of the device as reported by lspci
+            pci_device = [a,
+                          ids.class_name(pclass_id >> 8, numeric),
+                          ids.vendor_name(pvendor_id, numeric),
+                          ids.device_name(pvendor_id, pdevice_id, numeric)]
+            if prevision_id:
+                pci_device.append('-r%02x' % prevision_id)
+            if pclass_id & 0xff:
+                pci_device.append('-p%02x' % (pclass_id & 0xff))
+            if psvendor_id and psvendor_id != 0xffff:
+                pci_device.append(ids.subsystem_vendor_name(psvendor_id,
+                                                            numeric))
+                pci_device.append(ids.subsystem_device_name(
+                    pvendor_id, pdevice_id, psvendor_id, psdevice_id,
+                    numeric))
+            else:
+                pci_device.extend(['', ''])
+            pci_devices.append(pci_device)
+
+        return pci_devices
+
+    def get_pci_devices_fields(self, numeric=False, vendor=None,
+                               device=None):
+        '''Return the fields of the PCI devices as listed by lspci -Dm, or
+        by lspci -Dmnn if numeric, read from sysfs unless disabled or
+        pci.ids is missing.
+        '''
+        if CONF.agent.pci_sysfs_scan:
+            ids = pci_ids.get_pci_ids()
+            if ids is not None:
+                return self._scan_pci_devices(ids, numeric, vendor, device)
+
+        cmd = ["lspci", "-Dmnn" if numeric else "-Dm"]
         # See if the caller wants to limit us to a specific vendor/device.
         if vendor and device:
             option = "-d " + vendor + ":" + device
             cmd.append(option)
         p = subprocess.Popen(cmd, stdout=subprocess.PIPE,
                 universal_newlines=True)
+        pci_devices = [shlex.split(line.strip()) for line in p.stdout]
+        p.wait()
 
+        return pci_devices
+
+    def pci_devices_get(self, vendor=None, device=None):
         pci_devices = []
-        for line in p.stdout:
-            pci_device = shlex.split(line.strip())
+        for pci_device in self.get_pci_devices_fields(vendor=vendor,
+                                                      device=device):
             pci_device = self.format_lspci_output(pci_device)
 
             if any(x in pci_device[pclass].lower() for x in
                    IGNORE_PCI_CLASSES):
                 continue
 
-            dirpcidev = '/sys/bus/pci/devices/'
-            physfn = dirpcidev + pci_device[pciaddr] + '/physfn'
+            physfn = PCI_SYSFS_PATH + pci_device[pciaddr] + '/physfn'
             if not os.path.isdir(physfn):
                 # Do not report VFs
                 pci_devices.append(PCI(pci_device[pciaddr],
@@ -371,18 +477,12 @@ class PCIOperator(object):
                                        pci_device[psvendor],
                                        pci_device[psdevice]))
 
-        p.wait()
-
         return pci_devices
 
     def inics_get(self):
 
-        p = subprocess.Popen(["lspci", "-Dmnn"], stdout=subprocess.PIPE,
-                universal_newlines=True)
-
         pci_inics = []
-        for line in p.stdout:
-            inic = shlex.split(line.strip())
+        for inic in self.get_pci_devices_fields(numeric=True):
             if any(x in inic[pclass].lower() for x in ETHERNET_PCI_CLASSES):
                 # hack for now
                 if inic[prevision].strip() == inic[pvendor].strip():
@@ -394,8 +494,7 @@ class PCIOperator(object):
                     LOG.debug("update psdevice length=%s" % len(inic))
                     inic.append(inic[psvendor])
 
-                dirpcidev = '/sys/bus/pci/devices/'
-                physfn = dirpcidev + inic[pciaddr] + '/physfn'
+                physfn = PCI_SYSFS_PATH + inic[pciaddr] + '/physfn'
                 if os.path.isdir(physfn):
                     # Do not report VFs
                     continue
@@ -404,8 +503,6 @@ class PCIOperator(object):
                                      inic[prevision], inic[psvendor],
                                      inic[psdevice]))
 
-        p.wait()
-
         return pci_inics
 
     def pci_get_enabled_attr(self, class_id, vendor_id, product_id):
@@ -416,12 +513,19 @@ class PCIOperator(object):
                 return True
         return False
 
+    def get_pci_sysfs_addresses(self, pciaddr):
+        '''Return the sysfs address of a PCI address, with or without its
+        domain, as a list empty if the device is not present.
+        '''
+        return [a for a in [pciaddr, "0000:" + pciaddr]
+                if os.path.isdir(PCI_SYSFS_PATH + a)]
+
     def pci_get_device_attrs(self, pciaddr):
         ''' For this pciaddr, build a list of device attributes '''
         pci_attrs_array = []
 
         dirpcidev = '/sys/bus/pci/devices/'
-        pciaddrs = os.listdir(dirpcidev)
+        pciaddrs = self.get_pci_sysfs_addresses(pciaddr)
 
         for a in pciaddrs:
             if ((a == pciaddr) or (a == ("0000:" + pciaddr))):
@@ -486,6 +590,39 @@ class PCIOperator(object):
 
         return pci_attrs_array
 
+    def get_dpdk_support(self, vendor, device):
+        '''Return whether DPDK supports a NIC, queried once per vendor and
+        device.
+        '''
+        if (vendor, device) in self._dpdk_support:
+            return self._dpdk_support[(vendor, device)]
+
+        try:
+            with open(os.devnull, "w") as fnull:
+                subprocess.check_call(["query_pci_id", "-v " + str(vendor),  # pylint: disable=not-callable
+                                       "-d " + str(device)],
+                                      stdout=fnull, stderr=fnull)
+                dpdksupport = True
+                LOG.debug("DPDK does support NIC "
+                          "(vendor: %s device: %s)",
+                          vendor, device)
+                self._dpdk_support[(vendor, device)] = dpdksupport
+        except subprocess.CalledProcessError as e:
+            dpdksupport = False
+            if e.returncode == 1:
+                # NIC is not supprted
+                LOG.debug("DPDK does not support NIC "
+                          "(vendor: %s device: %s)",
+                          vendor, device)
+                self._dpdk_support[(vendor, device)] = dpdksupport
+            else:
+                # command failed, default to DPDK support to False
+                LOG.info("Could not determine DPDK support for "
+                         "NIC (vendor %s device: %s), defaulting "
+                         "to False", vendor, device)
+
+        return dpdksupport
+
     def get_pci_net_directory(self, pciaddr):
         device_directory = '/sys/bus/pci/devices/' + pciaddr
         # Look for the standard device 'net' directory
@@ -532,7 +669,7 @@ class PCIOperator(object):
         pci_attrs_array = []
 
         dirpcidev = '/sys/bus/pci/devices/'
-        pciaddrs = os.listdir(dirpcidev)
+        pciaddrs = self.get_pci_sysfs_addresses(pciaddr)
 
         for a in pciaddrs:
             if ((a == pciaddr) or (a == ("0000:" + pciaddr))):
@@ -556,7 +693,6 @@ class PCIOperator(object):
                 driver = self.get_pci_driver_name(a)
 
                 # Determine DPDK support
-                dpdksupport = False
                 fvendor = dirpcideva + '/vendor'
                 fdevice = dirpcideva + '/device'
                 try:
@@ -573,27 +709,7 @@ class PCIOperator(object):
                     LOG.debug("ATTR device unknown for: %s " % a)
                     device = None
 
-                try:
-                    with open(os.devnull, "w") as fnull:
-                        subprocess.check_call(["query_pci_id", "-v " + str(vendor),  # pylint: disable=not-callable
-                                               "-d " + str(device)],
-                                              stdout=fnull, stderr=fnull)
-                        dpdksupport = True
-                        LOG.debug("DPDK does support NIC "
-                                  "(vendor: %s device: %s)",
-                                  vendor, device)
-                except subprocess.CalledProcessError as e:
-                    dpdksupport = False
-                    if e.returncode == 1:
-                        # NIC is not supprted
-                        LOG.debug("DPDK does not support NIC "
-                                  "(vendor: %s device: %s)",
-                                  vendor, device)
-                    else:
-                        # command failed, default to DPDK support to False
-                        LOG.info("Could not determine DPDK support for "
-                                 "NIC (vendor %s device: %s), defaulting "
-                                 "to False", vendor, device)
+                dpdksupport = self.get_dpdk_support(vendor, device)
 
                 # determine the net directory for this device
                 dirpcinet = self.get_pci_net_directory(a)
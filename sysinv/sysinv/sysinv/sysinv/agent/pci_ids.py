@@ -0,0 +1,179 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# All Rights Reserved.
+#
+
+""" Names of the PCI devices and of their kernel modules.
+
+The names of the PCI vendors, devices, subsystems and classes are looked up
+in pci.ids, and the kernel modules supporting a PCI device in the
+modules.alias of the running kernel, as lspci does. Each file is parsed once
+into an index, and parsed again only when it changes.
+"""
+
+import fnmatch
+import io
+import os
+
+from oslo_log import log as logging
+
+LOG = logging.getLogger(__name__)
+
+# pci.ids of the pciutils of the host, by order of preference
+PCI_IDS_PATHS = ['/usr/share/hwdata/pci.ids', '/usr/share/misc/pci.ids']
+
+# indexes by path, with the modification time of the file they were parsed
+# from
+_indexes = {}
+
+
+def _format_name(name, number, unknown, numeric):
+    # names formatted as by lspci -m, or lspci -mnn if numeric
+    if name is None:
+        return ('%s [%s]' if numeric else '%s %s') % (unknown, number)
+    if numeric:
+        return '%s [%s]' % (name, number)
+    return name
+
+
+class PCIIds(object):
+    '''Class to look up the names of the PCI ids'''
+
+    def __init__(self):
+        self.vendors = {}
+        self.devices = {}
+        self.subsystems = {}
+        self.classes = {}
+
+    def vendor_name(self, vendor, numeric=False):
+        return _format_name(self.vendors.get(vendor), '%04x' % vendor,
+                            'Vendor', numeric)
+
+    def device_name(self, vendor, device, numeric=False):
+        return _format_name(self.devices.get((vendor, device)),
+                            '%04x' % device, 'Device', numeric)
+
+    def subsystem_vendor_name(self, svendor, numeric=False):
+        return _format_name(self.vendors.get(svendor), '%04x' % svendor,
+                            'Unknown vendor', numeric)
+
+    def subsystem_device_name(self, vendor, device, svendor, sdevice,
+                              numeric=False):
+        name = self.subsystems.get((vendor, device, svendor, sdevice))
+        if name is None and (vendor, device) == (svendor, sdevice):
+            name = self.devices.get((vendor, device))
+        return _format_name(name, '%04x' % sdevice, 'Device', numeric)
+
+    def class_name(self, pclass, numeric=False):
+        '''Return the name of a class, from its base class and subclass.'''
+        name = self.classes.get((pclass >> 8, pclass & 0xff))
+        if name is None:
+            name = self.classes.get((pclass >> 8, None))
+            if name is not None:
+                # the base class name only, with the full class number
+                numeric = True
+        return _format_name(name, '%04x' % pclass, 'Class', numeric)
+
+    @classmethod
+    def parse(cls, lines):
+        '''Build the index of the lines of a pci.ids.'''
+        ids = cls()
+        vendor = device = base_class = None
+        for line in lines:
+            line = line.rstrip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                if line.startswith('C '):
+                    base_class = int(line[2:4], 16)
+                    vendor = device = None
+                    ids.classes[(base_class, None)] = line[4:].strip()
+                elif line.startswith('\t\t'):
+                    if device is not None:
+                        svendor, sdevice, name = line[2:].split(None, 2)
+                        ids.subsystems[(vendor, device, int(svendor, 16),
+                                        int(sdevice, 16))] = name
+                elif line.startswith('\t'):
+                    number, name = line[1:].split(None, 1)
+                    if vendor is not None:
+                        device = int(number, 16)
+                        ids.devices[(vendor, device)] = name
+                    elif base_class is not None:
+                        ids.classes[(base_class, int(number, 16))] = name
+                else:
+                    number, name = line.split(None, 1)
+                    vendor = int(number, 16)
+                    device = base_class = None
+                    ids.vendors[vendor] = name
+            except (IndexError, ValueError):
+                LOG.debug("Skipping the pci.ids line: %s" % line)
+        return ids
+
+
+class ModuleAliases(object):
+    '''Class to look up the kernel modules supporting a PCI device'''
+
+    def __init__(self):
+        self.aliases = []
+        # modules by modalias, shared by the VFs of a device
+        self._modules = {}
+
+    def module_name(self, modalias):
+        '''Return the first module with an alias matching a modalias.'''
+        if modalias not in self._modules:
+            self._modules[modalias] = None
+            for pattern, module in self.aliases:
+                if fnmatch.fnmatchcase(modalias, pattern):
+                    self._modules[modalias] = module
+                    break
+        return self._modules[modalias]
+
+    @classmethod
+    def parse(cls, lines):
+        '''Build the index of the PCI aliases of the lines of a
+        modules.alias.'''
+        aliases = cls()
+        for line in lines:
+            fields = line.split()
+            if (len(fields) == 3 and fields[0] == 'alias' and
+                    fields[1].startswith('pci:')):
+                aliases.aliases.append((fields[1], fields[2]))
+        return aliases
+
+
+def _get_index(path, index_class):
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+    cached = _indexes.get(path)
+    if cached is None or cached[0] != mtime:
+        try:
+            with io.open(path, encoding='utf-8', errors='replace') as f:
+                cached = (mtime, index_class.parse(f))
+        except (IOError, OSError) as e:
+            LOG.warn("Could not read %s: %s" % (path, e))
+            return None
+        _indexes[path] = cached
+    return cached[1]
+
+
+def get_pci_ids():
+    """Return the PCIIds of the pci.ids of the host, or None if missing."""
+    for path in PCI_IDS_PATHS:
+        ids = _get_index(path, PCIIds)
+        if ids is not None:
+            return ids
+    return None
+
+
+def get_module_aliases():
+    """Return the ModuleAliases of the running kernel, or None if missing."""
+    path = '/lib/modules/%s/modules.alias' % os.uname()[2]
+    return _get_index(path, ModuleAliases)
@@ -0,0 +1,101 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+# vim: tabstop=4 shiftwidth=4 softtabstop=4
+
+# All Rights Reserved.
+#
+
+""" Cache of the results of the disk probes run by the agent.
+
+The model, capacity and free space of a disk are probed by running commands
+against the disk. Their results are cached by disk and by probe, along with
+a stamp of the udev state they depend on, and are probed again only when the
+stamp changes. The cache is kept in a file, so that it survives the restarts
+of the agent.
+"""
+
+import json
+import os
+
+from oslo_config import cfg
+from oslo_log import log as logging
+
+import tsconfig.tsconfig as tsc
+
+LOG = logging.getLogger(__name__)
+
+probe_cache_opts = [
+       cfg.StrOpt('disk_probe_cache',
+                  default=os.path.join(tsc.VOLATILE_PATH,
+                                       '.sysinv_disk_probes'),
+                  help='File caching the model, capacity and free space '
+                       'probed from the disks; empty disables the cache'),
+                   ]
+
+CONF = cfg.CONF
+CONF.register_opts(probe_cache_opts, 'agent')
+
+
+class ProbeCache(object):
+    """Class to cache the results of the disk probes in a file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = None
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        try:
+            with open(self.path, 'r') as f:
+                self._entries = json.load(f)
+        except (IOError, OSError):
+            pass
+        except ValueError:
+            LOG.warn("Discarding the corrupted disk probe cache %s" %
+                     self.path)
+
+    def _save(self):
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self._entries, f)
+            os.rename(tmp_path, self.path)
+        except (IOError, OSError) as e:
+            LOG.warn("Could not save the disk probe cache %s: %s" %
+                     (self.path, e))
+
+    def get(self, key, probe, stamp):
+        """Return the cached result of a probe of a disk.
+
+        :param key: persistent identifier of the disk
+        :param probe: name of the probe
+        :param stamp: list of the udev state the result depends on
+        :returns: the result, or None if not cached for the stamp
+        """
+        self._load()
+        entry = self._entries.get(key, {}).get(probe)
+        if entry is None or entry['stamp'] != stamp:
+            return None
+        return entry['result']
+
+    def set(self, key, probe, stamp, result):
+        """Cache the result of a probe of a disk."""
+        self._load()
+        self._entries.setdefault(key, {})[probe] = {'stamp': stamp,
+                                                    'result': result}
+        self._save()
+
+    def prune(self, keys):
+        """Drop the results of the disks not in keys."""
+        self._load()
+        removed = set(self._entries) - set(keys)
+        if removed:
+            for key in removed:
+                del self._entries[key]
+            self._save()
@@ -17,6 +17,7 @@ import sys
 
 from oslo_log import log as logging
 
+from sysinv.agent import lvm_snapshot
 from sysinv.common import disk_utils
 from sysinv.common import constants
 from sysinv.common import exception
@@ -45,81 +46,51 @@ class PVOperator(object):
         '''
         ipv = []
 
-        # keys: matching the field order of pvdisplay command
+        # keys: matching the LVM report fields
         string_keys = ['lvm_pv_name', 'lvm_vg_name', 'lvm_pv_uuid',
                        'lvm_pv_size', 'lvm_pe_total', 'lvm_pe_alloced']
 
         # keys that need to be translated into ints
         int_keys = ['lvm_pv_size', 'lvm_pe_total', 'lvm_pe_alloced']
 
-        # pvdisplay command to retrieve the pv data of all pvs present
-        pvdisplay_command = 'pvdisplay -C --separator=";" -o pv_name,vg_name,pv_uuid'\
-                            ',pv_size,pv_pe_count,pv_pe_alloc_count'\
-                            ' --units B --nosuffix --noheadings'
-
         if get_rook_device:
-            disable_filter = ' --config \'devices/global_filter=["a|.*|"]\''
-            pvdisplay_command = pvdisplay_command + disable_filter
-
-        # Execute the command
-        try:
-            pvdisplay_process = subprocess.Popen(pvdisplay_command,
-                                             stdout=subprocess.PIPE,
-                                             shell=True,
-                                             universal_newlines=True)
-            pvdisplay_output = pvdisplay_process.stdout.read()
-        except Exception as e:
-            self.handle_exception("Could not retrieve pvdisplay "
-                                  "information: %s" % e)
-            pvdisplay_output = ""
+            pvs = list(lvm_snapshot.get_report(
+                lvm_snapshot.ACCEPT_ALL_FILTER).pvs)
+        else:
+            pvs = list(lvm_snapshot.get_report().pvs)
 
         # Cinder devices are hidden by global_filter on standby controller,
         # list them separately.
         if cinder_device:
-            new_global_filer = ' --config \'devices/global_filter=["a|' + \
-                               cinder_device + '|","r|.*|"]\''
-            pvdisplay_process = pvdisplay_command + new_global_filer
-
-            try:
-                pvdisplay_process = subprocess.Popen(pvdisplay_process,
-                                                     stdout=subprocess.PIPE,
-                                                     shell=True,
-                                                     universal_newlines=True)
-                pvdisplay_output = pvdisplay_output + pvdisplay_process.stdout.read()
-            except Exception as e:
-                self.handle_exception("Could not retrieve vgdisplay "
-                                      "information: %s" % e)
-
-        # parse the output 1 pv/row
-        rows = [row for row in pvdisplay_output.split('\n') if row.strip()]
-        for row in rows:
-            if "unknown device" in row:
+            pvs += lvm_snapshot.get_report(
+                lvm_snapshot.get_device_filter(cinder_device)).pvs
+
+        for row in pvs:
+            if row['pv_name'] in ['unknown device', '[unknown]']:
                 # Found a previously known pv that is now missing
                 # This happens when a disk is physically removed without
                 # being removed from the volume group first
                 # Since the disk is gone we need to forcefully cleanup
                 # the volume group
                 try:
-                    values = row.split(';')
-                    values = [v.strip() for v in values]
-
-                    vgreduce_command = 'vgreduce --removemissing %s' % values[2]
+                    vgreduce_command = 'vgreduce --removemissing %s' % \
+                                       row['vg_name']
                     subprocess.Popen(vgreduce_command,
                                      stdout=subprocess.PIPE,
                                      shell=True)
+                    lvm_snapshot.invalidate()
                 except Exception as e:
                     self.handle_exception("Could not execute vgreduce: %s" % e)
                 continue
 
-            if (get_rook_device and ("ceph-" not in row)):
+            if (get_rook_device and ("ceph-" not in row['pv_name'] and
+                                     "ceph-" not in row['vg_name'])):
                 continue
 
-            # get the values of fields as strings
-            values = row.split(';')
-            values = [v.strip() for v in values]
-
             # create the dict of attributes
-            attr = dict(zip(string_keys, values))
+            attr = dict((key, row[field]) for key, field in
+                        zip(string_keys, lvm_snapshot.PV_FIELDS)
+                        if field in row)
 
             # convert required values from strings to ints
             for k in int_keys:
@@ -256,4 +227,5 @@ class PVOperator(object):
                          'stdout': e.stdout,
                          'stderr': e.stderr})
 
+        lvm_snapshot.invalidate()
         LOG.info("Deleting PV: %s completed" % (ipv_dict))
@@ -57,6 +57,7 @@ def setup_app(pecan_config=None, extra_hooks=None):
     app_hooks = [hooks.MultiFormDataHook(),
                  hooks.ConfigHook(),
                  hooks.DBHook(),
+                 hooks.DBProfileHook(),
                  hooks.ContextHook(pecan_config.app.acl_public_routes),
                  hooks.RPCHook(),
                  hooks.AuditLogging()]
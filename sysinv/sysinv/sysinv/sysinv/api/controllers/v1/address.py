@@ -197,7 +197,10 @@ class AddressCollection(collection.Collection):
         collection = AddressCollection()
         collection.addresses = [Address.convert_with_links(a, expand)
                                 for a in rpc_addresses]
-        collection.next = collection.get_next(limit, url=url, **kwargs)
+        collection.next = collection.get_next(
+            limit, url=url,
+            marker=utils.encode_cursor(rpc_addresses, kwargs.get('sort_key')),
+            **kwargs)
         return collection
 
 
@@ -216,11 +219,7 @@ class AddressController(rest.RestController):
                                 resource_url=None):
         limit = utils.validate_limit(limit)
         sort_dir = utils.validate_sort_dir(sort_dir)
-        marker_obj = None
-
-        if marker:
-            marker_obj = objects.address.get_by_uuid(
-                pecan.request.context, marker)
+        marker_obj = utils.get_marker(objects.address, marker, sort_key)
 
         if self._parent == "ihosts":
             addresses = pecan.request.dbapi.addresses_get_by_host(
@@ -445,7 +444,7 @@ class AddressController(rest.RestController):
             pecan.request.context, address_uuid)
         return Address.convert_with_links(rpc_address)
 
-    @wsme_pecan.wsexpose(AddressCollection, types.uuid, types.uuid, int,
+    @wsme_pecan.wsexpose(AddressCollection, types.uuid, wtypes.text, int,
                          wtypes.text, wtypes.text)
     def get_all(self, parent_uuid=None,
                 marker=None, limit=None, sort_key='id', sort_dir='asc'):
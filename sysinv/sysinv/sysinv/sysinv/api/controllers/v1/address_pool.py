@@ -22,7 +22,6 @@
 import netaddr
 import pecan
 from pecan import rest
-import random
 import uuid
 import wsme
 from wsme import types as wtypes
@@ -34,6 +33,7 @@ from sysinv.api.controllers.v1 import base
 from sysinv.api.controllers.v1 import collection
 from sysinv.api.controllers.v1 import types
 from sysinv.api.controllers.v1 import utils
+from sysinv.common import address_index
 from sysinv.common import constants
 from sysinv.common import exception
 from sysinv.common import utils as cutils
@@ -366,23 +366,6 @@ class AddressPoolController(rest.RestController):
         current = addrpool['ranges']
         addrpool['ranges'] = sorted(current, key=lambda x: netaddr.IPAddress(x[0]))
 
-    @classmethod
-    def _select_address(cls, available, order):
-        """
-        Chooses a new IP address from the set of available addresses according
-        to the allocation order directive.
-        """
-        if order == SEQUENTIAL_ALLOCATION:
-            return str(next(available.iter_ipranges())[0])
-        elif order == RANDOM_ALLOCATION:
-            index = random.randint(0, available.size - 1)
-            for r in available.iter_ipranges():
-                if index < r.size:
-                    return str(r[index])
-                index = index - r.size
-        else:
-            raise exception.AddressPoolInvalidAllocationOrder(order=order)
-
     @classmethod
     def allocate_address(cls, pool, dbapi=None, order=None):
         """
@@ -390,23 +373,19 @@ class AddressPoolController(rest.RestController):
         """
         if not dbapi:
             dbapi = pecan.request.dbapi
-        # Build a set of defined ranges
-        defined = netaddr.IPSet()
-        for (start, end) in pool.ranges:
-            defined.update(netaddr.IPRange(start, end))
-        # Determine which addresses are already in use
-        addresses = dbapi.addresses_get_by_pool(pool.id)
-        inuse = netaddr.IPSet()
-        for a in addresses:
-            inuse.add(a.address)
-        # Calculate which addresses are still available
-        available = defined - inuse
+        # The free addresses are tracked by the allocation index of the pool
+        available = address_index.get_index(pool, dbapi)
         if available.size == 0:
             raise exception.AddressPoolExhausted(name=pool.name)
         if order is None:
             order = pool.order
         # Select an address according to the allocation scheme
-        return cls._select_address(available, order)
+        if order == SEQUENTIAL_ALLOCATION:
+            return available.first()
+        elif order == RANDOM_ALLOCATION:
+            return available.random()
+        else:
+            raise exception.AddressPoolInvalidAllocationOrder(order=order)
 
     # @cutils.synchronized("address-pool-allocation", external=True)
     @classmethod
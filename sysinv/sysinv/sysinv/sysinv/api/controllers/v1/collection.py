@@ -40,16 +40,21 @@ class Collection(base.APIBase):
         """Return whether collection has more items."""
         return len(self.collection) and len(self.collection) == limit
 
-    def get_next(self, limit, url=None, **kwargs):
-        """Return a link to the next subset of the collection."""
+    def get_next(self, limit, url=None, marker=None, **kwargs):
+        """Return a link to the next subset of the collection.
+
+        :param marker: cursor of the next subset, the uuid of the last
+                       object of the collection if not set.
+        """
         if not self.has_next(limit):
             return wtypes.Unset
 
         resource_url = url or self._type  # pylint: disable=no-member
+        marker = marker or self.collection[-1].uuid
         q_args = ''.join(['%s=%s&' % (key, kwargs[key]) for key in kwargs])
         next_args = '?%(args)slimit=%(limit)d&marker=%(marker)s' % {
                                             'args': q_args, 'limit': limit,
-                                            'marker': self.collection[-1].uuid}
+                                            'marker': marker}
 
         return link.Link.make_link('next', pecan.request.host_url,
                                    resource_url, next_args).href
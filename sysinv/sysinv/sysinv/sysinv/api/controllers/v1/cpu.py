@@ -234,7 +234,8 @@ class CPUController(rest.RestController):
                                                     i_uuid, limit,
                                                     marker_obj,
                                                     sort_key=sort_key,
-                                                    sort_dir=sort_dir)
+                                                    sort_dir=sort_dir,
+                                                    profile=constants.DB_LOADING_PROFILE_LIST)
         elif self._from_inode:
             cpus = pecan.request.dbapi.icpu_get_by_inode(
                                                     i_uuid, limit,
@@ -247,7 +248,8 @@ class CPUController(rest.RestController):
                                                     i_uuid, limit,
                                                     marker_obj,
                                                     sort_key=sort_key,
-                                                    sort_dir=sort_dir)
+                                                    sort_dir=sort_dir,
+                                                    profile=constants.DB_LOADING_PROFILE_LIST)
             elif i_uuid and inode_uuid:   # Need ihost_uuid ?
                 cpus = pecan.request.dbapi.icpu_get_by_ihost_inode(
                                                     i_uuid,
@@ -269,7 +271,8 @@ class CPUController(rest.RestController):
             else:
                 cpus = pecan.request.dbapi.icpu_get_list(limit, marker_obj,
                                                      sort_key=sort_key,
-                                                     sort_dir=sort_dir)
+                                                     sort_dir=sort_dir,
+                                                     profile=constants.DB_LOADING_PROFILE_LIST)
 
         return CPUCollection.convert_with_links(cpus, limit,
                                                 url=resource_url,
@@ -234,7 +234,8 @@ class DiskController(rest.RestController):
                                                     i_uuid, limit,
                                                     marker_obj,
                                                     sort_key=sort_key,
-                                                    sort_dir=sort_dir)
+                                                    sort_dir=sort_dir,
+                                                    profile=constants.DB_LOADING_PROFILE_LIST)
         elif self._from_istor:
             disks = pecan.request.dbapi.idisk_get_by_istor(
                                                     i_uuid,
@@ -255,7 +256,8 @@ class DiskController(rest.RestController):
                                                     i_uuid, limit,
                                                     marker_obj,
                                                     sort_key=sort_key,
-                                                    sort_dir=sort_dir)
+                                                    sort_dir=sort_dir,
+                                                    profile=constants.DB_LOADING_PROFILE_LIST)
 
             elif i_uuid and istor_uuid:   # Need ihost_uuid ?
                 disks = pecan.request.dbapi.idisk_get_by_ihost_istor(
@@ -297,7 +299,8 @@ class DiskController(rest.RestController):
                 disks = pecan.request.dbapi.idisk_get_list(
                                                     limit, marker_obj,
                                                     sort_key=sort_key,
-                                                    sort_dir=sort_dir)
+                                                    sort_dir=sort_dir,
+                                                    profile=constants.DB_LOADING_PROFILE_LIST)
 
         return DiskCollection.convert_with_links(disks, limit,
                                                  url=resource_url,
@@ -33,6 +33,7 @@ from sysinv.api.controllers.v1 import collection
 from sysinv.api.controllers.v1 import link
 from sysinv.api.controllers.v1 import types
 from sysinv.api.controllers.v1 import utils
+from sysinv.common import constants
 from sysinv.common import exception
 from sysinv.common import utils as cutils
 from sysinv import objects
@@ -262,7 +263,8 @@ class EthernetPortController(rest.RestController):
                                                     uuid, limit,
                                                     marker_obj,
                                                     sort_key=sort_key,
-                                                    sort_dir=sort_dir)
+                                                    sort_dir=sort_dir,
+                                                    profile=constants.DB_LOADING_PROFILE_LIST)
         elif self._from_inode:
             ports = pecan.request.dbapi.ethernet_port_get_by_numa_node(
                                                     uuid, limit,
@@ -282,7 +284,8 @@ class EthernetPortController(rest.RestController):
                                                     uuid, limit,
                                                     marker_obj,
                                                     sort_key=sort_key,
-                                                    sort_dir=sort_dir)
+                                                    sort_dir=sort_dir,
+                                                    profile=constants.DB_LOADING_PROFILE_LIST)
             elif uuid and interface_uuid:   # Need ihost_uuid ?
                 ports = pecan.request.dbapi.ethernet_port_get_by_host_interface(
                                                     uuid,
@@ -305,7 +308,8 @@ class EthernetPortController(rest.RestController):
                 ports = pecan.request.dbapi.ethernet_port_get_list(
                                                     limit, marker_obj,
                                                     sort_key=sort_key,
-                                                    sort_dir=sort_dir)
+                                                    sort_dir=sort_dir,
+                                                    profile=constants.DB_LOADING_PROFILE_LIST)
 
         return EthernetPortCollection.convert_with_links(ports, limit,
                                                  url=resource_url,
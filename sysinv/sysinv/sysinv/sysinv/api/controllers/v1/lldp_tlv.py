@@ -114,7 +114,10 @@ class LLDPTLVCollection(collection.Collection):
         collection = LLDPTLVCollection()
         collection.lldp_tlvs = [LLDPTLV.convert_with_links(a, expand)
                                 for a in rpc_lldp_tlvs]
-        collection.next = collection.get_next(limit, url=url, **kwargs)
+        collection.next = collection.get_next(
+            limit, url=url,
+            marker=utils.encode_cursor(rpc_lldp_tlvs, kwargs.get('sort_key')),
+            **kwargs)
         return collection
 
 
@@ -147,10 +150,7 @@ class LLDPTLVController(rest.RestController):
         limit = utils.validate_limit(limit)
         sort_dir = utils.validate_sort_dir(sort_dir)
 
-        marker_obj = None
-        if marker:
-            marker_obj = objects.lldp_tlv.get_by_uuid(pecan.request.context,
-                                                      marker)
+        marker_obj = utils.get_marker(objects.lldp_tlv, marker, sort_key)
 
         if self._from_lldp_agents:
             tlvs = pecan.request.dbapi.lldp_tlv_get_by_agent(uuid, limit,
@@ -172,14 +172,14 @@ class LLDPTLVController(rest.RestController):
                                                     sort_dir=sort_dir)
 
     @wsme_pecan.wsexpose(LLDPTLVCollection, types.uuid,
-                         types.uuid, int, wtypes.text, wtypes.text)
+                         wtypes.text, int, wtypes.text, wtypes.text)
     def get_all(self, uuid=None,
                 marker=None, limit=None, sort_key='id', sort_dir='asc'):
         """Retrieve a list of lldp tlvs."""
         return self._get_lldp_tlvs_collection(uuid, marker, limit, sort_key,
                                               sort_dir)
 
-    @wsme_pecan.wsexpose(LLDPTLVCollection, types.uuid, types.uuid, int,
+    @wsme_pecan.wsexpose(LLDPTLVCollection, types.uuid, wtypes.text, int,
                          wtypes.text, wtypes.text)
     def detail(self, uuid=None, marker=None, limit=None,
                sort_key='id', sort_dir='asc'):
@@ -284,7 +284,8 @@ class MemoryController(rest.RestController):
                                                     i_uuid, limit,
                                                     marker_obj,
                                                     sort_key=sort_key,
-                                                    sort_dir=sort_dir)
+                                                    sort_dir=sort_dir,
+                                                    profile=constants.DB_LOADING_PROFILE_LIST)
 
         elif self._from_inode:
             memorys = pecan.request.dbapi.imemory_get_by_inode(
@@ -298,7 +299,8 @@ class MemoryController(rest.RestController):
                                                     i_uuid, limit,
                                                     marker_obj,
                                                     sort_key=sort_key,
-                                                    sort_dir=sort_dir)
+                                                    sort_dir=sort_dir,
+                                                    profile=constants.DB_LOADING_PROFILE_LIST)
             elif i_uuid and inode_uuid:   # Need ihost_uuid ?
                 memorys = pecan.request.dbapi.imemory_get_by_ihost_inode(
                                                     i_uuid,
@@ -321,7 +323,8 @@ class MemoryController(rest.RestController):
                 memorys = pecan.request.dbapi.imemory_get_list(limit,
                                                      marker_obj,
                                                      sort_key=sort_key,
-                                                     sort_dir=sort_dir)
+                                                     sort_dir=sort_dir,
+                                                     profile=constants.DB_LOADING_PROFILE_LIST)
 
         return MemoryCollection.convert_with_links(memorys, limit,
                                                    url=resource_url,
@@ -213,7 +213,10 @@ class PortCollection(collection.Collection):
         collection = PortCollection()
         collection.ports = [Port.convert_with_links(p, expand)
                             for p in rpc_ports]
-        collection.next = collection.get_next(limit, url=url, **kwargs)
+        collection.next = collection.get_next(
+            limit, url=url,
+            marker=utils.encode_cursor(rpc_ports, kwargs.get('sort_key')),
+            **kwargs)
         return collection
 
 
@@ -257,11 +260,7 @@ class PortController(rest.RestController):
         limit = utils.validate_limit(limit)
         sort_dir = utils.validate_sort_dir(sort_dir)
 
-        marker_obj = None
-        if marker:
-            marker_obj = objects.port.get_by_uuid(
-                pecan.request.context,
-                marker)
+        marker_obj = utils.get_marker(objects.port, marker, sort_key)
 
         if self._from_ihosts:
             ports = pecan.request.dbapi.port_get_by_host(
@@ -318,7 +317,7 @@ class PortController(rest.RestController):
                                                  sort_dir=sort_dir)
 
     @wsme_pecan.wsexpose(PortCollection, types.uuid, types.uuid,
-                         types.uuid, types.uuid, int, wtypes.text, wtypes.text)
+                         types.uuid, wtypes.text, int, wtypes.text, wtypes.text)
     def get_all(self, uuid=None, interface_uuid=None, node_uuid=None,
                 marker=None, limit=None, sort_key='id', sort_dir='asc'):
         """Retrieve a list of ports."""
@@ -328,7 +327,7 @@ class PortController(rest.RestController):
                                           node_uuid,
                                           marker, limit, sort_key, sort_dir)
 
-    @wsme_pecan.wsexpose(PortCollection, types.uuid, types.uuid, int,
+    @wsme_pecan.wsexpose(PortCollection, types.uuid, wtypes.text, int,
                          wtypes.text, wtypes.text)
     def detail(self, uuid=None, marker=None, limit=None,
                sort_key='id', sort_dir='asc'):
@@ -234,11 +234,13 @@ class PVController(rest.RestController):
             pvs = pecan.request.dbapi.ipv_get_by_ihost(ihost_uuid, limit,
                                                        marker_obj,
                                                        sort_key=sort_key,
-                                                       sort_dir=sort_dir)
+                                                       sort_dir=sort_dir,
+                                                       profile=constants.DB_LOADING_PROFILE_LIST)
         else:
             pvs = pecan.request.dbapi.ipv_get_list(limit, marker_obj,
                                                    sort_key=sort_key,
-                                                   sort_dir=sort_dir)
+                                                   sort_dir=sort_dir,
+                                                   profile=constants.DB_LOADING_PROFILE_LIST)
 
         return PVCollection.convert_with_links(pvs, limit,
                                                url=resource_url,
@@ -226,7 +226,10 @@ class SensorCollection(collection.Collection):
         collection = SensorCollection()
         collection.isensors = [Sensor.convert_with_links(p, expand)
                                for p in rpc_sensors]
-        collection.next = collection.get_next(limit, url=url, **kwargs)
+        collection.next = collection.get_next(
+            limit, url=url,
+            marker=utils.encode_cursor(rpc_sensors, kwargs.get('sort_key')),
+            **kwargs)
         return collection
 
 
@@ -262,11 +265,7 @@ class SensorController(rest.RestController):
         limit = utils.validate_limit(limit)
         sort_dir = utils.validate_sort_dir(sort_dir)
 
-        marker_obj = None
-        if marker:
-            marker_obj = objects.sensor.get_by_uuid(
-                pecan.request.context,
-                marker)
+        marker_obj = utils.get_marker(objects.sensor, marker, sort_key)
 
         if self._from_ihosts:
             sensors = pecan.request.dbapi.isensor_get_by_ihost(
@@ -324,7 +323,7 @@ class SensorController(rest.RestController):
                                                    sort_dir=sort_dir)
 
     @wsme_pecan.wsexpose(SensorCollection, types.uuid, types.uuid,
-                         types.uuid, int, wtypes.text, wtypes.text)
+                         wtypes.text, int, wtypes.text, wtypes.text)
     def get_all(self, uuid=None, sensorgroup_uuid=None,
                 marker=None, limit=None, sort_key='id', sort_dir='asc'):
         """Retrieve a list of sensors."""
@@ -333,7 +332,7 @@ class SensorController(rest.RestController):
                                             marker, limit,
                                             sort_key, sort_dir)
 
-    @wsme_pecan.wsexpose(SensorCollection, types.uuid, types.uuid, int,
+    @wsme_pecan.wsexpose(SensorCollection, types.uuid, wtypes.text, int,
                          wtypes.text, wtypes.text)
     def detail(self, uuid=None, marker=None, limit=None,
                sort_key='id', sort_dir='asc'):
@@ -19,12 +19,15 @@
 # Copyright (c) 2013-2020 Wind River Systems, Inc.
 #
 
+import base64
+import datetime
 from eventlet.green import subprocess
 import jsonpatch
 import netaddr
 import os
 import pecan
 import re
+import six
 import socket
 import uuid
 import wsme
@@ -34,6 +37,9 @@ import tsconfig.tsconfig as tsc
 
 from oslo_config import cfg
 from oslo_log import log
+from oslo_serialization import jsonutils
+from oslo_utils import timeutils
+from oslo_utils import uuidutils
 from sysinv._i18n import _
 from sysinv.common import ceph
 from sysinv.common import constants
@@ -74,6 +80,92 @@ def validate_sort_dir(sort_dir):
     return sort_dir
 
 
+# key of the datetime values of the collection cursors
+CURSOR_DATETIME = 'datetime'
+
+
+class KeysetMarker(object):
+    """Marker of a collection page decoded from a cursor; the sort key and
+    id values of the last object of the previous page.
+    """
+
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+
+def _get_cursor_keys(sort_key):
+    return set([sort_key or 'id', 'id'])
+
+
+def encode_cursor(rpc_objects, sort_key=None):
+    """Return an opaque cursor resuming a collection after its last object.
+
+    :param rpc_objects: the objects of the collection page.
+    :param sort_key: the key the collection is sorted by.
+    :returns: the cursor, or None if the sort key values are not encodable
+    """
+    if not rpc_objects:
+        return None
+
+    values = {}
+    for key in _get_cursor_keys(sort_key):
+        try:
+            value = getattr(rpc_objects[-1], key)
+        except (AttributeError, NotImplementedError):
+            return None
+        if isinstance(value, datetime.datetime):
+            value = {CURSOR_DATETIME: timeutils.normalize_time(
+                value).isoformat()}
+        elif not isinstance(value, (six.string_types, six.integer_types,
+                                    float, type(None))):
+            return None
+        values[key] = value
+
+    cursor = base64.urlsafe_b64encode(
+        jsonutils.dump_as_bytes(values, sort_keys=True))
+    return cursor.decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort_key=None):
+    """Return the marker of a collection page from an opaque cursor.
+
+    :param cursor: the cursor returned by encode_cursor.
+    :param sort_key: the key the collection is sorted by.
+    :returns: a KeysetMarker; the last object of the previous page does not
+              have to be loaded.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = jsonutils.loads(
+            base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not (isinstance(values, dict) and
+                _get_cursor_keys(sort_key).issubset(values)):
+            raise ValueError(cursor)
+        for key, value in values.items():
+            if isinstance(value, dict):
+                values[key] = timeutils.normalize_time(
+                    timeutils.parse_isotime(value[CURSOR_DATETIME]))
+    except (KeyError, TypeError, ValueError):
+        raise wsme.exc.ClientSideError(_("Invalid marker: %s") % cursor)
+    return KeysetMarker(values)
+
+
+def get_marker(object_class, marker, sort_key=None):
+    """Return the marker of a collection page request; the object of a uuid
+    marker, or the keyset values of a cursor returned in the next link of
+    the previous page.
+
+    :param object_class: the class of the collection objects.
+    :param marker: the uuid or cursor of the last object of the previous page.
+    :param sort_key: the key the collection is sorted by.
+    """
+    if not marker:
+        return None
+    if uuidutils.is_uuid_like(marker):
+        return object_class.get_by_uuid(pecan.request.context, marker)
+    return decode_cursor(marker, sort_key)
+
+
 def validate_patch(patch):
     """Performs a basic validation on patch."""
 
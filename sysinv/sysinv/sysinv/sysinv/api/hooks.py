@@ -35,6 +35,7 @@ from sysinv.common import context
 from sysinv.common import utils
 from sysinv.conductor import rpcapi
 from sysinv.db import api as dbapi
+from sysinv.db.sqlalchemy import profiler
 from sysinv.openstack.common import policy
 from webob import exc
 
@@ -103,6 +104,22 @@ class DBHook(hooks.PecanHook):
         state.request.dbapi = dbapi.get_instance()
 
 
+class DBProfileHook(hooks.PecanHook):
+    """Tag the database statements of a request with its route."""
+
+    def before(self, state):
+        controller = getattr(state, 'controller', None)
+        route = getattr(controller, '__name__', None) or state.request.path
+        instance = getattr(controller, '__self__', None)
+        if instance is not None:
+            route = '%s.%s' % (instance.__class__.__name__, route)
+        state.request.db_profile_scope = profiler.set_scope(
+            'api:%s %s' % (state.request.method, route))
+
+    def after(self, state):
+        profiler.set_scope(getattr(state.request, 'db_profile_scope', None))
+
+
 class ContextHook(hooks.PecanHook):
     """Configures a request context and attaches it to the request.
 
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+
+"""
+System Inventory Database Profile Utility.
+
+Shows the database statement statistics reported by the sysinv processes
+running with the [db_profiler] enabled option.
+"""
+
+from __future__ import print_function
+
+import collections
+import sys
+
+from oslo_config import cfg
+
+from sysinv.common import service
+from sysinv.db.sqlalchemy import profiler
+
+CONF = cfg.CONF
+
+SORT_KEYS = ['total', 'count', 'slowest']
+
+
+def _get_slowest(entry):
+    return max([s['duration'] for s in entry['slowest']] or [0])
+
+
+def aggregate_scopes(reports, by_method=True):
+    """Aggregate the statistics of the scopes reported by the processes"""
+    totals = collections.OrderedDict()
+    for report in reports:
+        for entry in report['scopes']:
+            key = (report['process'], entry['scope'],
+                   entry['method'] if by_method else profiler.SCOPE_NONE)
+            total = totals.setdefault(key, {'process': key[0],
+                                            'scope': key[1],
+                                            'method': key[2],
+                                            'count': 0,
+                                            'total': 0.0,
+                                            'slowest': []})
+            total['count'] += entry['count']
+            total['total'] += entry['total']
+            total['slowest'].extend(entry['slowest'])
+    return list(totals.values())
+
+
+def show_action(sort_key, limit, scope_filter, by_method, statements):
+    reports = profiler.load_reports(CONF.db_profiler.report_dir)
+    if not reports:
+        print("No database profile found in %s" %
+              CONF.db_profiler.report_dir)
+        return
+
+    scopes = aggregate_scopes(reports, by_method)
+    if scope_filter:
+        scopes = [s for s in scopes
+                  if scope_filter in s['scope'] or scope_filter in s['method']]
+    if sort_key == 'slowest':
+        scopes.sort(key=_get_slowest, reverse=True)
+    else:
+        scopes.sort(key=lambda s: s[sort_key], reverse=True)
+
+    print("%-20s %-50s %-40s %8s %10s %10s" %
+          ('process', 'scope', 'method', 'count', 'total', 'slowest'))
+    for entry in scopes[:limit]:
+        print("%-20s %-50s %-40s %8d %10.3f %10.3f" %
+              (entry['process'], entry['scope'], entry['method'],
+               entry['count'], entry['total'], _get_slowest(entry)))
+        if statements:
+            slowest = sorted(entry['slowest'], key=lambda s: s['duration'],
+                             reverse=True)
+            for statement in slowest[:CONF.db_profiler.slow_statements]:
+                print("    %10.3f %s" %
+                      (statement['duration'],
+                       ' '.join(statement['statement'].split())))
+
+
+def add_action_parsers(subparsers):
+    parser = subparsers.add_parser('show')
+    parser.set_defaults(func=show_action)
+    parser.add_argument('--sort', choices=SORT_KEYS, default='total',
+                        help='sort the scopes by total time, number of '
+                             'statements or slowest statement')
+    parser.add_argument('--limit', type=int, default=25,
+                        help='number of scopes shown')
+    parser.add_argument('--scope',
+                        help='only show the scopes or methods containing '
+                             'this string')
+    parser.add_argument('--by-scope', action='store_true',
+                        help='aggregate the database API methods of each '
+                             'scope')
+    parser.add_argument('--statements', action='store_true',
+                        help='show the slowest statements of each scope')
+
+
+CONF.register_cli_opt(
+    cfg.SubCommandOpt('action',
+                      title='actions',
+                      help='Perform the database profile operation',
+                      handler=add_action_parsers))
+
+
+def main():
+    service.prepare_service(sys.argv)
+    CONF.action.func(CONF.action.sort, CONF.action.limit,
+                     CONF.action.scope, not CONF.action.by_scope,
+                     CONF.action.statements)
@@ -0,0 +1,266 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Allocation index of the address pools.
+
+The free addresses of each pool are kept as a sorted list of disjoint ranges,
+so that the first free address, the free address following an address and
+a uniformly random free address of the pool are selected in O(log n),
+instead of loading every address of the pool and subtracting them from the
+pool ranges.
+
+The index of a pool is built from the pool ranges and the identifiers and
+addresses of the pool; the number of addresses, their greatest identifier and
+their latest update time form the generation of the index. The addresses
+created and destroyed through the database API of the process update the
+index and its generation; an index whose generation or ranges differ from the
+database, because of changes by other processes or rolled back transactions,
+is rebuilt.
+"""
+
+import bisect
+import collections
+import random
+import threading
+
+import netaddr
+
+# indexes of the address pools, by pool id
+_indexes = {}
+
+_lock = threading.Lock()
+
+
+def _to_int(address):
+    return int(netaddr.IPAddress(address))
+
+
+def _ranges_key(ranges):
+    return tuple((str(start), str(end)) for start, end in ranges)
+
+
+def _get_generation(allocated, updated_at):
+    """Return the generation of a list of (id, address) of a pool"""
+    return (len(allocated), max([a[0] for a in allocated] or [0]), updated_at)
+
+
+class AddressPoolIndex(object):
+    """Free addresses of an address pool"""
+
+    def __init__(self, ranges, family, allocated, updated_at=None):
+        """
+        :param ranges: list of (start, end) addresses of the pool
+        :param family: IP family of the pool
+        :param allocated: list of (id, address) of the addresses of the pool
+        :param updated_at: latest update time of the addresses of the pool
+        """
+        self.ranges = _ranges_key(ranges)
+        self.family = family
+        self.generation = _get_generation(allocated, updated_at)
+
+        defined = sorted((_to_int(start), _to_int(end))
+                         for start, end in ranges)
+        # merged pool ranges
+        self._defined_starts = []
+        self._defined_ends = []
+        for start, end in defined:
+            if self._defined_ends and start <= self._defined_ends[-1] + 1:
+                self._defined_ends[-1] = max(self._defined_ends[-1], end)
+            else:
+                self._defined_starts.append(start)
+                self._defined_ends.append(end)
+        self.capacity = sum(end - start + 1 for start, end in
+                            zip(self._defined_starts, self._defined_ends))
+
+        # free ranges, and the number of additional references of the
+        # addresses allocated more than once
+        self._starts = list(self._defined_starts)
+        self._ends = list(self._defined_ends)
+        self._shared = collections.Counter()
+        self.size = self.capacity
+        # number of free addresses preceding each free range, computed
+        # when a random address is selected after a change of the ranges
+        self._free_offsets = None
+
+        for value in sorted(_to_int(a[1]) for a in allocated):
+            self._allocate(value)
+
+    def is_current(self, ranges, generation):
+        return (self.ranges == _ranges_key(ranges) and
+                self.generation == generation)
+
+    def _find(self, value):
+        """Return the index of the free range including a value, or -1"""
+        i = bisect.bisect_right(self._starts, value) - 1
+        if i >= 0 and value <= self._ends[i]:
+            return i
+        return -1
+
+    def _is_defined(self, value):
+        i = bisect.bisect_right(self._defined_starts, value) - 1
+        return i >= 0 and value <= self._defined_ends[i]
+
+    def _allocate(self, value):
+        i = self._find(value)
+        if i < 0:
+            if self._is_defined(value):
+                self._shared[value] += 1
+            return
+        self._free_offsets = None
+        start, end = self._starts[i], self._ends[i]
+        if start == end:
+            del self._starts[i]
+            del self._ends[i]
+        elif value == start:
+            self._starts[i] = value + 1
+        elif value == end:
+            self._ends[i] = value - 1
+        else:
+            self._ends[i] = value - 1
+            self._starts.insert(i + 1, value + 1)
+            self._ends.insert(i + 1, end)
+        self.size -= 1
+
+    def _release(self, value):
+        if not self._is_defined(value) or self._find(value) >= 0:
+            return
+        if self._shared[value]:
+            self._shared[value] -= 1
+            if not self._shared[value]:
+                del self._shared[value]
+            return
+        self._free_offsets = None
+        i = bisect.bisect_right(self._starts, value)
+        merge_previous = i > 0 and self._ends[i - 1] == value - 1
+        merge_next = i < len(self._starts) and self._starts[i] == value + 1
+        if merge_previous and merge_next:
+            self._ends[i - 1] = self._ends[i]
+            del self._starts[i]
+            del self._ends[i]
+        elif merge_previous:
+            self._ends[i - 1] = value
+        elif merge_next:
+            self._starts[i] = value
+        else:
+            self._starts.insert(i, value)
+            self._ends.insert(i, value)
+        self.size += 1
+
+    def allocate(self, address_id, address):
+        """Record an address created in the pool"""
+        self._allocate(_to_int(address))
+        self.generation = (self.generation[0] + 1,
+                           max(self.generation[1], address_id),
+                           self.generation[2])
+
+    def release(self, address):
+        """Record an address destroyed from the pool"""
+        self._release(_to_int(address))
+        self.generation = (self.generation[0] - 1, self.generation[1],
+                           self.generation[2])
+
+    def _format(self, value):
+        return str(netaddr.IPAddress(value, self.family))
+
+    def first(self):
+        """Return the lowest free address, or None if there is none"""
+        if not self._starts:
+            return None
+        return self._format(self._starts[0])
+
+    def _following(self, value):
+        i = bisect.bisect_right(self._starts, value) - 1
+        if i >= 0 and value <= self._ends[i]:
+            return value
+        if i + 1 < len(self._starts):
+            return self._starts[i + 1]
+        return self._starts[0]
+
+    def following(self, address):
+        """Return the first free address at or after an address, wrapping
+        around to the lowest free address, or None if there is none.
+        """
+        if not self._starts:
+            return None
+        return self._format(self._following(_to_int(address)))
+
+    def random(self):
+        """Return a free address chosen uniformly at random, or None if
+        there is none.
+        """
+        if not self._starts:
+            return None
+        if self._free_offsets is None:
+            self._free_offsets = []
+            offset = 0
+            for start, end in zip(self._starts, self._ends):
+                self._free_offsets.append(offset)
+                offset += end - start + 1
+        offset = random.randint(0, self.size - 1)
+        i = bisect.bisect_right(self._free_offsets, offset) - 1
+        return self._format(self._starts[i] + offset - self._free_offsets[i])
+
+    def free_ranges(self):
+        """Return the free ranges as a list of (start, end) addresses"""
+        return [(self._format(start), self._format(end))
+                for start, end in zip(self._starts, self._ends)]
+
+
+def get_index(pool, dbapi):
+    """Return the allocation index of a pool, rebuilding it if the pool
+    ranges or addresses were changed outside of the index.
+
+    :param pool: address pool object
+    :param dbapi: database API used to read the addresses of the pool
+    """
+    generation = dbapi.address_pool_get_generation(pool.id)
+    with _lock:
+        index = _indexes.get(pool.id)
+        if index is not None and index.is_current(pool.ranges, generation):
+            return index
+
+    # an address updated meanwhile leaves the index out of date, and
+    # rebuilt on its next use
+    allocated = dbapi.address_pool_get_addresses(pool.id)
+    index = AddressPoolIndex(pool.ranges, pool.family, allocated,
+                             generation[2])
+    with _lock:
+        _indexes[pool.id] = index
+    return index
+
+
+def address_created(pool_id, address_id, address):
+    """Update the index of a pool with an address created in it"""
+    if pool_id is None:
+        return
+    with _lock:
+        index = _indexes.get(pool_id)
+        if index is not None:
+            index.allocate(address_id, address)
+
+
+def address_destroyed(pool_id, address_id, address):
+    """Update the index of a pool with an address destroyed from it"""
+    if pool_id is None:
+        return
+    with _lock:
+        index = _indexes.get(pool_id)
+        if index is None:
+            return
+        if address_id >= index.generation[1]:
+            # the greatest identifier of the pool is no longer known
+            del _indexes[pool_id]
+        else:
+            index.release(address)
+
+
+def invalidate(pool_id=None):
+    """Discard the index of a pool, or of all pools"""
+    with _lock:
+        if pool_id is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(pool_id, None)
@@ -24,6 +24,14 @@ SYSINV_CONDUCTOR_ACTIVE_PATH = os.path.join(SYSINV_CONFIG_PATH,
 HTTPS_CONFIG_REQUIRED = os.path.join(tsc.CONFIG_PATH, '.https_config_required')
 ADMIN_ENDPOINT_CONFIG_REQUIRED = os.path.join(tsc.CONFIG_PATH, '.admin_endpoint_config_required')
 
+# Database relationship loading profiles
+DB_LOADING_PROFILE_DETAIL = 'detail'
+DB_LOADING_PROFILE_LIST = 'list'
+DB_LOADING_PROFILE_PUPPET = 'puppet'
+DB_LOADING_PROFILES = [DB_LOADING_PROFILE_DETAIL,
+                       DB_LOADING_PROFILE_LIST,
+                       DB_LOADING_PROFILE_PUPPET]
+
 # Minimum password length
 MINIMUM_PASSWORD_LENGTH = 8
 
@@ -127,6 +127,22 @@ def get_lower_interface(context, iface):
     return context['interfaces'][lower_ifname]
 
 
+def get_pci_vendor_id(port):
+    """
+    Determine the PCI vendor id of given port.
+    """
+    # The vendor id can be found by inspecting the '[xxxx]' at the
+    # end of the port's pvendor field
+    if not port or not port.get('pvendor', None):
+        return None
+    vendor_id = re.search(r'\[([0-9a-fA-F]{1,4})\]$', port['pvendor'])
+    if vendor_id:
+        vendor_id = vendor_id.group(1)
+        return str(vendor_id)
+
+    return None
+
+
 def get_pci_device_id(port):
     """
     Determine the PCI device id of given port.
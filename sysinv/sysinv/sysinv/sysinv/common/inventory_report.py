@@ -0,0 +1,122 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+""" Delta reports of the inventory of the hosts.
+
+The agent reports the records of a resource type of its host, such as its
+disks, with a version: the hash of the records. Once the conductor has
+acknowledged a version, the agent only reports the version of the records
+while they are unchanged, then the records added or modified and the keys of
+the records removed since the acknowledged version. The conductor applies
+the changes to the records of the acknowledged version, and requests all the
+records when it does not have them, such as after a restart or a swact.
+"""
+
+import collections
+import hashlib
+import json
+import time
+
+# resource types reported by delta, and the key of their records
+MEMORY = 'memory'
+DISK = 'disk'
+LVG = 'lvg'
+PV = 'pv'
+
+RESOURCE_KEYS = {
+    MEMORY: 'numa_node',
+    DISK: 'device_node',
+    LVG: 'lvm_vg_name',
+    PV: 'lvm_pv_name',
+}
+
+
+def get_records(resource, records):
+    """Return the records of a resource type by key, in reported order"""
+    key = RESOURCE_KEYS[resource]
+    return collections.OrderedDict((record[key], record)
+                                   for record in records)
+
+
+def get_version(records):
+    """Return the version of records by key, independent of their order"""
+    content = json.dumps(dict((str(key), record)
+                              for key, record in records.items()),
+                         sort_keys=True, default=str)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def get_changes(previous, current):
+    """Return the records of current added or modified since previous,
+    and the keys of the records of previous removed from current.
+    """
+    changed = [record for key, record in current.items()
+               if previous.get(key) != record]
+    removed = [key for key in previous if key not in current]
+    return changed, removed
+
+
+def apply_changes(resource, previous, changed, removed):
+    """Return the records of previous with the changes applied"""
+    key = RESOURCE_KEYS[resource]
+    records = collections.OrderedDict(previous)
+    for record_key in removed:
+        records.pop(record_key, None)
+    for record in changed:
+        records[record[key]] = record
+    return records
+
+
+class InventoryReport(object):
+    """Delta reports of the records of a resource type of a host"""
+
+    def __init__(self, resource, full_report_interval):
+        """
+        :param resource: resource type of the records
+        :param full_report_interval: seconds between the reports of all
+                                     the records
+        """
+        self.resource = resource
+        self.full_report_interval = full_report_interval
+        self.reset()
+
+    def reset(self):
+        """Report all the records next"""
+        self.version = None
+        self.records = collections.OrderedDict()
+        self.reported_at = 0
+
+    def report(self, rpcapi, context, host_uuid, records):
+        """Report records to the conductor, only their version or their
+        changes if the conductor has acknowledged a version.
+
+        :returns: True if the conductor acknowledged the records
+        """
+        current = get_records(self.resource, records)
+        version = get_version(current)
+
+        if (self.version is not None and
+                time.time() - self.reported_at < self.full_report_interval):
+            changed, removed = get_changes(self.records, current)
+            result = rpcapi.inventory_report_by_ihost(
+                context, host_uuid, self.resource, version,
+                base_version=self.version, changed=changed, removed=removed)
+        else:
+            result = {'resync': True}
+
+        if result.get('resync'):
+            self.reported_at = time.time()
+            result = rpcapi.inventory_report_by_ihost(
+                context, host_uuid, self.resource, version,
+                changed=list(current.values()))
+
+        if result.get('version') != version:
+            self.reset()
+            return False
+
+        self.version = version
+        self.records = current
+        return True
@@ -0,0 +1,68 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+""" YAML serialization of the generated configuration files.
+
+The libyaml based safe dumper and loader are used when PyYAML was built
+with libyaml, falling back to the pure python implementation otherwise.
+Both produce the same output as yaml.dump with the default dumper for the
+plain python types making up the hiera data and helm overrides; data with
+python specific types is serialized with the default dumper.
+"""
+
+import yaml
+
+from oslo_log import log
+
+LOG = log.getLogger(__name__)
+
+try:
+    from yaml import CSafeDumper as _SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+    LIBYAML = True
+except ImportError:
+    from yaml import SafeDumper as _SafeDumper
+    from yaml import SafeLoader as SafeLoader
+    LIBYAML = False
+
+
+class SafeDumper(_SafeDumper):
+    """Safe dumper of the generated configuration files"""
+
+
+# The default dumper tags tuples as python objects while the safe dumper
+# represents them as lists; defer to the default dumper to keep the output.
+SafeDumper.add_representer(tuple, SafeDumper.represent_undefined)
+
+
+def dump(data, stream=None):
+    """Serialize data in block style.
+
+    :param data: data to serialize
+    :param stream: seekable stream the data is written to; the serialized
+                   data is returned instead if not supplied
+    """
+    try:
+        return yaml.dump(data, stream, Dumper=SafeDumper,
+                         default_flow_style=False)
+    except yaml.representer.RepresenterError as e:
+        LOG.debug("Serializing with the default dumper: %s" % e)
+        if stream is not None:
+            stream.seek(0)
+            stream.truncate()
+        return yaml.dump(data, stream, Dumper=yaml.Dumper,
+                         default_flow_style=False)
+
+
+def load(stream):
+    """Parse the yaml document of a string or seekable stream."""
+    try:
+        return yaml.load(stream, Loader=SafeLoader)
+    except yaml.constructor.ConstructorError as e:
+        LOG.debug("Parsing with the default loader: %s" % e)
+        if hasattr(stream, 'seek'):
+            stream.seek(0)
+        return yaml.load(stream, Loader=yaml.Loader)
@@ -29,6 +29,7 @@ collection of inventory data for each host.
 
 """
 
+import contextlib
 import errno
 import filecmp
 import fnmatch
@@ -66,6 +67,7 @@ from fm_api import constants as fm_constants
 from fm_api import fm_api
 from netaddr import IPAddress
 from netaddr import IPNetwork
+from oslo_concurrency import lockutils
 from oslo_config import cfg
 from oslo_log import log
 from oslo_serialization import base64
@@ -93,6 +95,8 @@ from sysinv.common import exception
 from sysinv.common import fm
 from sysinv.common import fernet
 from sysinv.common import health
+from sysinv.common import interface as cinterface
+from sysinv.common import inventory_report
 from sysinv.common import kubernetes
 from sysinv.common import retrying
 from sysinv.common import service
@@ -105,6 +109,7 @@ from sysinv.conductor import kube_app
 from sysinv.conductor import openstack
 from sysinv.conductor import docker_registry
 from sysinv.conductor import keystone_listener
+from sysinv.conductor import runtime_config
 from sysinv.db import api as dbapi
 from sysinv.fpga_agent import rpcapi as fpga_agent_rpcapi
 from sysinv.fpga_agent import constants as fpga_constants
@@ -151,6 +156,36 @@ conductor_opts = [
        cfg.IntOpt('fw_update_small_timeout',
                   default=300,
                   help='Timeout interval in seconds for a small device image'),
+       cfg.IntOpt('puppet_hieradata_workers',
+                  default=4,
+                  help=('Maximum number of hosts for which puppet hieradata '
+                        'is generated by concurrent green threads. Only the '
+                        'RPC and REST requests of the hosts overlap, the '
+                        'database queries are still serialized. Set to 1 to '
+                        'generate the hieradata serially.')),
+       cfg.BoolOpt('puppet_incremental_hieradata',
+                   default=True,
+                   help=('Only rewrite puppet hieradata files whose '
+                         'content has changed. The host files embed the '
+                         'config_uuid, so they are only skipped when '
+                         'regenerated for the same configuration '
+                         'generation.')),
+       cfg.BoolOpt('puppet_scoped_hieradata',
+                   default=False,
+                   help=('Only regenerate the host puppet hieradata of the '
+                         'plugins affected by the runtime manifest classes '
+                         'being applied.')),
+       cfg.IntOpt('config_update_merge_window',
+                  default=0,
+                  help=('Number of seconds in which host configuration '
+                        'updates of the same personalities and hosts are '
+                        'merged into a single configuration generation. '
+                        '0 disables merging.')),
+       cfg.BoolOpt('compact_objects',
+                   default=False,
+                   help=('Convert the inventory lists read by the periodic '
+                         'tasks to compact objects storing their fields in '
+                         'slots, to reduce the memory use of the audits.')),
                   ]
 
 CONF = cfg.CONF
@@ -189,7 +224,7 @@ AppTarBall = namedtuple(
 class ConductorManager(service.PeriodicService):
     """Sysinv Conductor service main class."""
 
-    RPC_API_VERSION = '1.1'
+    RPC_API_VERSION = '1.3'
     my_host_id = None
 
     def __init__(self, host, topic):
@@ -220,10 +255,29 @@ class ConductorManager(service.PeriodicService):
         self._host_reboot_config_uuid = {}
 
         # track deferred runtime config which need to be applied
-        self._host_deferred_runtime_config = []
+        self._host_deferred_runtime_config = \
+            runtime_config.DeferredRuntimeConfigQueue()
+
+        # configuration generations open for merging, indexed by the
+        # (personalities, host uuids, reboot) scope of the update
+        # struct {scope: (config_uuid, created_at)}
+        self._config_generations = {}
+        self._config_generations_created = 0
+        self._config_generations_merged = 0
+
+        # whether each host had applied its previous configuration when its
+        # config target was last updated, for skipping the unchanged runtime
+        # manifests
+        # struct {host_uuid: (config_uuid, in_sync)}
+        self._host_config_in_sync = {}
+
+        # inventory last applied from the delta reports of the agents
+        # struct {(host_uuid, resource): (version, {key: record})}
+        self._inventory_reports = {}
 
         # track whether runtime class apply may be in progress
-        self._runtime_class_apply_in_progress = []
+        self._runtime_class_apply_in_progress = \
+            runtime_config.RuntimeClassApplyTracker()
 
         # Guard for a function that should run only once per conductor start
         self._do_detect_swact = True
@@ -292,7 +346,9 @@ class ConductorManager(service.PeriodicService):
         self.host_uuid = self._get_active_controller_uuid()
 
         self._openstack = openstack.OpenStackOperator(self.dbapi)
-        self._puppet = puppet.PuppetOperator(self.dbapi)
+        self._puppet = puppet.PuppetOperator(
+            self.dbapi,
+            incremental=CONF.conductor.puppet_incremental_hieradata)
 
         # create /var/run/sysinv if required. On DOR, the manifests
         # may not run to create this volatile directory.
@@ -351,7 +407,9 @@ class ConductorManager(service.PeriodicService):
 
     def periodic_tasks(self, context, raise_on_error=False):
         """ Periodic tasks are run at pre-specified intervals. """
-        return self.run_periodic_tasks(context, raise_on_error=raise_on_error)
+        with objects_base.compact_objects(CONF.conductor.compact_objects):
+            return self.run_periodic_tasks(context,
+                                           raise_on_error=raise_on_error)
 
     @contextmanager
     def session(self):
@@ -1588,6 +1646,7 @@ class ConductorManager(service.PeriodicService):
             if utils.config_is_reboot_required(host.config_target):
                 config_uuid = self._config_set_reboot_required(config_uuid)
             self._puppet.update_host_config(host, config_uuid)
+            self._config_close_generation(config_uuid)
 
     def _ceph_mon_create(self, host):
         if not StorageBackendConfig.has_backend(
@@ -1723,13 +1782,15 @@ class ConductorManager(service.PeriodicService):
         config_dict = {
             "personalities": [constants.CONTROLLER],
             "classes": ['platform::sysctl::controller::runtime',
-                        'platform::remotelogging::runtime']
+                        'platform::remotelogging::runtime'],
+            "skip_unchanged": True,
         }
         self._config_apply_runtime_manifest(context, config_uuid, config_dict)
 
         config_dict = {
             "personalities": [constants.WORKER, constants.STORAGE],
             "classes": ['platform::remotelogging::runtime'],
+            "skip_unchanged": True,
         }
         self._config_apply_runtime_manifest(context, config_uuid, config_dict)
 
@@ -2195,6 +2256,17 @@ class ConductorManager(service.PeriodicService):
             values = {'mgmt_mac': inic['mac']}
             self.dbapi.ihost_update(ihost['uuid'], values)
 
+    @staticmethod
+    def _get_port_pci_ids(port):
+        """Return the PCI (vendor, device) ids of a port, or their names if
+           not reported. The names depend on the pci.ids and udev hardware
+           database of the host, so a NIC is identified by its ids.
+        """
+        vendor = cinterface.get_pci_vendor_id(port)
+        device = cinterface.get_pci_device_id(port)
+        return (vendor.lower() if vendor else port.get('pvendor'),
+                device.lower() if device else port.get('pdevice'))
+
     def _get_interface_mac_update_dict(self, ihost, inic_pciaddr_dict, interface_mac_update):
         """ Get port list of altered MACs if vendor and device-id is the same on a PCI address.
 
@@ -2205,9 +2277,9 @@ class ConductorManager(service.PeriodicService):
         eth_ports = self.dbapi.ethernet_port_get_by_host(ihost['uuid'])
         for port in eth_ports:
             if port.pciaddr in inic_pciaddr_dict.keys():
-                if (inic_pciaddr_dict[port.pciaddr]['pvendor'] == port.pvendor
-                        and inic_pciaddr_dict[port.pciaddr]['pdevice'] == port.pdevice
-                        and inic_pciaddr_dict[port.pciaddr]['mac'] != port.mac):
+                inic = inic_pciaddr_dict[port.pciaddr]
+                if (self._get_port_pci_ids(inic) == self._get_port_pci_ids(port)
+                        and inic['mac'] != port.mac):
                     LOG.debug('add interface for mac update %s' % vars(port))
                     interface_mac_update[port.interface_uuid] = port.pciaddr
 
@@ -2281,9 +2353,8 @@ class ConductorManager(service.PeriodicService):
                 continue
 
             if port.pciaddr in inic_pciaddr_dict.keys():
-                if (inic_pciaddr_dict[port.pciaddr]['pvendor'] != port.pvendor
-                        or (inic_pciaddr_dict[port.pciaddr]['pvendor'] == port.pvendor
-                        and inic_pciaddr_dict[port.pciaddr]['pdevice'] != port.pdevice)):
+                if (self._get_port_pci_ids(inic_pciaddr_dict[port.pciaddr]) !=
+                        self._get_port_pci_ids(port)):
                     if (iface.ifclass is None and not iface.used_by):
                         LOG.info('Detected port %s addr:%s replaced from "%s/%s" to "%s/%s"'
                                 % (port.name, port.pciaddr, port.pvendor, port.pdevice,
@@ -3570,10 +3641,6 @@ class ConductorManager(service.PeriodicService):
                                     reference='current (CHANGED)',
                                     sockets=cs, cores=cc, threads=ct)
 
-            # there has been an update.  Delete db entries and replace.
-            for icpu in icpus:
-                self.dbapi.icpu_destroy(icpu.uuid)
-
         # sort the list of cpus by socket and coreid
         cpu_list = sorted(icpu_dict_array, key=self._sort_by_socket_and_coreid)
 
@@ -3587,6 +3654,7 @@ class ConductorManager(service.PeriodicService):
             functions[numa_node] = self._get_default_cpu_functions(
                 ihost, numa_node, cpu_list, hyperthreading)
 
+        cpu_dicts = []
         for data in cpu_list:
             try:
                 forinodeid = None
@@ -3601,16 +3669,20 @@ class ConductorManager(service.PeriodicService):
                             'allocated_function': functions[numa_node].pop(0)}
 
                 cpu_dict.update(data)
+                cpu_dicts.append(cpu_dict)
 
-                self.dbapi.icpu_create(forihostid, cpu_dict)
-
-            except exception.NodeNotFound:
-                raise exception.SysinvException(_(
-                    "Invalid ihost_uuid: host not found: %s") %
-                    ihost_uuid)
             except Exception:
-                # info may have already been posted
-                pass
+                LOG.warn("Skipping cpu %s of host %s: %s" %
+                         (data.get('cpu'), ihost_uuid, data))
+
+        # there has been an update.  Update the changed cpus, create the new
+        # ones and delete the ones no longer reported in a single transaction.
+        try:
+            self.dbapi.icpu_upsert_many(forihostid, cpu_dicts,
+                                        delete_missing=num_cpus_dict > 0)
+        except Exception:
+            LOG.exception("Failed to update the cpus of host %s" %
+                          ihost_uuid)
 
         # if it is the first controller wait for the initial config to
         # be completed
@@ -3657,26 +3729,26 @@ class ConductorManager(service.PeriodicService):
             ihost['invprovision'] == constants.PROVISIONED and \
                 not force_update:
             LOG.debug("Ignore the host memory audit after the host is locked")
-            return
+            return False
         # To avoid agent update mem after conductor update mem when unlock action
         if ihost['administrative'] == constants.ADMIN_LOCKED and \
             ihost['ihost_action'] in [constants.UNLOCK_ACTION,
                 constants.FORCE_UNLOCK_ACTION]:
             LOG.debug("Ignore the host memory audit during the host is unlocking")
-            return
+            return False
 
         forihostid = ihost['id']
         ihost_inodes = self.dbapi.inode_get_by_ihost(ihost_uuid)
+        imems = dict((imem.forinodeid, imem) for imem in
+                     self.dbapi.imemory_get_by_ihost(ihost_uuid))
 
+        mem_dicts = []
         for i in imemory_dict_array:
             forinodeid = None
-            inode_uuid = None
             for n in ihost_inodes:
                 numa_node = int(n.numa_node)
                 if numa_node == int(i['numa_node']):
                     forinodeid = n['id']
-                    inode_uuid = n['uuid']
-                    inode_uuid.strip()
                     break
             else:
                 # not found in host_nodes, do not add memory element
@@ -3693,48 +3765,103 @@ class ConductorManager(service.PeriodicService):
             # numa_node is not stored against imemory table
             mem_dict.pop('numa_node', None)
 
-            try:
-                imems = self.dbapi.imemory_get_by_ihost_inode(ihost_uuid,
-                                                              inode_uuid)
-                if not imems:
-                    # Set the amount of memory reserved for platform use.
-                    mem_dict.update(self._get_platform_reserved_memory(
-                            ihost, i['numa_node']))
-                    self.dbapi.imemory_create(forihostid, mem_dict)
-                else:
-                    for imem in imems:
-                        # Include 4K pages in the displayed VM memtotal
-                        if imem.vm_hugepages_nr_4K is not None:
-                            vm_4K_mib = \
-                                (imem.vm_hugepages_nr_4K //
-                                 constants.NUM_4K_PER_MiB)
-                            mem_dict['memtotal_mib'] += vm_4K_mib
-                            mem_dict['memavail_mib'] += vm_4K_mib
-
-                        if imem.vswitch_hugepages_reqd is not None \
-                                and imem.vswitch_hugepages_reqd == mem_dict.get('vswitch_hugepages_nr'):
-                            # vswitch_hugepages_reqd matches the current config, so clear it
-                            mem_dict['vswitch_hugepages_reqd'] = None
-                        if imem.vm_hugepages_nr_2M_pending is not None \
-                                and imem.vm_hugepages_nr_2M_pending == mem_dict.get('vm_hugepages_nr_2M'):
-                            # vm_hugepages_nr_2M_pending matches the current config, so clear it
-                            mem_dict['vm_hugepages_nr_2M_pending'] = None
-                        if imem.vm_hugepages_nr_1G_pending is not None \
-                                and imem.vm_hugepages_nr_1G_pending == mem_dict.get('vm_hugepages_nr_1G'):
-                            # vm_hugepages_nr_1G_pending matches the current config, so clear it
-                            mem_dict['vm_hugepages_nr_1G_pending'] = None
-
-                        self.dbapi.imemory_update(imem['uuid'],
-                                                         mem_dict)
-            except Exception:
+            imem = imems.get(forinodeid)
+            if imem is None:
                 # Set the amount of memory reserved for platform use.
                 mem_dict.update(self._get_platform_reserved_memory(
                         ihost, i['numa_node']))
-                self.dbapi.imemory_create(forihostid, mem_dict)
-                pass
+            else:
+                # Include 4K pages in the displayed VM memtotal
+                if imem.vm_hugepages_nr_4K is not None:
+                    vm_4K_mib = \
+                        (imem.vm_hugepages_nr_4K //
+                         constants.NUM_4K_PER_MiB)
+                    mem_dict['memtotal_mib'] += vm_4K_mib
+                    mem_dict['memavail_mib'] += vm_4K_mib
+
+                if imem.vswitch_hugepages_reqd is not None \
+                        and imem.vswitch_hugepages_reqd == mem_dict.get('vswitch_hugepages_nr'):
+                    # vswitch_hugepages_reqd matches the current config, so clear it
+                    mem_dict['vswitch_hugepages_reqd'] = None
+                if imem.vm_hugepages_nr_2M_pending is not None \
+                        and imem.vm_hugepages_nr_2M_pending == mem_dict.get('vm_hugepages_nr_2M'):
+                    # vm_hugepages_nr_2M_pending matches the current config, so clear it
+                    mem_dict['vm_hugepages_nr_2M_pending'] = None
+                if imem.vm_hugepages_nr_1G_pending is not None \
+                        and imem.vm_hugepages_nr_1G_pending == mem_dict.get('vm_hugepages_nr_1G'):
+                    # vm_hugepages_nr_1G_pending matches the current config, so clear it
+                    mem_dict['vm_hugepages_nr_1G_pending'] = None
+
+            mem_dicts.append(mem_dict)
+
+        # Update the changed memory and create the new memory of the numa
+        # nodes in a single transaction.
+        self.dbapi.imemory_upsert_many(forihostid, mem_dicts)
 
         return
 
+    def inventory_report_by_ihost(self, context, ihost_uuid, resource,
+                                  report_version, base_version=None,
+                                  changed=None, removed=None):
+        """Apply a delta report of the inventory of a resource type of an
+        ihost.
+
+        The records are all reported when base_version is None, else only
+        the records changed and the keys of the records removed since
+        base_version, the version last acknowledged to the agent. Changed
+        records are applied by the update handler of the resource type.
+
+        :param context: an admin context
+        :param ihost_uuid: ihost uuid unique id
+        :param resource: resource type of the records
+        :param report_version: version of the records
+        :param base_version: version of the records the changes apply to
+        :param changed: records added or modified
+        :param removed: keys of the records removed
+        :returns: dict with the version of the records applied, None if
+                  they were ignored, or resync if all the records must be
+                  reported
+        """
+        report_key = (ihost_uuid, resource)
+        if base_version is None:
+            records = inventory_report.get_records(resource, changed or [])
+        else:
+            previous = self._inventory_reports.get(report_key)
+            if previous is None or previous[0] != base_version:
+                return {'resync': True}
+            if report_version == base_version:
+                return {'version': report_version}
+
+            records = inventory_report.apply_changes(
+                resource, previous[1], changed or [], removed or [])
+            if inventory_report.get_version(records) != report_version:
+                LOG.info("Inventory %s of host %s diverged from version %s, "
+                         "requesting all the records" %
+                         (resource, ihost_uuid, report_version))
+                del self._inventory_reports[report_key]
+                return {'resync': True}
+
+        # the records are acknowledged once applied
+        self._inventory_reports.pop(report_key, None)
+        values = list(records.values())
+        if resource == inventory_report.MEMORY:
+            applied = self.imemory_update_by_ihost(context, ihost_uuid,
+                                                   values, False)
+        elif resource == inventory_report.DISK:
+            applied = self.idisk_update_by_ihost(context, ihost_uuid, values)
+        elif resource == inventory_report.LVG:
+            applied = self.ilvg_update_by_ihost(context, ihost_uuid, values)
+        elif resource == inventory_report.PV:
+            applied = self.ipv_update_by_ihost(context, ihost_uuid, values)
+        else:
+            raise exception.SysinvException(_(
+                "Unsupported inventory resource type: %s") % resource)
+
+        if applied is False:
+            return {'version': None}
+        self._inventory_reports[report_key] = (report_version, records)
+        return {'version': report_version}
+
     def _get_disk_available_mib(self, disk, agent_disk_dict):
         partitions = self.dbapi.partition_get_by_idisk(disk['uuid'])
 
@@ -5240,22 +5367,24 @@ class ConductorManager(service.PeriodicService):
                     update_hosts_dict(host_id, constants.PV_AUDIT_REQUEST)
 
             # Make sure we get at least one good report for PVs & LVGs
-            hosts = self.dbapi.ihost_get_list()
+            hosts = [host for host in self.dbapi.ihost_get_list()
+                     if host.availability != constants.AVAILABILITY_OFFLINE]
+            host_ids = [host.id for host in hosts]
+            profile = constants.DB_LOADING_PROFILE_LIST
+            host_idisks = self.dbapi.idisk_get_by_ihosts(host_ids, profile)
+            host_ipvs = self.dbapi.ipv_get_by_ihosts(host_ids, profile)
+            host_ilvgs = self.dbapi.ilvg_get_by_ihosts(host_ids, profile)
+            host_fs = self.dbapi.host_fs_get_by_ihosts(host_ids, profile)
             for host in hosts:
-                if host.availability != constants.AVAILABILITY_OFFLINE:
-                    idisks = self.dbapi.idisk_get_by_ihost(host.uuid)
-                    if not idisks:
-                        update_hosts_dict(host.id, constants.DISK_AUDIT_REQUEST)
-                    ipvs = self.dbapi.ipv_get_by_ihost(host.uuid)
-                    if not ipvs:
-                        update_hosts_dict(host.id, constants.PARTITION_AUDIT_REQUEST)
-                        update_hosts_dict(host.id, constants.PV_AUDIT_REQUEST)
-                    ilvgs = self.dbapi.ilvg_get_by_ihost(host.uuid)
-                    if not ilvgs:
-                        update_hosts_dict(host.id, constants.LVG_AUDIT_REQUEST)
-                    host_fs = self.dbapi.host_fs_get_by_ihost(host.uuid)
-                    if not host_fs:
-                        update_hosts_dict(host.id, constants.FILESYSTEM_AUDIT_REQUEST)
+                if not host_idisks[host.id]:
+                    update_hosts_dict(host.id, constants.DISK_AUDIT_REQUEST)
+                if not host_ipvs[host.id]:
+                    update_hosts_dict(host.id, constants.PARTITION_AUDIT_REQUEST)
+                    update_hosts_dict(host.id, constants.PV_AUDIT_REQUEST)
+                if not host_ilvgs[host.id]:
+                    update_hosts_dict(host.id, constants.LVG_AUDIT_REQUEST)
+                if not host_fs[host.id]:
+                    update_hosts_dict(host.id, constants.FILESYSTEM_AUDIT_REQUEST)
 
         # Check partitions.
         partitions = self.dbapi.partition_get_all()
@@ -5276,6 +5405,8 @@ class ConductorManager(service.PeriodicService):
         # Send update request if required
         if update_hosts:
             rpcapi = agent_rpcapi.AgentAPI()
+            host_ipvs = self.dbapi.ipv_get_by_ihosts(
+                list(update_hosts), constants.DB_LOADING_PROFILE_LIST)
             for host_id, update_set in update_hosts.items():
 
                 ihost = self.dbapi.ihost_get(host_id)
@@ -5289,9 +5420,8 @@ class ConductorManager(service.PeriodicService):
 
                     # Get the cinder device to force detection even
                     # when filtered by LVM's global_filter.
-                    ipvs = self.dbapi.ipv_get_by_ihost(ihost['uuid'])
                     cinder_device = None
-                    for ipv in ipvs:
+                    for ipv in host_ipvs[host_id]:
                         if ipv['lvm_vg_name'] == constants.LVG_CINDER_VOLUMES:
                             cinder_device = ipv.get('disk_or_part_device_path')
 
@@ -5935,11 +6065,15 @@ class ConductorManager(service.PeriodicService):
             return
         if self._host_deferred_runtime_config:
             # apply the deferred runtime manifests
-            for config in list(self._host_deferred_runtime_config):
+            for key in self._host_deferred_runtime_config.keys():
+                # a manifest deferred again while applying the previous ones
+                # replaces the config_uuid of its queued duplicate
+                config = self._host_deferred_runtime_config.pop(key)
+                if config is None:
+                    continue
                 config_type = config.get('config_type')
                 LOG.info("found _audit_deferred_runtime_config request apply %s" %
                          config)
-                self._host_deferred_runtime_config.remove(config)
                 if config_type == CONFIG_APPLY_RUNTIME_MANIFEST:
                     # config runtime manifest system allows for filtering on scoped runtime classes
                     # to allow for more efficient handling while another scoped class apply may
@@ -6008,26 +6142,28 @@ class ConductorManager(service.PeriodicService):
             return
 
         LOG.debug("Starting kubernetes label audit")
-        sysinv_labels = self.dbapi.label_get_all()
-        nodes = self._kube.kube_get_nodes()
+        host_labels = self.dbapi.label_get_by_hosts(
+            [host.id for host in hosts], constants.DB_LOADING_PROFILE_LIST)
+        nodes = dict((node.metadata.name, node)
+                     for node in self._kube.kube_get_nodes())
 
         for host in hosts:
             try:
-                for node in nodes:
-                    if host.hostname == node.metadata.name:
-                        node_labels = node.metadata.labels
-                        host_labels = [l for l in sysinv_labels if l.host_id == host.id]
-                        for host_label in host_labels:
-                            if host_label.label_key not in node_labels.keys():
-                                LOG.info("Label audit: creating %s=%s on node %s"
-                                         % (host_label.label_key,
-                                            host_label.label_value, host.hostname))
-                                body = {
-                                    'metadata': {
-                                        'labels': {host_label.label_key: host_label.label_value}
-                                    }
-                                }
-                                self._kube.kube_patch_node(host.hostname, body)
+                node = nodes.get(host.hostname)
+                if node is None:
+                    continue
+                node_labels = node.metadata.labels
+                for host_label in host_labels[host.id]:
+                    if host_label.label_key not in node_labels:
+                        LOG.info("Label audit: creating %s=%s on node %s"
+                                 % (host_label.label_key,
+                                    host_label.label_value, host.hostname))
+                        body = {
+                            'metadata': {
+                                'labels': {host_label.label_key: host_label.label_value}
+                            }
+                        }
+                        self._kube.kube_patch_node(host.hostname, body)
             except Exception as e:
                 LOG.warning("Failed to sync kubernetes label to host %s: %s" %
                             (host.hostname, e))
@@ -10689,6 +10825,82 @@ class ConductorManager(service.PeriodicService):
 
         _sync_update_host_config_target(self, context, ihost_obj, config_uuid)
 
+    @contextlib.contextmanager
+    def _lock_hosts_config(self, hosts):
+        """Hold the config update lock of each of the supplied hosts.
+
+        The locks are acquired in host uuid order; the other config paths
+        hold a single host lock at a time.
+        """
+        locks = [lockutils.lock(LOCK_NAME_UPDATE_CONFIG + host_uuid)
+                 for host_uuid in sorted(set(host.uuid for host in hosts))]
+        acquired = []
+        try:
+            for lock in locks:
+                lock.__enter__()
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.__exit__(None, None, None)
+
+    def _update_hosts_config_target(self, context, hosts, config_uuid):
+        """Based upon config update, update config status of several hosts
+           with a single database update.
+        """
+        with self._lock_hosts_config(hosts):
+            config_targets = {}
+            for ihost_obj in hosts:
+                if ihost_obj.config_target == config_uuid:
+                    continue
+                host_config_uuid = config_uuid
+                # promote the current config to reboot required if a pending
+                # reboot required is still present
+                if (ihost_obj.config_target and
+                        ihost_obj.config_applied != ihost_obj.config_target):
+                    if utils.config_is_reboot_required(ihost_obj.config_target):
+                        host_config_uuid = self._config_set_reboot_required(
+                            config_uuid)
+                LOG.info("Setting config target of "
+                         "host '%s' to '%s'." % (ihost_obj.hostname,
+                                                 host_config_uuid))
+                config_targets[ihost_obj.id] = host_config_uuid
+
+            if config_targets:
+                self.dbapi.ihost_config_target_update_many(config_targets)
+
+            initial_config_complete = cutils.is_initial_config_complete()
+            for ihost_obj in hosts:
+                if ihost_obj.id in config_targets:
+                    ihost_obj.config_target = config_targets[ihost_obj.id]
+                    ihost_obj.obj_reset_changes(['config_target'])
+                if initial_config_complete:
+                    self._update_alarm_status(context, ihost_obj)
+
+    def _update_hosts_config_applied(self, context, hosts, config_uuid):
+        """Update the config applied of several hosts with a single
+           database update.
+        """
+        with self._lock_hosts_config(hosts):
+            servers = []
+            for ihost_obj in hosts:
+                self._remove_config_from_reboot_config_list(ihost_obj.uuid,
+                        config_uuid)
+                if ihost_obj.config_applied != config_uuid:
+                    servers.append(ihost_obj.id)
+
+            if servers:
+                self.dbapi.ihost_update_bulk(servers,
+                                             {'config_applied': config_uuid})
+
+            initial_config_complete = cutils.is_initial_config_complete()
+            for ihost_obj in hosts:
+                if ihost_obj.id in servers:
+                    ihost_obj.config_applied = config_uuid
+                    ihost_obj.obj_reset_changes(['config_applied'])
+                if initial_config_complete:
+                    self._update_alarm_status(context, ihost_obj)
+
     def _update_host_config_applied(self, context, ihost_obj, config_uuid):
         """Based upon agent update, update config status."""
 
@@ -10732,49 +10944,136 @@ class ConductorManager(service.PeriodicService):
                      "config_uuid=%s tb=%s" %
                      (personalities, host_uuids, reboot, config_uuid, tb[-3]))
 
-        # generate a new configuration identifier for this update
-        config_uuid = uuid.uuid4()
-
-        # Scope the UUID according to the reboot requirement of the update.
-        # This is done to prevent dynamic updates from overriding the reboot
-        # requirement of a previous update that required the host to be locked
-        # and unlocked in order to apply the full set of updates.
-        if reboot:
-            config_uuid = self._config_set_reboot_required(config_uuid)
-        else:
-            config_uuid = self._config_clear_reboot_required(config_uuid)
-
-        _trace_caller(personalities, host_uuids, reboot, config_uuid)
-
         if not host_uuids:
             hosts = self.dbapi.ihost_get_list()
         else:
             hosts = [self.dbapi.ihost_get(host_uuid) for host_uuid in host_uuids]
+        hosts = [host for host in hosts
+                 if host.personality and host.personality in personalities]
+
+        scope = (frozenset(personalities),
+                 frozenset(host_uuids) if host_uuids else None,
+                 bool(reboot))
+        config_uuid = self._config_get_open_generation(scope, hosts)
+        merged = config_uuid is not None
+        if not merged:
+            # generate a new configuration identifier for this update
+            config_uuid = uuid.uuid4()
+
+            # Scope the UUID according to the reboot requirement of the update.
+            # This is done to prevent dynamic updates from overriding the reboot
+            # requirement of a previous update that required the host to be locked
+            # and unlocked in order to apply the full set of updates.
+            if reboot:
+                config_uuid = self._config_set_reboot_required(config_uuid)
+            else:
+                config_uuid = self._config_clear_reboot_required(config_uuid)
+
+            self._config_open_generation(scope, config_uuid)
+
+        _trace_caller(personalities, host_uuids, reboot, config_uuid)
 
         for host in hosts:
-            if host.personality and host.personality in personalities:
-                if reboot:
-                    if host.uuid in self._host_reboot_config_uuid:
-                        self._host_reboot_config_uuid[host.uuid].append(config_uuid)
-                    else:
-                        self._host_reboot_config_uuid[host.uuid] = []
-                        self._host_reboot_config_uuid[host.uuid].append(config_uuid)
-                    if host.uuid == self.host_uuid:
-                        # This ensures that the host_reboot_config_uuid tracking
-                        # on this controller is aware that a reboot is required
-                        cutils.touch(ACTIVE_CONFIG_REBOOT_REQUIRED)
-                self._update_host_config_target(context, host, config_uuid)
+            if reboot:
+                reboot_config_uuids = \
+                    self._host_reboot_config_uuid.setdefault(host.uuid, [])
+                if config_uuid not in reboot_config_uuids:
+                    reboot_config_uuids.append(config_uuid)
+                if host.uuid == self.host_uuid:
+                    # This ensures that the host_reboot_config_uuid tracking
+                    # on this controller is aware that a reboot is required
+                    cutils.touch(ACTIVE_CONFIG_REBOOT_REQUIRED)
+
+        # An update merged into a generation shares it with the earlier
+        # updates, which are still pending on the hosts
+        for host in hosts:
+            self._host_config_in_sync[host.uuid] = (
+                config_uuid,
+                not merged and host.config_target is not None and
+                host.config_applied == host.config_target)
+
+        # the hosts already target a merged generation
+        if not merged:
+            self._update_hosts_config_target(context, hosts, config_uuid)
 
         LOG.info("_config_update_hosts config_uuid=%s" % config_uuid)
         return config_uuid
 
+    def _config_open_generation(self, scope, config_uuid):
+        """Open a configuration generation for merging the subsequent
+           updates of the same scope, if merging is enabled.
+        """
+        self._config_generations_created += 1
+        if CONF.conductor.config_update_merge_window > 0:
+            self._config_generations[scope] = (config_uuid, time.time())
+
+    def _config_get_open_generation(self, scope, hosts):
+        """Return the configuration generation an update of the supplied
+           scope and hosts can be merged into, or None.
+
+           A generation is only reused until it is sent to the hosts, and
+           while it is still the pending target of every affected host, so an
+           update is never merged into a generation that a host may already
+           be applying, has applied or that was superseded.
+        """
+        window = CONF.conductor.config_update_merge_window
+        now = time.time()
+        for key, (config_uuid, created_at) in list(
+                self._config_generations.items()):
+            if not 0 <= now - created_at < window:
+                del self._config_generations[key]
+
+        generation = self._config_generations.get(scope)
+        if generation is None:
+            return None
+
+        config_uuid = generation[0]
+        config_uuids = [config_uuid,
+                        self._config_set_reboot_required(config_uuid)]
+        for host in hosts:
+            if (host.config_target not in config_uuids or
+                    host.config_applied in config_uuids):
+                del self._config_generations[scope]
+                return None
+
+        self._config_generations_merged += 1
+        LOG.info("Merged configuration update into config_uuid=%s %s" %
+                 (config_uuid, self._get_config_update_stats()))
+        return config_uuid
+
+    def _config_close_generation(self, config_uuid):
+        """Close the configuration generation of a config_uuid once it is
+           sent to the hosts, so that no later update is merged into a
+           configuration they may already be applying.
+        """
+        config_uuid = self._config_clear_reboot_required(config_uuid)
+        for scope, (generation_uuid, created_at) in list(
+                self._config_generations.items()):
+            if self._config_clear_reboot_required(
+                    generation_uuid) == config_uuid:
+                del self._config_generations[scope]
+
+    def _get_config_update_stats(self):
+        """Return the configuration generation merge statistics"""
+        return {'open': len(self._config_generations),
+                'created': self._config_generations_created,
+                'merged': self._config_generations_merged}
+
     def _config_update_puppet(self, config_uuid, config_dict, force=False,
                               host_uuids=None):
         """Regenerate puppet hiera data files for each affected host that is
            provisioned. If host_uuid is provided, only that host's puppet
            hiera data file will be regenerated.
+
+           :returns: False if the hiera data is known to be unchanged
         """
-        host_updated = False
+        hosts_to_update = []
+        hosts_changed = []
+        system_changed = False
+
+        classes = None
+        if CONF.conductor.puppet_scoped_hieradata:
+            classes = config_dict.get('classes')
 
         personalities = config_dict['personalities']
         if not host_uuids:
@@ -10809,19 +11108,28 @@ class ConductorManager(service.PeriodicService):
                         # controller. The Hieradata of a host during an upgrade/rollback
                         # will be saved by update_host_config_upgrade() to the
                         # directory of the host's software load.
-                        self._puppet.update_host_config(host, config_uuid)
-                        host_updated = True
+                        hosts_to_update.append(host)
                 else:
                     LOG.info(
                         "Cannot regenerate the configuration for %s, "
                         "the node is not ready. invprovision=%s" %
                         (host.hostname, host.invprovision))
 
-        # ensure the system configuration is also updated if hosts require
-        # a reconfiguration
-        if host_updated:
-            self._puppet.update_system_config()
-            self._puppet.update_secure_system_config()
+        # system scope lookups are shared by all hosts within this pass
+        with self._puppet.batch_context():
+            hosts_changed = self._puppet.update_hosts_config(
+                hosts_to_update, config_uuid,
+                workers=CONF.conductor.puppet_hieradata_workers,
+                classes=classes)
+
+            # ensure the system configuration is also updated if hosts
+            # require a reconfiguration
+            if hosts_to_update:
+                system_changed = self._puppet.update_system_config()
+                system_changed |= bool(
+                    self._puppet.update_secure_system_config())
+
+        return bool(hosts_changed or system_changed)
 
     def _config_update_file(self,
                             context,
@@ -10845,11 +11153,8 @@ class ConductorManager(service.PeriodicService):
                 config_dict.get('personalities'),
                 config_dict.get('host_uuids')):
             # append to deferred for audit
-            self._host_deferred_runtime_config.append(
-                {'config_type': CONFIG_UPDATE_FILE,
-                 'config_uuid': config_uuid,
-                 'config_dict': config_dict,
-                 })
+            self._host_deferred_runtime_config.add(
+                CONFIG_UPDATE_FILE, config_uuid, config_dict, dedupe=False)
             LOG.info("defer update file to _host_deferred_runtime_config %s" %
                      self._host_deferred_runtime_config)
             return False
@@ -10857,6 +11162,7 @@ class ConductorManager(service.PeriodicService):
         # Ensure hiera data is updated prior to active apply.
         self._config_update_puppet(config_uuid, config_dict)
 
+        self._config_close_generation(config_uuid)
         rpcapi = agent_rpcapi.AgentAPI()
         try:
             rpcapi.iconfig_update_file(context,
@@ -10870,80 +11176,47 @@ class ConductorManager(service.PeriodicService):
 
     @cutils.synchronized(LOCK_RUNTIME_CONFIG_CHECK)
     def _clear_runtime_class_apply_in_progress(self, classes_list=None, host_uuids=None):
-        if classes_list is None:
-            classes_list = []
-        if host_uuids is None:
-            host_uuids = []
-        else:
+        if host_uuids is not None:
             host_uuids = [host_uuids] if isinstance(host_uuids, str) else host_uuids
 
-        for c, h in self._runtime_class_apply_in_progress:
-            host_intersection = [i for i in host_uuids if i in h]
-            LOG.info("config runtime c=%s, h=%s host_uuids=%s host_intersection=%s" %
-                     (c, h, host_uuids, host_intersection))
-            if c in classes_list:
-                if host_intersection:
-                    LOG.info("config runtime removing host_uuids=%s from %s" %
-                             (host_uuids, self._runtime_class_apply_in_progress))
-                    self._runtime_class_apply_in_progress.remove((c, h))
-            elif not classes_list and host_intersection:
-                LOG.info("config runtime removing host_uuids=%s from %s" %
-                         (host_uuids, self._runtime_class_apply_in_progress))
-                self._runtime_class_apply_in_progress.remove((c, h))
-            elif not classes_list and not host_uuids:
-                LOG.info("config runtime in classes_list c=%s, classes_list=%s" % (c, classes_list))
-                self._runtime_class_apply_in_progress = list()
-
-            LOG.info("config runtime end of _clear_runtime_class_apply_in_progress=%s" %
-                     self._runtime_class_apply_in_progress)
+        count = self._runtime_class_apply_in_progress.clear(classes_list,
+                                                            host_uuids)
+        LOG.info("config runtime cleared %s runtime class applies for "
+                 "classes_list=%s host_uuids=%s, in progress=%s" %
+                 (count, classes_list, host_uuids,
+                  self._runtime_class_apply_in_progress))
 
     @cutils.synchronized(LOCK_RUNTIME_CONFIG_CHECK)
     def _add_runtime_class_apply_in_progress(self, classes_list, host_uuids=None):
-        if host_uuids is None:
-            host_uuids = []
-        else:
+        if host_uuids is not None:
             host_uuids = [host_uuids] if isinstance(host_uuids, str) else host_uuids
 
-        for c in classes_list:
-            self._runtime_class_apply_in_progress.append((c, host_uuids))
+        self._runtime_class_apply_in_progress.add(classes_list, host_uuids)
 
     def _check_runtime_class_apply_in_progress(self, classes_list, host_uuids=None):
-        if host_uuids is None:
-            host_uuids = []
-        else:
-            host_uuids = [host_uuids] if isinstance(host_uuids, str) else host_uuids
-
-        for c, h in self._runtime_class_apply_in_progress:
-            if c in classes_list:
-                if host_uuids and host_uuids in h:
-                    LOG.info("config runtime  host_uuids=%s from %s" %
-                             (host_uuids, h))
-                    return True
-                else:
-                    return True
-        return False
+        # an apply of the classes on any host is considered in progress
+        return self._runtime_class_apply_in_progress.is_in_progress(
+            classes_list)
 
     @cutils.synchronized(LOCK_RUNTIME_CONFIG_CHECK)
     def _update_host_deferred_runtime_config(
             self, config_type, config_uuid, config_dict, force=None):
         # check if already in deferred list, and if so, replace duplicate with latest config
-        for drc in self._host_deferred_runtime_config:
-            if (drc['config_type'] == config_type and
-                    drc['config_dict'].get('classes') == config_dict.get('classes') and
-                    drc['config_dict'].get('personalities') == config_dict.get('personalities') and
-                    drc['config_dict'].get('host_uuids') == config_dict.get('host_uuids') and
-                    drc.get('force') == force):
-                LOG.info("config runtime replacing entry duplicate config %s with config_uuid=%s" %
-                         (drc, config_uuid))
-                drc['config_uuid'] = config_uuid
-                break
-        else:
-            self._host_deferred_runtime_config.append(
-                {'config_type': CONFIG_APPLY_RUNTIME_MANIFEST,
-                 'config_uuid': config_uuid,
-                 'config_dict': config_dict,
-                 'force': force,
-                 })
+        replaced = self._host_deferred_runtime_config.add(
+            config_type, config_uuid, config_dict, force)
+        if replaced is not None:
+            LOG.info("config runtime replacing entry duplicate config %s with config_uuid=%s" %
+                     (replaced, config_uuid))
+
+    def get_runtime_config_snapshot(self, context):
+        """Return the deferred runtime configurations and the runtime class
+           applies in progress, for inspecting stuck applies.
+
+        :param context: request context.
+        :returns: dict of the deferred configurations and applies in progress
+        """
+        return {'deferred': self._host_deferred_runtime_config.snapshot(),
+                'in_progress': self._runtime_class_apply_in_progress.snapshot()}
 
     def _config_apply_runtime_manifest(self,
                                        context,
@@ -10973,6 +11246,7 @@ class ConductorManager(service.PeriodicService):
                 hosts = [self.dbapi.ihost_get(host_uuid) for host_uuid in host_uuids]
 
             host_uuids = []
+            skipped_hosts = []
             personalities = config_dict.get('personalities')
             for host in hosts:
                 if host.personality in personalities:
@@ -10981,7 +11255,9 @@ class ConductorManager(service.PeriodicService):
                     else:
                         LOG.info("Skip applying manifest for host: %s. Version %s mismatch." %
                                  (host.hostname, host.software_load))
-                        self._update_host_config_applied(context, host, config_uuid)
+                        skipped_hosts.append(host)
+            self._update_hosts_config_applied(context, skipped_hosts,
+                                              config_uuid)
 
             if not host_uuids:
                 LOG.info("No hosts with matching software_version found, skipping apply_runtime_manifest")
@@ -11012,10 +11288,19 @@ class ConductorManager(service.PeriodicService):
 
         # Update hiera data for all hosts prior to runtime apply if host_uuid
         # is not set. If host_uuids is set only update hiera data for those hosts.
-        self._config_update_puppet(config_uuid,
-                                   config_dict,
-                                   host_uuids=host_uuids,
-                                   force=force)
+        hieradata_changed = self._config_update_puppet(config_uuid,
+                                                       config_dict,
+                                                       host_uuids=host_uuids,
+                                                       force=force)
+
+        # Runtime classes that only depend on the hiera data can request to
+        # skip the apply when the hiera data is unchanged.
+        if (config_dict.get('skip_unchanged') and not force and
+                not hieradata_changed and
+                self._config_skip_unchanged_runtime_manifest(
+                    context, config_uuid, config_dict)):
+            self._config_close_generation(config_uuid)
+            return
 
         self.evaluate_apps_reapply(context, trigger={'type': constants.APP_EVALUATE_REAPPLY_TYPE_RUNTIME_APPLY_PUPPET})
 
@@ -11025,6 +11310,7 @@ class ConductorManager(service.PeriodicService):
         config_uuid = self._config_clear_reboot_required(config_uuid)
 
         config_dict.update({'force': force})
+        self._config_close_generation(config_uuid)
         rpcapi = agent_rpcapi.AgentAPI()
         rpcapi.config_apply_runtime_manifest(context,
                                              config_uuid=config_uuid,
@@ -11036,6 +11322,35 @@ class ConductorManager(service.PeriodicService):
             self._add_runtime_class_apply_in_progress(filter_classes,
                                                       host_uuids=config_dict.get('host_uuids', None))
 
+    def _config_skip_unchanged_runtime_manifest(self, context, config_uuid,
+                                                config_dict):
+        """Mark the runtime manifest as applied on the affected hosts without
+           applying it, as long as it is the only configuration pending on
+           all of them: each host is still targeting it, and had applied its
+           previous configuration when the target was set.
+
+           :returns: True if the runtime manifest apply was skipped
+        """
+        host_uuids = config_dict.get('host_uuids')
+        if not host_uuids:
+            hosts = self.dbapi.ihost_get_list()
+        else:
+            hosts = [self.dbapi.ihost_get(host_uuid) for host_uuid in host_uuids]
+
+        personalities = config_dict.get('personalities') or []
+        hosts = [host for host in hosts if host.personality in personalities]
+        for host in hosts:
+            if (host.config_target != config_uuid or
+                    self._host_config_in_sync.get(host.uuid) !=
+                    (config_uuid, True)):
+                return False
+
+        LOG.info("hiera data unchanged, skipping runtime manifest "
+                 "config_uuid=%s, classes: %s" %
+                 (config_uuid, config_dict.get('classes')))
+        self._update_hosts_config_applied(context, hosts, config_uuid)
+        return True
+
     def _update_ipv_device_path(self, idisk, ipv):
         if not idisk.device_path:
             return
@@ -12128,6 +12443,7 @@ class ConductorManager(service.PeriodicService):
         config_dict = {
             "personalities": personalities,
             "classes": ['platform::fm::runtime'],
+            "skip_unchanged": True,
         }
         self._config_apply_runtime_manifest(context, config_uuid, config_dict)
 
@@ -12331,6 +12647,7 @@ class ConductorManager(service.PeriodicService):
 
                 # TODO(jkung): update public key info
                 config_uuid = self._config_update_hosts(context, personalities)
+                self._config_close_generation(config_uuid)
                 rpcapi.iconfig_update_file(context,
                                            iconfig_uuid=config_uuid,
                                            iconfig_dict=config_dict)
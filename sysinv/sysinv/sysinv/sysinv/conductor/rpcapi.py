@@ -40,9 +40,11 @@ class ConductorAPI(sysinv.openstack.common.rpc.proxy.RpcProxy):
 
         1.0 - Initial version.
         1.1 - Used for R5
+        1.2 - Added inventory_report_by_ihost
+        1.3 - Added get_runtime_config_snapshot
     """
 
-    RPC_API_VERSION = '1.1'
+    RPC_API_VERSION = '1.3'
 
     def __init__(self, topic=None):
         if topic is None:
@@ -414,6 +416,51 @@ class ConductorAPI(sysinv.openstack.common.rpc.proxy.RpcProxy):
                                        ipv_dict_array=ipv_dict_array),
                          version='1.1')
 
+    def inventory_report_by_ihost(self, context, ihost_uuid, resource,
+                                  report_version, base_version=None,
+                                  changed=None, removed=None):
+        """Synchronously, have a conductor apply a delta report of the
+        inventory of a resource type of an ihost.
+
+        The records are all reported when base_version is None, else only
+        the records changed and the keys of the records removed since
+        base_version.
+
+        :param context: an admin context
+        :param ihost_uuid: ihost uuid unique id
+        :param resource: resource type of the records
+        :param report_version: version of the records
+        :param base_version: version of the records the changes apply to
+        :param changed: records added or modified
+        :param removed: keys of the records removed
+        :returns: dict with the version of the records applied, None if
+                  they were ignored, or resync if all the records must be
+                  reported
+        """
+
+        return self.call(context,
+                         self.make_msg('inventory_report_by_ihost',
+                                       ihost_uuid=ihost_uuid,
+                                       resource=resource,
+                                       report_version=report_version,
+                                       base_version=base_version,
+                                       changed=changed,
+                                       removed=removed),
+                         version='1.2')
+
+    def get_runtime_config_snapshot(self, context):
+        """Synchronously, have a conductor return the runtime configurations
+        it deferred and the runtime class applies it has in progress.
+
+        :param context: request context.
+        :returns: dict with the deferred configurations, in order, and the
+                  applies in progress, with the time each was deferred or
+                  started
+        """
+        return self.call(context,
+                         self.make_msg('get_runtime_config_snapshot'),
+                         version='1.3')
+
     def ipartition_update_by_ihost(self, context,
                                    ihost_uuid, ipart_dict_array):
 
@@ -0,0 +1,183 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+""" System Inventory runtime configuration tracking."""
+
+import collections
+import copy
+import itertools
+import time
+
+
+def _freeze(value):
+    """Return a hashable equivalent of a list based config_dict value"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class DeferredRuntimeConfigQueue(object):
+    """Ordered queue of the runtime configurations deferred until the
+    conductor is ready to apply them.
+
+    Runtime manifests are indexed by (config_type, classes, personalities,
+    host_uuids, force) so that deferring a duplicate of a queued manifest
+    replaces its config_uuid in place, keeping its position in the queue.
+    """
+
+    def __init__(self):
+        self._entries = collections.OrderedDict()
+        self._deferred_at = {}
+        self._replaced = {}
+        self._sequence = itertools.count()
+
+    @staticmethod
+    def _get_key(config_type, config_dict, force):
+        return (config_type,
+                _freeze(config_dict.get('classes')),
+                _freeze(config_dict.get('personalities')),
+                _freeze(config_dict.get('host_uuids')),
+                force)
+
+    def add(self, config_type, config_uuid, config_dict, force=None,
+            dedupe=True):
+        """Defer a runtime configuration.
+
+        :param dedupe: replace the config_uuid of a queued duplicate
+        :returns: the queued entry replaced, or None
+        """
+        if dedupe:
+            key = self._get_key(config_type, config_dict, force)
+            entry = self._entries.get(key)
+            if entry is not None:
+                replaced = copy.copy(entry)
+                entry['config_uuid'] = config_uuid
+                self._replaced[key] += 1
+                return replaced
+        else:
+            key = ('sequence', next(self._sequence))
+
+        entry = {'config_type': config_type,
+                 'config_uuid': config_uuid,
+                 'config_dict': config_dict}
+        if dedupe:
+            entry['force'] = force
+        self._entries[key] = entry
+        self._deferred_at[key] = time.time()
+        self._replaced[key] = 0
+        return None
+
+    def keys(self):
+        return list(self._entries)
+
+    def pop(self, key):
+        """Remove and return the current entry of the key, or None"""
+        self._deferred_at.pop(key, None)
+        self._replaced.pop(key, None)
+        return self._entries.pop(key, None)
+
+    def snapshot(self):
+        """Return a copy of the queued entries, in order, with the time they
+        were deferred and the number of duplicates they replaced.
+        """
+        snapshot = []
+        for key, entry in self._entries.items():
+            entry = copy.deepcopy(entry)
+            entry['deferred_at'] = self._deferred_at[key]
+            entry['replaced'] = self._replaced[key]
+            snapshot.append(entry)
+        return snapshot
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __bool__(self):
+        return bool(self._entries)
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return repr(list(self._entries.values()))
+
+
+class RuntimeClassApplyTracker(object):
+    """Runtime classes being applied, indexed by class and by host.
+
+    An apply without host uuids is in progress on all the hosts and is only
+    cleared when everything is cleared.
+    """
+
+    def __init__(self):
+        self._applies = {}
+        self._by_class = collections.defaultdict(set)
+        self._by_host = collections.defaultdict(set)
+        self._sequence = itertools.count()
+
+    def add(self, classes_list, host_uuids=None):
+        host_uuids = frozenset(host_uuids or [])
+        started_at = time.time()
+        for puppet_class in classes_list:
+            apply_id = next(self._sequence)
+            self._applies[apply_id] = (puppet_class, host_uuids, started_at)
+            self._by_class[puppet_class].add(apply_id)
+            for host_uuid in host_uuids:
+                self._by_host[host_uuid].add(apply_id)
+
+    def _remove(self, apply_id):
+        puppet_class, host_uuids, _ = self._applies.pop(apply_id)
+        self._discard(self._by_class, puppet_class, apply_id)
+        for host_uuid in host_uuids:
+            self._discard(self._by_host, host_uuid, apply_id)
+
+    @staticmethod
+    def _discard(index, key, apply_id):
+        index[key].discard(apply_id)
+        if not index[key]:
+            del index[key]
+
+    def clear(self, classes_list=None, host_uuids=None):
+        """Clear the applies of the supplied classes on the supplied hosts;
+        of any class if no classes are supplied, and everything if neither
+        are supplied.
+
+        :returns: the number of applies cleared
+        """
+        if not classes_list and not host_uuids:
+            count = len(self._applies)
+            self._applies.clear()
+            self._by_class.clear()
+            self._by_host.clear()
+            return count
+
+        apply_ids = set()
+        for host_uuid in host_uuids or []:
+            apply_ids.update(self._by_host.get(host_uuid, []))
+        if classes_list:
+            apply_ids = [apply_id for apply_id in apply_ids
+                         if self._applies[apply_id][0] in classes_list]
+        for apply_id in apply_ids:
+            self._remove(apply_id)
+        return len(apply_ids)
+
+    def is_in_progress(self, classes_list):
+        return any(puppet_class in self._by_class
+                   for puppet_class in classes_list)
+
+    def snapshot(self):
+        """Return the applies in progress, in the order they were started"""
+        return [{'class': puppet_class,
+                 'host_uuids': sorted(host_uuids),
+                 'started_at': started_at}
+                for _, (puppet_class, host_uuids, started_at)
+                in sorted(self._applies.items())]
+
+    def __len__(self):
+        return len(self._applies)
+
+    def __repr__(self):
+        return repr([(puppet_class, sorted(host_uuids))
+                     for _, (puppet_class, host_uuids, _)
+                     in sorted(self._applies.items())])
@@ -229,6 +229,26 @@ class Connection(object):
         :returns: A server.
         """
 
+    @abc.abstractmethod
+    def ihost_update_bulk(self, servers, values):
+        """Update the same properties of several servers in a single
+        transaction.
+
+        :param servers: List of ids or uuids of servers.
+        :param values: Dict of values to update.
+        :returns: A list of the updated servers.
+        """
+
+    @abc.abstractmethod
+    def ihost_config_target_update_many(self, config_targets):
+        """Update the config target of several servers in a single
+        transaction.
+
+        :param config_targets: Dict of config targets indexed by the id or
+                               uuid of the server.
+        :returns: A list of the updated servers.
+        """
+
     @abc.abstractmethod
     def ihost_destroy(self, server):
         """Destroy a server and all associated leaves.
@@ -341,6 +361,20 @@ class Connection(object):
         :returns: A cpu.
         """
 
+    @abc.abstractmethod
+    def icpu_upsert_many(self, forihostid, values_list, delete_missing=False):
+        """Create or update the icpus of a server in a single transaction.
+
+        The reported cpus are matched by cpu ID against the current cpus of
+        the server; only the changed columns of the matched cpus are
+        updated and the other reported cpus are created.
+
+        :param forihostid: cpus belong to this host
+        :param values_list: A list of dicts as passed to icpu_create.
+        :param delete_missing: Delete the current cpus not reported.
+        :returns: A list of cpus.
+        """
+
     @abc.abstractmethod
     def icpu_get(self, cpu_id, forihostid=None):
         """Return a cpu.
@@ -351,7 +385,7 @@ class Connection(object):
 
     @abc.abstractmethod
     def icpu_get_list(self, limit=None, marker=None,
-                      sort_key=None, sort_dir=None):
+                      sort_key=None, sort_dir=None, profile=None):
         """Return a list of cpus.
 
         :param limit: Maximum number of cpus to return.
@@ -360,12 +394,14 @@ class Connection(object):
         :param sort_key: Attribute by which results should be sorted.
         :param sort_dir: direction in which results should be sorted.
                          (asc, desc)
+        :param profile: relationship loading profile; detail, list or
+                        puppet.
         """
 
     @abc.abstractmethod
     def icpu_get_by_ihost(self, ihost, limit=None,
                           marker=None, sort_key=None,
-                          sort_dir=None):
+                          sort_dir=None, profile=None):
         """List all the cpus for a given ihost.
 
         :param node: The id or uuid of an ihost.
@@ -375,6 +411,8 @@ class Connection(object):
         :param sort_key: Attribute by which results should be sorted
         :param sort_dir: direction in which results should be sorted
                          (asc, desc)
+        :param profile: relationship loading profile; detail, list or
+                        puppet.
         :returns: A list of cpus.
         """
 
@@ -462,6 +500,21 @@ class Connection(object):
         :returns: A memory.
         """
 
+    @abc.abstractmethod
+    def imemory_upsert_many(self, forihostid, values_list,
+                            delete_missing=False):
+        """Create or update the imemory of a server in a single transaction.
+
+        The reported memory is matched by inode against the current memory
+        of the server; only the changed columns of the matched memory are
+        updated and the other reported memory is created.
+
+        :param forihostid: memory belongs to this host
+        :param values_list: A list of dicts as passed to imemory_create.
+        :param delete_missing: Delete the current memory not reported.
+        :returns: A list of memory.
+        """
+
     @abc.abstractmethod
     def imemory_get(self, memory_id, forihostid=None):
         """Return a memory.
@@ -472,7 +525,7 @@ class Connection(object):
 
     @abc.abstractmethod
     def imemory_get_list(self, limit=None, marker=None,
-                         sort_key=None, sort_dir=None):
+                         sort_key=None, sort_dir=None, profile=None):
         """Return a list of memorys.
 
         :param limit: Maximum number of memorys to return.
@@ -481,12 +534,14 @@ class Connection(object):
         :param sort_key: Attribute by which results should be sorted.
         :param sort_dir: direction in which results should be sorted.
                          (asc, desc)
+        :param profile: relationship loading profile; detail, list or
+                        puppet.
         """
 
     @abc.abstractmethod
     def imemory_get_by_ihost(self, ihost, limit=None,
                              marker=None, sort_key=None,
-                             sort_dir=None):
+                             sort_dir=None, profile=None):
         """List all the memorys for a given ihost.
 
         :param node: The id or uuid of an ihost.
@@ -496,6 +551,8 @@ class Connection(object):
         :param sort_key: Attribute by which results should be sorted
         :param sort_dir: direction in which results should be sorted
                          (asc, desc)
+        :param profile: relationship loading profile; detail, list or
+                        puppet.
         :returns: A list of memorys.
         """
 
@@ -688,7 +745,7 @@ class Connection(object):
 
     @abc.abstractmethod
     def ethernet_port_get_list(self, limit=None, marker=None,
-                               sort_key=None, sort_dir=None):
+                               sort_key=None, sort_dir=None, profile=None):
         """Return a list of ethernet ports.
 
         :param limit: Maximum number of ports to return.
@@ -697,6 +754,8 @@ class Connection(object):
         :param sort_key: Attribute by which results should be sorted.
         :param sort_dir: Direction in which results should be sorted.
                          (asc, desc)
+        :param profile: relationship loading profile; detail, list or
+                        puppet.
         :returns:  List of ethernet ports
         """
 
@@ -712,7 +771,7 @@ class Connection(object):
     @abc.abstractmethod
     def ethernet_port_get_by_host(self, host,
                                   limit=None, marker=None,
-                                  sort_key=None, sort_dir=None):
+                                  sort_key=None, sort_dir=None, profile=None):
         """List all the ethernet ports for a given host.
 
         :param host: The id or uuid of an host.
@@ -722,6 +781,8 @@ class Connection(object):
         :param sort_key: Attribute by which results should be sorted
         :param sort_dir: Direction in which results should be sorted
                          (asc, desc)
+        :param profile: relationship loading profile; detail, list or
+                        puppet.
         :returns: A list of ethernet ports.
         """
 
@@ -991,7 +1052,7 @@ class Connection(object):
 
     @abc.abstractmethod
     def idisk_get_list(self, limit=None, marker=None,
-                       sort_key=None, sort_dir=None):
+                       sort_key=None, sort_dir=None, profile=None):
         """Return a list of disks.
 
         :param limit: Maximum number of disks to return.
@@ -1000,12 +1061,14 @@ class Connection(object):
         :param sort_key: Attribute by which results should be sorted.
         :param sort_dir: direction in which results should be sorted.
                          (asc, desc)
+        :param profile: relationship loading profile; detail, list or
+                        puppet.
         """
 
     @abc.abstractmethod
     def idisk_get_by_ihost(self, ihost, limit=None,
                            marker=None, sort_key=None,
-                           sort_dir=None):
+                           sort_dir=None, profile=None):
         """List all the disks for a given ihost.
 
         :param node: The id or uuid of an ihost.
@@ -1015,9 +1078,21 @@ class Connection(object):
         :param sort_key: Attribute by which results should be sorted
         :param sort_dir: direction in which results should be sorted
                          (asc, desc)
+        :param profile: relationship loading profile; detail, list or
+                        puppet.
         :returns: A list of disks.
         """
 
+    @abc.abstractmethod
+    def idisk_get_by_ihosts(self, ihosts, profile=None):
+        """List all the disks of the given ihosts.
+
+        :param ihosts: A list of ihost ids.
+        :param profile: relationship loading profile; detail, list or
+                        puppet.
+        :returns: A dict of the lists of disks keyed by ihost id.
+        """
+
     @abc.abstractmethod
     def idisk_get_by_istor(self, istor_uuid,
                            limit=None, marker=None,
@@ -1190,7 +1265,7 @@ class Connection(object):
     @abc.abstractmethod
     def partition_get_by_ihost(self, ihost, limit=None,
                            marker=None, sort_key=None,
-                           sort_dir=None):
+                           sort_dir=None, profile=None):
         """List all the partitions for a given ihost.
 
         :param node: The id or uuid of an ihost.
@@ -1200,6 +1275,8 @@ class Connection(object):
         :param sort_key: Attribute by which results should be sorted
         :param sort_dir: direction in which results should be sorted
                          (asc, desc)
+        :param profile: relationship loading profile; detail, list or
+                        puppet.
         :returns: A list of partitions.
         """
 
@@ -1443,6 +1520,16 @@ class Connection(object):
         :returns: A list of ilvgs.
         """
 
+    @abc.abstractmethod
+    def ilvg_get_by_ihosts(self, ihosts, profile=None):
+        """List all the lvgs of the given ihosts.
+
+        :param ihosts: A list of ihost ids.
+        :param profile: relationship loading profile; detail, list or
+                        puppet.
+        :returns: A dict of the lists of lvgs keyed by ihost id.
+        """
+
     @abc.abstractmethod
     def ilvg_update(self, ilvg_id, values):
         """Update properties of an ilvg.
@@ -1508,7 +1595,7 @@ class Connection(object):
 
     @abc.abstractmethod
     def ipv_get_list(self, limit=None, marker=None,
-                       sort_key=None, sort_dir=None):
+                       sort_key=None, sort_dir=None, profile=None):
         """Return a list of pvs.
 
         :param limit: Maximum number of ipvs to return.
@@ -1517,12 +1604,14 @@ class Connection(object):
         :param sort_key: Attribute by which results should be sorted.
         :param sort_dir: direction in which results should be sorted.
                          (asc, desc)
+        :param profile: relationship loading profile; detail, list or
+                        puppet.
         """
 
     @abc.abstractmethod
     def ipv_get_by_ihost(self, ihost, limit=None,
                            marker=None, sort_key=None,
-                           sort_dir=None):
+                           sort_dir=None, profile=None):
         """List all the pvs for a given ihost.
 
         :param ihost: The id or uuid of an ihost.
@@ -1531,9 +1620,21 @@ class Connection(object):
         :param sort_key: Attribute by which results should be sorted
         :param sort_dir: direction in which results should be sorted
                          (asc, desc)
+        :param profile: relationship loading profile; detail, list or
+                        puppet.
         :returns: A list of ipvs.
         """
 
+    @abc.abstractmethod
+    def ipv_get_by_ihosts(self, ihosts, profile=None):
+        """List all the pvs of the given ihosts.
+
+        :param ihosts: A list of ihost ids.
+        :param profile: relationship loading profile; detail, list or
+                        puppet.
+        :returns: A dict of the lists of pvs keyed by ihost id.
+        """
+
     @abc.abstractmethod
     def ipv_update(self, ipv_id, values):
         """Update properties of an ipv.
@@ -4705,6 +4806,16 @@ class Connection(object):
         :returns: A list of filesystems.
         """
 
+    @abc.abstractmethod
+    def host_fs_get_by_ihosts(self, ihosts, profile=None):
+        """List all the filesystems of the given ihosts.
+
+        :param ihosts: A list of ihost ids.
+        :param profile: relationship loading profile; detail, list or
+                        puppet.
+        :returns: A dict of the lists of filesystems keyed by ihost id.
+        """
+
     @abc.abstractmethod
     def host_fs_update(self, fs_id, values):
         """Update properties of a filesystem.
@@ -28,11 +28,14 @@ from oslo_db import exception as db_exc
 from oslo_db.sqlalchemy import enginefacade
 from oslo_db.sqlalchemy import utils as db_utils
 
+from sqlalchemy import func
 from sqlalchemy import inspect
 from sqlalchemy import or_
 
 from sqlalchemy.orm import contains_eager
 from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import lazyload
+from sqlalchemy.orm import selectinload
 from sqlalchemy.orm import with_polymorphic
 from sqlalchemy.orm.exc import DetachedInstanceError
 from sqlalchemy.orm.exc import MultipleResultsFound
@@ -42,13 +45,16 @@ from oslo_log import log
 from oslo_utils import uuidutils
 from sysinv._i18n import _
 from sysinv import objects
+from sysinv.common import address_index
 from sysinv.common import constants
 from sysinv.common import device as dconstants
 from sysinv.common import exception
 from sysinv.common import utils
 from sysinv.db import api
+from sysinv.db.sqlalchemy import cache
 from sysinv.db.sqlalchemy import models
 from sysinv.db.sqlalchemy import objects as db_objects
+from sysinv.db.sqlalchemy import profiler
 
 CONF = cfg.CONF
 CONF.import_opt('journal_min_size',
@@ -79,6 +85,8 @@ def get_session(autocommit=True, expire_on_commit=False, use_slave=False):
 
 def get_backend():
     """The backend is this module itself."""
+    profiler.setup(Connection)
+    cache.setup(_get_cache_generations)
     return Connection()
 
 
@@ -93,6 +101,78 @@ def _session_for_write():
     return enginefacade.writer.using(_context)
 
 
+def _get_cache_generations():
+    query = model_query(models.CacheGenerations.name,
+                        models.CacheGenerations.generation)
+    return dict(query.all())
+
+
+def _invalidate_cache(*tables):
+    """Increase the generations of modified cached tables, so that the
+    processes drop their cached results.
+    """
+    if not CONF.db_cache.enabled:
+        return
+
+    with _session_for_write() as session:
+        query = model_query(models.CacheGenerations, session=session)
+        query = query.filter(models.CacheGenerations.name.in_(tables))
+        query.update({models.CacheGenerations.generation:
+                      models.CacheGenerations.generation + 1},
+                     synchronize_session=False)
+    cache.invalidate(*tables)
+
+
+def _upsert_many(session, model, key, rows, query, delete_missing=False):
+    """Diff reported rows against the current rows of a query and apply
+    the differences within a session.
+
+    The current rows matching a reported row by key are updated with the
+    changed columns only, the other reported rows are created and, if
+    delete_missing, the current rows not reported are deleted.
+
+    :param session: session of the write transaction
+    :param model: model of the rows
+    :param key: column identifying a row among the rows of the query
+    :param rows: list of dicts of the reported rows
+    :param query: query of the current rows
+    :param delete_missing: delete the current rows not reported
+    :returns: the created and updated rows, in the order reported
+    """
+    columns = (set(model.__table__.columns.keys()) -
+               set(['id', 'created_at', 'updated_at', 'deleted_at']))
+    current = dict((getattr(row, key), row) for row in query)
+
+    result = []
+    reported = set()
+    for values in rows:
+        values = dict((name, value) for name, value in values.items()
+                      if name in columns)
+        row = current.get(values[key])
+        if row is None:
+            if not values.get('uuid'):
+                values['uuid'] = uuidutils.generate_uuid()
+            row = model()
+            row.update(values)
+            session.add(row)
+            current[values[key]] = row
+        else:
+            values.pop('uuid', None)
+            for name, value in values.items():
+                if getattr(row, name) != value:
+                    setattr(row, name, value)
+        reported.add(values[key])
+        result.append(row)
+
+    if delete_missing:
+        for value, row in current.items():
+            if value not in reported:
+                session.delete(row)
+
+    session.flush()
+    return result
+
+
 def _paginate_query(model, limit=None, marker=None, sort_key=None,
                     sort_dir=None, query=None):
     if not query:
@@ -220,6 +300,81 @@ def add_host_options(query):
                 joinedload(models.HostUpgrade.load_target))
 
 
+def _get_object_relationships(model, klass):
+    """Return the relationships of a model read when converting it to a
+    sysinv object, or None if they are not known.
+    """
+    relationships = set(inspect(model).relationships.keys())
+    required = set()
+    for accessor in klass._foreign_fields.values():
+        if callable(accessor):
+            return None
+        required.add(accessor.split(':')[0])
+    required.update(klass.fields)
+    return required & relationships
+
+
+def add_loading_profile(query, model, klass, profile):
+    """Adds the relationship loading options of a profile to a query.
+
+    detail: the loading defined by the model; typically the joined eager
+            loading of every relationship and of their own relationships.
+    list:   the relationships read by the sysinv object are loaded with a
+            SELECT ... IN statement each, without their own relationships.
+    puppet: the relationships read by the sysinv object are joined to the
+            query, without their own relationships.
+
+    The other relationships are loaded on access. Objects with callable
+    foreign fields are always loaded with the detail profile.
+
+    :param query: Initial query to add the options to.
+    :param model: model queried.
+    :param klass: sysinv object class the results are converted to.
+    :param profile: loading profile, the detail profile if None.
+    :return: Modified query.
+    """
+    if profile is None or profile == constants.DB_LOADING_PROFILE_DETAIL:
+        return query
+    elif profile == constants.DB_LOADING_PROFILE_LIST:
+        loader = selectinload
+    elif profile == constants.DB_LOADING_PROFILE_PUPPET:
+        loader = joinedload
+    else:
+        raise exception.InvalidParameterValue(
+            err="Unknown loading profile: %s" % profile)
+
+    relationships = _get_object_relationships(model, klass)
+    if relationships is None:
+        return query
+    options = [loader(getattr(model, name)).lazyload('*')
+               for name in sorted(relationships)]
+    options.append(lazyload('*'))
+    return query.options(*options)
+
+
+def add_filter_by_hosts(query, model, host_ids, host_column='forihostid'):
+    """Adds a filter on a list of host ids to a query, sorted by id.
+
+    :param query: Initial query to add filter to.
+    :param model: model queried.
+    :param host_ids: list of host ids to filter results by.
+    :param host_column: name of the host id column of the model.
+    :return: Modified query.
+    """
+    query = query.filter(getattr(model, host_column).in_(host_ids))
+    return query.order_by(model.id)
+
+
+def _group_by_host(results, host_ids, host_field='forihostid'):
+    """Group query results in a dict keyed by host id, with a possibly empty
+    list for each of the host ids supplied.
+    """
+    grouped = dict((host_id, []) for host_id in host_ids)
+    for result in results:
+        grouped.setdefault(result[host_field], []).append(result)
+    return grouped
+
+
 def add_inode_filter_by_ihost(query, value):
     if utils.is_int_like(value):
         return query.filter_by(forihostid=value)
@@ -1201,6 +1356,7 @@ class Connection(api.Connection):
                 session.flush()
             except db_exc.DBDuplicateEntry:
                 raise exception.SystemAlreadyExists(uuid=values['uuid'])
+            _invalidate_cache(cache.SYSTEM)
             return isystem
 
     @db_objects.objectify(objects.system)
@@ -1215,6 +1371,7 @@ class Connection(api.Connection):
 
         return result
 
+    @cache.cached(cache.SYSTEM)
     @db_objects.objectify(objects.system)
     def isystem_get_one(self):
         query = model_query(models.isystem)
@@ -1252,6 +1409,7 @@ class Connection(api.Connection):
             count = query.update(values, synchronize_session='fetch')
             if count != 1:
                 raise exception.ServerNotFound(server=server)
+            _invalidate_cache(cache.SYSTEM)
             return query.one()
 
     def isystem_destroy(self, server):
@@ -1266,6 +1424,7 @@ class Connection(api.Connection):
 
             # skip cascade delete to leafs otherwise major issue!
             query.delete()
+            _invalidate_cache(cache.SYSTEM)
 
     def _host_get(self, server):
         query = model_query(models.ihost)
@@ -1418,6 +1577,49 @@ class Connection(api.Connection):
                 raise exception.ServerNotFound(server=server)
         return self._host_get(server)
 
+    @staticmethod
+    def _host_identities_filter(query, servers):
+        ids = [s for s in servers if utils.is_int_like(s)]
+        uuids = [s for s in servers if not utils.is_int_like(s)]
+        return query.filter(or_(models.ihost.id.in_(ids),
+                                models.ihost.uuid.in_(uuids)))
+
+    def _hosts_update(self, session, servers, values):
+        query = model_query(models.ihost, session=session)
+        query = self._host_identities_filter(query, servers)
+        count = query.update(values, synchronize_session=False)
+        if count != len(set(servers)):
+            raise exception.ServerNotFound(server=servers)
+
+    def _hosts_get(self, servers):
+        query = model_query(models.ihost)
+        query = add_host_options(query)
+        query = self._host_identities_filter(query, servers)
+        return query.order_by(models.ihost.id).all()
+
+    @db_objects.objectify(objects.host)
+    def ihost_update_bulk(self, servers, values):
+        if not servers:
+            return []
+        with _session_for_write() as session:
+            self._hosts_update(session, servers, values)
+        return self._hosts_get(servers)
+
+    @db_objects.objectify(objects.host)
+    def ihost_config_target_update_many(self, config_targets):
+        if not config_targets:
+            return []
+        # one statement per distinct target; the hosts of a configuration
+        # update share the same target, except for the reboot required ones
+        servers_by_target = {}
+        for server, config_target in config_targets.items():
+            servers_by_target.setdefault(config_target, []).append(server)
+        with _session_for_write() as session:
+            for config_target, servers in servers_by_target.items():
+                self._hosts_update(session, servers,
+                                   {'config_target': config_target})
+        return self._hosts_get(list(config_targets))
+
     def ihost_destroy(self, server):
         with _session_for_write() as session:
             query = model_query(models.ihost, session=session)
@@ -1579,6 +1781,17 @@ class Connection(api.Connection):
             return self._cpu_get(values['uuid'])
 
     @db_objects.objectify(objects.cpu)
+    def icpu_upsert_many(self, forihostid, values_list, delete_missing=False):
+        with _session_for_write() as session:
+            query = model_query(models.icpu, read_deleted="no",
+                                session=session)
+            query = query.filter_by(forihostid=forihostid)
+            rows = [dict(values, forihostid=forihostid)
+                    for values in values_list]
+            return _upsert_many(session, models.icpu, 'cpu', rows, query,
+                                delete_missing)
+
+    @db_objects.objectify_readonly(objects.cpu)
     def icpu_get_all(self, forihostid=None, forinodeid=None):
         query = model_query(models.icpu, read_deleted="no")
         if forihostid:
@@ -1591,23 +1804,28 @@ class Connection(api.Connection):
     def icpu_get(self, cpu_id, forihostid=None):
         return self._cpu_get(cpu_id, forihostid)
 
-    @db_objects.objectify(objects.cpu)
+    @db_objects.objectify_readonly(objects.cpu)
     def icpu_get_list(self, limit=None, marker=None,
-                      sort_key=None, sort_dir=None):
+                      sort_key=None, sort_dir=None, profile=None):
+        query = model_query(models.icpu)
+        query = add_loading_profile(query, models.icpu, objects.cpu,
+                                    profile)
         return _paginate_query(models.icpu, limit, marker,
-                               sort_key, sort_dir)
+                               sort_key, sort_dir, query)
 
-    @db_objects.objectify(objects.cpu)
+    @db_objects.objectify_readonly(objects.cpu)
     def icpu_get_by_ihost(self, ihost,
                           limit=None, marker=None,
-                          sort_key=None, sort_dir=None):
+                          sort_key=None, sort_dir=None, profile=None):
 
         query = model_query(models.icpu)
         query = add_icpu_filter_by_ihost(query, ihost)
+        query = add_loading_profile(query, models.icpu, objects.cpu,
+                                    profile)
         return _paginate_query(models.icpu, limit, marker,
                                sort_key, sort_dir, query)
 
-    @db_objects.objectify(objects.cpu)
+    @db_objects.objectify_readonly(objects.cpu)
     def icpu_get_by_inode(self, inode,
                           limit=None, marker=None,
                           sort_key=None, sort_dir=None):
@@ -1617,7 +1835,7 @@ class Connection(api.Connection):
         return _paginate_query(models.icpu, limit, marker,
                                sort_key, sort_dir, query)
 
-    @db_objects.objectify(objects.cpu)
+    @db_objects.objectify_readonly(objects.cpu)
     def icpu_get_by_ihost_inode(self, ihost, inode,
                                 limit=None, marker=None,
                                 sort_key=None, sort_dir=None):
@@ -1696,6 +1914,18 @@ class Connection(api.Connection):
             return self._memory_get(values['uuid'])
 
     @db_objects.objectify(objects.memory)
+    def imemory_upsert_many(self, forihostid, values_list,
+                            delete_missing=False):
+        with _session_for_write() as session:
+            query = model_query(models.imemory, read_deleted="no",
+                                session=session)
+            query = query.filter_by(forihostid=forihostid)
+            rows = [dict(values, forihostid=forihostid)
+                    for values in values_list]
+            return _upsert_many(session, models.imemory, 'forinodeid',
+                                rows, query, delete_missing)
+
+    @db_objects.objectify_readonly(objects.memory)
     def imemory_get_all(self, forihostid=None, forinodeid=None):
         query = model_query(models.imemory, read_deleted="no")
         if forihostid:
@@ -1708,23 +1938,28 @@ class Connection(api.Connection):
     def imemory_get(self, memory_id, forihostid=None):
         return self._memory_get(memory_id, forihostid)
 
-    @db_objects.objectify(objects.memory)
+    @db_objects.objectify_readonly(objects.memory)
     def imemory_get_list(self, limit=None, marker=None,
-                      sort_key=None, sort_dir=None):
+                      sort_key=None, sort_dir=None, profile=None):
+        query = model_query(models.imemory)
+        query = add_loading_profile(query, models.imemory, objects.memory,
+                                    profile)
         return _paginate_query(models.imemory, limit, marker,
-                               sort_key, sort_dir)
+                               sort_key, sort_dir, query)
 
-    @db_objects.objectify(objects.memory)
+    @db_objects.objectify_readonly(objects.memory)
     def imemory_get_by_ihost(self, ihost,
                           limit=None, marker=None,
-                          sort_key=None, sort_dir=None):
+                          sort_key=None, sort_dir=None, profile=None):
 
         query = model_query(models.imemory)
         query = add_imemory_filter_by_ihost(query, ihost)
+        query = add_loading_profile(query, models.imemory, objects.memory,
+                                    profile)
         return _paginate_query(models.imemory, limit, marker,
                                sort_key, sort_dir, query)
 
-    @db_objects.objectify(objects.memory)
+    @db_objects.objectify_readonly(objects.memory)
     def imemory_get_by_inode(self, inode,
                              limit=None, marker=None,
                              sort_key=None, sort_dir=None):
@@ -1734,7 +1969,7 @@ class Connection(api.Connection):
         return _paginate_query(models.imemory, limit, marker,
                                sort_key, sort_dir, query)
 
-    @db_objects.objectify(objects.memory)
+    @db_objects.objectify_readonly(objects.memory)
     def imemory_get_by_ihost_inode(self, ihost, inode,
                                    limit=None, marker=None,
                                    sort_key=None, sort_dir=None):
@@ -1983,13 +2218,13 @@ class Connection(api.Connection):
     def port_get(self, portid, hostid=None):
         return self._port_get(portid, hostid)
 
-    @db_objects.objectify(objects.port)
+    @db_objects.objectify_readonly(objects.port)
     def port_get_list(self, limit=None, marker=None,
                       sort_key=None, sort_dir=None):
         return _paginate_query(models.Ports, limit, marker,
                                sort_key, sort_dir)
 
-    @db_objects.objectify(objects.port)
+    @db_objects.objectify_readonly(objects.port)
     def port_get_all(self, hostid=None, interfaceid=None):
         query = model_query(models.Ports, read_deleted="no")
         if hostid:
@@ -1998,7 +2233,7 @@ class Connection(api.Connection):
             query = query.filter_by(interface_id=interfaceid)
         return query.all()
 
-    @db_objects.objectify(objects.port)
+    @db_objects.objectify_readonly(objects.port)
     def port_get_by_host(self, host,
                          limit=None, marker=None,
                          sort_key=None, sort_dir=None):
@@ -2007,7 +2242,7 @@ class Connection(api.Connection):
         return _paginate_query(models.Ports, limit, marker,
                                sort_key, sort_dir, query)
 
-    @db_objects.objectify(objects.port)
+    @db_objects.objectify_readonly(objects.port)
     def port_get_by_interface(self, interface,
                               limit=None, marker=None,
                               sort_key=None, sort_dir=None):
@@ -2016,7 +2251,7 @@ class Connection(api.Connection):
         return _paginate_query(models.Ports, limit, marker,
                                sort_key, sort_dir, query)
 
-    @db_objects.objectify(objects.port)
+    @db_objects.objectify_readonly(objects.port)
     def port_get_by_host_interface(self, host, interface,
                                    limit=None, marker=None,
                                    sort_key=None, sort_dir=None):
@@ -2025,7 +2260,7 @@ class Connection(api.Connection):
         return _paginate_query(models.Ports, limit, marker,
                                sort_key, sort_dir, query)
 
-    @db_objects.objectify(objects.port)
+    @db_objects.objectify_readonly(objects.port)
     def port_get_by_numa_node(self, node,
                               limit=None, marker=None,
                               sort_key=None, sort_dir=None):
@@ -2094,13 +2329,16 @@ class Connection(api.Connection):
         except NoResultFound:
             raise exception.PortNotFound(port=mac)
 
-    @db_objects.objectify(objects.ethernet_port)
+    @db_objects.objectify_readonly(objects.ethernet_port)
     def ethernet_port_get_list(self, limit=None, marker=None,
-                               sort_key=None, sort_dir=None):
+                               sort_key=None, sort_dir=None, profile=None):
+        query = model_query(models.EthernetPorts)
+        query = add_loading_profile(query, models.EthernetPorts,
+                                    objects.ethernet_port, profile)
         return _paginate_query(models.EthernetPorts, limit, marker,
-                               sort_key, sort_dir)
+                               sort_key, sort_dir, query)
 
-    @db_objects.objectify(objects.ethernet_port)
+    @db_objects.objectify_readonly(objects.ethernet_port)
     def ethernet_port_get_all(self, hostid=None, interfaceid=None):
         query = model_query(models.EthernetPorts, read_deleted="no")
         if hostid:
@@ -2109,16 +2347,18 @@ class Connection(api.Connection):
             query = query.filter_by(interface_id=interfaceid)
         return query.all()
 
-    @db_objects.objectify(objects.ethernet_port)
+    @db_objects.objectify_readonly(objects.ethernet_port)
     def ethernet_port_get_by_host(self, host,
                                   limit=None, marker=None,
-                                  sort_key=None, sort_dir=None):
+                                  sort_key=None, sort_dir=None, profile=None):
         query = model_query(models.EthernetPorts)
         query = add_port_filter_by_host(query, host)
+        query = add_loading_profile(query, models.EthernetPorts,
+                                    objects.ethernet_port, profile)
         return _paginate_query(models.EthernetPorts, limit, marker,
                                sort_key, sort_dir, query)
 
-    @db_objects.objectify(objects.ethernet_port)
+    @db_objects.objectify_readonly(objects.ethernet_port)
     def ethernet_port_get_by_interface(self, interface,
                                        limit=None, marker=None,
                                        sort_key=None, sort_dir=None):
@@ -2127,7 +2367,7 @@ class Connection(api.Connection):
         return _paginate_query(models.EthernetPorts, limit, marker,
                                sort_key, sort_dir, query)
 
-    @db_objects.objectify(objects.ethernet_port)
+    @db_objects.objectify_readonly(objects.ethernet_port)
     def ethernet_port_get_by_numa_node(self, node,
                                        limit=None, marker=None,
                                        sort_key=None, sort_dir=None):
@@ -2720,20 +2960,39 @@ class Connection(api.Connection):
 
     @db_objects.objectify(objects.disk)
     def idisk_get_list(self, limit=None, marker=None,
-                      sort_key=None, sort_dir=None):
+                      sort_key=None, sort_dir=None, profile=None):
+        query = model_query(models.idisk)
+        query = add_loading_profile(query, models.idisk, objects.disk,
+                                    profile)
         return _paginate_query(models.idisk, limit, marker,
-                               sort_key, sort_dir)
+                               sort_key, sort_dir, query)
 
     @db_objects.objectify(objects.disk)
     def idisk_get_by_ihost(self, ihost,
                           limit=None, marker=None,
-                          sort_key=None, sort_dir=None):
+                          sort_key=None, sort_dir=None, profile=None):
 
         query = model_query(models.idisk)
         query = add_idisk_filter_by_ihost(query, ihost)
+        query = add_loading_profile(query, models.idisk, objects.disk,
+                                    profile)
         return _paginate_query(models.idisk, limit, marker,
                                sort_key, sort_dir, query)
 
+    @db_objects.objectify(objects.disk)
+    def _idisk_get_by_ihosts(self, ihosts, profile=None):
+        query = model_query(models.idisk)
+        query = add_filter_by_hosts(query, models.idisk, ihosts)
+        query = add_loading_profile(query, models.idisk, objects.disk,
+                                    profile)
+        return query.all()
+
+    def idisk_get_by_ihosts(self, ihosts, profile=None):
+        if not ihosts:
+            return {}
+        return _group_by_host(self._idisk_get_by_ihosts(ihosts, profile),
+                              ihosts)
+
     @db_objects.objectify(objects.disk)
     def idisk_get_by_istor(self, istor_uuid,
                            limit=None, marker=None,
@@ -2865,10 +3124,12 @@ class Connection(api.Connection):
     @db_objects.objectify(objects.partition)
     def partition_get_by_ihost(self, ihost,
                            limit=None, marker=None,
-                           sort_key=None, sort_dir=None):
+                           sort_key=None, sort_dir=None, profile=None):
 
         query = model_query(models.partition)
         query = add_partition_filter_by_ihost(query, ihost)
+        query = add_loading_profile(query, models.partition, objects.partition,
+                                    profile)
         return _paginate_query(models.partition, limit, marker,
                                sort_key, sort_dir, query)
 
@@ -3272,6 +3533,20 @@ class Connection(api.Connection):
         return _paginate_query(models.ilvg, limit, marker,
                                sort_key, sort_dir, query)
 
+    @db_objects.objectify(objects.lvg)
+    def _ilvg_get_by_ihosts(self, ihosts, profile=None):
+        query = model_query(models.ilvg)
+        query = add_filter_by_hosts(query, models.ilvg, ihosts)
+        query = add_loading_profile(query, models.ilvg, objects.lvg,
+                                    profile)
+        return query.all()
+
+    def ilvg_get_by_ihosts(self, ihosts, profile=None):
+        if not ihosts:
+            return {}
+        return _group_by_host(self._ilvg_get_by_ihosts(ihosts, profile),
+                              ihosts)
+
     @db_objects.objectify(objects.lvg)
     def ilvg_update(self, ilvg_id, values):
         with _session_for_write() as session:
@@ -3338,20 +3613,39 @@ class Connection(api.Connection):
 
     @db_objects.objectify(objects.pv)
     def ipv_get_list(self, limit=None, marker=None,
-                     sort_key=None, sort_dir=None):
+                     sort_key=None, sort_dir=None, profile=None):
+        query = model_query(models.ipv)
+        query = add_loading_profile(query, models.ipv, objects.pv,
+                                    profile)
         return _paginate_query(models.ipv, limit, marker,
-                               sort_key, sort_dir)
+                               sort_key, sort_dir, query)
 
     @db_objects.objectify(objects.pv)
     def ipv_get_by_ihost(self, ihost,
                          limit=None, marker=None,
-                         sort_key=None, sort_dir=None):
+                         sort_key=None, sort_dir=None, profile=None):
 
         query = model_query(models.ipv)
         query = add_ipv_filter_by_ihost(query, ihost)
+        query = add_loading_profile(query, models.ipv, objects.pv,
+                                    profile)
         return _paginate_query(models.ipv, limit, marker,
                                sort_key, sort_dir, query)
 
+    @db_objects.objectify(objects.pv)
+    def _ipv_get_by_ihosts(self, ihosts, profile=None):
+        query = model_query(models.ipv)
+        query = add_filter_by_hosts(query, models.ipv, ihosts)
+        query = add_loading_profile(query, models.ipv, objects.pv,
+                                    profile)
+        return query.all()
+
+    def ipv_get_by_ihosts(self, ihosts, profile=None):
+        if not ihosts:
+            return {}
+        return _group_by_host(self._ipv_get_by_ihosts(ihosts, profile),
+                              ihosts)
+
     @db_objects.objectify(objects.pv)
     def ipv_update(self, ipv_id, values):
         with _session_for_write() as session:
@@ -5082,6 +5376,7 @@ class Connection(api.Connection):
                 session.flush()
             except db_exc.DBDuplicateEntry:
                 raise exception.NetworkAlreadyExists(uuid=values['uuid'])
+            _invalidate_cache(cache.NETWORKS)
             return self._network_get(values['uuid'])
 
     @db_objects.objectify(objects.network)
@@ -5096,6 +5391,7 @@ class Connection(api.Connection):
     def network_get_by_type(self, networktype):
         return self._network_get_by_type(networktype)
 
+    @cache.cached(cache.NETWORKS)
     @db_objects.objectify(objects.network)
     def networks_get_all(self, limit=None, marker=None,
                          sort_key=None, sort_dir=None):
@@ -5130,6 +5426,7 @@ class Connection(api.Connection):
             count = query.update(values, synchronize_session='fetch')
             if count != 1:
                 raise exception.NetworkNotFound(network_uuid=network_uuid)
+            _invalidate_cache(cache.NETWORKS)
             return query.one()
 
     def network_destroy(self, network_uuid):
@@ -5140,6 +5437,7 @@ class Connection(api.Connection):
         except NoResultFound:
             raise exception.NetworkNotFound(network_uuid=network_uuid)
         query.delete()
+        _invalidate_cache(cache.NETWORKS)
 
     def _interface_network_get(self, uuid):
         query = model_query(models.InterfaceNetworks)
@@ -5279,6 +5577,8 @@ class Connection(api.Connection):
             except db_exc.DBDuplicateEntry:
                 raise exception.AddressAlreadyExists(address=values['address'],
                                                      prefix=values['prefix'])
+            address_index.address_created(address.address_pool_id,
+                                          address.id, address.address)
             return self._address_get(values['uuid'])
 
     @db_objects.objectify(objects.address)
@@ -5314,6 +5614,9 @@ class Connection(api.Connection):
             count = query.update(values, synchronize_session='fetch')
             if count != 1:
                 raise exception.AddressNotFound(address_uuid=address_uuid)
+            if 'address' in values or 'address_pool_id' in values:
+                address_index.invalidate()
+            _invalidate_cache(cache.ADDRESS_POOLS)
             return query.one()
 
     @db_objects.objectify(objects.address)
@@ -5420,10 +5723,30 @@ class Connection(api.Connection):
         query = model_query(models.Addresses)
         query = add_identity_filter(query, address_uuid)
         try:
-            query.one()
+            address = query.one()
         except NoResultFound:
             raise exception.AddressNotFound(address_uuid=address_uuid)
         query.delete()
+        address_index.address_destroyed(address.address_pool_id,
+                                        address.id, address.address)
+        _invalidate_cache(cache.ADDRESS_POOLS)
+
+    def address_pool_get_addresses(self, pool_id):
+        """Return the (id, address) of the addresses of a pool"""
+        query = model_query(models.Addresses.id, models.Addresses.address)
+        query = query.filter(models.Addresses.address_pool_id == pool_id)
+        return [(address_id, address) for address_id, address in query.all()]
+
+    def address_pool_get_generation(self, pool_id):
+        """Return the number of addresses of a pool, their greatest id and
+        their latest update time
+        """
+        query = model_query(func.count(models.Addresses.id),
+                            func.max(models.Addresses.id),
+                            func.max(models.Addresses.updated_at))
+        query = query.filter(models.Addresses.address_pool_id == pool_id)
+        count, max_id, updated_at = query.one()
+        return (count, max_id or 0, updated_at)
 
     def address_remove_interface(self, address_uuid):
         query = model_query(models.Addresses)
@@ -5441,6 +5764,7 @@ class Connection(api.Connection):
         if family:
             query = query.filter(models.Addresses.family == family)
         query.delete()
+        _invalidate_cache(cache.ADDRESS_POOLS)
 
     def addresses_remove_interface_by_interface(self, interface_id,
                                                 family=None):
@@ -5663,6 +5987,8 @@ class Connection(api.Connection):
                 session.flush()
             except db_exc.DBDuplicateEntry:
                 raise exception.AddressPoolAlreadyExists(uuid=values['uuid'])
+            address_index.invalidate(address_pool.id)
+            _invalidate_cache(cache.ADDRESS_POOLS)
             return self._address_pool_get(values['uuid'])
 
     def _address_pool_range_update(self, session, address_pool, ranges):
@@ -5687,9 +6013,11 @@ class Connection(api.Connection):
 
             session.add(address_pool)
             session.flush()
+            _invalidate_cache(cache.ADDRESS_POOLS)
 
             return address_pool
 
+    @cache.cached(cache.ADDRESS_POOLS)
     @db_objects.objectify(objects.address_pool)
     def address_pool_get(self, address_pool_uuid):
         return self._address_pool_get(address_pool_uuid)
@@ -5737,11 +6065,13 @@ class Connection(api.Connection):
         query = model_query(models.AddressPools)
         query = add_identity_filter(query, address_pool_uuid)
         try:
-            query.one()
+            address_pool = query.one()
         except NoResultFound:
             raise exception.AddressPoolNotFound(
                 address_pool_uuid=address_pool_uuid)
         query.delete()
+        address_index.invalidate(address_pool.id)
+        _invalidate_cache(cache.ADDRESS_POOLS, cache.NETWORKS)
 
     # SENSORS
     def _sensor_analog_create(self, hostid, values):
@@ -6129,14 +6459,14 @@ class Connection(api.Connection):
     def isensor_get(self, sensorid, hostid=None):
         return self._isensor_get(models.Sensors, sensorid, hostid)
 
-    @db_objects.objectify(objects.sensor)
+    @db_objects.objectify_readonly(objects.sensor)
     def isensor_get_list(self, limit=None, marker=None,
                          sort_key=None, sort_dir=None):
         model_query(models.Sensors)
         return _paginate_query(models.Sensors, limit, marker,
                                sort_key, sort_dir)
 
-    @db_objects.objectify(objects.sensor)
+    @db_objects.objectify_readonly(objects.sensor)
     def isensor_get_all(self, host_id=None, sensorgroupid=None):
         query = model_query(models.Sensors, read_deleted="no")
 
@@ -6146,7 +6476,7 @@ class Connection(api.Connection):
             query = query.filter_by(sensorgroup_id=sensorgroupid)
         return query.all()
 
-    @db_objects.objectify(objects.sensor)
+    @db_objects.objectify_readonly(objects.sensor)
     def isensor_get_by_ihost(self, ihost,
                              limit=None, marker=None,
                              sort_key=None, sort_dir=None):
@@ -6162,7 +6492,7 @@ class Connection(api.Connection):
         query = add_sensor_filter_by_sensorgroup(query, sensorgroup)
         return _paginate_query(cls, limit, marker, sort_key, sort_dir, query)
 
-    @db_objects.objectify(objects.sensor)
+    @db_objects.objectify_readonly(objects.sensor)
     def isensor_get_by_sensorgroup(self, sensorgroup,
                                    limit=None, marker=None,
                                    sort_key=None, sort_dir=None):
@@ -6171,7 +6501,7 @@ class Connection(api.Connection):
         return _paginate_query(models.Sensors, limit, marker,
                                sort_key, sort_dir, query)
 
-    @db_objects.objectify(objects.sensor)
+    @db_objects.objectify_readonly(objects.sensor)
     def isensor_get_by_ihost_sensorgroup(self, ihost, sensorgroup,
                                          limit=None, marker=None,
                                          sort_key=None, sort_dir=None):
@@ -6549,8 +6879,10 @@ class Connection(api.Connection):
                 session.flush()
             except db_exc.DBDuplicateEntry:
                 raise exception.LoadAlreadyExists(uuid=values['uuid'])
+            _invalidate_cache(cache.LOADS)
         return load
 
+    @cache.cached(cache.LOADS)
     @db_objects.objectify(objects.load)
     def load_get(self, load):
         # load may be passed as a string. It may be uuid or Int.
@@ -6594,6 +6926,7 @@ class Connection(api.Connection):
             count = query.update(values, synchronize_session='fetch')
             if count != 1:
                 raise exception.LoadNotFound(load=load)
+            _invalidate_cache(cache.LOADS, cache.SOFTWARE_UPGRADE)
             return query.one()
 
     def load_destroy(self, load):
@@ -6607,6 +6940,7 @@ class Connection(api.Connection):
                 raise exception.LoadNotFound(load=load)
 
             query.delete()
+            _invalidate_cache(cache.LOADS, cache.SOFTWARE_UPGRADE)
 
     def set_upgrade_loads_state(self, upgrade, to_state, from_state):
         with _session_for_write():
@@ -6640,6 +6974,7 @@ class Connection(api.Connection):
                 session.flush()
             except db_exc.DBDuplicateEntry:
                 raise exception.UpgradeAlreadyExists(uuid=values['uuid'])
+            _invalidate_cache(cache.SOFTWARE_UPGRADE)
 
             return self._software_upgrade_get(values['uuid'])
 
@@ -6656,6 +6991,7 @@ class Connection(api.Connection):
         return _paginate_query(models.SoftwareUpgrade, limit, marker,
                                sort_key, sort_dir, query)
 
+    @cache.cached(cache.SOFTWARE_UPGRADE)
     @db_objects.objectify(objects.software_upgrade)
     def software_upgrade_get_one(self):
         query = model_query(models.SoftwareUpgrade)
@@ -6674,6 +7010,7 @@ class Connection(api.Connection):
             count = query.update(values, synchronize_session='fetch')
             if count != 1:
                 raise exception.NotFound(id)
+            _invalidate_cache(cache.SOFTWARE_UPGRADE)
             return query.one()
 
     def software_upgrade_destroy(self, id):
@@ -6687,6 +7024,7 @@ class Connection(api.Connection):
                 raise exception.NotFound(id)
 
             query.delete()
+            _invalidate_cache(cache.SOFTWARE_UPGRADE)
 
     def _host_upgrade_create(self, host_id, version, values=None):
         if values is None:
@@ -7427,13 +7765,13 @@ class Connection(api.Connection):
 
         return result
 
-    @db_objects.objectify(objects.lldp_tlv)
+    @db_objects.objectify_readonly(objects.lldp_tlv)
     def lldp_tlv_get_list(self, limit=None, marker=None,
                           sort_key=None, sort_dir=None):
         return _paginate_query(models.LldpTlvs, limit, marker,
                                sort_key, sort_dir)
 
-    @db_objects.objectify(objects.lldp_tlv)
+    @db_objects.objectify_readonly(objects.lldp_tlv)
     def lldp_tlv_get_all(self, agentid=None, neighbourid=None):
         query = model_query(models.LldpTlvs, read_deleted="no")
         if agentid:
@@ -7442,7 +7780,7 @@ class Connection(api.Connection):
             query = query.filter_by(neighbour_id=neighbourid)
         return query.all()
 
-    @db_objects.objectify(objects.lldp_tlv)
+    @db_objects.objectify_readonly(objects.lldp_tlv)
     def lldp_tlv_get_by_agent(self, agent,
                               limit=None, marker=None,
                               sort_key=None, sort_dir=None):
@@ -7451,7 +7789,7 @@ class Connection(api.Connection):
         return _paginate_query(models.LldpTlvs, limit, marker,
                                sort_key, sort_dir, query)
 
-    @db_objects.objectify(objects.lldp_tlv)
+    @db_objects.objectify_readonly(objects.lldp_tlv)
     def lldp_tlv_get_by_neighbour(self, neighbour,
                                   limit=None, marker=None,
                                   sort_key=None, sort_dir=None):
@@ -7949,6 +8287,21 @@ class Connection(api.Connection):
         return _paginate_query(models.Label, limit, marker,
                                sort_key, sort_dir, query)
 
+    @db_objects.objectify(objects.label)
+    def _label_get_by_hosts(self, hosts, profile=None):
+        query = model_query(models.Label)
+        query = add_filter_by_hosts(query, models.Label, hosts,
+                                    host_column='host_id')
+        query = add_loading_profile(query, models.Label, objects.label,
+                                    profile)
+        return query.all()
+
+    def label_get_by_hosts(self, hosts, profile=None):
+        if not hosts:
+            return {}
+        return _group_by_host(self._label_get_by_hosts(hosts, profile),
+                              hosts, host_field='host_id')
+
     def _label_query(self, host_id, label_key, session=None):
         query = model_query(models.Label, session=session)
         query = query.filter(models.Label.host_id == host_id)
@@ -8459,6 +8812,20 @@ class Connection(api.Connection):
         return _paginate_query(models.HostFs, limit, marker,
                                sort_key, sort_dir, query)
 
+    @db_objects.objectify(objects.host_fs)
+    def _host_fs_get_by_ihosts(self, ihosts, profile=None):
+        query = model_query(models.HostFs)
+        query = add_filter_by_hosts(query, models.HostFs, ihosts)
+        query = add_loading_profile(query, models.HostFs, objects.host_fs,
+                                    profile)
+        return query.all()
+
+    def host_fs_get_by_ihosts(self, ihosts, profile=None):
+        if not ihosts:
+            return {}
+        return _group_by_host(self._host_fs_get_by_ihosts(ihosts, profile),
+                              ihosts)
+
     @db_objects.objectify(objects.host_fs)
     def host_fs_update(self, fs_id, values):
         with _session_for_write() as session:
@@ -0,0 +1,218 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+""" Opt-in read-through cache of the rarely modified database rows.
+
+The results of the database API methods reading the system, the networks,
+the address pools, the loads and the software upgrade are cached by process.
+Each cached table has a generation in the cache_generations table, increased
+by the database API methods modifying the table. A process drops its cached
+results of a table when it modifies it, and reads the generations of the
+tables at most once per ttl to drop the results of the tables modified by
+other processes.
+"""
+
+import collections
+import copy
+import functools
+import time
+
+from oslo_config import cfg
+from oslo_log import log
+
+from sysinv.common import exception
+
+LOG = log.getLogger(__name__)
+
+cache_opts = [
+    cfg.BoolOpt('enabled',
+                default=False,
+                help='Cache the system, networks, address pools, loads and '
+                     'software upgrade read through the database API'),
+    cfg.IntOpt('ttl',
+               default=5,
+               help='Seconds the cached results are used before the '
+                    'generations of their tables are read from the database'),
+    cfg.IntOpt('stats_interval',
+               default=300,
+               help='Seconds between the logs of the hit rates of the cache; '
+                    '0 disables the logs'),
+]
+
+CONF = cfg.CONF
+CONF.register_opts(cache_opts, group='db_cache')
+
+# cached tables
+SYSTEM = 'i_system'
+NETWORKS = 'networks'
+ADDRESS_POOLS = 'address_pools'
+LOADS = 'loads'
+SOFTWARE_UPGRADE = 'software_upgrade'
+
+_cache = None
+
+
+class CacheStats(object):
+    """Lookups of the cached results of a table"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': round(float(self.hits) / lookups, 3)
+                if lookups else 0.0}
+
+
+class ResultCache(object):
+    """Results of the database API methods, by table"""
+
+    def __init__(self, ttl, stats_interval, get_generations):
+        """
+        :param ttl: seconds between the reads of the table generations
+        :param stats_interval: seconds between the logs of the statistics
+        :param get_generations: function returning the generation by table
+        """
+        self.ttl = ttl
+        self.stats_interval = stats_interval
+        self.get_generations = get_generations
+        self.entries = collections.defaultdict(dict)
+        # number of drops of the results of each table, so that the results
+        # loaded while they are dropped are not cached
+        self.drops = collections.Counter()
+        self.generations = {}
+        self.checked_at = 0
+        self.stats = collections.defaultdict(CacheStats)
+        self.reported_at = time.time()
+
+    def _drop(self, table):
+        self.entries.pop(table, None)
+        self.drops[table] += 1
+
+    def _check_generations(self):
+        self.checked_at = time.time()
+        generations = self.get_generations()
+        for table, generation in generations.items():
+            if self.generations.get(table) != generation:
+                self._drop(table)
+        self.generations = generations
+
+    def lookup(self, table, key, loader):
+        """Return the cached result of a method, loading it on a miss.
+
+        :param table: table read by the method
+        :param key: method name and arguments
+        :param loader: function returning the result of the method
+        """
+        if time.time() - self.checked_at >= self.ttl:
+            self._check_generations()
+
+        stats = self.stats[table]
+        if key in self.entries[table]:
+            stats.hits += 1
+            result, error = self.entries[table][key]
+        else:
+            stats.misses += 1
+            drops = self.drops[table]
+            result = error = None
+            try:
+                result = loader()
+            except exception.NotFound as e:
+                error = e
+            if self.drops[table] == drops:
+                self.entries[table][key] = (result, error)
+
+        if (self.stats_interval and
+                time.time() - self.reported_at >= self.stats_interval):
+            self.report()
+
+        if error is not None:
+            raise copy.copy(error)
+        # the callers may modify the objects returned
+        return copy.deepcopy(result)
+
+    def invalidate(self, tables):
+        """Drop the cached results of tables modified by the process"""
+        for table in tables:
+            self._drop(table)
+            self.stats[table].invalidations += 1
+        # read the generations increased by the modification
+        self.checked_at = 0
+
+    def snapshot(self):
+        return dict((table, stats.as_dict())
+                    for table, stats in self.stats.items())
+
+    def report(self):
+        self.reported_at = time.time()
+        for table, stats in sorted(self.snapshot().items()):
+            LOG.info("Database cache: %s: %d hits, %d misses, %d "
+                     "invalidations, hit rate %.3f" %
+                     (table, stats['hits'], stats['misses'],
+                      stats['invalidations'], stats['hit_rate']))
+
+
+def cached(table):
+    """Decorator caching the results of a database API method.
+
+    Only the results and the NotFound errors of methods reading a single
+    table, that are not part of a write transaction, should be cached.
+    :param table: table read by the method
+    """
+
+    def the_decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            if _cache is None:
+                return fn(self, *args, **kwargs)
+            key = (fn.__name__, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(key)
+            except TypeError:
+                return fn(self, *args, **kwargs)
+            return _cache.lookup(table, key,
+                                 functools.partial(fn, self, *args, **kwargs))
+
+        return wrapper
+
+    return the_decorator
+
+
+def invalidate(*tables):
+    """Drop the cached results of tables modified by the process"""
+    if _cache is not None:
+        _cache.invalidate(tables)
+
+
+def setup(get_generations):
+    """Start caching the results if enabled in the configuration.
+
+    :param get_generations: function returning the generation by table
+    """
+    global _cache
+
+    if not CONF.db_cache.enabled or _cache is not None:
+        return
+
+    _cache = ResultCache(CONF.db_cache.ttl, CONF.db_cache.stats_interval,
+                         get_generations)
+    LOG.info("Database cache enabled, ttl %ss" % CONF.db_cache.ttl)
+
+
+def teardown():
+    """Stop caching the results"""
+    global _cache
+    _cache = None
+
+
+def get_cache():
+    """Return the result cache, or None if caching is disabled"""
+    return _cache
@@ -0,0 +1,47 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+from sqlalchemy import Column, MetaData, Table
+from sqlalchemy import DateTime, Integer, String
+
+ENGINE = 'InnoDB'
+CHARSET = 'utf8'
+
+CACHED_TABLES = ['i_system', 'networks', 'address_pools', 'loads',
+                 'software_upgrade']
+
+
+def upgrade(migrate_engine):
+    """
+       This database upgrade creates the generations of the tables cached
+       by the database API, increased on their modifications.
+    """
+
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    cache_generations = Table(
+        'cache_generations',
+        meta,
+        Column('created_at', DateTime),
+        Column('updated_at', DateTime),
+        Column('deleted_at', DateTime),
+        Column('id', Integer, primary_key=True, nullable=False),
+        Column('name', String(255), unique=True, nullable=False),
+        Column('generation', Integer, nullable=False, default=0),
+
+        mysql_engine=ENGINE,
+        mysql_charset=CHARSET,
+    )
+
+    cache_generations.create()
+    for name in CACHED_TABLES:
+        cache_generations.insert().values(name=name, generation=0).execute()
+
+
+def downgrade(migrate_engine):
+    # Downgrade is unsupported in this release.
+    raise NotImplementedError('SysInv database downgrade is unsupported.')
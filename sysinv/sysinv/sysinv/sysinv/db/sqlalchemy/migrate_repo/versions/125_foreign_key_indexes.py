@@ -0,0 +1,62 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+from sqlalchemy import Index, MetaData, Table
+
+ENGINE = 'InnoDB'
+CHARSET = 'utf8'
+
+# indexed columns, by table, of the foreign keys filtering the inventory
+# queries; the unique constraints already index the labels by host and
+# the memory by host and node
+INDEXES = {
+    'i_node': [('forihostid',)],
+    'i_icpu': [('forihostid', 'forinodeid'), ('forinodeid',)],
+    'i_imemory': [('forinodeid',)],
+    'interfaces': [('forihostid',)],
+    'ports': [('host_id', 'interface_id'), ('interface_id',), ('node_id',)],
+    'addresses': [('address_pool_id',), ('interface_id',)],
+    'address_modes': [('interface_id',)],
+    'routes': [('interface_id',)],
+    'i_idisk': [('forihostid',)],
+    'partition': [('forihostid',), ('idisk_id',)],
+    'i_pv': [('forihostid',)],
+    'i_lvg': [('forihostid',)],
+    'i_istor': [('forihostid',)],
+    'i_sensorgroups': [('host_id',)],
+    'i_sensors': [('host_id', 'sensorgroup_id'), ('sensorgroup_id',)],
+    'pci_devices': [('host_id',)],
+    'lldp_agents': [('host_id',), ('port_id',)],
+    'lldp_neighbours': [('host_id',), ('port_id',)],
+    'lldp_tlvs': [('agent_id',), ('neighbour_id',)],
+    'host_fs': [('forihostid',)],
+}
+
+
+def get_index_name(table, columns):
+    return 'ix_%s_%s' % (table, '_'.join(columns))
+
+
+def upgrade(migrate_engine):
+    """
+       This database upgrade indexes the foreign keys filtering the
+       inventory queries of the hosts.
+    """
+
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    for table_name, indexes in INDEXES.items():
+        table = Table(table_name, meta, autoload=True)
+        for columns in indexes:
+            index = Index(get_index_name(table_name, columns),
+                          *[table.c[column] for column in columns])
+            index.create(migrate_engine)
+
+
+def downgrade(migrate_engine):
+    # Downgrade is unsupported in this release.
+    raise NotImplementedError('SysInv database downgrade is unsupported.')
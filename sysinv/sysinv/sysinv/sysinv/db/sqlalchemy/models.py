@@ -2157,3 +2157,11 @@ class KubeCmdVersions(Base):
     kubelet_version = Column(String(255), nullable=False)
     UniqueConstraint('kubeadm_version', 'kubelet_version',
                      name='u_kubeadm_version_kubelet_version')
+
+
+class CacheGenerations(Base):
+    __tablename__ = 'cache_generations'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), unique=True, nullable=False)
+    generation = Column(Integer, nullable=False, default=0)
@@ -7,17 +7,72 @@ import functools
 
 import eventlet
 from oslo_db.sqlalchemy import enginefacade
+from sqlalchemy import inspect
 from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.orm.exc import UnmappedInstanceError
 
+from sysinv.objects import base as objects_base
+
 ALREADY_ATTACHED_STRING = 'already attached'
 
+# attributes read by the readonly conversion, by object and model class
+_readonly_attributes = {}
+
 
 def _session_for_read():
     _context = eventlet.greenthread.getcurrent()
     return enginefacade.reader.using(_context)
 
 
+def _objectify(klass, first_result):
+    with _session_for_read() as session:
+        bound_session = True
+        try:
+            session.add(first_result)
+        except UnmappedInstanceError:
+            bound_session = False
+        except InvalidRequestError as e:
+            if ALREADY_ATTACHED_STRING in str(e):
+                bound_session = False
+            else:
+                raise e
+
+        try:
+            second_result = klass.from_db_object(first_result)
+        except TypeError:
+            # TODO(deva): handle lists of objects better
+            #             once support for those lands and is imported.
+            second_result = [klass.from_db_object(obj) for obj in first_result]
+
+        if bound_session:
+            session.expunge_all()
+
+    return second_result
+
+
+def _get_readonly_attributes(klass, model):
+    """Return the model attributes read when converting it to the object,
+    or None if they are not known.
+    """
+    key = (klass, model)
+    if key not in _readonly_attributes:
+        attributes = set(klass.fields)
+        for accessor in klass._foreign_fields.values():
+            if callable(accessor):
+                attributes = None
+                break
+            attributes.add(accessor.split(':')[0])
+        if attributes is not None:
+            attributes &= set(inspect(model).attrs.keys())
+        _readonly_attributes[key] = attributes
+    return _readonly_attributes[key]
+
+
+def _is_loaded(klass, db_object):
+    attributes = _get_readonly_attributes(klass, type(db_object))
+    return attributes is not None and attributes.issubset(db_object.__dict__)
+
+
 def objectify(klass):
     """Decorator to convert database results into specified objects.
     :param klass: database results class
@@ -26,31 +81,34 @@ def objectify(klass):
     def the_decorator(fn):
         @functools.wraps(fn)
         def wrapper(*args, **kwargs):
-            first_result = fn(*args, **kwargs)
-
-            with _session_for_read() as session:
-                bound_session = True
-                try:
-                    session.add(first_result)
-                except UnmappedInstanceError:
-                    bound_session = False
-                except InvalidRequestError as e:
-                    if ALREADY_ATTACHED_STRING in str(e):
-                        bound_session = False
-                    else:
-                        raise e
-
-                try:
-                    second_result = klass.from_db_object(first_result)
-                except TypeError:
-                    # TODO(deva): handle lists of objects better
-                    #             once support for those lands and is imported.
-                    second_result = [klass.from_db_object(obj) for obj in first_result]
-
-                if bound_session:
-                    session.expunge_all()
-
-            return second_result
+            return _objectify(klass, fn(*args, **kwargs))
+
+        return wrapper
+
+    return the_decorator
+
+
+def objectify_readonly(klass):
+    """Decorator to convert lists of database results into specified
+    objects, for results that are not modified by the caller.
+
+    The results are converted without attaching them to a read session;
+    only if every attribute read by the conversion was loaded by the query.
+    Otherwise, or if the result is not a list, it is converted as with
+    objectify. Within objects_base.compact_objects, the results are
+    converted to the compact class of the objects.
+    :param klass: database results class
+    """
+
+    def the_decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            obj_class = objects_base.get_object_class(klass)
+            result = fn(*args, **kwargs)
+            if (not isinstance(result, list) or
+                    not all(_is_loaded(klass, obj) for obj in result)):
+                return _objectify(obj_class, result)
+            return [obj_class.from_db_object_readonly(obj) for obj in result]
 
         return wrapper
 
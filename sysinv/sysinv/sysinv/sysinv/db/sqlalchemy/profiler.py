@@ -0,0 +1,281 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+""" Opt-in profiling of the database statements.
+
+The statements executed through SQLAlchemy are counted and timed by scope;
+the RPC method, periodic task or API route handled by the greenthread, and
+the database API Connection method that issued them. The statistics of each
+process are periodically logged and written to the report directory, where
+the sysinv-dbprofile command reads them.
+"""
+
+import collections
+import contextlib
+import functools
+import heapq
+import inspect
+import json
+import os
+import sys
+import time
+
+import eventlet
+from oslo_config import cfg
+from oslo_log import log
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LOG = log.getLogger(__name__)
+
+profiler_opts = [
+    cfg.BoolOpt('enabled',
+                default=False,
+                help='Count and time the database statements by RPC method, '
+                     'periodic task, API route and database API method'),
+    cfg.IntOpt('report_interval',
+               default=300,
+               help='Seconds between the reports of the statistics to the '
+                    'log and the report directory; 0 disables the periodic '
+                    'reports'),
+    cfg.IntOpt('slow_statements',
+               default=5,
+               help='Number of slowest statements kept per scope'),
+    cfg.StrOpt('report_dir',
+               default='/var/run/sysinv/dbprofile',
+               help='Directory the statistics of each process are written '
+                    'to'),
+]
+
+CONF = cfg.CONF
+CONF.register_opts(profiler_opts, group='db_profiler')
+
+# scope of the statements executed outside of a tagged scope or method
+SCOPE_NONE = '-'
+
+REPORT_PREFIX = 'dbprofile-'
+REPORT_SUFFIX = '.json'
+
+# number of scopes logged by each report
+REPORT_LOG_SCOPES = 10
+
+_START_TIME_KEY = 'sysinv_profile_start'
+
+_profiler = None
+
+
+def set_scope(name):
+    """Tag the statements executed by the current greenthread with the
+    RPC method, periodic task or API route being handled.
+
+    :returns: the previous scope of the greenthread
+    """
+    thread = eventlet.greenthread.getcurrent()
+    previous = getattr(thread, '_db_profile_scope', None)
+    thread._db_profile_scope = name
+    return previous
+
+
+@contextlib.contextmanager
+def scope(name):
+    previous = set_scope(name)
+    try:
+        yield
+    finally:
+        set_scope(previous)
+
+
+def _profile_method(name, func):
+    """Tag the statements with the outermost database API method"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        thread = eventlet.greenthread.getcurrent()
+        if getattr(thread, '_db_profile_method', None):
+            return func(*args, **kwargs)
+        thread._db_profile_method = name
+        try:
+            return func(*args, **kwargs)
+        finally:
+            thread._db_profile_method = None
+
+    wrapper._db_profile_original = func
+    return wrapper
+
+
+class ScopeStats(object):
+    """Statistics of the statements executed in a scope"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = []
+
+    def add(self, statement, duration, slow_statements):
+        self.count += 1
+        self.total += duration
+        if len(self.slowest) < slow_statements:
+            heapq.heappush(self.slowest, (duration, statement))
+        elif self.slowest and duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (duration, statement))
+
+    def as_dict(self):
+        return {'count': self.count,
+                'total': round(self.total, 6),
+                'slowest': [{'duration': round(duration, 6),
+                             'statement': statement}
+                            for duration, statement
+                            in sorted(self.slowest, reverse=True)]}
+
+
+class StatementProfiler(object):
+    """Aggregate the statements executed by the database engines by
+    scope and database API method.
+    """
+
+    def __init__(self, report_interval, slow_statements, report_dir):
+        self.report_interval = report_interval
+        self.slow_statements = slow_statements
+        self.report_dir = report_dir
+        self.stats = collections.defaultdict(ScopeStats)
+        self.started_at = time.time()
+        self.reported_at = self.started_at
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters,
+                              context, executemany):
+        conn.info[_START_TIME_KEY] = time.time()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters,
+                             context, executemany):
+        start = conn.info.pop(_START_TIME_KEY, None)
+        if start is not None:
+            self.record(statement, time.time() - start)
+
+    def record(self, statement, duration):
+        thread = eventlet.greenthread.getcurrent()
+        key = (getattr(thread, '_db_profile_scope', None) or SCOPE_NONE,
+               getattr(thread, '_db_profile_method', None) or SCOPE_NONE)
+        self.stats[key].add(statement, duration, self.slow_statements)
+
+        if (self.report_interval and
+                time.time() - self.reported_at >= self.report_interval):
+            self.report()
+
+    def snapshot(self):
+        """Return the statistics of each scope, by decreasing total time"""
+        scopes = []
+        for (scope_name, method), stats in self.stats.items():
+            entry = stats.as_dict()
+            entry['scope'] = scope_name
+            entry['method'] = method
+            scopes.append(entry)
+        scopes.sort(key=lambda e: e['total'], reverse=True)
+        return {'process': os.path.basename(sys.argv[0]),
+                'pid': os.getpid(),
+                'started_at': self.started_at,
+                'reported_at': time.time(),
+                'scopes': scopes}
+
+    def get_report_path(self):
+        return os.path.join(self.report_dir, '%s%s-%s%s' % (
+            REPORT_PREFIX, os.path.basename(sys.argv[0]), os.getpid(),
+            REPORT_SUFFIX))
+
+    def report(self):
+        """Log the busiest scopes and write the statistics to the report
+        directory.
+        """
+        self.reported_at = time.time()
+        snapshot = self.snapshot()
+        for entry in snapshot['scopes'][:REPORT_LOG_SCOPES]:
+            LOG.info("Database profile: %s %s: %d statements in %.3fs" %
+                     (entry['scope'], entry['method'], entry['count'],
+                      entry['total']))
+
+        path = self.get_report_path()
+        try:
+            if not os.path.isdir(self.report_dir):
+                os.makedirs(self.report_dir)
+            with open(path + '.tmp', 'w') as f:
+                json.dump(snapshot, f)
+            os.rename(path + '.tmp', path)
+        except (IOError, OSError) as e:
+            LOG.warning("Unable to write the database profile %s: %s" %
+                        (path, e))
+
+
+def _instrument(connection_class):
+    for name, attr in list(vars(connection_class).items()):
+        if name.startswith('_') or not inspect.isfunction(attr):
+            continue
+        setattr(connection_class, name, _profile_method(name, attr))
+
+
+def _uninstrument(connection_class):
+    for name, attr in list(vars(connection_class).items()):
+        original = getattr(attr, '_db_profile_original', None)
+        if original is not None:
+            setattr(connection_class, name, original)
+
+
+def setup(connection_class):
+    """Start profiling the statements if enabled in the configuration.
+
+    :param connection_class: database API class whose methods are tagged
+    """
+    global _profiler
+
+    if not CONF.db_profiler.enabled or _profiler is not None:
+        return
+
+    _profiler = StatementProfiler(CONF.db_profiler.report_interval,
+                                  CONF.db_profiler.slow_statements,
+                                  CONF.db_profiler.report_dir)
+    event.listen(Engine, 'before_cursor_execute',
+                 _profiler.before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute',
+                 _profiler.after_cursor_execute)
+    _instrument(connection_class)
+    LOG.info("Database profiling enabled, reporting to %s" %
+             _profiler.get_report_path())
+
+
+def teardown(connection_class):
+    """Stop profiling the statements"""
+    global _profiler
+
+    if _profiler is None:
+        return
+
+    event.remove(Engine, 'before_cursor_execute',
+                 _profiler.before_cursor_execute)
+    event.remove(Engine, 'after_cursor_execute',
+                 _profiler.after_cursor_execute)
+    _uninstrument(connection_class)
+    _profiler = None
+
+
+def get_profiler():
+    """Return the statement profiler, or None if profiling is disabled"""
+    return _profiler
+
+
+def load_reports(report_dir):
+    """Return the statistics written by the processes to a directory"""
+    reports = []
+    if not os.path.isdir(report_dir):
+        return reports
+    for filename in sorted(os.listdir(report_dir)):
+        if not (filename.startswith(REPORT_PREFIX) and
+                filename.endswith(REPORT_SUFFIX)):
+            continue
+        try:
+            with open(os.path.join(report_dir, filename)) as f:
+                reports.append(json.load(f))
+        except (IOError, OSError, ValueError) as e:
+            LOG.warning("Unable to read the database profile %s: %s" %
+                        (filename, e))
+    return reports
@@ -6,6 +6,8 @@
 
 import yaml
 
+from sysinv.common import yaml_utils
+
 
 class quoted_str(str):
     pass
@@ -13,7 +15,9 @@ class quoted_str(str):
 
 # force strings to be single-quoted to avoid interpretation as numeric values
 def quoted_presenter(dumper, data):
-    return dumper.represent_scalar(u'tag:yaml.org,2002:str', data, style="'")
+    return dumper.represent_scalar(u'tag:yaml.org,2002:str', str(data),
+                                   style="'")
 
 
 yaml.add_representer(quoted_str, quoted_presenter)
+yaml_utils.SafeDumper.add_representer(quoted_str, quoted_presenter)
@@ -21,6 +21,7 @@ from oslo_log import log as logging
 from sysinv.common import constants
 from sysinv.common import exception
 from sysinv.common import utils
+from sysinv.common import yaml_utils
 from sysinv.helm import common
 from sysinv.helm import utils as helm_utils
 
@@ -883,7 +884,7 @@ class HelmOperator(object):
                                            text=True)
 
             with open(tmppath, 'w') as f:
-                yaml.dump(overrides, f, default_flow_style=False)
+                yaml_utils.dump(overrides, f)
             os.close(fd)
             os.rename(tmppath, filepath)
             # Change the permission to be readable to non-root users(ie.Armada)
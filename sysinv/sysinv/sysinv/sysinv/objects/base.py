@@ -19,7 +19,10 @@
 """Sysinv common internal object model"""
 
 import collections
+import contextlib
 import copy
+import eventlet
+import functools
 import six
 
 from oslo_log import log as logging
@@ -39,6 +42,20 @@ def get_attrname(name):
     return '_%s' % name
 
 
+# Types of the values returned unchanged by the field typefns, the values
+# of these types are not coerced by SysinvObject.from_db_object_readonly.
+READONLY_PASSTHROUGH_TYPES = {
+    int: (int,),
+    obj_utils.int_or_none: (int, type(None)),
+    obj_utils.float_or_none: (float, type(None)),
+    obj_utils.str_or_none: (six.text_type, type(None)),
+    obj_utils.bool_or_none: (bool,),
+    obj_utils.uuid_or_none: (type(None),),
+    obj_utils.list_of_strings_or_none: (type(None),),
+    obj_utils.datetime_or_str_or_none: (type(None),),
+}
+
+
 def make_class_properties(cls):
     # NOTE(danms): Inherit SysinvObject's base fields only
     cls.fields.update(SysinvObject.fields)
@@ -80,12 +97,85 @@ class SysinvObjectMetaclass(type):
         if not hasattr(cls, '_obj_classes'):
             # This will be set in the 'SysinvObject' class.
             cls._obj_classes = collections.defaultdict(list)
+        elif dict_.get('_compact'):
+            # NOTE: The compact class of an object inherits its properties
+            # and is hydrated as the object class.
+            pass
         else:
             # Add the subclass to SysinvObject._obj_classes
             make_class_properties(cls)
             cls._obj_classes[cls.obj_name()].append(cls)
 
 
+class CompactObjectMixin(object):
+    """Mixin class of the compact classes of the objects.
+
+    The fields, changed fields and context are stored in slots, and the
+    set of changed fields is only allocated when a field is changed. The
+    object classes define no __slots__, so the instances still have a
+    __dict__; it only holds the attributes set besides the fields.
+    """
+    __slots__ = ()
+
+    def __init__(self):
+        self._changes = None
+        self._context = None
+
+    @property
+    def _changed_fields(self):
+        if self._changes is None:
+            self._changes = set()
+        return self._changes
+
+    @_changed_fields.setter
+    def _changed_fields(self, value):
+        self._changes = value
+
+    def __deepcopy__(self, memo):
+        cls = self.__class__
+        result = cls.__new__(cls)
+        memo[id(self)] = result
+        for name in cls.__slots__:
+            if name == '_context' or not hasattr(self, name):
+                continue
+            setattr(result, name, copy.deepcopy(getattr(self, name), memo))
+        return result
+
+    def obj_what_changed(self):
+        """Returns a set of fields that have been modified."""
+        return self._changes or set()
+
+    def obj_reset_changes(self, fields=None):
+        """Reset the list of fields that have been changed."""
+        if not fields:
+            self._changes = None
+        elif self._changes:
+            self._changes -= set(fields)
+
+
+@contextlib.contextmanager
+def compact_objects(enabled=True):
+    """Convert the database list results of the current greenthread to
+    the compact classes of the objects.
+    """
+    thread = eventlet.greenthread.getcurrent()
+    previous = getattr(thread, '_compact_objects', False)
+    thread._compact_objects = enabled
+    try:
+        yield
+    finally:
+        thread._compact_objects = previous
+
+
+def get_object_class(cls):
+    """Return the class the database results of the current greenthread
+    are converted to.
+    """
+    if getattr(eventlet.greenthread.getcurrent(), '_compact_objects', False):
+        return cls.compact_class()
+    return cls
+
+
 # These are decorators that mark an object's method as remotable.
 # If the metaclass is configured to forward object methods to an
 # indirection service, these will result in making an RPC call
@@ -194,6 +284,7 @@ class SysinvObject(object):
     obj_extra_fields = []
     _foreign_fields = {}
     _optional_fields = []
+    _compact = False
 
     def __init__(self):
         self._changed_fields = set()
@@ -484,6 +575,76 @@ class SysinvObject(object):
     def from_db_object(cls, db_obj):
         return cls._from_db_object(cls(), db_obj)
 
+    @classmethod
+    def compact_class(cls):
+        """Return the compact class of the object; a subclass storing the
+        fields in slots, with the same name, fields and methods. The
+        instances are smaller than those of the object class, but are not
+        free of a __dict__.
+        """
+        if cls._compact:
+            return cls
+        compact = cls.__dict__.get('_compact_class')
+        if compact is None:
+            slots = [get_attrname(name) for name in cls.fields]
+            slots.extend(['_changes', '_context'])
+            compact = type(cls)(cls.__name__, (CompactObjectMixin, cls),
+                                {'__slots__': tuple(slots),
+                                 '__module__': cls.__module__,
+                                 '_compact': True})
+            cls._compact_class = compact
+        return compact
+
+    @classmethod
+    def _get_readonly_fields(cls):
+        """Return the (name, attribute, typefn, passthrough types) of the
+        fields, cached by class.
+        """
+        readonly_fields = cls.__dict__.get('_readonly_fields')
+        if readonly_fields is None:
+            readonly_fields = [
+                (name, get_attrname(name), typefn,
+                 READONLY_PASSTHROUGH_TYPES.get(typefn, ()))
+                for name, typefn in cls.fields.items()]
+            cls._readonly_fields = readonly_fields
+        return readonly_fields
+
+    @classmethod
+    def from_db_object_readonly(cls, db_object):
+        """Converts a database entity to a formal object, for a result that
+        is not modified.
+
+        The values are read from the loaded entity state and are only
+        coerced by the field typefn when not already of the type it
+        returns. The fields are not recorded as changed.
+        """
+        obj = cls()
+        if cls._compact:
+            store = functools.partial(setattr, obj)
+        else:
+            store = obj.__dict__.__setitem__
+        values = db_object.__dict__
+        for name, attrname, typefn, passthrough in cls._get_readonly_fields():
+            if name in cls._foreign_fields:
+                value = obj._get_foreign_field(name, db_object)
+            elif name in values:
+                value = values[name]
+            elif (name in cls._optional_fields and
+                    not hasattr(db_object, name)):
+                continue
+            else:
+                value = db_object[name]
+
+            if type(value) not in passthrough:
+                try:
+                    value = typefn(value)
+                except Exception:
+                    LOG.exception(_('Error setting %(attr)s') %
+                                  {'attr': "%s.%s" % (cls.obj_name(), name)})
+                    raise
+            store(attrname, value)
+        return obj
+
 
 class ObjectListBase(object):
     """Mixin class for lists of objects.
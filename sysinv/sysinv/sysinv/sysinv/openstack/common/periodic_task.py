@@ -21,6 +21,7 @@ from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import timeutils
 from sysinv._i18n import _
+from sysinv.db.sqlalchemy import profiler
 
 periodic_opts = [
     cfg.BoolOpt('run_external_periodic_tasks',
@@ -177,7 +178,8 @@ class PeriodicTasks(object):
             self._periodic_last_run[task_name] = timeutils.utcnow()  # pylint: disable=no-member
 
             try:
-                task(self, context)
+                with profiler.scope('periodic:%s' % full_task_name):
+                    task(self, context)
             except Exception as e:
                 if raise_on_error:
                     raise
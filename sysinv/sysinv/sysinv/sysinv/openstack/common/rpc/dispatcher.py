@@ -83,6 +83,7 @@ On the client side, the same changes should be made as in example 1.  The
 minimum version that supports the new parameter should be specified.
 """
 
+from sysinv.db.sqlalchemy import profiler
 from sysinv.openstack.common.rpc import common as rpc_common
 from sysinv.openstack.common.rpc import serializer as rpc_serializer
 
@@ -169,7 +170,8 @@ class RpcDispatcher(object):
                 continue
             if is_compatible:
                 kwargs = self._deserialize_args(ctxt, kwargs)
-                result = getattr(proxyobj, method)(ctxt, **kwargs)
+                with profiler.scope('rpc:%s' % method):
+                    result = getattr(proxyobj, method)(ctxt, **kwargs)
                 return self.serializer.serialize_entity(ctxt, result)
 
         if had_compatible:
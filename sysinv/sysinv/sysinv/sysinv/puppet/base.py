@@ -31,6 +31,15 @@ class BasePuppet(object):
         'dcorch'
     ]
 
+    # Runtime puppet classes applying the host hiera data generated by the
+    # plugin. These scope a partial regeneration of the host hiera data to
+    # the affected plugins; a plugin that does not declare its runtime
+    # classes is always regenerated.
+    RUNTIME_CLASSES = None
+
+    # Plugins whose puppet context is consumed by this plugin
+    CONTEXT_PLUGINS = []
+
     def __init__(self, operator):
         self._operator = operator
 
@@ -68,6 +77,15 @@ class BasePuppet(object):
     def get_host_config_upgrade(self, host):
         return {}
 
+    def is_host_config_affected(self, classes):
+        """
+        Determine whether the host hiera data generated by the plugin is
+        applied by the supplied runtime puppet classes
+        """
+        if self.RUNTIME_CLASSES is None:
+            return True
+        return bool(set(classes) & set(self.RUNTIME_CLASSES))
+
     @staticmethod
     def quoted_str(value):
         return quoted_str(value)
@@ -76,11 +94,19 @@ class BasePuppet(object):
     def _generate_random_password(length=16):
         return utils.generate_random_password(length=length)
 
+    def _get_batch_cached(self, key, loader):
+        """
+        Retrieve a system scope value that is shared by all the hosts
+        generated within the current regeneration pass
+        """
+        return self._operator.batch_get(key, loader)
+
     def _get_database_password(self, service):
         passwords = self.context.setdefault('_database_passwords', {})
         if service not in passwords:
-            passwords[service] = self._get_keyring_password(service,
-                                                            'database')
+            passwords[service] = self._get_batch_cached(
+                ('_database_passwords', service),
+                lambda: self._get_keyring_password(service, 'database'))
         return passwords[service]
 
     def _get_database_username(self, service):
@@ -96,7 +122,8 @@ class BasePuppet(object):
     def _get_system(self):
         system = self.context.get('_system', None)
         if system is None:
-            system = self.dbapi.isystem_get_one()
+            system = self._get_batch_cached(
+                '_system', self.dbapi.isystem_get_one)
             self.context['_system'] = system
         return system
 
@@ -176,7 +203,9 @@ class BasePuppet(object):
         address_name = utils.format_address_name(name, networktype)
         address = addresses.get(address_name)
         if address is None:
-            address = self.dbapi.address_get_by_name(address_name)
+            address = self._get_batch_cached(
+                ('_address_names', address_name),
+                lambda: self.dbapi.address_get_by_name(address_name))
             addresses[address_name] = address
 
         return address
@@ -213,7 +242,9 @@ class BasePuppet(object):
         siblings (if supplied)
         """
         cpus = []
-        for c in self.dbapi.icpu_get_by_ihost(host.id):
+        host_cpus = self.dbapi.icpu_get_by_ihost(
+            host.id, profile=constants.DB_LOADING_PROFILE_PUPPET)
+        for c in host_cpus:
             if c.thread != 0 and not threads:
                 continue
             if c.allocated_function == function or not function:
@@ -229,9 +260,14 @@ class BasePuppet(object):
         return sorted(cpus, key=lambda c: c.cpu)
 
     def _get_service_parameters(self, service=None):
-        service_parameters = []
         if self.dbapi is None:
-            return service_parameters
+            return []
+        return self._get_batch_cached(
+            ('_service_parameters', service),
+            lambda: self._load_service_parameters(service))
+
+    def _load_service_parameters(self, service):
+        service_parameters = []
         try:
             service_parameters = self.dbapi.service_parameter_get_all(
                 service=service)
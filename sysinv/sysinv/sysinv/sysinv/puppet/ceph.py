@@ -25,6 +25,13 @@ LOG = logging.getLogger(__name__)
 class CephPuppet(openstack.OpenstackBasePuppet):
     """Class to encapsulate puppet operations for ceph storage configuration"""
 
+    RUNTIME_CLASSES = ['platform::ceph::mon::runtime',
+                       'platform::ceph::rgw::keystone::runtime',
+                       'platform::ceph::rgw::runtime',
+                       'platform::ceph::runtime_base',
+                       'platform::ceph::runtime_osds',
+                       'platform::ceph::upgrade::runtime']
+
     SERVICE_PORT_MON_V1 = 6789
     SERVICE_NAME_RGW = 'swift'
     SERVICE_PORT_RGW = 7480  # civetweb port
@@ -307,7 +314,8 @@ class CephPuppet(openstack.OpenstackBasePuppet):
         osd_config = {}
         journal_config = {}
 
-        disks = self.dbapi.idisk_get_by_ihost(host.id)
+        disks = self.dbapi.idisk_get_by_ihost(
+            host.id, profile=constants.DB_LOADING_PROFILE_PUPPET)
         stors = self.dbapi.istor_get_by_ihost(host.id)
 
         # setup pairings between the storage entity and the backing disks
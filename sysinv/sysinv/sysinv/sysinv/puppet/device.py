@@ -17,6 +17,8 @@ from sysinv.puppet import quoted_str
 class DevicePuppet(base.BasePuppet):
     """Class to encapsulate puppet operations for device configuration"""
 
+    RUNTIME_CLASSES = ['platform::devices::fpga::fec::runtime']
+
     def _get_device_id_index(self, host):
         """
         Builds a dictionary of device lists indexed by device id.
@@ -15,6 +15,8 @@ from sysinv.puppet import openstack
 class FmPuppet(openstack.OpenstackBasePuppet):
     """Class to encapsulate puppet operations for fm configuration"""
 
+    RUNTIME_CLASSES = ['platform::fm::runtime']
+
     SERVICE_NAME = 'fm'
     SERVICE_PORT = 18002
     BOOTSTRAP_MGMT_IP = '127.0.0.1'
@@ -72,6 +72,11 @@ IFACE_POST_DOWN_OP = 6
 class InterfacePuppet(base.BasePuppet):
     """Class to encapsulate puppet operations for interface configuration"""
 
+    RUNTIME_CLASSES = ['platform::interfaces::sriov::runtime',
+                       'platform::interfaces::sriov::vf::runtime',
+                       'platform::network::routes::runtime',
+                       'platform::network::runtime']
+
     def __init__(self, *args, **kwargs):
         super(InterfacePuppet, self).__init__(*args, **kwargs)
         self._openstack = None
@@ -184,7 +189,9 @@ class InterfacePuppet(base.BasePuppet):
         Builds a dictionary of port lists indexed by PCI address.
         """
         devices = collections.defaultdict(list)
-        for port in self.dbapi.ethernet_port_get_by_host(host.id):
+        ports = self.dbapi.ethernet_port_get_by_host(
+            host.id, profile=constants.DB_LOADING_PROFILE_PUPPET)
+        for port in ports:
             devices[port.pciaddr].append(port)
         return devices
 
@@ -209,12 +216,20 @@ class InterfacePuppet(base.BasePuppet):
         return results
 
     def _get_network_type_index(self):
+        return self._get_batch_cached(
+            '_network_type_index', self._build_network_type_index)
+
+    def _build_network_type_index(self):
         networks = {}
         for network in self.dbapi.networks_get_all():
             networks[network['type']] = network
         return networks
 
     def _get_gateway_index(self):
+        return self._get_batch_cached(
+            '_gateway_index', self._build_gateway_index)
+
+    def _build_gateway_index(self):
         """
         Builds a dictionary of gateway IP addresses indexed by network type.
         """
@@ -238,6 +253,10 @@ class InterfacePuppet(base.BasePuppet):
         return gateways
 
     def _get_floating_ip_index(self):
+        return self._get_batch_cached(
+            '_floating_ip_index', self._build_floating_ip_index)
+
+    def _build_floating_ip_index(self):
         """
         Builds a dictionary of floating ip addresses indexed by network type.
         """
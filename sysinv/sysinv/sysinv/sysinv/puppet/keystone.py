@@ -22,6 +22,11 @@ OPENSTACK_PASSWORD_RULES_FILE = '/etc/keystone/password-rules.conf'
 class KeystonePuppet(openstack.OpenstackBasePuppet):
     """Class to encapsulate puppet operations for keystone configuration"""
 
+    RUNTIME_CLASSES = ['openstack::keystone::endpoint::runtime',
+                       'openstack::keystone::endpoint::runtime::post',
+                       'openstack::keystone::password::runtime',
+                       'openstack::keystone::server::runtime']
+
     SERVICE_NAME = 'keystone'
     SERVICE_TYPE = 'identity'
     SERVICE_PORT = 5000
@@ -5,7 +5,10 @@
 #
 
 from __future__ import absolute_import
+import collections
 from eventlet.green import subprocess
+from eventlet import semaphore
+import hashlib
 import json
 import keyring
 import netaddr
@@ -13,6 +16,7 @@ import os
 import random
 import re
 import tempfile
+import time
 
 from oslo_log import log as logging
 from sysinv.common import constants
@@ -41,15 +45,50 @@ KUBECONFIG = "--kubeconfig=%s" % kubernetes.KUBERNETES_ADMIN_CONF
 KUBE_ROOTCA_CERT_NS = 'deployment'
 KUBE_ROOTCA_CERT_SECRET = 'system-kube-rootca-certificate'
 
+# Lifetime of the bootstrap tokens created for the join command (seconds)
+KUBEADM_TOKEN_TTL = 24 * 60 * 60
+
+# Lifetime of the certificates uploaded for the controller join command
+# (seconds); kubeadm deletes the uploaded-certs secret after two hours
+KUBEADM_CERTS_TTL = 2 * 60 * 60
+
+# Period a generated join command is reused for hosts of the same role
+# (seconds), counted from the upload of the certificates for controllers.
+# It is kept well under KUBEADM_CERTS_TTL so that a controller whose
+# hieradata embeds a reused join command still has more than an hour and a
+# half to join before its certificates are deleted. The reused token remains
+# valid for more than 23 hours.
+KUBEADM_JOIN_CMD_CACHE_PERIOD = 15 * 60
+
+KubeadmJoinCommand = collections.namedtuple(
+    'KubeadmJoinCommand', ['join_cmd', 'fingerprint', 'created_at'])
+
 
 class KubernetesPuppet(base.BasePuppet):
     """Class to encapsulate puppet operations for kubernetes configuration"""
+
+    RUNTIME_CLASSES = ['platform::kubernetes::bindmounts',
+                       'platform::kubernetes::certsans::runtime',
+                       'platform::kubernetes::duplex_migration::runtime',
+                       'platform::kubernetes::master::change_apiserver_parameters',
+                       'platform::kubernetes::master::upgrade_kubelet',
+                       'platform::kubernetes::pre_pull_control_plane_images',
+                       'platform::kubernetes::upgrade_control_plane',
+                       'platform::kubernetes::upgrade_first_control_plane',
+                       'platform::kubernetes::worker::pci::runtime',
+                       'platform::kubernetes::worker::upgrade_kubelet']
+    CONTEXT_PLUGINS = ['interface']
+
     ETCD_SERVICE_PORT = '2379'
 
     def __init__(self, *args, **kwargs):
         super(KubernetesPuppet, self).__init__(*args, **kwargs)
         self._kube_operator = kubernetes.KubeOperator()
 
+        # kubeadm join commands indexed by host personality
+        self._join_cmd_cache = {}
+        self._join_cmd_lock = semaphore.Semaphore()
+
     def get_system_config(self):
         config = {}
         config.update(
@@ -230,58 +269,16 @@ class KubernetesPuppet(base.BasePuppet):
         # The token expires after 24 hours and is needed for a reinstall.
         # The puppet manifest handles the case where the node already exists.
         try:
-            join_cmd_additions = ''
+            join_cmd = self._get_kubeadm_join_cmd(host.personality)
             if host.personality == constants.CONTROLLER:
-                # Upload the certificates used during kubeadm join
-                # The cert key will be printed in the last line of the output
-
-                # We will create a temp file with the kubeadm config
-                # We need this because the kubeadm config could have changed
-                # since bootstrap. Reading the kubeadm config each time
-                # it is needed ensures we are not using stale data
-
-                fd, temp_kubeadm_config_view = tempfile.mkstemp(
-                    dir='/tmp', suffix='.yaml')
-                with os.fdopen(fd, 'w') as f:
-                    cmd = ['kubectl', 'get', 'cm', '-n', 'kube-system',
-                           'kubeadm-config', '-o=jsonpath={.data.ClusterConfiguration}',
-                           KUBECONFIG]
-                    subprocess.check_call(cmd, stdout=f)  # pylint: disable=not-callable
-
-                # We will use a custom key to encrypt kubeadm certificates
-                # to make sure all hosts decrypt using the same key
-
-                key = str(keyring.get_password(CERTIFICATE_KEY_SERVICE,
-                        CERTIFICATE_KEY_USER))
-
-                with open(temp_kubeadm_config_view, "a") as f:
-                    f.write("---\r\napiVersion: kubeadm.k8s.io/v1beta2\r\n"
-                            "kind: InitConfiguration\r\ncertificateKey: "
-                            "{}".format(key))
-
-                cmd = ['kubeadm', 'init', 'phase', 'upload-certs',
-                       '--upload-certs', '--config',
-                       temp_kubeadm_config_view]
-
-                subprocess.check_call(cmd)  # pylint: disable=not-callable
-                join_cmd_additions = \
-                    " --control-plane --certificate-key %s" % key
-                os.unlink(temp_kubeadm_config_view)
-
                 # Configure the IP address of the API Server for the controller host.
                 # If not set the default network interface will be used, which does not
                 # ensure it will be the Cluster IP address of this host.
                 host_cluster_ip = self._get_host_cluster_address(host)
-                join_cmd_additions += \
+                join_cmd += \
                     " --apiserver-advertise-address %s" % host_cluster_ip
 
-            cmd = ['kubeadm', KUBECONFIG, 'token', 'create', '--print-join-command',
-                   '--description', 'Bootstrap token for %s' % host.hostname]
-            join_cmd = subprocess.check_output(cmd, universal_newlines=True)  # pylint: disable=not-callable
-            join_cmd_additions += \
-                " --cri-socket /var/run/containerd/containerd.sock"
-            join_cmd = join_cmd.strip() + join_cmd_additions
-            LOG.info('get_kubernetes_join_cmd join_cmd=%s' % join_cmd)
+            join_cmd += " --cri-socket /var/run/containerd/containerd.sock"
         except Exception:
             LOG.exception("Exception generating bootstrap token")
             raise exception.SysinvException(
@@ -289,6 +286,84 @@ class KubernetesPuppet(base.BasePuppet):
 
         return join_cmd
 
+    def _get_kubeadm_join_cmd(self, personality):
+        """Return the kubeadm join command shared by the hosts of the
+        supplied personality.
+
+        A join command is reused for KUBEADM_JOIN_CMD_CACHE_PERIOD seconds
+        after it was created, and after its certificates were uploaded for
+        controllers, unless the kubeadm configuration or the certificate key
+        changed.
+        """
+        # Reading the kubeadm config each time it is needed ensures we are
+        # not using stale data, but it is read once per regeneration pass.
+        kubeadm_config = self._get_batch_cached(
+            '_kubeadm_config', self._get_kubeadm_cluster_config)
+
+        key = None
+        fingerprint = hashlib.sha256(kubeadm_config.encode('utf-8'))
+        if personality == constants.CONTROLLER:
+            # We will use a custom key to encrypt kubeadm certificates
+            # to make sure all hosts decrypt using the same key
+            key = str(keyring.get_password(CERTIFICATE_KEY_SERVICE,
+                    CERTIFICATE_KEY_USER))
+            fingerprint.update(key.encode('utf-8'))
+        fingerprint = fingerprint.hexdigest()
+
+        with self._join_cmd_lock:
+            cached = self._join_cmd_cache.get(personality)
+            if (cached and cached.fingerprint == fingerprint and
+                    0 <= time.time() - cached.created_at <
+                    KUBEADM_JOIN_CMD_CACHE_PERIOD):
+                return cached.join_cmd
+
+            # taken before the certificates are uploaded, so that the join
+            # command expires before kubeadm deletes them
+            created_at = time.time()
+            join_cmd_additions = ''
+            if key is not None:
+                self._upload_kubeadm_certs(kubeadm_config, key)
+                join_cmd_additions = \
+                    " --control-plane --certificate-key %s" % key
+
+            cmd = ['kubeadm', KUBECONFIG, 'token', 'create',
+                   '--print-join-command',
+                   '--ttl', '%ds' % KUBEADM_TOKEN_TTL,
+                   '--description', 'Bootstrap token for %s hosts' % personality]
+            join_cmd = subprocess.check_output(cmd, universal_newlines=True)  # pylint: disable=not-callable
+            join_cmd = join_cmd.strip() + join_cmd_additions
+            LOG.info('get_kubernetes_join_cmd join_cmd=%s' % join_cmd)
+
+            self._join_cmd_cache[personality] = KubeadmJoinCommand(
+                join_cmd, fingerprint, created_at)
+        return join_cmd
+
+    def _get_kubeadm_cluster_config(self):
+        cmd = ['kubectl', 'get', 'cm', '-n', 'kube-system',
+               'kubeadm-config', '-o=jsonpath={.data.ClusterConfiguration}',
+               KUBECONFIG]
+        return subprocess.check_output(cmd, universal_newlines=True)  # pylint: disable=not-callable
+
+    def _upload_kubeadm_certs(self, kubeadm_config, key):
+        # Upload the certificates used during kubeadm join, encrypted with
+        # the supplied certificate key. We will create a temp file with the
+        # kubeadm config since it could have changed since bootstrap.
+        fd, temp_kubeadm_config_view = tempfile.mkstemp(
+            dir='/tmp', suffix='.yaml')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(kubeadm_config)
+                f.write("---\r\napiVersion: kubeadm.k8s.io/v1beta2\r\n"
+                        "kind: InitConfiguration\r\ncertificateKey: "
+                        "{}".format(key))
+
+            cmd = ['kubeadm', 'init', 'phase', 'upload-certs',
+                   '--upload-certs', '--config',
+                   temp_kubeadm_config_view]
+            subprocess.check_call(cmd)  # pylint: disable=not-callable
+        finally:
+            os.unlink(temp_kubeadm_config_view)
+
     def _get_etcd_endpoint(self):
         addr = self._format_url_address(self._get_cluster_host_address())
         protocol = "http"
@@ -495,7 +570,8 @@ class KubernetesPuppet(base.BasePuppet):
 
         # determine platform reserved memory
         k8s_reserved_mem = 0
-        host_memory = self.dbapi.imemory_get_by_ihost(host.id)
+        host_memory = self.dbapi.imemory_get_by_ihost(
+            host.id, profile=constants.DB_LOADING_PROFILE_PUPPET)
         numa_memory = utils.get_numa_index_list(host_memory)
         for node, memory in numa_memory.items():
             reserved_mib = memory[0].platform_reserved_mib
@@ -13,6 +13,9 @@ from sysinv.puppet import base
 
 class LdapPuppet(base.BasePuppet):
     """Class to encapsulate puppet operations for ldap configuration"""
+
+    RUNTIME_CLASSES = ['platform::ldap::client::runtime']
+
     SERVICE_NAME = 'open-ldap'
 
     def get_secure_static_config(self):
@@ -16,6 +16,11 @@ from sysinv.puppet import interface
 class NetworkingPuppet(base.BasePuppet):
     """Class to encapsulate puppet operations for networking configuration"""
 
+    RUNTIME_CLASSES = ['platform::network::routes::runtime',
+                       'platform::network::runtime',
+                       'platform::ptpinstance::runtime']
+    CONTEXT_PLUGINS = ['interface']
+
     def get_system_config(self):
         config = {}
         config.update(self._get_pxeboot_network_config())
@@ -13,6 +13,9 @@ from sysinv.puppet import openstack
 class NfvPuppet(openstack.OpenstackBasePuppet):
     """Class to encapsulate puppet operations for vim configuration"""
 
+    RUNTIME_CLASSES = ['platform::nfv::runtime',
+                       'platform::nfv::webserver::runtime']
+
     SERVICE_NAME = 'vim'
     SERVICE_PORT = 4545
     PLATFORM_KEYRING_SERVICE = 'CGCS'
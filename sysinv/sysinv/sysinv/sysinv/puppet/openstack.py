@@ -37,9 +37,10 @@ class OpenstackBasePuppet(base.BasePuppet):
     def _get_service_password(self, service):
         passwords = self.context.setdefault('_service_passwords', {})
         if service not in passwords:
-            passwords[service] = self._get_keyring_password(
-                service,
-                self.DEFAULT_SERVICE_PROJECT_NAME)
+            passwords[service] = self._get_batch_cached(
+                ('_service_passwords', service),
+                lambda: self._get_keyring_password(
+                    service, self.DEFAULT_SERVICE_PROJECT_NAME))
         return passwords[service]
 
     def _get_service_user_name(self, service):
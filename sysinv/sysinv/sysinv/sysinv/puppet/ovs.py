@@ -17,6 +17,9 @@ LOG = log.getLogger(__name__)
 class OVSPuppet(base.BasePuppet):
     """Class to encapsulate puppet operations for vswitch configuration"""
 
+    RUNTIME_CLASSES = []
+    CONTEXT_PLUGINS = ['interface', 'platform']
+
     def __init__(self, *args, **kwargs):
         super(OVSPuppet, self).__init__(*args, **kwargs)
 
@@ -340,7 +343,8 @@ class OVSPuppet(base.BasePuppet):
         config = {}
         vswitch_size = 0
 
-        host_memory = self.dbapi.imemory_get_by_ihost(host.id)
+        host_memory = self.dbapi.imemory_get_by_ihost(
+            host.id, profile=constants.DB_LOADING_PROFILE_PUPPET)
         for memory in host_memory:
             vswitch_size = memory.vswitch_hugepages_size_mib
             vswitch_pages = memory.vswitch_hugepages_reqd \
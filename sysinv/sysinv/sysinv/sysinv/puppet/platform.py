@@ -21,6 +21,29 @@ HOSTNAME_CLUSTER_HOST_SUFFIX = '-cluster-host'
 class PlatformPuppet(base.BasePuppet):
     """Class to encapsulate puppet operations for platform configuration"""
 
+    RUNTIME_CLASSES = ['platform::compute::config::runtime',
+                       'platform::compute::grub::runtime',
+                       'platform::dns::dnsmasq::runtime',
+                       'platform::drbd::cephmon::runtime',
+                       'platform::drbd::dc_vault::runtime',
+                       'platform::drbd::dockerdistribution::runtime',
+                       'platform::drbd::etcd::runtime',
+                       'platform::drbd::extension::runtime',
+                       'platform::drbd::pgsql::runtime',
+                       'platform::drbd::platform::runtime',
+                       'platform::drbd::rookmon::runtime',
+                       'platform::drbd::runtime',
+                       'platform::haproxy::restart::runtime',
+                       'platform::haproxy::runtime',
+                       'platform::remotelogging::runtime',
+                       'platform::sm::ceph::runtime',
+                       'platform::sm::norestart::runtime',
+                       'platform::sm::rgw::runtime',
+                       'platform::sm::stx_openstack::runtime',
+                       'platform::sm::update_oam_config::runtime',
+                       'platform::sysctl::controller::runtime',
+                       'platform::users::runtime']
+
     def get_static_config(self):
         config = {}
         config.update(self._get_static_software_config())
@@ -642,7 +665,8 @@ class PlatformPuppet(base.BasePuppet):
     def _get_host_memory_config(self, host):
         config = {}
         if constants.WORKER in utils.get_personalities(host):
-            host_memory = self.dbapi.imemory_get_by_ihost(host.id)
+            host_memory = self.dbapi.imemory_get_by_ihost(
+                host.id, profile=constants.DB_LOADING_PROFILE_PUPPET)
             memory_numa_list = utils.get_numa_index_list(host_memory)
 
             platform_cpus_no_threads = self._get_platform_cpu_list(host)
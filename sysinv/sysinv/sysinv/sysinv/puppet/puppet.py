@@ -8,41 +8,92 @@
 
 from __future__ import absolute_import
 
+import contextlib
 import eventlet
+import hashlib
 import io
 import os
 import tempfile
-import yaml
 
 from stevedore import extension
 from tsconfig import tsconfig
 
 from oslo_log import log as logging
+from oslo_utils import encodeutils
+from sysinv.common import exception
+from sysinv.common import yaml_utils
 from sysinv.puppet import common
 
 
 LOG = logging.getLogger(__name__)
 
+CONFIG_UUID_KEY = 'platform::config::params::config_uuid'
+
+# hieradata keys that change with every configuration generation and do not
+# reflect a change of the configuration data itself
+VOLATILE_CONFIG_KEYS = [
+    CONFIG_UUID_KEY,
+]
+
 
 def puppet_context(func):
     """Decorate to initialize the local threading context"""
     def _wrapper(self, *args, **kwargs):
         thread_context = eventlet.greenthread.getcurrent()
         setattr(thread_context, '_puppet_context', dict())
-        func(self, *args, **kwargs)
+        return func(self, *args, **kwargs)
     return _wrapper
 
 
+class PuppetBatchContext(object):
+    """System scope lookups shared across a hieradata regeneration pass
+
+    Host specific data continues to live in the per-call puppet context;
+    only lookups that are independent of the host being generated (the
+    system, networks, platform addresses, service parameters, passwords)
+    are kept here, for the duration of a single batch.
+    """
+
+    def __init__(self):
+        self._cache = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, loader):
+        try:
+            value = self._cache[key]
+        except KeyError:
+            self.misses += 1
+            value = self._cache[key] = loader()
+        else:
+            self.hits += 1
+        return value
+
+    def stats(self):
+        return {'entries': len(self._cache),
+                'hits': self.hits,
+                'misses': self.misses}
+
+
 class PuppetOperator(object):
     """Class to encapsulate puppet operations for System Inventory"""
 
-    def __init__(self, dbapi=None, path=None):
+    def __init__(self, dbapi=None, path=None, incremental=False):
         if path is None:
             path = common.PUPPET_HIERADATA_PATH
 
         self.dbapi = dbapi
         self.path = path
 
+        # when incremental, config files are only written if their content
+        # changed; the digests of the written files are indexed by path
+        self.incremental = incremental
+        self._config_digests = {}
+
+        # hiera keys generated by each plugin, indexed by host uuid; used to
+        # merge a partial regeneration into the existing host configuration
+        self._host_config_keys = {}
+
         puppet_plugins = extension.ExtensionManager(
             namespace='systemconfig.puppet_plugins',
             invoke_on_load=True, invoke_args=(self,))
@@ -62,6 +113,40 @@ class PuppetOperator(object):
     def config(self):
         return self.context.get('config', {})
 
+    @property
+    def batch(self):
+        thread_context = eventlet.greenthread.getcurrent()
+        return getattr(thread_context, '_puppet_batch', None)
+
+    @contextlib.contextmanager
+    def batch_context(self):
+        """Share system scope lookups across all the puppet operations
+        invoked by the current greenthread (and the workers it spawns)
+        within the block.  Nested batches reuse the outermost one.
+        """
+        batch = self.batch
+        if batch is not None:
+            yield batch
+            return
+
+        thread_context = eventlet.greenthread.getcurrent()
+        batch = PuppetBatchContext()
+        setattr(thread_context, '_puppet_batch', batch)
+        try:
+            yield batch
+        finally:
+            setattr(thread_context, '_puppet_batch', None)
+            LOG.info("Puppet batch context cache: %s" % batch.stats())
+
+    def batch_get(self, key, loader):
+        """Return the batch scoped value for key, loading it on a miss.
+        Outside of a batch the loader is always invoked.
+        """
+        batch = self.batch
+        if batch is None:
+            return loader()
+        return batch.get(key, loader)
+
     @puppet_context
     def create_static_config(self):
         """
@@ -134,7 +219,10 @@ class PuppetOperator(object):
 
     @puppet_context
     def update_system_config(self):
-        """Update the configuration for the system"""
+        """Update the configuration for the system
+
+        :returns: False if the system configuration is known to be unchanged
+        """
         try:
             # NOTE: order is important due to cached context data
             self.context['config'] = config = {}
@@ -142,7 +230,7 @@ class PuppetOperator(object):
                 config.update(puppet_plugin.obj.get_system_config())
 
             filename = 'system.yaml'
-            self._write_config(filename, config)
+            return self._write_config(filename, config)
         except Exception:
             LOG.exception("failed to create system config")
             raise
@@ -158,7 +246,10 @@ class PuppetOperator(object):
 
     @puppet_context
     def update_secure_system_config(self):
-        """Update the secure configuration for the system"""
+        """Update the secure configuration for the system
+
+        :returns: False if the secure configuration is known to be unchanged
+        """
         try:
             # NOTE: order is important due to cached context data
             self.context['config'] = config = {}
@@ -166,7 +257,7 @@ class PuppetOperator(object):
                 config.update(puppet_plugin.obj.get_secure_system_config())
 
             filename = 'secure_system.yaml'
-            self._write_config(filename, config)
+            return self._write_config(filename, config)
         except Exception:
             LOG.exception("failed to create secure_system config")
             raise
@@ -181,17 +272,170 @@ class PuppetOperator(object):
             raise
 
     @puppet_context
-    def update_host_config(self, host, config_uuid=None):
-        """Update the host hiera configuration files for the supplied host"""
+    def update_host_config(self, host, config_uuid=None, classes=None):
+        """Update the host hiera configuration files for the supplied host
+
+        If runtime puppet classes are supplied, only the plugins generating
+        the hiera data they apply are invoked and their output is merged
+        into the existing host configuration.
+
+        :param host: host object
+        :param config_uuid: configuration uuid
+        :param classes: puppet classes the configuration is applied with
+        :returns: False if the host configuration is known to be unchanged
+        """
 
         self.config_uuid = config_uuid
         self.context['config'] = config = {}
+
+        plugins = self._get_scoped_plugins(classes)
+        host_keys = self._host_config_keys.get(host.uuid)
+        if plugins is not None and host_keys is not None:
+            current = self._get_current_host_config(host)
+            if current is not None:
+                LOG.info("Updating hiera for host: %s with config_uuid: %s "
+                         "plugins: %s" % (host.hostname, config_uuid,
+                                          plugins))
+                return self._update_host_config_scoped(
+                    host, plugins, host_keys, current, config)
+
         LOG.info("Updating hiera for host: %s "
                  "with config_uuid: %s" % (host.hostname, config_uuid))
+        host_keys = {}
+        for puppet_plugin in self.puppet_plugins:
+            plugin_config = puppet_plugin.obj.get_host_config(host)
+            host_keys[puppet_plugin.name] = frozenset(plugin_config)
+            config.update(plugin_config)
+
+        changed = self._write_host_config(host, config)
+        self._host_config_keys[host.uuid] = host_keys
+        return changed
+
+    def _update_host_config_scoped(self, host, plugins, host_keys, current,
+                                   config):
+        """Regenerate the hiera data of the supplied plugins, in the supplied
+        order, and merge it, in plugin order, with the hiera data of the other
+        plugins from the current host configuration.
+        """
+        plugins_by_name = dict((p.name, p) for p in self.puppet_plugins)
+        plugin_configs = {}
+        for name in plugins:
+            plugin_configs[name] = \
+                plugins_by_name[name].obj.get_host_config(host)
+
+        host_keys = dict(host_keys)
         for puppet_plugin in self.puppet_plugins:
-            config.update(puppet_plugin.obj.get_host_config(host))
+            if puppet_plugin.name in plugin_configs:
+                plugin_config = plugin_configs[puppet_plugin.name]
+                host_keys[puppet_plugin.name] = frozenset(plugin_config)
+            else:
+                plugin_config = dict(
+                    (key, current[key])
+                    for key in host_keys.get(puppet_plugin.name, [])
+                    if key in current)
+            config.update(plugin_config)
+
+        # the configuration uuid changes with every generation
+        if self.config_uuid:
+            config[CONFIG_UUID_KEY] = self.config_uuid
+
+        changed = self._write_host_config(host, config)
+        self._host_config_keys[host.uuid] = host_keys
+        return changed
+
+    def _get_scoped_plugins(self, classes=None):
+        """Return the names of the plugins generating the host hiera data
+        applied by the supplied runtime puppet classes, in the order they
+        must be invoked, or None if the hiera data must be fully regenerated.
+
+        The plugins providing the puppet context consumed by the others are
+        invoked first, in dependency order, then the other plugins in plugin
+        order.
+        """
+        if not classes:
+            return None
 
-        self._write_host_config(host, config)
+        # every class must be declared by a plugin, otherwise the affected
+        # hiera data is unknown
+        declared = set()
+        for puppet_plugin in self.puppet_plugins:
+            declared.update(puppet_plugin.obj.RUNTIME_CLASSES or [])
+        if not set(classes) <= declared:
+            return None
+
+        scoped = [p for p in self.puppet_plugins
+                  if p.obj.is_host_config_affected(classes)]
+
+        plugins_by_name = dict((p.name[4:], p) for p in self.puppet_plugins)
+        ordered = []
+
+        def _add_context_plugins(puppet_plugin, path):
+            for name in puppet_plugin.obj.CONTEXT_PLUGINS:
+                context_plugin = plugins_by_name[name]
+                if context_plugin.name in path:
+                    raise exception.SysinvException(
+                        "Circular puppet plugin context dependency: %s" %
+                        ' -> '.join(path + [context_plugin.name]))
+                if context_plugin.name not in ordered:
+                    _add_context_plugins(context_plugin,
+                                         path + [context_plugin.name])
+                    ordered.append(context_plugin.name)
+
+        for puppet_plugin in scoped:
+            _add_context_plugins(puppet_plugin, [puppet_plugin.name])
+        ordered.extend(p.name for p in scoped if p.name not in ordered)
+        return ordered
+
+    def _get_current_host_config(self, host):
+        filepath = os.path.join(self.path, "%s.yaml" % host.mgmt_ip)
+        if not os.path.exists(filepath):
+            return None
+        return self._read_host_config(host, self.path)
+
+    def update_hosts_config(self, hosts, config_uuid=None, workers=1,
+                            classes=None):
+        """Update the host hiera configuration files for the supplied hosts
+
+        When more than one worker is requested the hosts are generated by a
+        bounded pool of green threads.  The green threads only overlap on
+        the calls that yield to the eventlet hub, such as the RPC and REST
+        requests of the plugins; psycopg2 is not green, so the database
+        queries of the hosts still run one after another.  The puppet
+        context and the database session are both scoped to the current
+        greenthread, so each worker generates its host in isolation and the
+        resulting hieradata is identical to the serial path.
+
+        :param hosts: list of host objects
+        :param config_uuid: configuration uuid
+        :param workers: maximum number of hosts generated concurrently
+        :param classes: puppet classes the configuration is applied with
+        :returns: list of hosts whose configuration may have changed
+        """
+        hosts = list(hosts)
+        workers = min(workers or 1, len(hosts))
+        if workers <= 1:
+            return [host for host in hosts
+                    if self.update_host_config(host, config_uuid,
+                                               classes=classes)]
+
+        LOG.info("Updating hiera for %d hosts using %d workers" %
+                 (len(hosts), workers))
+        batch = self.batch
+        pool = eventlet.greenpool.GreenPool(size=workers)
+        threads = [pool.spawn(self._update_host_config_worker,
+                              batch, host, config_uuid, classes)
+                   for host in hosts]
+        pool.waitall()
+
+        # re-raise the first failure, in host order, as the serial path would
+        return [host for host, thread in zip(hosts, threads)
+                if thread.wait()]
+
+    def _update_host_config_worker(self, batch, host, config_uuid, classes):
+        # propagate the batch context of the caller to the worker
+        thread_context = eventlet.greenthread.getcurrent()
+        setattr(thread_context, '_puppet_batch', batch)
+        return self.update_host_config(host, config_uuid, classes=classes)
 
     def read_host_config(self, host, version=None):
         """"""
@@ -223,7 +467,7 @@ class PuppetOperator(object):
 
         with io.open(os.path.join(path, filename), 'r',
                      encoding='utf-8') as yaml_file:
-            host_config = yaml.load(yaml_file)
+            host_config = yaml_utils.load(yaml_file)
 
         host_config.update(config)
 
@@ -232,6 +476,7 @@ class PuppetOperator(object):
     def remove_host_config(self, host):
         """Remove the configuration for the supplied host"""
         try:
+            self._host_config_keys.pop(host.uuid, None)
             filename = "%s.yaml" % host.mgmt_ip
             self._remove_config(filename)
         except Exception:
@@ -240,7 +485,7 @@ class PuppetOperator(object):
     def _write_host_config(self, host, config, path=None):
         """Update the configuration for a specific host"""
         filename = "%s.yaml" % host.mgmt_ip
-        self._write_config(filename, config, path)
+        return self._write_config(filename, config, path)
 
     def _read_host_config(self, host, path):
         filename = "%s.yaml" % host.mgmt_ip
@@ -251,29 +496,93 @@ class PuppetOperator(object):
         try:
             LOG.debug("Reading config at %s", filepath)
             with open(filepath, 'r') as f:
-                return yaml.load(f, Loader=yaml.Loader)
+                return yaml_utils.load(f)
         except Exception:
             LOG.exception("Failed to read config file at %s" % filepath)
             raise
 
+    @staticmethod
+    def _get_config_digests(content):
+        """Return the digests of the serialized configuration content; one
+        of the full content and one ignoring the volatile top level keys.
+        """
+        content = encodeutils.safe_encode(content)
+        volatile = tuple(encodeutils.safe_encode('%s:' % key)
+                         for key in VOLATILE_CONFIG_KEYS)
+        data = b''.join(line for line in content.splitlines(True)
+                        if not line.startswith(volatile))
+        return (hashlib.sha256(content).hexdigest(),
+                hashlib.sha256(data).hexdigest())
+
+    def _get_file_digests(self, filepath):
+        """Return the digests of the current config file, using the digest
+        index unless the file was modified since it was last indexed.
+        """
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+
+        stat_key = (stat.st_mtime, stat.st_size)
+        entry = self._config_digests.get(filepath)
+        if entry is None or entry[0] != stat_key:
+            with open(filepath, 'rb') as f:
+                entry = (stat_key, self._get_config_digests(f.read()))
+            self._config_digests[filepath] = entry
+        return entry[1]
+
     def _write_config(self, filename, config, path=None):
+        """Write the configuration file
+
+        In incremental mode the serialized configuration is compared with
+        the current file content and the write is skipped if they match.
+        The volatile keys are compared too, as puppet applies them, so a
+        host file is rewritten for every new config_uuid; they are only
+        ignored in the returned change status.
+
+        :returns: False if the configuration data is known to be unchanged,
+                  ignoring the volatile keys
+        """
         if path is None:
             path = self.path
         filepath = os.path.join(path, filename)
         try:
-            fd, tmppath = tempfile.mkstemp(dir=path, prefix=filename,
-                                           text=True)
-            with open(tmppath, 'w') as f:
-                yaml.dump(config, f, default_flow_style=False)
-            os.close(fd)
-            os.rename(tmppath, filepath)
+            if not self.incremental:
+                self._write_file(filename, path,
+                                 lambda f: yaml_utils.dump(config, f))
+                return True
+
+            content = yaml_utils.dump(config)
+            digests = self._get_config_digests(content)
+            current = self._get_file_digests(filepath)
+            if digests == current:
+                LOG.debug("Config file unchanged, skipping write: %s" %
+                          filepath)
+                return False
+
+            self._write_file(filename, path, lambda f: f.write(content))
+            stat = os.stat(filepath)
+            self._config_digests[filepath] = (
+                (stat.st_mtime, stat.st_size), digests)
+            return current is None or digests[1] != current[1]
         except Exception:
             LOG.exception("failed to write config file: %s" % filepath)
             raise
 
+    @staticmethod
+    def _write_file(filename, path, writer):
+        filepath = os.path.join(path, filename)
+        fd, tmppath = tempfile.mkstemp(dir=path, prefix=filename,
+                                       text=True)
+        with open(tmppath, 'w') as f:
+            writer(f)
+        os.close(fd)
+        os.rename(tmppath, filepath)
+
     def _remove_config(self, filename):
         filepath = os.path.join(self.path, filename)
         try:
+            self._config_digests.pop(filepath, None)
             if os.path.exists(filepath):
                 os.unlink(filepath)
         except Exception:
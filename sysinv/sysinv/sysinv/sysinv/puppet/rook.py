@@ -12,6 +12,8 @@ from sysinv.common.storage_backend_conf import StorageBackendConfig
 class RookPuppet(base.BasePuppet):
     """Class to encapsulate puppet operations for rook"""
 
+    RUNTIME_CLASSES = ['platform::rook::runtime']
+
     def get_system_config(self):
         ceph_rook_backend = StorageBackendConfig.get_backend_conf(
             self.dbapi, constants.SB_TYPE_CEPH_ROOK)
@@ -36,7 +38,8 @@ class RookPuppet(base.BasePuppet):
         # lvm named with ceph-xxxx is the disk provisioned by rook
         # system backup and restore will not erase these disk
         # when system restore, after unlock host, re-activate these vg
-        pvs = self.dbapi.ipv_get_by_ihost(host.id)
+        pvs = self.dbapi.ipv_get_by_ihost(
+            host.id, profile=constants.DB_LOADING_PROFILE_PUPPET)
         for pv in pvs:
             if pv.lvm_vg_name.startswith("ceph"):
                 rook_vgs.append(pv.lvm_vg_name)
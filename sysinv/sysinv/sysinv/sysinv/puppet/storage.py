@@ -14,6 +14,24 @@ from sysinv.puppet import base
 class StoragePuppet(base.BasePuppet):
     """Class to encapsulate puppet operations for storage configuration"""
 
+    RUNTIME_CLASSES = ['platform::drbd::cephmon::runtime',
+                       'platform::drbd::dc_vault::runtime',
+                       'platform::drbd::dockerdistribution::runtime',
+                       'platform::drbd::etcd::runtime',
+                       'platform::drbd::extension::runtime',
+                       'platform::drbd::pgsql::runtime',
+                       'platform::drbd::platform::runtime',
+                       'platform::drbd::rookmon::runtime',
+                       'platform::drbd::runtime',
+                       'platform::filesystem::backup::runtime',
+                       'platform::filesystem::conversion::runtime',
+                       'platform::filesystem::docker::runtime',
+                       'platform::filesystem::kubelet::runtime',
+                       'platform::filesystem::scratch::runtime',
+                       'platform::lvm::compute::runtime',
+                       'platform::lvm::controller::runtime',
+                       'platform::partitions::runtime']
+
     def get_system_config(self):
         config = {}
         config.update(self._get_filesystem_config())
@@ -69,8 +87,10 @@ class StoragePuppet(base.BasePuppet):
         return config
 
     def _get_partition_config(self, host):
-        disks = self.dbapi.idisk_get_by_ihost(host.id)
-        partitions = self.dbapi.partition_get_by_ihost(host.id)
+        disks = self.dbapi.idisk_get_by_ihost(
+            host.id, profile=constants.DB_LOADING_PROFILE_PUPPET)
+        partitions = self.dbapi.partition_get_by_ihost(
+            host.id, profile=constants.DB_LOADING_PROFILE_PUPPET)
 
         create_actions = []
         modify_actions = []
@@ -188,7 +208,8 @@ class StoragePuppet(base.BasePuppet):
         # - nova-local PVs    : controllers and all workers
 
         # Go through the PVs and
-        pvs = self.dbapi.ipv_get_by_ihost(host.id)
+        pvs = self.dbapi.ipv_get_by_ihost(
+            host.id, profile=constants.DB_LOADING_PROFILE_PUPPET)
         for pv in pvs:
             if pv.lvm_vg_name == constants.LVG_CGTS_VG:
                 # PVs for this volume group are only ever added, therefore the state of the PV doesn't matter. Make
@@ -280,7 +301,8 @@ class StoragePuppet(base.BasePuppet):
         return config
 
     def _get_worker_config(self, host):
-        pvs = self.dbapi.ipv_get_by_ihost(host.id)
+        pvs = self.dbapi.ipv_get_by_ihost(
+            host.id, profile=constants.DB_LOADING_PROFILE_PUPPET)
 
         final_pvs = []
         adding_pvs = []
@@ -323,7 +345,8 @@ class StoragePuppet(base.BasePuppet):
         removing_disks = []
 
         # add nova-local filter
-        pvs = self.dbapi.ipv_get_by_ihost(host.id)
+        pvs = self.dbapi.ipv_get_by_ihost(
+            host.id, profile=constants.DB_LOADING_PROFILE_PUPPET)
         for pv in pvs:
             if pv.lvm_vg_name == constants.LVG_NOVA_LOCAL:
                 if pv.pv_state == constants.PV_DEL:
@@ -0,0 +1,157 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""
+Tests for the sysinv agent disk monitor.
+"""
+
+import eventlet
+import mock
+
+from sysinv.agent import disk_monitor
+from sysinv.tests import base
+
+
+class FakeDevice(object):
+    def __init__(self, name, device_type='disk', action='add', parent=None):
+        self.sys_path = '/sys/block/%s' % name
+        self.device_node = '/dev/%s' % name
+        self.device_type = device_type
+        self.action = action
+        self.parent = parent
+
+    def find_parent(self, subsystem, device_type=None):
+        return self.parent
+
+
+class TestDiskMonitor(base.TestCase):
+
+    def setUp(self):
+        super(TestDiskMonitor, self).setUp()
+        self.disks = [FakeDevice('sda'), FakeDevice('sdb')]
+
+        self.disk_operator = mock.Mock()
+        self.disk_operator.idisk_get_device.side_effect = \
+            lambda device: {'device_node': device.device_node}
+        self.partition_operator = mock.Mock()
+        self.partition_operator.ipartition_get_device.side_effect = \
+            lambda device: [{'device_node': device.device_node + '1'}]
+
+        context = mock.Mock()
+        context.list_devices.side_effect = lambda **kw: list(self.disks)
+        p = mock.patch('pyudev.Context', return_value=context)
+        p.start()
+        self.addCleanup(p.stop)
+        p = mock.patch('pyudev.Monitor')
+        p.start()
+        self.addCleanup(p.stop)
+        p = mock.patch('eventlet.spawn')
+        p.start()
+        self.addCleanup(p.stop)
+
+        self.monitor = disk_monitor.DiskMonitor(self.disk_operator,
+                                                self.partition_operator)
+        self.monitor.start()
+
+    def _device_nodes(self, inventory):
+        return [item['device_node'] for item in inventory]
+
+    def test_not_started(self):
+        monitor = disk_monitor.DiskMonitor(self.disk_operator,
+                                           self.partition_operator)
+        monitor.idisk_get()
+        monitor.ipartition_get()
+        self.disk_operator.idisk_get.assert_called_once_with()
+        self.partition_operator.ipartition_get.assert_called_once_with(
+            skip_gpt_check=False)
+
+    def test_served_from_memory(self):
+        for _ in range(3):
+            self.assertEqual(self._device_nodes(self.monitor.idisk_get()),
+                             ['/dev/sda', '/dev/sdb'])
+            self.assertEqual(
+                self._device_nodes(self.monitor.ipartition_get()),
+                ['/dev/sda1', '/dev/sdb1'])
+        self.assertEqual(self.disk_operator.idisk_get_device.call_count, 2)
+        self.assertEqual(
+            self.partition_operator.ipartition_get_device.call_count, 2)
+
+    def test_events(self):
+        self.monitor.idisk_get()
+        self.monitor.ipartition_get()
+
+        # a partition created on a disk probes the disk only
+        partition = FakeDevice('sda1', device_type='partition',
+                               parent=self.disks[0])
+        self.monitor.handle_event(partition)
+        self.assertEqual(self.disk_operator.idisk_get_device.call_count, 3)
+        self.monitor.ipartition_get()
+        self.partition_operator.ipartition_get_device.assert_called_with(
+            self.disks[0])
+        self.assertEqual(
+            self.partition_operator.ipartition_get_device.call_count, 3)
+
+        self.monitor.handle_event(FakeDevice('sdc'))
+        self.monitor.handle_event(FakeDevice('sda', action='remove'))
+        self.assertEqual(self._device_nodes(self.monitor.idisk_get()),
+                         ['/dev/sdb', '/dev/sdc'])
+        self.assertEqual(self._device_nodes(self.monitor.ipartition_get()),
+                         ['/dev/sdb1', '/dev/sdc1'])
+
+    def test_events_coalesced(self):
+        self.monitor.idisk_get()
+
+        # a burst of events probes each disk once, after its last event
+        self.monitor.handle_events([
+            FakeDevice('sda1', device_type='partition',
+                       parent=self.disks[0]),
+            FakeDevice('sda2', device_type='partition',
+                       parent=self.disks[0]),
+            FakeDevice('sda', action='change'),
+            FakeDevice('sdc'),
+            FakeDevice('sdc', action='remove'),
+        ])
+        self.assertEqual(self.disk_operator.idisk_get_device.call_count, 3)
+        self.assertEqual(
+            self.disk_operator.idisk_get_device.call_args[0][0].sys_path,
+            '/sys/block/sda')
+        self.assertEqual(self._device_nodes(self.monitor.idisk_get()),
+                         ['/dev/sda', '/dev/sdb'])
+
+    @mock.patch('eventlet.hubs.trampoline')
+    def test_receive(self, mock_trampoline):
+        device = FakeDevice('sda')
+        self.monitor._monitor.poll.return_value = device
+        self.assertIs(self.monitor._receive(), device)
+        self.monitor._monitor.poll.assert_called_once_with(timeout=0)
+
+        # without select.poll, the device is received with receive_device
+        self.monitor._monitor.poll.side_effect = AttributeError
+        self.monitor._monitor.receive_device.return_value = ('add', device)
+        self.assertIs(self.monitor._receive(), device)
+        self.assertIs(self.monitor._receive(), device)
+        self.assertEqual(self.monitor._monitor.poll.call_count, 2)
+
+        mock_trampoline.side_effect = eventlet.Timeout
+        self.assertIsNone(self.monitor._receive(timeout=1))
+
+    def test_rescan(self):
+        self.monitor.idisk_get()
+        self.disks.append(FakeDevice('sdc'))
+        self.assertEqual(len(self.monitor.idisk_get()), 2)
+
+        self.monitor.rescan()
+        self.assertEqual(len(self.monitor.idisk_get()), 3)
+
+        self.config(disk_rescan_interval=0, group='agent')
+        self.disks.pop(0)
+        self.assertEqual(len(self.monitor.idisk_get()), 2)
+
+    def test_not_inventoried(self):
+        self.disk_operator.idisk_get_device.side_effect = lambda device: None
+        self.assertEqual(self.monitor.idisk_get(), [])
+        self.assertEqual(self.monitor.ipartition_get(), [])
+        self.partition_operator.ipartition_get_device.assert_not_called()
@@ -0,0 +1,135 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""
+Tests for the sysinv agent LVM snapshot.
+"""
+
+import json
+import mock
+
+from sysinv.agent import lvg
+from sysinv.agent import lvm_snapshot
+from sysinv.agent import pv
+from sysinv.tests import base
+
+CGTS_VG = {'vg_name': 'cgts-vg', 'vg_uuid': 'vg-uuid-1', 'vg_attr': 'wz--n-',
+           'max_lv': '0', 'lv_count': '3', 'max_pv': '0', 'pv_count': '1',
+           'vg_size': '107374182400', 'vg_extent_count': '25599',
+           'vg_free_count': '1024'}
+
+CEPH_VG = {'vg_name': 'ceph-1234', 'vg_uuid': 'vg-uuid-2',
+           'vg_attr': 'wz--n-', 'max_lv': '0', 'lv_count': '1',
+           'max_pv': '0', 'pv_count': '1', 'vg_size': '53687091200',
+           'vg_extent_count': '12799', 'vg_free_count': '0'}
+
+CGTS_PV = {'pv_name': '/dev/sda5', 'vg_name': 'cgts-vg',
+           'pv_uuid': 'pv-uuid-1', 'pv_size': '107374182400',
+           'pv_pe_count': '25599', 'pv_pe_alloc_count': '24575'}
+
+CEPH_PV = {'pv_name': '/dev/sdb', 'vg_name': 'ceph-1234',
+           'pv_uuid': 'pv-uuid-2', 'pv_size': '53687091200',
+           'pv_pe_count': '12799', 'pv_pe_alloc_count': '12799'}
+
+ORPHAN_PV = {'pv_name': '/dev/sdc', 'vg_name': '', 'pv_uuid': 'pv-uuid-3',
+             'pv_size': '1073741824', 'pv_pe_count': '0',
+             'pv_pe_alloc_count': '0'}
+
+
+def _fullreport(vgs, orphans=None):
+    report = [{'vg': [vg], 'pv': pvs, 'lv': lvs} for vg, pvs, lvs in vgs]
+    if orphans:
+        report.append({'vg': [], 'pv': orphans, 'lv': []})
+    return json.dumps({'report': report})
+
+
+DEFAULT_REPORT = _fullreport(
+    [(CGTS_VG, [CGTS_PV],
+      [{'lv_name': 'log-lv', 'vg_name': 'cgts-vg'},
+       {'lv_name': 'scratch-lv', 'vg_name': 'cgts-vg'},
+       {'lv_name': 'nova-pool', 'vg_name': 'cgts-vg'}])],
+    orphans=[ORPHAN_PV])
+
+ACCEPT_ALL_REPORT = _fullreport(
+    [(CGTS_VG, [CGTS_PV], []),
+     (CEPH_VG, [CEPH_PV],
+      [{'lv_name': 'osd-block-1', 'vg_name': 'ceph-1234'}])],
+    orphans=[ORPHAN_PV])
+
+
+class TestLVMSnapshot(base.TestCase):
+
+    def setUp(self):
+        super(TestLVMSnapshot, self).setUp()
+        lvm_snapshot.invalidate()
+        self.addCleanup(lvm_snapshot.invalidate)
+
+        self.commands = []
+        p = mock.patch('eventlet.green.subprocess.Popen',
+                       side_effect=self._popen)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def _popen(self, command, **kwargs):
+        self.commands.append(command)
+        process = mock.Mock(returncode=0)
+        if lvm_snapshot.ACCEPT_ALL_FILTER in command:
+            output = ACCEPT_ALL_REPORT
+        else:
+            output = DEFAULT_REPORT
+        process.communicate.return_value = (output, None)
+        return process
+
+    def test_report(self):
+        report = lvm_snapshot.get_report()
+        self.assertEqual([vg['vg_name'] for vg in report.vgs], ['cgts-vg'])
+        self.assertEqual([p['pv_name'] for p in report.pvs],
+                         ['/dev/sda5', '/dev/sdc'])
+        self.assertEqual(report.lv_names('cgts-vg'),
+                         ['log-lv', 'scratch-lv', 'nova-pool'])
+        self.assertTrue(report.has_pv('/dev/sda5'))
+        self.assertFalse(report.has_pv('/dev/sda'))
+
+    def test_shared_until_invalidated(self):
+        lvm_snapshot.get_report()
+        lvm_snapshot.get_report()
+        self.assertEqual(len(self.commands), 1)
+        lvm_snapshot.get_report(lvm_snapshot.ACCEPT_ALL_FILTER)
+        self.assertEqual(len(self.commands), 2)
+
+        lvm_snapshot.invalidate()
+        lvm_snapshot.get_report()
+        self.assertEqual(len(self.commands), 3)
+
+    def test_failure_not_shared(self):
+        with mock.patch('eventlet.green.subprocess.Popen',
+                        side_effect=OSError('lvm not found')):
+            self.assertEqual(lvm_snapshot.get_report().vgs, [])
+        self.assertEqual(len(lvm_snapshot.get_report().vgs), 1)
+
+    def test_operators(self):
+        ilvg = lvg.LVGOperator().ilvg_get()
+        ipv = pv.PVOperator().ipv_get()
+
+        # the report of each device filter is read once
+        self.assertEqual(len(self.commands), 2)
+
+        self.assertEqual(ilvg, [
+            {'lvm_vg_name': 'cgts-vg', 'lvm_vg_uuid': 'vg-uuid-1',
+             'lvm_vg_access': 'wz--n-', 'lvm_max_lv': 0, 'lvm_cur_lv': 2,
+             'lvm_max_pv': 0, 'lvm_cur_pv': 1, 'lvm_vg_size': 107374182400,
+             'lvm_vg_total_pe': 25599, 'lvm_vg_free_pe': 1024},
+            {'lvm_vg_name': 'ceph-1234', 'lvm_vg_uuid': 'vg-uuid-2',
+             'lvm_vg_access': 'wz--n-', 'lvm_max_lv': 0, 'lvm_cur_lv': 1,
+             'lvm_max_pv': 0, 'lvm_cur_pv': 1, 'lvm_vg_size': 53687091200,
+             'lvm_vg_total_pe': 12799, 'lvm_vg_free_pe': 0}])
+        self.assertEqual(ipv, [
+            {'lvm_pv_name': '/dev/sda5', 'lvm_vg_name': 'cgts-vg',
+             'lvm_pv_uuid': 'pv-uuid-1', 'lvm_pv_size': 107374182400,
+             'lvm_pe_total': 25599, 'lvm_pe_alloced': 24575},
+            {'lvm_pv_name': '/dev/sdb', 'lvm_vg_name': 'ceph-1234',
+             'lvm_pv_uuid': 'pv-uuid-2', 'lvm_pv_size': 53687091200,
+             'lvm_pe_total': 12799, 'lvm_pe_alloced': 12799}])
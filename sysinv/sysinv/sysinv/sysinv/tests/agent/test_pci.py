@@ -9,6 +9,9 @@ Tests for the sysinv agent pci utilities.
 """
 
 import mock
+import os
+import shutil
+import tempfile
 try:
     from contextlib import nested  # Python 2
 except ImportError:
@@ -23,6 +26,7 @@ except ImportError:
         with ExitStack() as stack:
             yield tuple(stack.enter_context(cm) for cm in contexts)
 
+from sysinv.agent import pci_ids
 from sysinv.agent.pci import PCIOperator
 from sysinv.agent.pci import PCI
 from sysinv.agent.manager import AgentManager
@@ -118,6 +122,198 @@ FAKE_DEVICES = [PCI(
     'b4:00.0', 'Processing accelerators', 'Intel Corporation [8086]', 'Device [0d8f]',
     '', 'Intel Corporation [8086]', 'Device [0000]')]
 
+FAKE_PCI_IDS = """\
+# List of PCI ID's
+8086  Intel Corporation
+\t10ed  82599 Ethernet Controller Virtual Function
+\t10fb  82599ES 10-Gigabit SFI/SFP+ Network Connection
+\t\t8086 0003  Ethernet Server Adapter X520-2
+C 02  Network controller
+\t00  Ethernet controller
+C 12  Processing accelerators
+"""
+
+FAKE_MODULES_ALIAS = """\
+# Aliases extracted from modules themselves.
+alias pci:v00008086d000010FBsv*sd*bc*sc*i* ixgbe
+alias pci:v00008086d000010EDsv*sd*bc*sc*i* ixgbevf
+alias vfio_pci:v*d*sv*sd*bc*sc*i* vfio_pci
+"""
+
+# sysfs of a NIC with a VF, and of an accelerator
+FAKE_SYSFS_DEVICES = {
+    '0000:81:00.0': {'vendor': '0x8086', 'device': '0x10fb',
+                     'class': '0x020000', 'revision': '0x01',
+                     'subsystem_vendor': '0x8086',
+                     'subsystem_device': '0x0003'},
+    '0000:81:10.0': {'vendor': '0x8086', 'device': '0x10ed',
+                     'class': '0x020000', 'revision': '0x01',
+                     'subsystem_vendor': '0x8086',
+                     'subsystem_device': '0x000c',
+                     'modalias': 'pci:v00008086d000010EDsv00008086'
+                                 'sd0000000Cbc02sc00i00'},
+    '0000:b4:00.0': {'vendor': '0x8086', 'device': '0x0d8f',
+                     'class': '0x120000', 'revision': '0x01',
+                     'subsystem_vendor': '0x8086',
+                     'subsystem_device': '0x0001'},
+}
+
+
+class TestPciIds(base.TestCase):
+
+    def setUp(self):
+        super(TestPciIds, self).setUp()
+        self.ids = pci_ids.PCIIds.parse(FAKE_PCI_IDS.splitlines())
+
+    def test_names(self):
+        self.assertEqual(self.ids.vendor_name(0x8086), 'Intel Corporation')
+        self.assertEqual(self.ids.vendor_name(0x8086, numeric=True),
+                         'Intel Corporation [8086]')
+        self.assertEqual(
+            self.ids.device_name(0x8086, 0x10fb, numeric=True),
+            '82599ES 10-Gigabit SFI/SFP+ Network Connection [10fb]')
+        self.assertEqual(
+            self.ids.subsystem_device_name(0x8086, 0x10fb, 0x8086, 0x0003),
+            'Ethernet Server Adapter X520-2')
+        self.assertEqual(self.ids.class_name(0x0200),
+                         'Ethernet controller')
+        self.assertEqual(self.ids.class_name(0x0200, numeric=True),
+                         'Ethernet controller [0200]')
+
+    def test_unknown_names(self):
+        self.assertEqual(self.ids.vendor_name(0x1af4), 'Vendor 1af4')
+        self.assertEqual(self.ids.device_name(0x8086, 0x1518),
+                         'Device 1518')
+        self.assertEqual(self.ids.device_name(0x8086, 0x1518, numeric=True),
+                         'Device [1518]')
+        self.assertEqual(
+            self.ids.subsystem_device_name(0x8086, 0x10fb, 0x8086, 0x0000,
+                                           numeric=True),
+            'Device [0000]')
+        # the name of the base class only includes the class number
+        self.assertEqual(self.ids.class_name(0x1200),
+                         'Processing accelerators [1200]')
+        self.assertEqual(self.ids.class_name(0x1300), 'Class 1300')
+
+    def test_module_aliases(self):
+        aliases = pci_ids.ModuleAliases.parse(FAKE_MODULES_ALIAS.splitlines())
+        self.assertEqual(aliases.module_name(
+            'pci:v00008086d000010EDsv00008086sd0000000Cbc02sc00i00'),
+            'ixgbevf')
+        self.assertIsNone(aliases.module_name(
+            'pci:v00008086d00000D8Fsv00008086sd00000001bc12sc00i00'))
+
+
+class TestPciSysfsScan(base.TestCase):
+
+    def setUp(self):
+        super(TestPciSysfsScan, self).setUp()
+        self.config(pci_sysfs_scan=True, group='agent')
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        sysfs = os.path.join(self.tmpdir, 'devices')
+        for address, attrs in FAKE_SYSFS_DEVICES.items():
+            os.makedirs(os.path.join(sysfs, address))
+            for attr, value in attrs.items():
+                with open(os.path.join(sysfs, address, attr), 'w') as f:
+                    f.write(value + '\n')
+        pf = os.path.join(sysfs, '0000:81:00.0')
+        vf = os.path.join(sysfs, '0000:81:10.0')
+        os.symlink(pf, os.path.join(vf, 'physfn'))
+        os.makedirs(os.path.join(self.tmpdir, 'drivers', 'vfio-pci'))
+        os.symlink(os.path.join(self.tmpdir, 'drivers', 'vfio-pci'),
+                   os.path.join(vf, 'driver'))
+
+        for target, value in [
+                ('sysinv.agent.pci.PCI_SYSFS_PATH', sysfs + '/'),
+                ('sysinv.agent.pci_ids.get_pci_ids',
+                 mock.Mock(return_value=pci_ids.PCIIds.parse(
+                     FAKE_PCI_IDS.splitlines()))),
+                ('sysinv.agent.pci_ids.get_module_aliases',
+                 mock.Mock(return_value=pci_ids.ModuleAliases.parse(
+                     FAKE_MODULES_ALIAS.splitlines())))]:
+            p = mock.patch(target, value)
+            p.start()
+            self.addCleanup(p.stop)
+        p = mock.patch('eventlet.green.subprocess.Popen')
+        self.mock_popen = p.start()
+        self.addCleanup(p.stop)
+        p = mock.patch.object(PCIOperator, 'get_lspci_output_by_addr')
+        self.mock_lspci = p.start()
+        self.addCleanup(p.stop)
+
+        self.pci_operator = PCIOperator()
+
+    def _fields(self, device):
+        return [device.pciaddr, device.pclass, device.pvendor, device.pdevice,
+                device.prevision, device.psvendor, device.psdevice]
+
+    def test_inics_get(self):
+        inics = self.pci_operator.inics_get()
+        self.assertEqual([self._fields(inic) for inic in inics], [
+            ['0000:81:00.0', 'Ethernet controller [0200]',
+             'Intel Corporation [8086]',
+             '82599ES 10-Gigabit SFI/SFP+ Network Connection [10fb]',
+             '-r01', 'Intel Corporation [8086]',
+             'Ethernet Server Adapter X520-2 [0003]']])
+        self.mock_popen.assert_not_called()
+
+    def test_pci_devices_get(self):
+        devices = self.pci_operator.pci_devices_get()
+        self.assertEqual([self._fields(device) for device in devices], [
+            ['0000:b4:00.0', 'Processing accelerators [1200]',
+             'Intel Corporation', 'Device 0d8f', '-r01', 'Intel Corporation',
+             'Device 0001']])
+        self.assertEqual(
+            len(self.pci_operator.pci_devices_get(vendor='8086',
+                                                  device='0d8f')), 1)
+        self.assertEqual(
+            len(self.pci_operator.pci_devices_get(vendor='8086',
+                                                  device='0b30')), 0)
+        self.mock_popen.assert_not_called()
+
+    def test_sriov_vf_names(self):
+        vfaddrs = ['0000:81:10.0']
+        self.assertEqual(self.pci_operator.get_pci_sriov_vf_driver_name(
+            '0000:81:00.0', vfaddrs), 'vfio-pci')
+        self.assertEqual(self.pci_operator.get_pci_sriov_vf_module_name(
+            '0000:81:00.0', vfaddrs), 'ixgbevf')
+        self.mock_lspci.assert_not_called()
+
+    def test_lspci(self):
+        self.config(pci_sysfs_scan=False, group='agent')
+        self.mock_popen.return_value.stdout = [
+            '0000:b4:00.0 "Processing accelerators" "Intel Corporation" '
+            '"Device 0d8f" -r01 "Intel Corporation" "Device 0001"\n']
+        devices = self.pci_operator.pci_devices_get()
+        self.assertEqual([self._fields(device) for device in devices], [
+            ['0000:b4:00.0', 'Processing accelerators', 'Intel Corporation',
+             'Device 0d8f', '-r01', 'Intel Corporation', 'Device 0001']])
+        self.assertEqual(self.mock_popen.call_args[0][0], ['lspci', '-Dm'])
+
+    def test_lspci_sriov_vf_names(self):
+        self.config(pci_sysfs_scan=False, group='agent')
+        self.mock_lspci.return_value = FAKE_LSPCI_OUTPUT['82:10.0']
+        vfaddrs = ['0000:81:10.0']
+        self.assertEqual(self.pci_operator.get_pci_sriov_vf_driver_name(
+            '0000:81:00.0', vfaddrs), 'vfio-pci')
+        self.assertEqual(self.pci_operator.get_pci_sriov_vf_module_name(
+            '0000:81:00.0', vfaddrs), 'ixgbevf')
+        self.assertEqual(self.mock_lspci.call_count, 2)
+
+    def test_names_differ_from_lspci(self):
+        # the sysfs scan reports the pci.ids names, which differ from the
+        # names lspci looks up in the udev hardware database
+        self.mock_popen.return_value.stdout = [
+            '0000:81:00.0 "Ethernet controller [0200]" '
+            '"Intel Corporation [8086]" "Ethernet 10G 2P X520 Adapter [10fb]" '
+            '-r01 "Intel Corporation [8086]" "10GbE 2P X520 Adapter [0003]"\n']
+        sysfs = self._fields(self.pci_operator.inics_get()[0])
+        self.config(pci_sysfs_scan=False, group='agent')
+        lspci = self._fields(self.pci_operator.inics_get()[0])
+        self.assertEqual(sysfs[0], lspci[0])
+        self.assertNotEqual(sysfs[3], lspci[3])
+
 
 class TestPciOperator(base.TestCase):
 
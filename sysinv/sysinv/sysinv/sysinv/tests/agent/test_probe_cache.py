@@ -0,0 +1,153 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""
+Tests for the sysinv agent disk probe cache.
+"""
+
+import mock
+import os
+import shutil
+import tempfile
+
+from sysinv.agent import disk
+from sysinv.agent import probe_cache
+from sysinv.tests import base
+
+
+class FakeDevice(dict):
+    def __init__(self, sys_path, **properties):
+        super(FakeDevice, self).__init__(properties)
+        self.sys_path = sys_path
+        self.sys_name = os.path.basename(sys_path)
+        self.device_node = '/dev/' + self.sys_name
+        self.device_number = 2048
+        self.device_type = 'disk'
+
+
+class TestProbeCache(base.TestCase):
+
+    def setUp(self):
+        super(TestProbeCache, self).setUp()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.path = os.path.join(self.tmpdir, 'probes')
+
+    def test_get(self):
+        cache = probe_cache.ProbeCache(self.path)
+        self.assertIsNone(cache.get('wwn-1', 'size_mib', ['sda', '1']))
+        cache.set('wwn-1', 'size_mib', ['sda', '1'], 512000)
+        self.assertEqual(cache.get('wwn-1', 'size_mib', ['sda', '1']),
+                         512000)
+        self.assertIsNone(cache.get('wwn-1', 'size_mib', ['sda', '2']))
+        self.assertIsNone(cache.get('wwn-1', 'model_num', ['sda', '1']))
+
+    def test_persistent(self):
+        probe_cache.ProbeCache(self.path).set('wwn-1', 'size_mib',
+                                              ['sda', '1'], 512000)
+        cache = probe_cache.ProbeCache(self.path)
+        self.assertEqual(cache.get('wwn-1', 'size_mib', ['sda', '1']),
+                         512000)
+
+    def test_corrupted(self):
+        with open(self.path, 'w') as f:
+            f.write('{"wwn-1": ')
+        cache = probe_cache.ProbeCache(self.path)
+        self.assertIsNone(cache.get('wwn-1', 'size_mib', ['sda', '1']))
+
+    def test_prune(self):
+        cache = probe_cache.ProbeCache(self.path)
+        cache.set('wwn-1', 'size_mib', ['sda', '1'], 512000)
+        cache.set('wwn-2', 'size_mib', ['sdb', '1'], 256000)
+        cache.prune(['wwn-2'])
+        cache = probe_cache.ProbeCache(self.path)
+        self.assertIsNone(cache.get('wwn-1', 'size_mib', ['sda', '1']))
+        self.assertEqual(cache.get('wwn-2', 'size_mib', ['sdb', '1']),
+                         256000)
+
+
+class TestDiskProbeCache(base.TestCase):
+
+    def setUp(self):
+        super(TestDiskProbeCache, self).setUp()
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.config(disk_probe_cache=os.path.join(self.tmpdir, 'probes'),
+                    group='agent')
+
+        # sysfs of a disk with a partition
+        self.sys_path = os.path.join(self.tmpdir, 'sda')
+        self._set_partition('sda1', '2048', '1024')
+        self.device = FakeDevice(self.sys_path, MAJOR='8',
+                                 ID_PATH='pci-0000:00:0d.0-ata-1.0',
+                                 DEVLINKS='/dev/disk/by-id/wwn-0x5000',
+                                 DEVNAME='/dev/sda',
+                                 USEC_INITIALIZED='1000',
+                                 ID_SERIAL_SHORT='VB1',
+                                 ID_PART_TABLE_TYPE='gpt')
+
+        self.probes = {}
+        for name, target, result in [
+                ('capacity', 'sysinv.common.utils.get_disk_capacity_mib',
+                 512000),
+                ('available', 'sysinv.agent.disk.DiskOperator.'
+                              'get_disk_available_mib', 1024),
+                ('model', 'sysinv.agent.disk.DiskOperator.get_disk_model',
+                 'VBOX HARDDISK')]:
+            p = mock.patch(target, return_value=result)
+            self.probes[name] = p.start()
+            self.addCleanup(p.stop)
+        for target in ['sysinv.agent.disk.DiskOperator.get_rootfs_node',
+                       'sysinv.agent.disk.DiskOperator.is_rotational']:
+            p = mock.patch(target, return_value=None)
+            p.start()
+            self.addCleanup(p.stop)
+
+    def _set_partition(self, name, start, size):
+        path = os.path.join(self.sys_path, name)
+        if not os.path.isdir(path):
+            os.makedirs(path)
+        for attribute, value in [('start', start), ('size', size)]:
+            with open(os.path.join(path, attribute), 'w') as f:
+                f.write(value + '\n')
+
+    def _call_counts(self):
+        return dict((name, probe.call_count)
+                    for name, probe in self.probes.items())
+
+    def test_cached(self):
+        for _ in range(2):
+            attr = disk.DiskOperator().idisk_get_device(self.device)
+            self.assertEqual(attr['size_mib'], 512000)
+            self.assertEqual(attr['available_mib'], 1024)
+            self.assertEqual(attr['capabilities']['model_num'],
+                             'VBOX HARDDISK')
+        self.assertEqual(self._call_counts(),
+                         {'capacity': 1, 'available': 1, 'model': 1})
+
+    def test_partition_changed(self):
+        operator = disk.DiskOperator()
+        operator.idisk_get_device(self.device)
+        self._set_partition('sda2', '4096', '1024')
+        operator.idisk_get_device(self.device)
+        self.assertEqual(self._call_counts(),
+                         {'capacity': 1, 'available': 2, 'model': 1})
+
+    def test_added_again(self):
+        operator = disk.DiskOperator()
+        operator.idisk_get_device(self.device)
+        self.device['USEC_INITIALIZED'] = '2000'
+        operator.idisk_get_device(self.device)
+        self.assertEqual(self._call_counts(),
+                         {'capacity': 2, 'available': 2, 'model': 2})
+
+    def test_disabled(self):
+        self.config(disk_probe_cache='', group='agent')
+        operator = disk.DiskOperator()
+        operator.idisk_get_device(self.device)
+        operator.idisk_get_device(self.device)
+        self.assertEqual(self._call_counts(),
+                         {'capacity': 2, 'available': 2, 'model': 2})
@@ -11,6 +11,7 @@ Tests for the API / address / methods.
 import mock
 import netaddr
 from six.moves import http_client
+from six.moves.urllib import parse
 
 from oslo_utils import uuidutils
 from sysinv.common import constants
@@ -397,6 +398,40 @@ class TestList(AddressTestCase):
         response = self.get_json(self.get_iface_scoped_url(interface_id))
         self.assertEqual([], response[self.RESULT_KEY])
 
+    def test_list_addresses_pages(self):
+        expected = [a['uuid'] for a in
+                    self.get_json(self.API_PREFIX)[self.RESULT_KEY]]
+        self.assertGreater(len(expected), 2)
+
+        addresses = []
+        marker = None
+        while True:
+            path = '%s?limit=2' % self.API_PREFIX
+            if marker:
+                path += '&marker=%s' % marker
+            response = self.get_json(path)
+            addresses.extend(a['uuid'] for a in response[self.RESULT_KEY])
+            if 'next' not in response:
+                break
+            # the next subset is resumed from an opaque cursor
+            marker = parse.parse_qs(
+                parse.urlparse(response['next']).query)['marker'][0]
+            self.assertFalse(uuidutils.is_uuid_like(marker))
+        self.assertEqual(addresses, expected)
+
+    def test_list_addresses_uuid_marker(self):
+        expected = [a['uuid'] for a in
+                    self.get_json(self.API_PREFIX)[self.RESULT_KEY]]
+        response = self.get_json('%s?limit=2&marker=%s' %
+                                 (self.API_PREFIX, expected[0]))
+        self.assertEqual([a['uuid'] for a in response[self.RESULT_KEY]],
+                         expected[1:3])
+
+    def test_list_addresses_invalid_marker(self):
+        response = self.get_json('%s?marker=invalid' % self.API_PREFIX,
+                                 expect_errors=True)
+        self.assertEqual(http_client.BAD_REQUEST, response.status_int)
+
 
 class TestPatch(AddressTestCase):
 
@@ -0,0 +1,54 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""
+Tests for the API /ethernet_ports/ methods.
+"""
+
+from sysinv.tests.api import base
+from sysinv.tests.db import base as dbbase
+from sysinv.tests.db import utils as dbutils
+
+
+class EthernetPortTestCase(base.FunctionalTest, dbbase.BaseHostTestCase):
+
+    def setUp(self):
+        super(EthernetPortTestCase, self).setUp()
+        self.host = self._create_test_host(personality='controller')
+        self.other_host = self._create_test_host(personality='worker',
+                                                 unit=1)
+        for host in [self.host, self.other_host]:
+            for index in range(2):
+                dbutils.create_test_ethernet_port(
+                    name='eth%s' % index, host_id=host.id,
+                    mac='08:00:27:ea:%02x:%02x' % (host.id, index),
+                    pciaddr='0000:00:0%s.0' % index)
+
+    def _get_port_names(self, response):
+        return sorted(port['name'] for port in response['ethernet_ports'])
+
+    def test_list(self):
+        response = self.get_json('/ethernet_ports')
+        self.assertEqual(len(response['ethernet_ports']), 4)
+
+    def test_list_by_host(self):
+        response = self.get_json('/ihosts/%s/ethernet_ports' %
+                                 self.host.uuid)
+        self.assertEqual(self._get_port_names(response), ['eth0', 'eth1'])
+        for port in response['ethernet_ports']:
+            self.assertEqual(port['host_uuid'], self.host.uuid)
+
+    def test_list_by_host_query(self):
+        response = self.get_json('/ethernet_ports?uuid=%s' %
+                                 self.other_host.uuid)
+        self.assertEqual(self._get_port_names(response), ['eth0', 'eth1'])
+        for port in response['ethernet_ports']:
+            self.assertEqual(port['host_uuid'], self.other_host.uuid)
+
+    def test_list_limit(self):
+        response = self.get_json('/ethernet_ports?limit=1')
+        self.assertEqual(len(response['ethernet_ports']), 1)
+        self.assertIn('next', response)
@@ -0,0 +1,169 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Test class for the address pool allocation index."""
+
+import collections
+import mock
+
+from sysinv.api.controllers.v1 import address_pool
+from sysinv.common import address_index
+from sysinv.common import exception
+from sysinv.tests import base
+from sysinv.tests.db import base as dbbase
+from sysinv.tests.db import utils as dbutils
+
+
+class AddressPoolIndexTestCase(base.TestCase):
+
+    def test_free_ranges(self):
+        index = address_index.AddressPoolIndex(
+            [('192.168.1.10', '192.168.1.19'), ('192.168.1.2', '192.168.1.5')],
+            4, [(1, '192.168.1.3'), (2, '192.168.1.12'), (3, '10.0.0.1')])
+        self.assertEqual(index.capacity, 14)
+        self.assertEqual(index.size, 12)
+        self.assertEqual(index.generation, (3, 3, None))
+        self.assertEqual(index.free_ranges(),
+                         [('192.168.1.2', '192.168.1.2'),
+                          ('192.168.1.4', '192.168.1.5'),
+                          ('192.168.1.10', '192.168.1.11'),
+                          ('192.168.1.13', '192.168.1.19')])
+
+    def test_allocate_release(self):
+        index = address_index.AddressPoolIndex(
+            [('192.168.1.2', '192.168.1.4')], 4, [])
+        index.allocate(1, '192.168.1.2')
+        index.allocate(2, '192.168.1.3')
+        self.assertEqual(index.first(), '192.168.1.4')
+        index.release('192.168.1.2')
+        self.assertEqual(index.first(), '192.168.1.2')
+        index.release('192.168.1.3')
+        self.assertEqual(index.free_ranges(),
+                         [('192.168.1.2', '192.168.1.4')])
+        self.assertEqual(index.generation, (0, 2, None))
+
+    def test_release_shared_address(self):
+        # an address used by two interfaces is free once both are destroyed
+        index = address_index.AddressPoolIndex(
+            [('192.168.1.2', '192.168.1.4')], 4,
+            [(1, '192.168.1.2'), (2, '192.168.1.2')])
+        index.release('192.168.1.2')
+        self.assertEqual(index.first(), '192.168.1.3')
+        index.release('192.168.1.2')
+        self.assertEqual(index.first(), '192.168.1.2')
+
+    def test_following(self):
+        index = address_index.AddressPoolIndex(
+            [('fd00::2', 'fd00::5')], 6, [(1, 'fd00::3'), (2, 'fd00::5')])
+        self.assertEqual(index.following('fd00::2'), 'fd00::2')
+        self.assertEqual(index.following('fd00::3'), 'fd00::4')
+        self.assertEqual(index.following('fd00::5'), 'fd00::2')
+
+    def test_random(self):
+        index = address_index.AddressPoolIndex(
+            [('192.168.1.2', '192.168.1.5'), ('192.168.1.10', '192.168.1.11')],
+            4, [(1, '192.168.1.5')])
+        with mock.patch('random.randint', return_value=0) as mock_randint:
+            self.assertEqual(index.random(), '192.168.1.2')
+            mock_randint.assert_called_once_with(0, 4)
+        with mock.patch('random.randint', return_value=3):
+            self.assertEqual(index.random(), '192.168.1.10')
+        with mock.patch('random.randint', return_value=4):
+            self.assertEqual(index.random(), '192.168.1.11')
+        index.allocate(2, '192.168.1.10')
+        with mock.patch('random.randint', return_value=3):
+            self.assertEqual(index.random(), '192.168.1.11')
+
+    def test_random_distribution(self):
+        # a free address following a long allocated run is not favoured
+        index = address_index.AddressPoolIndex(
+            [('192.168.1.1', '192.168.1.20')], 4,
+            [(i, '192.168.1.%d' % i) for i in range(2, 18)])
+        self.assertEqual(index.size, 4)
+        counts = collections.Counter(index.random() for _ in range(4000))
+        self.assertEqual(set(counts), set(['192.168.1.1', '192.168.1.18',
+                                           '192.168.1.19', '192.168.1.20']))
+        for count in counts.values():
+            self.assertGreater(count, 800)
+            self.assertLess(count, 1200)
+
+    def test_exhausted(self):
+        index = address_index.AddressPoolIndex(
+            [('192.168.1.2', '192.168.1.2')], 4, [(1, '192.168.1.2')])
+        self.assertEqual(index.size, 0)
+        self.assertIsNone(index.first())
+        self.assertIsNone(index.random())
+
+
+class AddressPoolAllocationTestCase(dbbase.DbTestCase):
+
+    def setUp(self):
+        super(AddressPoolAllocationTestCase, self).setUp()
+        self.pool = dbutils.create_test_address_pool(
+            name='test', network='192.168.100.0', prefix=24,
+            ranges=[['192.168.100.2', '192.168.100.6']])
+
+    def _create_address(self, address):
+        return dbutils.create_test_address(
+            family=4, address=address, prefix=24,
+            address_pool_id=self.pool.id)
+
+    def _allocate(self, order=address_pool.SEQUENTIAL_ALLOCATION):
+        return address_pool.AddressPoolController.allocate_address(
+            self.pool, dbapi=self.dbapi, order=order)
+
+    def test_allocate_sequential(self):
+        self._create_address('192.168.100.2')
+        self.assertEqual(self._allocate(), '192.168.100.3')
+        self._create_address('192.168.100.3')
+        self.assertEqual(self._allocate(), '192.168.100.4')
+
+    def test_allocate_updated_by_database_api(self):
+        self._allocate()
+        with mock.patch.object(self.dbapi, 'address_pool_get_addresses',
+                               wraps=self.dbapi.address_pool_get_addresses
+                               ) as get_addresses:
+            first = self._create_address('192.168.100.2')
+            self.assertEqual(self._allocate(), '192.168.100.3')
+            second = self._create_address('192.168.100.3')
+            self.dbapi.address_destroy(first.uuid)
+            self.assertEqual(self._allocate(), '192.168.100.2')
+            self.assertEqual(get_addresses.call_count, 0)
+            # destroying the greatest id of the pool discards the index
+            self.dbapi.address_destroy(second.uuid)
+            self.assertEqual(self._allocate(), '192.168.100.2')
+            self.assertEqual(get_addresses.call_count, 1)
+
+    def test_allocate_changed_outside_index(self):
+        self.assertEqual(self._allocate(), '192.168.100.2')
+        # an address created by another process does not update the index
+        with mock.patch.object(address_index, 'address_created'):
+            self._create_address('192.168.100.2')
+        self.assertEqual(self._allocate(), '192.168.100.3')
+
+    def test_allocate_updated_outside_index(self):
+        address = self._create_address('192.168.100.2')
+        self.assertEqual(self._allocate(), '192.168.100.3')
+        # an address updated by another process does not update the index
+        with mock.patch.object(address_index, 'invalidate'):
+            self.dbapi.address_update(address.uuid,
+                                      {'address': '192.168.100.3'})
+        self.assertEqual(self._allocate(), '192.168.100.2')
+
+    def test_allocate_ranges_updated(self):
+        self.assertEqual(self._allocate(), '192.168.100.2')
+        self.pool = self.dbapi.address_pool_update(
+            self.pool.uuid, {'ranges': [['192.168.100.10', '192.168.100.20']]})
+        self.assertEqual(self._allocate(), '192.168.100.10')
+
+    def test_allocate_exhausted(self):
+        for i in range(2, 7):
+            self._create_address('192.168.100.%d' % i)
+        self.assertRaises(exception.AddressPoolExhausted, self._allocate)
+
+    def test_allocate_invalid_order(self):
+        self.assertRaises(exception.AddressPoolInvalidAllocationOrder,
+                          self._allocate, 'invalid')
@@ -0,0 +1,46 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the delta reports of the inventory of the hosts."""
+
+from sysinv.common import inventory_report
+from sysinv.tests import base
+
+
+class InventoryReportTestCase(base.TestCase):
+
+    def setUp(self):
+        super(InventoryReportTestCase, self).setUp()
+        self.pvs = [{'lvm_pv_name': '/dev/sda5', 'lvm_vg_name': 'cgts-vg'},
+                    {'lvm_pv_name': '/dev/sdb', 'lvm_vg_name': 'nova-local'}]
+
+    def test_version(self):
+        records = inventory_report.get_records(inventory_report.PV, self.pvs)
+        reordered = inventory_report.get_records(inventory_report.PV,
+                                                 reversed(self.pvs))
+        self.assertEqual(inventory_report.get_version(records),
+                         inventory_report.get_version(reordered))
+
+        changed = inventory_report.get_records(
+            inventory_report.PV, [dict(self.pvs[0], lvm_vg_name='other')])
+        self.assertNotEqual(inventory_report.get_version(records),
+                            inventory_report.get_version(changed))
+
+    def test_changes(self):
+        previous = inventory_report.get_records(inventory_report.PV,
+                                                self.pvs)
+        new_pv = {'lvm_pv_name': '/dev/sdc', 'lvm_vg_name': 'nova-local'}
+        current = inventory_report.get_records(
+            inventory_report.PV, [self.pvs[0], new_pv])
+
+        changed, removed = inventory_report.get_changes(previous, current)
+        self.assertEqual(changed, [new_pv])
+        self.assertEqual(removed, ['/dev/sdb'])
+
+        applied = inventory_report.apply_changes(inventory_report.PV,
+                                                 previous, changed, removed)
+        self.assertEqual(inventory_report.get_version(applied),
+                         inventory_report.get_version(current))
@@ -0,0 +1,115 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Test class for Sysinv yaml serialization."""
+
+import io
+import mock
+import yaml
+
+from six.moves import reload_module
+
+from sysinv.common import yaml_utils
+from sysinv import helm
+from sysinv import puppet
+from sysinv.tests import base
+
+
+class YamlUtilsTestCase(base.TestCase):
+
+    def setUp(self):
+        super(YamlUtilsTestCase, self).setUp()
+        shared = ['10.10.10.2', '10.10.10.3']
+        shared_rule = {'port': 443, 'proto': 'tcp'}
+        self.data = {
+            'platform::params::hostname': 'controller-0',
+            'platform::params::mgmt_interface': shared,
+            'platform::network::addresses': shared,
+            'platform::params::enabled': True,
+            'platform::params::mtu': 1500,
+            'platform::params::ratio': 1.5,
+            'platform::params::none': None,
+            'platform::params::empty': '',
+            'platform::params::numeric': '0123',
+            'platform::params::boolean': 'yes',
+            'platform::params::date': '2022-01-01',
+            'platform::params::multiline': 'line 1\nline 2\n',
+            'platform::params::unicode': u'caf\xe9',
+            'platform::params::long': 'value ' * 50,
+            'platform::params::quoted': "it's: quoted",
+            'platform::params::nested': {
+                'rules': [{'port': 22, 'proto': 'tcp'}, {'port': 80},
+                          shared_rule],
+                'ingress': [shared_rule],
+                'labels': {},
+                'empty': [],
+            },
+        }
+
+    def _dump(self, data):
+        # the serialization previously used for the generated files
+        return yaml.dump(data, default_flow_style=False)
+
+    def test_dump(self):
+        self.assertEqual(yaml_utils.dump(self.data), self._dump(self.data))
+
+    def test_dump_stream(self):
+        stream = io.StringIO()
+        self.assertIsNone(yaml_utils.dump(self.data, stream))
+        self.assertEqual(stream.getvalue(), self._dump(self.data))
+
+    def test_dump_pure_python(self):
+        # restore the dumpers the representers of the modules registered on
+        self.addCleanup(yaml_utils.__dict__.update, dict(yaml_utils.__dict__))
+        with mock.patch.dict(yaml.__dict__):
+            del yaml.__dict__['CSafeDumper']
+            del yaml.__dict__['CSafeLoader']
+            reload_module(yaml_utils)
+        self.assertFalse(yaml_utils.LIBYAML)
+        self.assertEqual(yaml_utils.dump(self.data), self._dump(self.data))
+        self.assertEqual(yaml_utils.load(self._dump(self.data)), self.data)
+
+    def test_dump_quoted_str(self):
+        self.data['platform::params::software_version'] = \
+            puppet.quoted_str('22.06')
+        self.data['platform::interface::pciaddr'] = \
+            helm.quoted_str('0000:81:00.0')
+        expected = self._dump(self.data)
+        self.assertIn("platform::params::software_version: '22.06'",
+                      expected)
+        with mock.patch('yaml.dump', wraps=yaml.dump) as mock_dump:
+            self.assertEqual(yaml_utils.dump(self.data), expected)
+        # serialized once, by the libyaml dumper if available
+        self.assertEqual(mock_dump.call_count, 1)
+        self.assertIs(mock_dump.call_args[1]['Dumper'], yaml_utils.SafeDumper)
+        if yaml_utils.LIBYAML:
+            self.assertTrue(issubclass(yaml_utils.SafeDumper,
+                                       yaml.CSafeDumper))
+
+    def test_dump_aliases(self):
+        # the shared objects are serialized once, as anchors and aliases
+        content = yaml_utils.dump(self.data)
+        self.assertIn('&id001', content)
+        self.assertIn('*id001', content)
+        self.assertEqual(content,
+                         yaml.safe_dump(self.data, default_flow_style=False))
+        self.assertEqual(content, self._dump(self.data))
+
+    def test_dump_python_types(self):
+        self.data['platform::params::range'] = (1, 2)
+        stream = io.StringIO()
+        yaml_utils.dump(self.data, stream)
+        self.assertEqual(stream.getvalue(), self._dump(self.data))
+
+    def test_load(self):
+        content = self._dump(self.data)
+        self.assertEqual(yaml_utils.load(content), self.data)
+        self.assertEqual(yaml_utils.load(io.StringIO(content)), self.data)
+
+    def test_load_python_types(self):
+        self.data['platform::params::range'] = (1, 2)
+        stream = io.StringIO(self._dump(self.data))
+        self.assertEqual(yaml_utils.load(stream), self.data)
@@ -36,6 +36,7 @@ from sysinv.agent import rpcapi as agent_rpcapi
 from sysinv.common import constants
 from sysinv.common import device as dconstants
 from sysinv.common import exception
+from sysinv.common import inventory_report
 from sysinv.common import kubernetes
 from sysinv.common import utils as cutils
 from sysinv.conductor import manager
@@ -63,6 +64,8 @@ class FakePuppetOperator(object):
     def __init__(self, db_api):
         self.dbapi = dbapi
         self.update_host_config = mock.MagicMock()
+        self.update_hosts_config = mock.MagicMock()
+        self.batch_context = mock.MagicMock()
         self.update_system_config = mock.MagicMock()
         self.update_secure_system_config = mock.MagicMock()
 
@@ -316,7 +319,7 @@ class ManagerTestCase(base.DbTestCase):
         self.mocked_get_kube_versions.start()
         self.addCleanup(self.mocked_get_kube_versions.stop)
 
-        self.service._puppet = mock.Mock()
+        self.service._puppet = mock.MagicMock()
         self.service._allocate_addresses_for_host = mock.Mock()
         self.service._update_pxe_config = mock.Mock()
         self.service._ceph_mon_create = mock.Mock()
@@ -601,6 +604,79 @@ class ManagerTestCase(base.DbTestCase):
         ret = self.service.ilvg_get_nova_ilvg_by_ihost(self.context, ihost['uuid'])
         self.assertEqual(ret, [])
 
+    def _inventory_rpcapi(self):
+        rpcapi = mock.Mock()
+        rpcapi.inventory_report_by_ihost.side_effect = \
+            self.service.inventory_report_by_ihost
+        return rpcapi
+
+    def test_inventory_report_by_ihost(self):
+        ihost = self._create_test_ihost()
+        rpcapi = self._inventory_rpcapi()
+        report = inventory_report.InventoryReport(inventory_report.DISK, 3600)
+        disks = [{'device_node': '/dev/sda', 'size_mib': 1024},
+                 {'device_node': '/dev/sdb', 'size_mib': 2048}]
+
+        with mock.patch.object(self.service,
+                               'idisk_update_by_ihost') as update:
+            self.assertTrue(report.report(rpcapi, self.context,
+                                          ihost['uuid'], disks))
+            update.assert_called_once_with(self.context, ihost['uuid'],
+                                           disks)
+
+            # only the version is reported while unchanged
+            self.assertTrue(report.report(rpcapi, self.context,
+                                          ihost['uuid'], disks))
+            self.assertEqual(update.call_count, 1)
+            kwargs = rpcapi.inventory_report_by_ihost.call_args[1]
+            self.assertEqual(kwargs['changed'], [])
+            self.assertEqual(kwargs['removed'], [])
+
+            disks = [{'device_node': '/dev/sda', 'size_mib': 4096}]
+            self.assertTrue(report.report(rpcapi, self.context,
+                                          ihost['uuid'], disks))
+            kwargs = rpcapi.inventory_report_by_ihost.call_args[1]
+            self.assertEqual(kwargs['changed'], disks)
+            self.assertEqual(kwargs['removed'], ['/dev/sdb'])
+            update.assert_called_with(self.context, ihost['uuid'], disks)
+
+    def test_inventory_report_by_ihost_resync(self):
+        ihost = self._create_test_ihost()
+        rpcapi = self._inventory_rpcapi()
+        report = inventory_report.InventoryReport(inventory_report.DISK, 3600)
+        disks = [{'device_node': '/dev/sda', 'size_mib': 1024}]
+
+        with mock.patch.object(self.service,
+                               'idisk_update_by_ihost') as update:
+            report.report(rpcapi, self.context, ihost['uuid'], disks)
+            # as after a restart of the conductor
+            self.service._inventory_reports = {}
+            rpcapi.inventory_report_by_ihost.reset_mock()
+            self.assertTrue(report.report(rpcapi, self.context,
+                                          ihost['uuid'], disks))
+            self.assertEqual(rpcapi.inventory_report_by_ihost.call_count, 2)
+            self.assertIsNone(
+                rpcapi.inventory_report_by_ihost.call_args[1].get(
+                    'base_version'))
+            self.assertEqual(update.call_count, 2)
+
+    def test_inventory_report_by_ihost_ignored(self):
+        ihost = self._create_test_ihost()
+        rpcapi = self._inventory_rpcapi()
+        report = inventory_report.InventoryReport(inventory_report.MEMORY,
+                                                  3600)
+        memory = [{'numa_node': 0, 'memtotal_mib': 1024}]
+
+        with mock.patch.object(self.service, 'imemory_update_by_ihost',
+                               return_value=False) as update:
+            self.assertFalse(report.report(rpcapi, self.context,
+                                           ihost['uuid'], memory))
+            # all the records are reported until applied
+            self.assertFalse(report.report(rpcapi, self.context,
+                                           ihost['uuid'], memory))
+            self.assertEqual(update.call_count, 2)
+            self.assertIsNone(report.version)
+
     def test_lldp_neighbour_tlv_update_exceed_length(self):
         # Set up
         ihost = self._create_test_ihost()
@@ -1583,6 +1659,39 @@ class ManagerTestCase(base.DbTestCase):
                          chost_updated.config_applied)
         self.assertEqual(self.alarm_raised, False)
 
+    def test_get_runtime_config_snapshot(self):
+        config_uuid = str(uuid.uuid4())
+        chost = self._create_test_ihost(
+            personality=constants.CONTROLLER,
+            hostname='controller-0',
+            uuid=str(uuid.uuid4()),
+            config_status=None,
+            config_applied=config_uuid,
+            config_target=config_uuid,
+            invprovision=constants.PROVISIONED,
+            administrative=constants.ADMIN_UNLOCKED,
+            operational=constants.OPERATIONAL_ENABLED,
+            availability=constants.AVAILABILITY_ONLINE,
+        )
+
+        snapshot = self.service.get_runtime_config_snapshot(self.context)
+        self.assertEqual(snapshot, {'deferred': [], 'in_progress': []})
+
+        self.mock_ready_to_apply_runtime_config.return_value = False
+        self.service.update_user_config(self.context)
+        chost_updated = self.dbapi.ihost_get(chost.uuid)
+
+        snapshot = self.service.get_runtime_config_snapshot(self.context)
+        self.assertEqual(len(snapshot['deferred']), 1)
+        deferred = snapshot['deferred'][0]
+        self.assertEqual(deferred['config_uuid'], chost_updated.config_target)
+        self.assertIn('deferred_at', deferred)
+
+        self.mock_ready_to_apply_runtime_config.return_value = True
+        self.service._audit_deferred_runtime_config(self.context)
+        snapshot = self.service.get_runtime_config_snapshot(self.context)
+        self.assertEqual(snapshot['deferred'], [])
+
     def test_deferred_multiple_runtime_config(self):
         # Create controller-0
         config_uuid = str(uuid.uuid4())
@@ -1653,6 +1762,176 @@ class ManagerTestCase(base.DbTestCase):
                          chost_updated.config_applied)
         self.assertEqual(self.alarm_raised, False)
 
+    def test_runtime_config_manifest_hieradata_unchanged(self):
+        # Create controller-0
+        config_uuid = str(uuid.uuid4())
+        chost = self._create_test_ihost(
+            personality=constants.CONTROLLER,
+            hostname='controller-0',
+            uuid=str(uuid.uuid4()),
+            config_status=None,
+            config_applied=config_uuid,
+            config_target=config_uuid,
+            invprovision=constants.PROVISIONED,
+            administrative=constants.ADMIN_UNLOCKED,
+            operational=constants.OPERATIONAL_ENABLED,
+            availability=constants.AVAILABILITY_ONLINE,
+        )
+
+        # Pretend the regenerated hiera data is unchanged
+        self.service._puppet.update_hosts_config.return_value = []
+        self.service._puppet.update_system_config.return_value = False
+        self.service._puppet.update_secure_system_config.return_value = False
+
+        with mock.patch.object(agent_rpcapi.AgentAPI,
+                               'config_apply_runtime_manifest') as mock_apply:
+            self.service.update_snmp_config(self.context)
+            mock_apply.assert_not_called()
+
+        # Verify the config is up to date without the manifest apply
+        chost_updated = self.dbapi.ihost_get(chost.uuid)
+        self.assertNotEqual(chost_updated.config_target, config_uuid)
+        self.assertEqual(chost_updated.config_target,
+                         chost_updated.config_applied)
+        self.assertEqual(self.alarm_raised, False)
+
+    def test_runtime_config_manifest_hieradata_unchanged_pending(self):
+        # Create controller-0 with a configuration not applied yet
+        chost = self._create_test_ihost(
+            personality=constants.CONTROLLER,
+            hostname='controller-0',
+            uuid=str(uuid.uuid4()),
+            config_status=None,
+            config_applied=str(uuid.uuid4()),
+            config_target=str(uuid.uuid4()),
+            invprovision=constants.PROVISIONED,
+            administrative=constants.ADMIN_UNLOCKED,
+            operational=constants.OPERATIONAL_ENABLED,
+            availability=constants.AVAILABILITY_ONLINE,
+        )
+
+        # Pretend the regenerated hiera data is unchanged
+        self.service._puppet.update_hosts_config.return_value = []
+        self.service._puppet.update_system_config.return_value = False
+        self.service._puppet.update_secure_system_config.return_value = False
+
+        # The manifest is applied, as it also applies the pending config
+        with mock.patch.object(agent_rpcapi.AgentAPI,
+                               'config_apply_runtime_manifest') as mock_apply:
+            self.service.update_snmp_config(self.context)
+            mock_apply.assert_called_once()
+
+        chost_updated = self.dbapi.ihost_get(chost.uuid)
+        self.assertNotEqual(chost_updated.config_target,
+                            chost_updated.config_applied)
+
+    def _create_test_controller_in_sync(self):
+        config_uuid = str(uuid.uuid4())
+        return self._create_test_ihost(
+            personality=constants.CONTROLLER,
+            hostname='controller-0',
+            uuid=str(uuid.uuid4()),
+            config_status=None,
+            config_applied=config_uuid,
+            config_target=config_uuid,
+            invprovision=constants.PROVISIONED,
+            administrative=constants.ADMIN_UNLOCKED,
+            operational=constants.OPERATIONAL_ENABLED,
+            availability=constants.AVAILABILITY_ONLINE,
+        )
+
+    def test_config_update_hosts_merged(self):
+        self.config(config_update_merge_window=60, group='conductor')
+        chost = self._create_test_controller_in_sync()
+        personalities = [constants.CONTROLLER]
+
+        config_uuid = self.service._config_update_hosts(
+            self.context, personalities)
+        with mock.patch.object(self.service,
+                               '_update_hosts_config_target') as mock_target:
+            self.assertEqual(
+                self.service._config_update_hosts(self.context, personalities),
+                config_uuid)
+            mock_target.assert_not_called()
+        self.assertEqual(self.dbapi.ihost_get(chost.uuid).config_target,
+                         config_uuid)
+
+        # updates requiring a reboot are a separate generation
+        self.assertNotEqual(
+            self.service._config_update_hosts(self.context, personalities,
+                                              reboot=True),
+            config_uuid)
+        self.assertEqual(self.service._get_config_update_stats(),
+                         {'open': 2, 'created': 2, 'merged': 1})
+
+    def test_config_update_hosts_merge_applied(self):
+        self.config(config_update_merge_window=60, group='conductor')
+        chost = self._create_test_controller_in_sync()
+        personalities = [constants.CONTROLLER]
+
+        config_uuid = self.service._config_update_hosts(
+            self.context, personalities)
+        self.dbapi.ihost_update(chost.uuid, {'config_applied': config_uuid})
+
+        # the host applied the generation, so the update needs a new one
+        self.assertNotEqual(
+            self.service._config_update_hosts(self.context, personalities),
+            config_uuid)
+        self.assertEqual(self.service._get_config_update_stats()['merged'], 0)
+
+    def test_config_update_hosts_merge_dispatched(self):
+        self.config(config_update_merge_window=60, group='conductor')
+        self._create_test_controller_in_sync()
+        personalities = [constants.CONTROLLER]
+        config_dict = {'personalities': personalities,
+                       'classes': ['platform::sysctl::controller::runtime']}
+
+        config_uuid = self.service._config_update_hosts(
+            self.context, personalities)
+        with mock.patch.object(agent_rpcapi.AgentAPI,
+                               'config_apply_runtime_manifest') as mock_apply:
+            self.service._config_apply_runtime_manifest(
+                self.context, config_uuid, config_dict)
+            mock_apply.assert_called_once()
+
+        # the runtime manifest was sent, so the update needs a new generation
+        self.assertNotEqual(
+            self.service._config_update_hosts(self.context, personalities),
+            config_uuid)
+        self.assertEqual(self.service._get_config_update_stats(),
+                         {'open': 1, 'created': 2, 'merged': 0})
+
+    def test_config_update_hosts_merge_deferred(self):
+        self.config(config_update_merge_window=60, group='conductor')
+        self._create_test_controller_in_sync()
+        personalities = [constants.CONTROLLER]
+        config_dict = {'personalities': personalities,
+                       'classes': ['platform::sysctl::controller::runtime']}
+
+        config_uuid = self.service._config_update_hosts(
+            self.context, personalities)
+        self.mock_ready_to_apply_runtime_config.return_value = False
+        with mock.patch.object(agent_rpcapi.AgentAPI,
+                               'config_apply_runtime_manifest') as mock_apply:
+            self.service._config_apply_runtime_manifest(
+                self.context, config_uuid, config_dict)
+            mock_apply.assert_not_called()
+
+        # the deferred runtime manifest was not sent yet
+        self.assertEqual(
+            self.service._config_update_hosts(self.context, personalities),
+            config_uuid)
+        self.assertEqual(self.service._get_config_update_stats()['merged'], 1)
+
+    def test_config_update_hosts_merge_disabled(self):
+        self._create_test_controller_in_sync()
+        personalities = [constants.CONTROLLER]
+        self.assertNotEqual(
+            self.service._config_update_hosts(self.context, personalities),
+            self.service._config_update_hosts(self.context, personalities))
+        self.assertEqual(self.service._get_config_update_stats(),
+                         {'open': 0, 'created': 2, 'merged': 0})
+
     def _raise_alarm(self, fault):
         self.alarm_raised = True
 
@@ -1709,6 +1988,53 @@ class ManagerTestCase(base.DbTestCase):
             mgmt_mac='22:44:33:55:11:77',
             mgmt_ip='1.2.3.6')
 
+    @mock.patch.object(agent_rpcapi.AgentAPI, 'agent_update')
+    def test_agent_update_request(self, mock_agent_update):
+        self._create_test_ihosts()
+        compute = self.dbapi.ihost_get_by_hostname('compute-0')
+        utils.create_test_idisk(device_node='/dev/sda',
+                                forihostid=compute.id)
+        utils.create_test_host_fs(name='scratch', forihostid=compute.id)
+
+        self.service._agent_update_request(self.context)
+
+        requests = dict((call[0][1], sorted(call[0][2]))
+                        for call in mock_agent_update.call_args_list)
+        self.assertEqual(len(requests), 3)
+        self.assertEqual(requests[compute.uuid],
+                         sorted([constants.PARTITION_AUDIT_REQUEST,
+                                 constants.PV_AUDIT_REQUEST,
+                                 constants.LVG_AUDIT_REQUEST]))
+        controller = self.dbapi.ihost_get_by_hostname('controller-0')
+        self.assertIn(constants.DISK_AUDIT_REQUEST,
+                      requests[controller.uuid])
+        self.assertIn(constants.FILESYSTEM_AUDIT_REQUEST,
+                      requests[controller.uuid])
+
+    @mock.patch.object(cutils, 'is_initial_config_complete',
+                       lambda: True)
+    def test_audit_kubernetes_labels(self):
+        self._create_test_ihosts()
+        hosts = self.dbapi.ihost_get_list()
+        controller = self.dbapi.ihost_get_by_hostname('controller-0')
+        compute = self.dbapi.ihost_get_by_hostname('compute-0')
+        for host, label_key in [(controller, 'present'),
+                                (controller, 'missing'),
+                                (compute, 'unknown-node')]:
+            utils.create_test_label(host_id=host.id,
+                                    label_key=label_key,
+                                    label_value='enabled')
+
+        node = mock.Mock()
+        node.metadata.name = 'controller-0'
+        node.metadata.labels = {'present': 'enabled'}
+        self.service._kube = mock.Mock()
+        self.service._kube.kube_get_nodes.return_value = [node]
+
+        self.service._audit_kubernetes_labels(hosts)
+        self.service._kube.kube_patch_node.assert_called_once_with(
+            'controller-0', {'metadata': {'labels': {'missing': 'enabled'}}})
+
     def _create_test_iports(self):
         enp25s0f0 = {'dev_id': 0, 'numa_node': 0, 'sriov_numvfs': 0, 'sriov_vfs_pci_address': '',
             'pdevice': 'Ethernet Controller X710 for 10GbE SFP+ [1572]', 'link_mode': '0',
@@ -2241,6 +2567,50 @@ class ManagerTestCase(base.DbTestCase):
         self.assertEqual(port.speed, inic_dict_array[-1]['speed'])
         self.assertEqual(port.dpdksupport, inic_dict_array[-1]['dpdksupport'])
 
+    def test_iport_update_by_ihost_report_renamed_device(self):
+        """Test the port inventory update with renamed PCI ids
+
+        The names of the vendor and device ids depend on the PCI ids database of the
+        host, so a port reported with the same ids under other names is not replaced
+        """
+        # Create compute-0 node
+        config_uuid = str(uuid.uuid4())
+        ihost = self._create_test_ihost(
+            hostname='compute-0', mgmt_mac='22:44:33:55:11:77', uuid=str(uuid.uuid4()),
+            personality=constants.WORKER, config_status=None, config_applied=config_uuid,
+            config_target=config_uuid, invprovision=constants.PROVISIONED,
+            administrative=constants.ADMIN_UNLOCKED, operational=constants.OPERATIONAL_ENABLED,
+            availability=constants.AVAILABILITY_ONLINE,
+        )
+
+        mock_find_local_mgmt_interface_vlan_id = mock.MagicMock()
+        p = mock.patch(
+            'sysinv.conductor.manager.ConductorManager._find_local_mgmt_interface_vlan_id',
+            mock_find_local_mgmt_interface_vlan_id)
+        p.start().return_value = 0
+        self.addCleanup(p.stop)
+
+        mock_socket_gethostname = mock.MagicMock()
+        p2 = mock.patch('socket.gethostname', mock_socket_gethostname)
+        p2.start().return_value = 'controller-0'
+        self.addCleanup(p2.stop)
+
+        inic_dict_array = self._create_test_iports()
+        self.service.iport_update_by_ihost(self.context, ihost['uuid'], inic_dict_array)
+        ports = {port.pciaddr: port.uuid
+                 for port in self.dbapi.ethernet_port_get_by_host(ihost['uuid'])}
+
+        for inic in inic_dict_array:
+            inic['pvendor'] = 'Intel Corp. [8086]'
+            inic['pdevice'] = 'Device [%s]' % inic['pdevice'][-5:-1].upper()
+
+        self.service.iport_update_by_ihost(self.context, ihost['uuid'], inic_dict_array)
+
+        self.assertEqual(
+            {port.pciaddr: port.uuid
+             for port in self.dbapi.ethernet_port_get_by_host(ihost['uuid'])},
+            ports)
+
     def test_iport_update_by_ihost_report_update_same_device_same_slot_diff_mac(self):
         """Test the interface MAC update
 
@@ -101,3 +101,19 @@ class RPCAPITestCase(base.DbTestCase):
 
     def test_update_dnsmasq_config(self):
         self._test_rpcapi('update_dnsmasq_config', 'call')
+
+    def test_inventory_report_by_ihost(self):
+        self._test_rpcapi('inventory_report_by_ihost',
+                          'call',
+                          ihost_uuid=self.fake_ihost['uuid'],
+                          resource='disk',
+                          report_version='2',
+                          base_version='1',
+                          changed=[],
+                          removed=['/dev/sdb'],
+                          version='1.2')
+
+    def test_get_runtime_config_snapshot(self):
+        self._test_rpcapi('get_runtime_config_snapshot',
+                          'call',
+                          version='1.3')
@@ -0,0 +1,109 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Test class for Sysinv conductor runtime configuration tracking."""
+
+from sysinv.conductor import runtime_config
+from sysinv.tests import base
+
+RUNTIME_MANIFEST = 'config_apply_runtime_manifest'
+UPDATE_FILE = 'config_update_file'
+ROUTES = 'platform::network::routes::runtime'
+DNS = 'platform::dns::runtime'
+
+
+class DeferredRuntimeConfigQueueTestCase(base.TestCase):
+
+    def setUp(self):
+        super(DeferredRuntimeConfigQueueTestCase, self).setUp()
+        self.queue = runtime_config.DeferredRuntimeConfigQueue()
+
+    def _config_dict(self, classes, host_uuids=None):
+        return {'personalities': ['controller'],
+                'classes': classes,
+                'host_uuids': host_uuids}
+
+    def test_add_duplicate(self):
+        self.queue.add(RUNTIME_MANIFEST, 'uuid-1', self._config_dict([ROUTES]))
+        self.queue.add(RUNTIME_MANIFEST, 'uuid-2', self._config_dict([DNS]))
+        replaced = self.queue.add(RUNTIME_MANIFEST, 'uuid-3',
+                                  self._config_dict([ROUTES]))
+
+        self.assertEqual(replaced['config_uuid'], 'uuid-1')
+        snapshot = self.queue.snapshot()
+        self.assertEqual([e['config_uuid'] for e in snapshot],
+                         ['uuid-3', 'uuid-2'])
+        self.assertEqual([e['replaced'] for e in snapshot], [1, 0])
+
+    def test_add_distinct(self):
+        self.queue.add(RUNTIME_MANIFEST, 'uuid-1', self._config_dict([ROUTES]))
+        self.queue.add(RUNTIME_MANIFEST, 'uuid-2',
+                       self._config_dict([ROUTES], ['host-1']))
+        self.queue.add(RUNTIME_MANIFEST, 'uuid-3', self._config_dict([ROUTES]),
+                       force=True)
+        self.assertEqual(len(self.queue), 3)
+
+    def test_add_update_file(self):
+        config_dict = {'personalities': ['controller']}
+        self.queue.add(UPDATE_FILE, 'uuid-1', config_dict, dedupe=False)
+        self.queue.add(UPDATE_FILE, 'uuid-2', config_dict, dedupe=False)
+        self.assertEqual(len(self.queue), 2)
+        self.assertNotIn('force', self.queue.snapshot()[0])
+
+    def test_pop(self):
+        self.queue.add(RUNTIME_MANIFEST, 'uuid-1', self._config_dict([ROUTES]))
+        self.queue.add(RUNTIME_MANIFEST, 'uuid-2', self._config_dict([DNS]))
+        keys = self.queue.keys()
+
+        self.assertEqual(self.queue.pop(keys[0])['config_uuid'], 'uuid-1')
+        # a duplicate deferred while popping is queued again
+        self.queue.add(RUNTIME_MANIFEST, 'uuid-3', self._config_dict([ROUTES]))
+        self.assertEqual(self.queue.pop(keys[1])['config_uuid'], 'uuid-2')
+        self.assertIsNone(self.queue.pop(keys[1]))
+        self.assertEqual([e['config_uuid'] for e in self.queue.snapshot()],
+                         ['uuid-3'])
+        self.assertTrue(self.queue)
+
+    def test_snapshot_copy(self):
+        self.queue.add(RUNTIME_MANIFEST, 'uuid-1', self._config_dict([ROUTES]))
+        self.queue.snapshot()[0]['config_dict']['classes'].append(DNS)
+        self.assertEqual(self.queue.snapshot()[0]['config_dict']['classes'],
+                         [ROUTES])
+
+
+class RuntimeClassApplyTrackerTestCase(base.TestCase):
+
+    def setUp(self):
+        super(RuntimeClassApplyTrackerTestCase, self).setUp()
+        self.tracker = runtime_config.RuntimeClassApplyTracker()
+
+    def test_in_progress(self):
+        self.tracker.add([ROUTES], ['host-1'])
+        self.assertTrue(self.tracker.is_in_progress([ROUTES]))
+        self.assertFalse(self.tracker.is_in_progress([DNS]))
+
+    def test_clear_class_host(self):
+        self.tracker.add([ROUTES, DNS], ['host-1', 'host-2'])
+        self.tracker.add([ROUTES], ['host-3'])
+
+        self.assertEqual(self.tracker.clear([ROUTES], ['host-1']), 1)
+        self.assertEqual(
+            [(e['class'], e['host_uuids']) for e in self.tracker.snapshot()],
+            [(DNS, ['host-1', 'host-2']), (ROUTES, ['host-3'])])
+
+    def test_clear_host(self):
+        self.tracker.add([ROUTES, DNS], ['host-1'])
+        self.tracker.add([ROUTES], ['host-2'])
+        self.assertEqual(self.tracker.clear(host_uuids=['host-1']), 2)
+        self.assertEqual(len(self.tracker), 1)
+
+    def test_clear_all_hosts(self):
+        self.tracker.add([ROUTES])
+        # an apply on all the hosts is not cleared by host
+        self.assertEqual(self.tracker.clear([ROUTES], ['host-1']), 0)
+        self.assertTrue(self.tracker.is_in_progress([ROUTES]))
+        self.assertEqual(self.tracker.clear(), 1)
+        self.assertFalse(self.tracker.is_in_progress([ROUTES]))
@@ -0,0 +1,218 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Database object conversion benchmark.
+
+Populates the unit test SQLite database with synthetic hosts and measures the
+throughput of the list queries and of the conversion of their results into
+sysinv objects; by the objectify decorator, which attaches the results to a
+read session and sets the fields through the object properties, and by the
+objectify_readonly decorator. The memory allocated per object is measured for
+the object classes and their compact classes.
+
+    python -m sysinv.tests.db.benchmark --hosts 20 --cpus 64 --output base.json
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import json
+import sys
+import time
+import tracemalloc
+import unittest
+
+from sysinv import objects
+from sysinv.common import constants
+from sysinv.db.sqlalchemy import api as sqlalchemy_api
+from sysinv.db.sqlalchemy import models
+from sysinv.db.sqlalchemy import objects as db_objects
+from sysinv.tests.db import base as dbbase
+from sysinv.tests.db import utils as dbutils
+
+FLEET_DEFAULTS = collections.OrderedDict([
+    ('hosts', 10),
+    ('cpus', 32),
+    ('ports', 8),
+])
+
+# list queries measured, as (name, model, object class, database API method)
+QUERIES = [
+    ('cpu', models.icpu, objects.cpu, 'icpu_get_list'),
+    ('memory', models.imemory, objects.memory, 'imemory_get_list'),
+    ('ethernet_port', models.EthernetPorts, objects.ethernet_port,
+     'ethernet_port_get_list'),
+]
+
+
+def _identity(result):
+    return result
+
+
+class Throughput(object):
+    """Accumulated objects converted and wall time of a conversion path"""
+
+    def __init__(self):
+        self.objects = 0
+        self.wall = 0.0
+
+    def measure(self, func, *args):
+        start = time.time()
+        result = func(*args)
+        self.wall += time.time() - start
+        self.objects += len(result)
+        return result
+
+    def as_dict(self):
+        return collections.OrderedDict([
+            ('objects', self.objects),
+            ('wall', round(self.wall, 6)),
+            ('per_second', int(self.objects / self.wall) if self.wall else 0),
+        ])
+
+
+class ObjectifyBenchmark(dbbase.BaseHostTestCase):
+    """Benchmark run as a test case to reuse the unit test database and
+    fixtures. It is not discovered by the test runner.
+    """
+
+    fleet = FLEET_DEFAULTS
+    repeat = 10
+
+    def setUp(self):
+        super(ObjectifyBenchmark, self).setUp()
+        for unit in range(self.fleet['hosts']):
+            host = self._create_test_host(constants.WORKER, unit=unit)
+            self._create_test_host_cpus(host, platform=2,
+                                        application=self.fleet['cpus'] - 2)
+            for index in range(self.fleet['ports']):
+                dbutils.create_test_ethernet_port(
+                    name='eth%s' % index,
+                    host_id=host.id,
+                    mac='02:11:22:%02x:%02x:%02x' % (
+                        host.id // 256, host.id % 256, index),
+                    pciaddr='0000:00:%02x.0' % index)
+
+    def _measure(self, model, klass, method):
+        connection = sqlalchemy_api.Connection()
+        getter = getattr(sqlalchemy_api.Connection, method)
+        convert = {
+            'objectify': db_objects.objectify(klass)(_identity),
+            'objectify_readonly': db_objects.objectify_readonly(klass)(
+                _identity),
+        }
+        query = {
+            'objectify': db_objects.objectify(klass)(getter.__wrapped__),
+            'objectify_readonly': getter,
+        }
+        results = collections.OrderedDict()
+        for path in ['objectify', 'objectify_readonly']:
+            results['convert:%s' % path] = Throughput()
+            results['query:%s' % path] = Throughput()
+
+        for _ in range(self.repeat):
+            for path in ['objectify', 'objectify_readonly']:
+                rows = sqlalchemy_api.model_query(model).all()
+                results['convert:%s' % path].measure(convert[path], rows)
+                results['query:%s' % path].measure(query[path], connection)
+        return results
+
+    def _measure_memory(self, model, klass):
+        rows = sqlalchemy_api.model_query(model).all()
+        results = collections.OrderedDict()
+        for path, obj_class in [('object', klass),
+                                ('compact', klass.compact_class())]:
+            tracemalloc.start()
+            try:
+                objs = [obj_class.from_db_object_readonly(row) for row in rows]
+                allocated = tracemalloc.get_traced_memory()[0]
+            finally:
+                tracemalloc.stop()
+            results['memory:%s' % path] = collections.OrderedDict([
+                ('objects', len(objs)),
+                ('allocated', allocated),
+                ('per_object', allocated // len(objs) if objs else 0),
+            ])
+        return results
+
+    def test_benchmark(self):
+        self._results = collections.OrderedDict([
+            ('fleet', self.fleet),
+            ('repeat', self.repeat),
+            ('python', sys.version.split()[0]),
+        ])
+        for name, model, klass, method in QUERIES:
+            results = self._measure(model, klass, method)
+            self._results[name] = collections.OrderedDict(
+                (path, throughput.as_dict())
+                for path, throughput in results.items())
+            self._results[name].update(self._measure_memory(model, klass))
+
+
+def compare(baseline, results):
+    """Print the conversion throughput and the memory per object of each
+    query and path.
+    """
+    print("%-50s %12s %12s" % ('measurement', 'result', 'baseline'))
+    for name, _, _, _ in QUERIES:
+        for path, metrics in results[name].items():
+            base_metrics = baseline.get(name, {}).get(path)
+            if base_metrics is None:
+                continue
+            key = 'per_object' if path.startswith('memory:') else 'per_second'
+            print("%-50s %12d %12d" %
+                  ('%s:%s:%s' % (name, path, key), metrics[key],
+                   base_metrics[key]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    for name, default in FLEET_DEFAULTS.items():
+        parser.add_argument('--%s' % name, type=int, default=default,
+                            help='number of %s (default: %s)' %
+                                 (name if name == 'hosts' else
+                                  '%s per host' % name, default))
+    parser.add_argument('--repeat', type=int,
+                        default=ObjectifyBenchmark.repeat,
+                        help='number of measures of each path (default: %s)'
+                             % ObjectifyBenchmark.repeat)
+    parser.add_argument('--output', help='write the results to a JSON file')
+    parser.add_argument('--compare',
+                        help='compare the results with a previous JSON file')
+    args = parser.parse_args(argv)
+
+    if args.cpus < 2:
+        parser.error('at least 2 cpus are required')
+    if args.ports > 256:
+        parser.error('at most 256 ports are supported')
+
+    ObjectifyBenchmark.fleet = collections.OrderedDict(
+        (name, getattr(args, name)) for name in FLEET_DEFAULTS)
+    ObjectifyBenchmark.repeat = args.repeat
+    benchmark = ObjectifyBenchmark('test_benchmark')
+    result = unittest.TestResult()
+    benchmark.run(result)
+    for _, error in result.errors + result.failures:
+        print(error, file=sys.stderr)
+    if not result.wasSuccessful():
+        return 1
+
+    results = benchmark._results
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+    elif not args.output:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
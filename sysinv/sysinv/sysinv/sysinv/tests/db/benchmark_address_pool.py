@@ -0,0 +1,142 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Address pool allocation benchmark.
+
+Populates the unit test SQLite database with an address pool and measures
+the bulk provisioning of host addresses from it; each allocation selects a
+free address of the pool and creates it, as done by assign_address. The
+allocation index of the pool is compared with the subtraction of every
+address of the pool from the pool ranges.
+
+    python -m sysinv.tests.db.benchmark_address_pool --addresses 5000
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import json
+import sys
+import time
+import unittest
+
+import netaddr
+
+from sysinv.api.controllers.v1 import address_pool
+from sysinv.common import address_index
+from sysinv.tests.db import base as dbbase
+from sysinv.tests.db import utils as dbutils
+
+POOL_DEFAULTS = collections.OrderedDict([
+    ('addresses', 2000),
+    ('hosts', 200),
+])
+
+POOL_NETWORK = netaddr.IPNetwork('fd00::/104')
+
+
+def _allocate_ipset(pool, dbapi, order):
+    """Select an address as done before the allocation index"""
+    defined = netaddr.IPSet()
+    for (start, end) in pool.ranges:
+        defined.update(netaddr.IPRange(start, end))
+    inuse = netaddr.IPSet()
+    for a in dbapi.addresses_get_by_pool(pool.id):
+        inuse.add(a.address)
+    available = defined - inuse
+    return str(next(available.iter_ipranges())[0])
+
+
+def _allocate_index(pool, dbapi, order):
+    return address_pool.AddressPoolController.allocate_address(
+        pool, dbapi=dbapi, order=order)
+
+
+class AddressPoolBenchmark(dbbase.DbTestCase):
+    """Benchmark run as a test case to reuse the unit test database and
+    fixtures. It is not discovered by the test runner.
+    """
+
+    pool_size = POOL_DEFAULTS
+
+    def setUp(self):
+        super(AddressPoolBenchmark, self).setUp()
+        self.pool = dbutils.create_test_address_pool(
+            name='benchmark', family=6, network=str(POOL_NETWORK.network),
+            prefix=POOL_NETWORK.prefixlen,
+            ranges=[[str(POOL_NETWORK[1]), str(POOL_NETWORK[-1])]])
+        for index in range(self.pool_size['addresses']):
+            self._create_address(str(POOL_NETWORK[index * 2 + 1]))
+
+    def _create_address(self, address):
+        return self.dbapi.address_create({'family': 6,
+                                          'address': address,
+                                          'prefix': POOL_NETWORK.prefixlen,
+                                          'address_pool_id': self.pool.id})
+
+    def _measure(self, allocate, order):
+        address_index.invalidate()
+        created = []
+        start = time.time()
+        for _ in range(self.pool_size['hosts']):
+            address = allocate(self.pool, self.dbapi, order)
+            created.append(self._create_address(address))
+        wall = time.time() - start
+        for address in created:
+            self.dbapi.address_destroy(address.uuid)
+        return collections.OrderedDict([
+            ('hosts', len(created)),
+            ('wall', round(wall, 6)),
+            ('per_second', int(len(created) / wall) if wall else 0),
+        ])
+
+    def test_benchmark(self):
+        self._results = collections.OrderedDict([
+            ('pool', self.pool_size),
+            ('python', sys.version.split()[0]),
+        ])
+        for path, allocate in [('ipset', _allocate_ipset),
+                               ('index', _allocate_index)]:
+            self._results[path] = self._measure(
+                allocate, address_pool.SEQUENTIAL_ALLOCATION)
+        self._results['index:random'] = self._measure(
+            _allocate_index, address_pool.RANDOM_ALLOCATION)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--addresses', type=int,
+                        default=POOL_DEFAULTS['addresses'],
+                        help='number of addresses allocated before the hosts '
+                             '(default: %s)' % POOL_DEFAULTS['addresses'])
+    parser.add_argument('--hosts', type=int, default=POOL_DEFAULTS['hosts'],
+                        help='number of hosts provisioned (default: %s)' %
+                             POOL_DEFAULTS['hosts'])
+    parser.add_argument('--output', help='write the results to a JSON file')
+    args = parser.parse_args(argv)
+
+    AddressPoolBenchmark.pool_size = collections.OrderedDict(
+        (name, getattr(args, name)) for name in POOL_DEFAULTS)
+    benchmark = AddressPoolBenchmark('test_benchmark')
+    result = unittest.TestResult()
+    benchmark.run(result)
+    for _, error in result.errors + result.failures:
+        print(error, file=sys.stderr)
+    if not result.wasSuccessful():
+        return 1
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(benchmark._results, f, indent=2)
+    else:
+        json.dump(benchmark._results, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2092,3 +2092,27 @@ class TestMigrations(BaseMigrationTestCase, WalkVersionsMixin):
             self.assertTrue(
                 isinstance(ptp_interface_maps.c[column].type,
                 getattr(sqlalchemy.types, column_type)))
+
+    def _check_124(self, engine, data):
+        # 124_cache_generations.py
+        cache_generations = db_utils.get_table(engine, 'cache_generations')
+        cache_generations_columns = {
+            'id': 'Integer',
+            'name': 'String',
+            'generation': 'Integer'
+        }
+        for column, column_type in cache_generations_columns.items():
+            self.assertTrue(
+                isinstance(cache_generations.c[column].type,
+                getattr(sqlalchemy.types, column_type)))
+        names = [row.name for row in cache_generations.select().execute()]
+        self.assertIn('i_system', names)
+
+    def _check_125(self, engine, data):
+        # 125_foreign_key_indexes.py
+        for table, columns in [('i_icpu', ['forihostid', 'forinodeid']),
+                               ('i_imemory', ['forinodeid']),
+                               ('addresses', ['address_pool_id']),
+                               ('lldp_tlvs', ['agent_id'])]:
+            indexes = sqlalchemy.inspect(engine).get_indexes(table)
+            self.assertIn(columns, [i['column_names'] for i in indexes])
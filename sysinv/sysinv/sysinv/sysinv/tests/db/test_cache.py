@@ -0,0 +1,125 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the database result cache."""
+
+import mock
+
+from sysinv.common import exception
+from sysinv.db import api as dbapi
+from sysinv.db.sqlalchemy import api as sqlalchemy_api
+from sysinv.db.sqlalchemy import cache
+from sysinv.db.sqlalchemy import models
+from sysinv.tests.db import base
+from sysinv.tests.db import utils
+
+
+class DbCacheTestCase(base.DbTestCase):
+
+    def setUp(self):
+        super(DbCacheTestCase, self).setUp()
+        self.dbapi = dbapi.get_instance()
+        self.system = utils.create_test_isystem()
+
+        self.config(enabled=True, ttl=60, stats_interval=0, group='db_cache')
+        cache.setup(sqlalchemy_api._get_cache_generations)
+        self.addCleanup(cache.teardown)
+        self.cache = cache.get_cache()
+
+    def _stats(self, table):
+        return self.cache.snapshot()[table]
+
+    def _increase_generation(self, table):
+        # as done by the database API of another process
+        with sqlalchemy_api._session_for_write() as session:
+            query = sqlalchemy_api.model_query(models.CacheGenerations,
+                                               session=session)
+            query.filter_by(name=table).update(
+                {'generation': models.CacheGenerations.generation + 1})
+
+    def test_hit(self):
+        first = self.dbapi.isystem_get_one()
+        second = self.dbapi.isystem_get_one()
+        self.assertEqual(first.uuid, second.uuid)
+        # the callers get their own copy
+        self.assertIsNot(first, second)
+        stats = self._stats(cache.SYSTEM)
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_invalidate_on_update(self):
+        self.dbapi.isystem_get_one()
+        self.dbapi.isystem_update(self.system.uuid, {'name': 'updated'})
+        self.assertEqual(self.dbapi.isystem_get_one().name, 'updated')
+        stats = self._stats(cache.SYSTEM)
+        self.assertEqual(stats['invalidations'], 1)
+        self.assertEqual(stats['misses'], 2)
+
+    def test_generation_of_other_process(self):
+        self.dbapi.isystem_get_one()
+        self._increase_generation(cache.SYSTEM)
+        self.dbapi.isystem_get_one()
+        # the generation is read once per ttl
+        self.assertEqual(self._stats(cache.SYSTEM)['hits'], 1)
+
+        self.cache.checked_at = 0
+        self.dbapi.isystem_get_one()
+        self.assertEqual(self._stats(cache.SYSTEM)['misses'], 2)
+
+    def test_not_found(self):
+        self.assertRaises(exception.NotFound,
+                          self.dbapi.software_upgrade_get_one)
+        self.assertRaises(exception.NotFound,
+                          self.dbapi.software_upgrade_get_one)
+        self.assertEqual(self._stats(cache.SOFTWARE_UPGRADE)['hits'], 1)
+
+        load_from = utils.create_test_load(software_version='1.0')
+        load_to = utils.create_test_load(software_version='2.0')
+        utils.create_test_upgrade(from_load=load_from.id,
+                                  to_load=load_to.id)
+        upgrade = self.dbapi.software_upgrade_get_one()
+        self.assertEqual(upgrade.to_release, '2.0')
+
+        self.dbapi.load_update(load_to.id, {'software_version': '3.0'})
+        upgrade = self.dbapi.software_upgrade_get_one()
+        self.assertEqual(upgrade.to_release, '3.0')
+
+    def test_arguments(self):
+        load = utils.create_test_load(software_version='1.0')
+        self.assertEqual(self.dbapi.load_get(load.id).uuid, load.uuid)
+        self.assertEqual(self.dbapi.load_get(load.uuid).id, load.id)
+        self.assertRaises(exception.LoadNotFound, self.dbapi.load_get, 99)
+        self.assertEqual(self._stats(cache.LOADS)['misses'], 3)
+
+    def test_loaded_while_invalidated(self):
+        def loader():
+            # the table is modified while the result is loaded
+            self.dbapi.isystem_update(self.system.uuid, {'name': 'updated'})
+            return 'stale'
+
+        self.cache.lookup(cache.SYSTEM, 'key', loader)
+        self.assertNotIn('key', self.cache.entries[cache.SYSTEM])
+
+    def test_disabled(self):
+        cache.teardown()
+        with mock.patch.object(sqlalchemy_api, 'model_query',
+                               wraps=sqlalchemy_api.model_query) as query:
+            self.dbapi.isystem_get_one()
+            self.dbapi.isystem_get_one()
+            self.assertEqual(query.call_count, 2)
+
+    def test_disabled_no_generation_update(self):
+        cache.teardown()
+        self.config(enabled=False, group='db_cache')
+        generations = sqlalchemy_api._get_cache_generations()
+        session_for_write = sqlalchemy_api._session_for_write
+        with mock.patch.object(sqlalchemy_api, '_session_for_write',
+                               wraps=session_for_write) as write:
+            sqlalchemy_api._invalidate_cache(cache.SYSTEM)
+            write.assert_not_called()
+        self.dbapi.isystem_update(self.system.uuid, {'name': 'updated'})
+        self.assertEqual(sqlalchemy_api._get_cache_generations(), generations)
@@ -0,0 +1,79 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the database statement profiling."""
+
+import fixtures
+
+from sysinv.cmd import dbprofile
+from sysinv.db import api as dbapi
+from sysinv.db.sqlalchemy import api as sqlalchemy_api
+from sysinv.db.sqlalchemy import profiler
+from sysinv.tests.db import base
+from sysinv.tests.db import utils
+
+
+class DbProfilerTestCase(base.DbTestCase):
+
+    def setUp(self):
+        super(DbProfilerTestCase, self).setUp()
+        self.dbapi = dbapi.get_instance()
+        self.report_dir = self.useFixture(fixtures.TempDir()).path
+        self.config(enabled=True, report_interval=0,
+                    report_dir=self.report_dir, group='db_profiler')
+        profiler.setup(sqlalchemy_api.Connection)
+        self.addCleanup(profiler.teardown, sqlalchemy_api.Connection)
+        self.profiler = profiler.get_profiler()
+
+        self.system = utils.create_test_isystem()
+        self.host = utils.create_test_ihost(forisystemid=self.system['id'])
+
+    def _get_scope(self, scope, method):
+        for entry in self.profiler.snapshot()['scopes']:
+            if entry['scope'] == scope and entry['method'] == method:
+                return entry
+        return None
+
+    def test_scope_method(self):
+        with profiler.scope('rpc:test'):
+            self.dbapi.ihost_get(self.host.uuid)
+            self.dbapi.ihost_get_list()
+
+        entry = self._get_scope('rpc:test', 'ihost_get')
+        self.assertIsNotNone(entry)
+        self.assertGreaterEqual(entry['count'], 1)
+        self.assertIsNotNone(self._get_scope('rpc:test', 'ihost_get_list'))
+        # the scope is restored
+        self.dbapi.ihost_get_list()
+        self.assertIsNotNone(
+            self._get_scope(profiler.SCOPE_NONE, 'ihost_get_list'))
+
+    def test_slowest_statements(self):
+        self.config(slow_statements=2, group='db_profiler')
+        self.profiler.slow_statements = 2
+        for duration in [0.1, 0.3, 0.2]:
+            self.profiler.record('SELECT %s' % duration, duration)
+
+        entry = self._get_scope(profiler.SCOPE_NONE, profiler.SCOPE_NONE)
+        self.assertEqual(entry['count'], 3)
+        self.assertEqual([s['statement'] for s in entry['slowest']],
+                         ['SELECT 0.3', 'SELECT 0.2'])
+
+    def test_report(self):
+        with profiler.scope('periodic:test'):
+            self.dbapi.ihost_get_list()
+        self.profiler.report()
+
+        reports = profiler.load_reports(self.report_dir)
+        self.assertEqual(len(reports), 1)
+        scopes = dbprofile.aggregate_scopes(reports, by_method=False)
+        self.assertIn('periodic:test', [s['scope'] for s in scopes])
+
+    def test_teardown(self):
+        profiler.teardown(sqlalchemy_api.Connection)
+        self.assertIsNone(profiler.get_profiler())
+        self.assertFalse(hasattr(sqlalchemy_api.Connection.ihost_get,
+                                 '_db_profile_original'))
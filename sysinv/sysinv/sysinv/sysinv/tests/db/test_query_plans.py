@@ -0,0 +1,111 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Tests for the query plans of the hot database API queries.
+
+The statements executed by the queries are explained, and the tables they
+filter by foreign key must not be scanned entirely.
+"""
+
+import re
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from sysinv.db import api as dbapi
+from sysinv.tests.db import base
+from sysinv.tests.db import utils
+
+# database API methods, their arguments and the tables they filter;
+# HOST is replaced by the id of the seeded host
+HOST = 'host'
+
+QUERIES = [
+    ('inode_get_by_ihost', [HOST], ['i_node']),
+    ('icpu_get_by_ihost', [HOST], ['i_icpu']),
+    ('icpu_get_by_ihost_inode', [HOST, 1], ['i_icpu']),
+    ('imemory_get_by_ihost', [HOST], ['i_imemory']),
+    ('imemory_get_by_ihost_inode', [HOST, 1], ['i_imemory']),
+    ('iinterface_get_by_ihost', [HOST], ['interfaces']),
+    ('ethernet_port_get_by_host', [HOST], ['ports']),
+    ('port_get_by_interface', [1], ['ports']),
+    ('addresses_get_by_pool', [1], ['addresses']),
+    ('idisk_get_by_ihost', [HOST], ['i_idisk']),
+    ('partition_get_by_ihost', [HOST], ['partition']),
+    ('ipv_get_by_ihost', [HOST], ['i_pv']),
+    ('ilvg_get_by_ihost', [HOST], ['i_lvg']),
+    ('isensor_get_by_ihost', [HOST], ['i_sensors']),
+    ('pci_device_get_by_host', [HOST], ['pci_devices']),
+    ('lldp_agent_get_by_host', [HOST], ['lldp_agents']),
+    ('lldp_tlv_get_by_agent', [1], ['lldp_tlvs']),
+    ('label_get_by_host', [HOST], ['label']),
+    ('host_fs_get_by_ihost', [HOST], ['host_fs']),
+]
+
+# full scans reported by the query plans, where the aliases of the tables
+# are suffixed by a number
+_SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)')
+_POSTGRESQL_SCAN = re.compile(r'Seq Scan on (\w+)')
+_ALIAS_SUFFIX = re.compile(r'_\d+$')
+
+
+def get_full_scans(connection, statement, parameters):
+    """Return the tables scanned entirely by a statement"""
+    dialect = connection.dialect.name
+    cursor = connection.connection.cursor()
+    try:
+        if dialect == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters)
+            details = [row[-1] for row in cursor.fetchall()]
+            pattern = _SQLITE_SCAN
+        elif dialect == 'postgresql':
+            # the tables seeded are too small for their indexes to be used
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + statement, parameters)
+            details = [row[0] for row in cursor.fetchall()]
+            pattern = _POSTGRESQL_SCAN
+        else:
+            return []
+    finally:
+        cursor.close()
+
+    scans = []
+    for detail in details:
+        match = pattern.search(detail)
+        if match:
+            scans.append(_ALIAS_SUFFIX.sub('', match.group(1)))
+    return scans
+
+
+class QueryPlanTestCase(base.DbTestCase):
+
+    def setUp(self):
+        super(QueryPlanTestCase, self).setUp()
+        self.dbapi = dbapi.get_instance()
+        self.system = utils.create_test_isystem()
+        self.host = utils.create_test_ihost(forisystemid=self.system.id)
+        self.scans = []
+
+    def _explain(self, conn, cursor, statement, parameters, context,
+                 executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            self.scans.extend(get_full_scans(conn, statement, parameters))
+
+    def test_no_full_scan(self):
+        failures = []
+        event.listen(Engine, 'before_cursor_execute', self._explain)
+        self.addCleanup(event.remove, Engine, 'before_cursor_execute',
+                        self._explain)
+
+        for method, args, tables in QUERIES:
+            args = [self.host.id if a == HOST else a for a in args]
+            self.scans = []
+            getattr(self.dbapi, method)(*args)
+            scanned = sorted(set(tables) & set(self.scans))
+            if scanned:
+                failures.append('%s scans %s' % (method, ', '.join(scanned)))
+
+        self.assertEqual(failures, [])
@@ -8,15 +8,42 @@
 
 """Tests for manipulating Nodes via the DB API"""
 
+from oslo_db.sqlalchemy import enginefacade
 from oslo_utils import uuidutils
+from sqlalchemy import event
+from sqlalchemy.orm import lazyload
 
+from sysinv import objects
 from sysinv.common import constants
 from sysinv.common import exception
 from sysinv.db import api as dbapi
+from sysinv.db.sqlalchemy import api as sqlalchemy_api
+from sysinv.db.sqlalchemy import models
+from sysinv.db.sqlalchemy import objects as db_objects
 from sysinv.tests.db import base
 from sysinv.tests.db import utils
 
 
+class StatementRecorder(object):
+    """Record the SQL statements executed by the database engine"""
+
+    def __init__(self):
+        self.engine = enginefacade.get_legacy_facade().get_engine()
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, *args):
+        # ignore the connection liveness checks
+        if ' FROM ' in statement:
+            self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+
 class DbNodeTestCase(base.DbTestCase):
 
     def setUp(self):
@@ -94,6 +121,42 @@ class DbNodeTestCase(base.DbTestCase):
         res = self.dbapi.ihost_update(n['id'], {'availability': new_state})
         self.assertEqual(new_state, res['availability'])
 
+    def test_update_ihost_bulk(self):
+        uuids = self._create_many_test_ihosts()
+        config_uuid = uuidutils.generate_uuid()
+
+        res = self.dbapi.ihost_update_bulk(uuids[:3],
+                                           {'config_applied': config_uuid})
+        self.assertEqual(sorted(h['uuid'] for h in res), uuids[:3])
+        for host_uuid in uuids:
+            expected = (config_uuid if host_uuid in uuids[:3]
+                        else "config_value")
+            self.assertEqual(expected,
+                             self.dbapi.ihost_get(host_uuid)['config_applied'])
+
+    def test_update_ihost_bulk_not_found(self):
+        uuids = self._create_many_test_ihosts()
+        self.assertRaises(exception.ServerNotFound,
+                          self.dbapi.ihost_update_bulk,
+                          uuids[:1] + [uuidutils.generate_uuid()],
+                          {'config_applied': uuidutils.generate_uuid()})
+        # the update is not partially applied
+        self.assertEqual("config_value",
+                         self.dbapi.ihost_get(uuids[0])['config_applied'])
+
+    def test_update_ihost_config_target_many(self):
+        uuids = self._create_many_test_ihosts()
+        target = uuidutils.generate_uuid()
+        reboot_target = uuidutils.generate_uuid()
+        config_targets = dict((host_uuid, target) for host_uuid in uuids)
+        config_targets[uuids[0]] = reboot_target
+
+        res = self.dbapi.ihost_config_target_update_many(config_targets)
+        self.assertEqual(len(res), len(uuids))
+        for host in res:
+            self.assertEqual(config_targets[host['uuid']],
+                             host['config_target'])
+
     def test_destroy_ihost(self):
         n = self._create_test_ihost()
 
@@ -127,6 +190,45 @@ class DbNodeTestCase(base.DbTestCase):
         self.assertEqual(n['id'], m['forihostid'])
         self.assertEqual(p['forinodeid'], m['forinodeid'])
 
+    def test_upsert_many_cpus(self):
+        n = self._create_test_ihost()
+        node = utils.create_test_node(forihostid=n['id'])
+        cpus = self.dbapi.icpu_upsert_many(n['id'], [
+            utils.get_test_icpu(cpu=cpu, core=cpu, forinodeid=node.id)
+            for cpu in range(2)])
+        self.assertEqual([c.cpu for c in cpus], [0, 1])
+
+        values = [utils.get_test_icpu(cpu=cpu, core=cpu, forinodeid=node.id)
+                  for cpu in [0, 2]]
+        values[0]['allocated_function'] = constants.APPLICATION_FUNCTION
+        self.dbapi.icpu_upsert_many(n['id'], values, delete_missing=True)
+
+        current = dict((c.cpu, c)
+                       for c in self.dbapi.icpu_get_by_ihost(n['id']))
+        self.assertEqual(sorted(current), [0, 2])
+        # the reported cpus are updated in place
+        self.assertEqual(current[0].uuid, cpus[0].uuid)
+        self.assertEqual(current[0].allocated_function,
+                         constants.APPLICATION_FUNCTION)
+
+    def test_upsert_many_memory(self):
+        n = self._create_test_ihost()
+        nodes = [utils.create_test_node(forihostid=n['id'], numa_node=i)
+                 for i in range(2)]
+        memory = self.dbapi.imemory_create(n['id'], utils.get_test_imemory(
+            forinodeid=nodes[0].id))
+
+        values = [utils.get_test_imemory(forinodeid=node.id,
+                                         memtotal_mib=4096)
+                  for node in nodes]
+        self.dbapi.imemory_upsert_many(n['id'], values)
+
+        current = self.dbapi.imemory_get_by_ihost(n['id'])
+        self.assertEqual(len(current), 2)
+        for m in current:
+            self.assertEqual(m.memtotal_mib, 4096)
+        self.assertIn(memory.uuid, [m.uuid for m in current])
+
     def test_create_networkPort_on_a_server(self):
         n = self._create_test_ihost()
 
@@ -457,3 +559,153 @@ class DbNodeTestCase(base.DbTestCase):
         self.dbapi.kube_rootca_host_update_destroy(host_update['id'])
         self.assertRaises(exception.KubeRootCAHostUpdateNotFound,
                         self.dbapi.kube_rootca_host_update_get, host_update['id'])
+
+
+class DbLoadingProfileTestCase(base.DbTestCase):
+
+    def setUp(self):
+        super(DbLoadingProfileTestCase, self).setUp()
+        self.dbapi = dbapi.get_instance()
+        self.system = utils.create_test_isystem()
+        self.host = utils.create_test_ihost(forisystemid=self.system['id'])
+        lvg = utils.create_test_lvg(forihostid=self.host.id,
+                                    lvm_vg_name=constants.LVG_CGTS_VG)
+        pv = utils.create_test_pv(forihostid=self.host.id,
+                                  forilvgid=lvg.id,
+                                  lvm_vg_name=constants.LVG_CGTS_VG)
+        for index in range(3):
+            disk = utils.create_test_idisk(
+                device_node='/dev/sd%s' % 'abc'[index],
+                device_path='/dev/disk/by-path/pci-0000:00:0d.0-ata-%s.0' %
+                            index,
+                forihostid=self.host.id,
+                foripvid=pv.id)
+            utils.create_test_partition(
+                device_node='/dev/sd%s1' % 'abc'[index],
+                forihostid=self.host.id,
+                idisk_id=disk.id,
+                idisk_uuid=disk.uuid,
+                size_mib=128)
+
+    def _get_by_profile(self, getter):
+        results = {}
+        for profile in constants.DB_LOADING_PROFILES:
+            with StatementRecorder() as recorder:
+                objs = getter(self.host.id, profile=profile)
+            results[profile] = ([obj.as_dict() for obj in objs],
+                                recorder.statements)
+        return results
+
+    def _check_profiles(self, getter, relationships):
+        results = self._get_by_profile(getter)
+        detail, detail_statements = results[constants.DB_LOADING_PROFILE_DETAIL]
+
+        # the profiles only change how the same objects are loaded
+        for objs, _ in results.values():
+            self.assertEqual(objs, detail)
+            self.assertTrue(all(obj['ihost_uuid'] == self.host.uuid
+                                for obj in objs))
+
+        # a statement per relationship read by the objects at most
+        _, statements = results[constants.DB_LOADING_PROFILE_LIST]
+        self.assertLessEqual(len(statements), 1 + relationships)
+        self.assertLess(statements[0].count('JOIN'),
+                        detail_statements[0].count('JOIN'))
+
+        # a single statement joining the relationships read by the objects
+        _, statements = results[constants.DB_LOADING_PROFILE_PUPPET]
+        self.assertEqual(len(statements), 1)
+        self.assertLessEqual(statements[0].count('JOIN'), relationships)
+        self.assertLess(statements[0].count('JOIN'),
+                        detail_statements[0].count('JOIN'))
+
+    def test_disk_profiles(self):
+        self._check_profiles(self.dbapi.idisk_get_by_ihost, 3)
+
+    def test_partition_profiles(self):
+        self._check_profiles(self.dbapi.partition_get_by_ihost, 2)
+
+    def test_pv_profiles(self):
+        self._check_profiles(self.dbapi.ipv_get_by_ihost, 2)
+
+    def test_unknown_profile(self):
+        self.assertRaises(exception.InvalidParameterValue,
+                          self.dbapi.idisk_get_by_ihost,
+                          self.host.id, profile='unknown')
+
+    def test_disk_get_by_ihosts(self):
+        host = utils.create_test_ihost(forisystemid=self.system['id'],
+                                       hostname='controller-1',
+                                       uuid=uuidutils.generate_uuid(),
+                                       mgmt_mac='01:34:67:9A:CD:FF')
+        with StatementRecorder() as recorder:
+            disks = self.dbapi.idisk_get_by_ihosts(
+                [self.host.id, host.id],
+                profile=constants.DB_LOADING_PROFILE_PUPPET)
+
+        # a single statement whatever the number of hosts
+        self.assertEqual(len(recorder.statements), 1)
+        self.assertEqual(sorted(disks.keys()), sorted([self.host.id, host.id]))
+        self.assertEqual([d.uuid for d in disks[self.host.id]],
+                         [d.uuid for d in
+                          self.dbapi.idisk_get_by_ihost(self.host.id)])
+        self.assertEqual(disks[host.id], [])
+        self.assertEqual(self.dbapi.idisk_get_by_ihosts([]), {})
+
+
+class DbReadonlyObjectTestCase(base.BaseHostTestCase):
+
+    def setUp(self):
+        super(DbReadonlyObjectTestCase, self).setUp()
+        self.host = self._create_test_host(constants.CONTROLLER)
+        self._create_test_host_cpus(self.host, platform=2, application=2)
+        for index in range(2):
+            utils.create_test_ethernet_port(
+                name='eth%s' % index,
+                host_id=self.host.id,
+                mac='02:11:22:33:44:%02x' % index,
+                pciaddr='0000:00:%02x.0' % index)
+
+    def _check_objects(self, objs, expected):
+        self.assertEqual(len(objs), len(expected))
+        for obj, expected_obj in zip(objs, expected):
+            self.assertIs(type(obj), type(expected_obj))
+            self.assertEqual(obj.as_dict(), expected_obj.as_dict())
+            for field in obj.fields:
+                self.assertIs(type(getattr(obj, field)),
+                              type(getattr(expected_obj, field)))
+            self.assertEqual(obj.obj_what_changed(), set())
+
+    def test_cpu_get_by_ihost(self):
+        cpus = self.dbapi.icpu_get_by_ihost(self.host.id)
+        self.assertEqual(len(cpus), 4)
+        self.assertTrue(all(cpu.ihost_uuid == self.host.uuid
+                            for cpu in cpus))
+        self._check_objects(cpus, [self.dbapi.icpu_get(cpu.uuid)
+                                   for cpu in cpus])
+
+    def test_memory_get_by_ihost(self):
+        memory = self.dbapi.imemory_get_by_ihost(self.host.id)
+        self._check_objects(memory, [self.dbapi.imemory_get(m.uuid)
+                                     for m in memory])
+
+    def test_ethernet_port_get_by_host(self):
+        ports = self.dbapi.ethernet_port_get_by_host(
+            self.host.id, profile=constants.DB_LOADING_PROFILE_LIST)
+        self.assertEqual(len(ports), 2)
+        self._check_objects(ports, [self.dbapi.ethernet_port_get(port.uuid)
+                                    for port in ports])
+
+    def test_unloaded_relationship(self):
+        # the objects are converted in a session when a relationship read
+        # by the conversion was not loaded by the query
+        @db_objects.objectify_readonly(objects.cpu)
+        def get_cpus():
+            query = sqlalchemy_api.model_query(models.icpu)
+            query = query.options(lazyload('*'))
+            return query.filter_by(forihostid=self.host.id).all()
+
+        cpus = get_cpus()
+        self.assertTrue(all(cpu.ihost_uuid == self.host.uuid
+                            for cpu in cpus))
+        self._check_objects(cpus, self.dbapi.icpu_get_by_ihost(self.host.id))
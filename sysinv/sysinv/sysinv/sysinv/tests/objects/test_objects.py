@@ -13,6 +13,7 @@
 #    under the License.
 
 import contextlib
+import copy
 import datetime
 import gettext
 import iso8601
@@ -447,6 +448,92 @@ class TestObject(_LocalTest, _TestObjectMixin):
     pass
 
 
+class TestCompactObject(_LocalTest):
+    def setUp(self):
+        super(TestCompactObject, self).setUp()
+        self.compact_class = MyObj.compact_class()
+
+    def _get_objects(self):
+        objs = []
+        for obj_class in [MyObj, self.compact_class]:
+            obj = obj_class()
+            obj.foo = 1
+            obj.bar = 'bar'
+            obj.obj_reset_changes()
+            objs.append(obj)
+        return objs
+
+    def test_compact_class(self):
+        self.assertIs(self.compact_class, MyObj.compact_class())
+        self.assertIs(self.compact_class, self.compact_class.compact_class())
+        self.assertTrue(issubclass(self.compact_class, MyObj))
+        self.assertEqual(self.compact_class.obj_name(), 'MyObj')
+        self.assertEqual(MyObj._obj_classes['MyObj'], [MyObj])
+        self.assertIn('_foo', self.compact_class.__slots__)
+
+    def test_dict_syntax(self):
+        obj, compact = self._get_objects()
+        self.assertEqual(compact['foo'], 1)
+        self.assertEqual(compact.get('bar'), 'bar')
+        self.assertTrue('foo' in compact)
+        self.assertFalse('missing' in compact)
+        self.assertEqual(compact.as_dict(), obj.as_dict())
+        self.assertEqual(sorted(compact.items()), sorted(obj.items()))
+
+    def test_primitive(self):
+        obj, compact = self._get_objects()
+        self.assertEqual(compact.obj_to_primitive(), obj.obj_to_primitive())
+        compact.bar = 'changed'
+        primitive = compact.obj_to_primitive()
+        self.assertEqual(primitive['sysinv_object.changes'], ['bar'])
+        obj = MyObj.obj_from_primitive(primitive)
+        self.assertIs(type(obj), MyObj)
+        self.assertEqual(obj.bar, 'changed')
+
+    def test_changes(self):
+        _, compact = self._get_objects()
+        self.assertEqual(compact.obj_what_changed(), set())
+        self.assertIsNone(compact._changes)
+        compact.foo = '2'
+        compact.bar = 'changed'
+        self.assertEqual(compact.foo, 2)
+        self.assertEqual(compact.obj_what_changed(), set(['foo', 'bar']))
+        compact.obj_reset_changes(['foo'])
+        self.assertEqual(compact.obj_what_changed(), set(['bar']))
+        compact.obj_reset_changes()
+        self.assertIsNone(compact._changes)
+
+    def test_remotable(self):
+        ctxt = context.get_admin_context()
+        compact = self.compact_class.get(ctxt)
+        self.assertIs(type(compact), self.compact_class)
+        self.assertIs(compact._context, ctxt)
+        compact.modify_save_modify(ctxt)
+        self.assertEqual(compact.obj_what_changed(), set(['foo']))
+        self.assertEqual(compact.foo, 42)
+        self.assertEqual(compact.bar, 'meow')
+
+    def test_load(self):
+        compact = self.compact_class()
+        self.assertEqual(compact.bar, 'loaded!')
+
+    def test_deepcopy(self):
+        _, compact = self._get_objects()
+        compact._context = context.get_admin_context()
+        copied = copy.deepcopy(compact)
+        self.assertIs(type(copied), self.compact_class)
+        self.assertEqual(copied.as_dict(), compact.as_dict())
+        self.assertFalse(hasattr(copied, '_context'))
+
+    def test_compact_objects(self):
+        self.assertIs(base.get_object_class(MyObj), MyObj)
+        with base.compact_objects():
+            self.assertIs(base.get_object_class(MyObj), self.compact_class)
+            with base.compact_objects(enabled=False):
+                self.assertIs(base.get_object_class(MyObj), MyObj)
+        self.assertIs(base.get_object_class(MyObj), MyObj)
+
+
 class TestObjectListBase(test_base.TestCase):
     def test_list_like_operations(self):
         class Foo(base.ObjectListBase, base.SysinvObject):
@@ -0,0 +1,331 @@
+#
+# Copyright (c) 2022 Wind River Systems, Inc.
+#
+# SPDX-License-Identifier: Apache-2.0
+#
+
+"""Hieradata generation benchmark.
+
+Populates the unit test SQLite database with a synthetic system and measures
+the system and host hiera data generation of each puppet plugin; the wall
+time, the number of SQL statements and the memory allocated.
+
+    python -m sysinv.tests.puppet.benchmark --workers 50 --output base.json
+    python -m sysinv.tests.puppet.benchmark --workers 50 --compare base.json
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import json
+import sys
+import time
+import tracemalloc
+import unittest
+
+from oslo_db.sqlalchemy import enginefacade
+from sqlalchemy import event
+
+from sysinv.common import constants
+from sysinv.puppet import puppet
+from sysinv.tests.db import base as dbbase
+from sysinv.tests.db import utils as dbutils
+from sysinv.tests.puppet import base
+
+FLEET_DEFAULTS = collections.OrderedDict([
+    ('controllers', 2),
+    ('workers', 10),
+    ('storage', 0),
+    ('interfaces', 2),
+    ('vlans', 2),
+    ('bonds', 1),
+    ('sriov', 1),
+    ('ptp', 2),
+    ('labels', 4),
+])
+
+# first management address allocated to the synthetic hosts
+HOST_ADDRESS_OFFSET = 20
+
+
+class QueryCounter(object):
+    """Count the SQL statements executed by an engine"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _count(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(self.engine, 'before_cursor_execute', self._count)
+
+
+class Metrics(object):
+    """Accumulated cost of the calls of a puppet plugin method"""
+
+    def __init__(self):
+        self.calls = 0
+        self.wall = 0.0
+        self.queries = 0
+        self.allocated = 0
+        self.peak = 0
+
+    def measure(self, counter, func, *args):
+        queries = counter.count
+        allocated = self._start_tracing()
+        start = time.time()
+        try:
+            return func(*args)
+        finally:
+            self.wall += time.time() - start
+            current, peak = tracemalloc.get_traced_memory()
+            self.calls += 1
+            self.queries += counter.count - queries
+            self.allocated += current - allocated
+            self.peak = max(self.peak, peak - allocated)
+
+    @staticmethod
+    def _start_tracing():
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.clear_traces()
+        return tracemalloc.get_traced_memory()[0]
+
+    def as_dict(self):
+        return collections.OrderedDict([
+            ('calls', self.calls),
+            ('wall', round(self.wall, 6)),
+            ('queries', self.queries),
+            ('allocated', self.allocated),
+            ('peak', self.peak),
+        ])
+
+
+class HieradataBenchmark(base.PuppetTestCaseMixin, dbbase.BaseHostTestCase):
+    """Benchmark run as a test case to reuse the unit test database and
+    fixtures. It is not discovered by the test runner.
+    """
+
+    fleet = FLEET_DEFAULTS
+
+    def setUp(self):
+        super(HieradataBenchmark, self).setUp()
+        self._ptp_instances = [
+            dbutils.create_test_ptp_instance(
+                name='benchmark-ptp%s' % index,
+                service=constants.PTP_INSTANCE_TYPE_PTP4L)
+            for index in range(self.fleet['ptp'])]
+        self._create_fleet()
+
+    def _create_fleet(self):
+        hostnames = ['%s-%s' % (constants.WORKER, unit)
+                     for unit in range(self.fleet['workers'])]
+        hostnames += ['%s-%s' % (constants.STORAGE, unit)
+                      for unit in range(self.fleet['storage'])]
+        addresses = self._create_test_addresses(
+            hostnames, self.mgmt_subnet, constants.NETWORK_TYPE_MGMT,
+            start=HOST_ADDRESS_OFFSET)
+        addresses = dict((hostname, address.address)
+                         for hostname, address in zip(hostnames, addresses))
+
+        for unit in range(self.fleet['controllers']):
+            host = self._create_test_host(constants.CONTROLLER, unit=unit)
+            self._create_test_host_cpus(host, platform=16)
+            self._create_host_interfaces(host)
+        for personality, count in [(constants.WORKER, self.fleet['workers']),
+                                   (constants.STORAGE, self.fleet['storage'])]:
+            for unit in range(count):
+                hostname = '%s-%s' % (personality, unit)
+                host = self._create_test_host(personality, unit=unit,
+                                              mgmt_ip=addresses[hostname])
+                self._create_test_host_cpus(host, platform=2, application=6)
+                self._create_host_interfaces(host)
+
+    def _create_port(self, host, iface, **kwargs):
+        index = len(self.dbapi.ethernet_port_get_by_host(host.id))
+        return dbutils.create_test_ethernet_port(
+            name='eth%s' % index,
+            host_id=host.id,
+            interface_id=iface.id,
+            mac='02:11:22:33:%02x:%02x' % (host.id % 256, index),
+            pciaddr='0000:00:%02x.0' % index,
+            dev_id=0,
+            **kwargs)
+
+    def _create_interface(self, host, ifname, **kwargs):
+        return dbutils.create_test_interface(
+            ifname=ifname,
+            forihostid=host.id,
+            ihost_uuid=host.uuid,
+            ifclass=kwargs.pop('ifclass', constants.INTERFACE_CLASS_NONE),
+            **kwargs)
+
+    def _create_host_interfaces(self, host):
+        ifaces = self._create_test_host_platform_interface(host)
+
+        for index in range(self.fleet['interfaces']):
+            iface = self._create_interface(host, 'data%s' % index)
+            self._create_port(host, iface)
+            for vlan in range(self.fleet['vlans']):
+                vlan_id = 100 + index * self.fleet['vlans'] + vlan
+                self._create_interface(
+                    host, 'vlan%s' % vlan_id,
+                    iftype=constants.INTERFACE_TYPE_VLAN,
+                    vlan_id=vlan_id, uses=[iface.ifname])
+
+        for index in range(self.fleet['bonds']):
+            members = []
+            for member in range(2):
+                iface = self._create_interface(
+                    host, 'bond%smember%s' % (index, member))
+                self._create_port(host, iface)
+                members.append(iface.ifname)
+            self._create_interface(
+                host, 'bond%s' % index,
+                iftype=constants.INTERFACE_TYPE_AE,
+                aemode='balanced', txhashpolicy='layer2', uses=members)
+
+        for index in range(self.fleet['sriov']):
+            iface = self._create_interface(
+                host, 'sriov%s' % index,
+                ifclass=constants.INTERFACE_CLASS_PCI_SRIOV,
+                sriov_numvfs=4, sriov_vf_driver='ixgbevf')
+            self._create_port(host, iface,
+                              driver='ixgbe', sriov_totalvfs=64,
+                              sriov_numvfs=4, sriov_vf_driver='ixgbevf')
+
+        for ptp_instance in self._ptp_instances:
+            self.dbapi.ptp_instance_assign(
+                {'host_id': host.id, 'ptp_instance_id': ptp_instance.id})
+            ptp_interface = dbutils.create_test_ptp_interface(
+                name='%s-%s' % (ptp_instance.name, host.hostname),
+                ptp_instance_id=ptp_instance.id,
+                ptp_instance_uuid=ptp_instance.uuid)
+            self.dbapi.ptp_interface_assign(
+                {'interface_id': ifaces[-1].id,
+                 'ptp_interface_id': ptp_interface.id})
+
+        for index in range(self.fleet['labels']):
+            dbutils.create_test_label(
+                host_id=host.id,
+                label_key='benchmark-label-%s' % index,
+                label_value='enabled')
+
+    @puppet.puppet_context
+    def _measure_system_config(self, counter, results):
+        for puppet_plugin in self.operator.puppet_plugins:
+            results[puppet_plugin.name].measure(
+                counter, puppet_plugin.obj.get_system_config)
+
+    @puppet.puppet_context
+    def _measure_host_config(self, counter, results, host):
+        self.operator.context['config'] = config = {}
+        for puppet_plugin in self.operator.puppet_plugins:
+            config.update(results[puppet_plugin.name].measure(
+                counter, puppet_plugin.obj.get_host_config, host))
+
+    def test_benchmark(self):
+        engine = enginefacade.get_legacy_facade().get_engine()
+        system = collections.defaultdict(Metrics)
+        host = collections.defaultdict(Metrics)
+        total = collections.defaultdict(Metrics)
+        hosts = self.dbapi.ihost_get_list()
+        self.operator.config_uuid = None
+
+        tracemalloc.start()
+        try:
+            with QueryCounter(engine) as counter:
+                self._measure_system_config(counter, system)
+                for ihost in hosts:
+                    self._measure_host_config(counter, host, ihost)
+
+                total['update_system_config'].measure(
+                    counter, self.operator.update_system_config)
+                total['update_hosts_config'].measure(
+                    counter, self.operator.update_hosts_config, hosts)
+                with self.operator.batch_context():
+                    total['update_hosts_config_batch'].measure(
+                        counter, self.operator.update_hosts_config, hosts)
+        finally:
+            tracemalloc.stop()
+
+        self._results = collections.OrderedDict([
+            ('fleet', self.fleet),
+            ('hosts', len(hosts)),
+            ('python', sys.version.split()[0]),
+            ('system', self._as_dict(system)),
+            ('host', self._as_dict(host)),
+            ('total', self._as_dict(total)),
+        ])
+
+    @staticmethod
+    def _as_dict(results):
+        return collections.OrderedDict(
+            (name, metrics.as_dict()) for name, metrics in results.items())
+
+
+def compare(baseline, results):
+    """Print the relative wall time and queries of each measurement"""
+    print("%-40s %12s %12s %10s %10s" %
+          ('measurement', 'wall', 'baseline', 'queries', 'baseline'))
+    for scope in ['system', 'host', 'total']:
+        for name, metrics in results[scope].items():
+            base_metrics = baseline.get(scope, {}).get(name)
+            if base_metrics is None:
+                continue
+            print("%-40s %12.6f %12.6f %10d %10d" %
+                  ('%s:%s' % (scope, name), metrics['wall'],
+                   base_metrics['wall'], metrics['queries'],
+                   base_metrics['queries']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    for name, default in FLEET_DEFAULTS.items():
+        parser.add_argument('--%s' % name, type=int, default=default,
+                            help='number of %s (default: %s)' %
+                                 (name, default))
+    parser.add_argument('--output', help='write the results to a JSON file')
+    parser.add_argument('--compare',
+                        help='compare the results with a previous JSON file')
+    args = parser.parse_args(argv)
+
+    if args.controllers > 2:
+        parser.error('at most 2 controllers are supported')
+    hosts = args.workers + args.storage
+    if hosts > dbbase.BaseIPv4Mixin.mgmt_subnet.size - HOST_ADDRESS_OFFSET - 1:
+        parser.error('too many hosts for the management subnet')
+
+    HieradataBenchmark.fleet = collections.OrderedDict(
+        (name, getattr(args, name)) for name in FLEET_DEFAULTS)
+    benchmark = HieradataBenchmark('test_benchmark')
+    result = unittest.TestResult()
+    benchmark.run(result)
+    for _, error in result.errors + result.failures:
+        print(error, file=sys.stderr)
+    if not result.wasSuccessful():
+        return 1
+
+    results = benchmark._results
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+    elif not args.output:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -13,6 +13,7 @@ from sysinv.common import constants
 from sysinv.common import device as dconstants
 from sysinv.common import kubernetes
 from sysinv.puppet import interface
+from sysinv.puppet import kubernetes as kubernetes_puppet
 from sysinv.puppet import puppet
 from sysinv.tests.db import base as dbbase
 from sysinv.tests.db import utils as dbutils
@@ -325,3 +326,100 @@ class KubeVersionTestCase(base.PuppetTestCaseMixin, dbbase.BaseHostTestCase):
 
         self.assertEqual(kubeadm_version, '1.19.13')
         self.assertEqual(kubelet_version, '1.19.13')
+
+
+class KubeJoinCmdTestCase(base.PuppetTestCaseMixin, dbbase.BaseHostTestCase):
+
+    def setUp(self):
+        super(KubeJoinCmdTestCase, self).setUp()
+        self.controller = self._create_test_host(constants.CONTROLLER)
+        self.worker = self._create_test_host(constants.WORKER)
+
+        self.kubeadm_config = 'kubernetesVersion: v1.21.8'
+        self.mock_check_output = mock.patch(
+            'sysinv.puppet.kubernetes.subprocess.check_output',
+            side_effect=self._check_output).start()
+        self.mock_check_call = mock.patch(
+            'sysinv.puppet.kubernetes.subprocess.check_call').start()
+        self.mock_get_password = mock.patch(
+            'sysinv.puppet.kubernetes.keyring.get_password',
+            return_value='certkey').start()
+        mock.patch.object(self.operator.kubernetes,
+                          '_get_host_cluster_address',
+                          return_value='192.168.206.2').start()
+        self.addCleanup(mock.patch.stopall)
+        self.tokens = 0
+
+    def _check_output(self, cmd, **kwargs):
+        if cmd[0] == 'kubectl':
+            return self.kubeadm_config
+        self.tokens += 1
+        return 'kubeadm join 192.168.206.1:6443 --token token%d\n' % self.tokens
+
+    def _get_join_cmd(self, host):
+        return self.operator.kubernetes._get_kubernetes_join_cmd(host)
+
+    def test_join_cmd_controller(self):
+        join_cmd = self._get_join_cmd(self.controller)
+        self.assertEqual(
+            join_cmd,
+            'kubeadm join 192.168.206.1:6443 --token token1'
+            ' --control-plane --certificate-key certkey'
+            ' --apiserver-advertise-address 192.168.206.2'
+            ' --cri-socket /var/run/containerd/containerd.sock')
+        self.assertEqual(self.mock_check_call.call_count, 1)
+
+    def test_join_cmd_reused(self):
+        self.assertEqual(self._get_join_cmd(self.controller),
+                         self._get_join_cmd(self.controller))
+        self.assertEqual(self._get_join_cmd(self.worker),
+                         self._get_join_cmd(self.worker))
+        # one token per role and a single certificate upload
+        self.assertEqual(self.tokens, 2)
+        self.assertEqual(self.mock_check_call.call_count, 1)
+
+    def test_join_cmd_expired(self):
+        with mock.patch('sysinv.puppet.kubernetes.time.time',
+                        return_value=1000):
+            self._get_join_cmd(self.worker)
+        with mock.patch('sysinv.puppet.kubernetes.time.time',
+                        return_value=1000 +
+                        kubernetes_puppet.KUBEADM_JOIN_CMD_CACHE_PERIOD):
+            self.assertIn('token2', self._get_join_cmd(self.worker))
+
+    def test_join_cmd_expired_before_certs(self):
+        # the join command is not reused once its certificates have been
+        # uploaded for the cache period
+        with mock.patch('sysinv.puppet.kubernetes.time.time',
+                        return_value=1000):
+            self._get_join_cmd(self.controller)
+        cache_period = kubernetes_puppet.KUBEADM_JOIN_CMD_CACHE_PERIOD
+        with mock.patch('sysinv.puppet.kubernetes.time.time',
+                        return_value=1000 + cache_period - 1):
+            self.assertIn('token1', self._get_join_cmd(self.controller))
+        with mock.patch('sysinv.puppet.kubernetes.time.time',
+                        return_value=1000 + cache_period):
+            self.assertIn('token2', self._get_join_cmd(self.controller))
+        self.assertEqual(self.mock_check_call.call_count, 2)
+        self.assertLess(cache_period, kubernetes_puppet.KUBEADM_CERTS_TTL / 2)
+
+    def test_join_cmd_kubeadm_config_changed(self):
+        self._get_join_cmd(self.controller)
+        self.kubeadm_config = 'kubernetesVersion: v1.22.5'
+        self.assertIn('token2', self._get_join_cmd(self.controller))
+        self.assertEqual(self.mock_check_call.call_count, 2)
+
+    def test_join_cmd_certificate_key_changed(self):
+        self._get_join_cmd(self.controller)
+        self.mock_get_password.return_value = 'newkey'
+        join_cmd = self._get_join_cmd(self.controller)
+        self.assertIn('--certificate-key newkey', join_cmd)
+        self.assertEqual(self.mock_check_call.call_count, 2)
+
+    def test_join_cmd_batch(self):
+        with self.operator.batch_context():
+            self._get_join_cmd(self.controller)
+            self._get_join_cmd(self.worker)
+        kubectl_calls = [c for c in self.mock_check_output.call_args_list
+                         if c[0][0][0] == 'kubectl']
+        self.assertEqual(len(kubectl_calls), 1)
@@ -4,7 +4,13 @@
 #
 
 import mock
+import os
+import shutil
+import tempfile
 
+from sysinv.puppet import ovs
+from sysinv.puppet import puppet
+from sysinv.tests import base as testbase
 from sysinv.tests.db import base as dbbase
 from sysinv.tests.puppet import base
 
@@ -36,6 +42,104 @@ class PuppetOperatorTestSuiteMixin(base.PuppetTestCaseMixin):
         self.operator.update_host_config(self.host)  # pylint: disable=no-member
         assert self.mock_write_config.called
 
+    def test_update_hosts_config_parallel(self):
+        hosts = [self.host, self.host]  # pylint: disable=no-member
+        self.operator.update_hosts_config(hosts, workers=1)
+        serial_calls = self.mock_write_config.call_args_list
+        self.mock_write_config.reset_mock()
+
+        self.operator.update_hosts_config(hosts, workers=2)
+        self.assertEqual(self.mock_write_config.call_count, len(hosts))
+        self.assertEqual(self.mock_write_config.call_args_list, serial_calls)
+
+    def test_update_hosts_config_parallel_failure(self):
+        hosts = [self.host, self.host]  # pylint: disable=no-member
+        with mock.patch.object(self.operator, 'update_host_config',
+                               side_effect=[None, ValueError()]):
+            self.assertRaises(ValueError,
+                              self.operator.update_hosts_config,
+                              hosts, workers=2)
+
+    def test_update_hosts_config_batch_context(self):
+        hosts = [self.host, self.host]  # pylint: disable=no-member
+        self.operator.update_hosts_config(hosts, workers=1)
+        expected_calls = self.mock_write_config.call_args_list
+        self.mock_write_config.reset_mock()
+
+        with self.operator.batch_context() as batch:
+            self.operator.update_hosts_config(hosts, workers=2)
+        self.assertEqual(self.mock_write_config.call_args_list, expected_calls)
+        self.assertGreater(batch.misses, 0)
+        self.assertGreater(batch.hits, 0)
+        self.assertIsNone(self.operator.batch)
+
+    def test_batch_context_system_lookup(self):
+        with mock.patch.object(self.dbapi, 'isystem_get_one',  # pylint: disable=no-member
+                               wraps=self.dbapi.isystem_get_one) as mock_get:  # pylint: disable=no-member
+            with self.operator.batch_context() as batch:
+                self.operator.update_host_config(self.host)  # pylint: disable=no-member
+                self.operator.update_host_config(self.host)  # pylint: disable=no-member
+            self.assertEqual(mock_get.call_count, 1)
+            self.assertGreater(batch.stats()['hits'], 0)
+
+    def test_update_host_config_scoped(self):
+        self.operator.update_host_config(self.host, 'uuid-1')  # pylint: disable=no-member
+        config = self.mock_write_config.call_args[0][1]
+        self.mock_write_config.reset_mock()
+
+        with mock.patch.object(self.operator, '_get_current_host_config',
+                               return_value=dict(config)), \
+                mock.patch('sysinv.puppet.interface.InterfacePuppet.'
+                           'get_host_config') as mock_interface:
+            self.operator.update_host_config(
+                self.host, 'uuid-2',  # pylint: disable=no-member
+                classes=['platform::dns::dnsmasq::runtime'])
+            mock_interface.assert_not_called()
+
+        config['platform::config::params::config_uuid'] = 'uuid-2'
+        self.assertEqual(self.mock_write_config.call_args[0][1], config)
+
+    def test_update_host_config_scoped_unknown_class(self):
+        self.operator.update_host_config(self.host)  # pylint: disable=no-member
+        with mock.patch.object(self.operator,
+                               '_get_current_host_config') as mock_current:
+            self.operator.update_host_config(
+                self.host,  # pylint: disable=no-member
+                classes=['platform::config::runtime'])
+            mock_current.assert_not_called()
+        self.assertEqual(self.mock_write_config.call_count, 2)
+
+    @mock.patch.object(ovs.OVSPuppet, 'RUNTIME_CLASSES',
+                       ['platform::vswitch::runtime'])
+    def test_update_host_config_scoped_context(self):
+        # the context plugins run first, in dependency order
+        self.assertEqual(
+            self.operator._get_scoped_plugins(  # pylint: disable=no-member
+                ['platform::vswitch::runtime']),
+            ['002_interface', '001_platform', '003_ovs'])
+
+        self.operator.update_host_config(self.host)  # pylint: disable=no-member
+        config = self.mock_write_config.call_args[0][1]
+
+        contexts = []
+
+        def get_host_config(obj, host):
+            contexts.append(dict(obj.context))
+            return {}
+
+        with mock.patch.object(self.operator, '_get_current_host_config',
+                               return_value=dict(config)), \
+                mock.patch.object(ovs.OVSPuppet, 'get_host_config',
+                                  autospec=True,
+                                  side_effect=get_host_config):
+            self.operator.update_host_config(
+                self.host,  # pylint: disable=no-member
+                classes=['platform::vswitch::runtime'])
+
+        self.assertEqual(len(contexts), 1)
+        self.assertIn('interfaces', contexts[0])
+        self.assertIn('_lldp_drivers', contexts[0])
+
 
 #  ============= IPv4 environment tests ==============
 # Tests all puppet operations for a Controller (defaults to IPv4)
@@ -142,3 +246,52 @@ class PlatformUpgradeOpenstackAIODuplexHostTestCase(PuppetOperatorTestSuiteMixin
                 ],
                 any_order=True
             )
+
+
+class PuppetOperatorIncrementalWriteTestCase(testbase.TestCase):
+
+    def setUp(self):
+        super(PuppetOperatorIncrementalWriteTestCase, self).setUp()
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path)
+        self.operator = puppet.PuppetOperator(path=self.path,
+                                              incremental=True)
+        self.config = {
+            'platform::config::params::config_uuid': 'uuid-1',
+            'platform::params::hostname': 'controller-0',
+        }
+
+    def _read_file(self, filename):
+        with open(os.path.join(self.path, filename)) as f:
+            return f.read()
+
+    def test_write_config_unchanged(self):
+        self.assertTrue(self.operator._write_config('test.yaml', self.config))
+        with mock.patch('os.rename') as mock_rename:
+            self.assertFalse(
+                self.operator._write_config('test.yaml', self.config))
+            mock_rename.assert_not_called()
+
+    def test_write_config_changed(self):
+        self.operator._write_config('test.yaml', self.config)
+        self.config['platform::params::hostname'] = 'controller-1'
+        self.assertTrue(self.operator._write_config('test.yaml', self.config))
+        self.assertIn('controller-1', self._read_file('test.yaml'))
+
+    def test_write_config_volatile_key_changed(self):
+        self.operator._write_config('test.yaml', self.config)
+        self.config['platform::config::params::config_uuid'] = 'uuid-2'
+        self.assertFalse(
+            self.operator._write_config('test.yaml', self.config))
+        # the file is still rewritten with the new configuration uuid
+        self.assertIn('uuid-2', self._read_file('test.yaml'))
+
+    def test_write_config_existing_file(self):
+        self.operator._write_config('test.yaml', self.config)
+        operator = puppet.PuppetOperator(path=self.path, incremental=True)
+        self.assertFalse(operator._write_config('test.yaml', self.config))
+
+    def test_write_config_not_incremental(self):
+        operator = puppet.PuppetOperator(path=self.path)
+        self.assertTrue(operator._write_config('test.yaml', self.config))
+        self.assertTrue(operator._write_config('test.yaml', self.config))